@@ -24,10 +24,38 @@ from .unit_of_work import (
     ExecutionResult
 )
 
+from .scheduler import TaskScheduler
+
+from .critical_path import (
+    LatencyHistogram,
+    CriticalPathAnalyzer,
+    CriticalPathReport
+)
+
+from .checkpoint import (
+    CheckpointStore,
+    SQLiteCheckpointStore,
+    CheckpointError
+)
+
+from .result_cache import TaskResultCache
+
+from .retry import (
+    RetryPolicy,
+    CircuitBreaker
+)
+
 from .executor import (
     UnitOfWorkExecutor,
     DependencyCycleError,
-    AgentNotFoundError
+    AgentNotFoundError,
+    CheckpointNotFoundError,
+    AgentInvocationError
+)
+
+from .planner import (
+    CapabilityPlanner,
+    PlanStep
 )
 
 from .dashboard import (
@@ -51,9 +79,23 @@ __all__ = [
     "Task",
     "UnitOfWork",
     "ExecutionResult",
+    "TaskScheduler",
+    "LatencyHistogram",
+    "CriticalPathAnalyzer",
+    "CriticalPathReport",
     "UnitOfWorkExecutor",
     "DependencyCycleError",
     "AgentNotFoundError",
+    "CheckpointNotFoundError",
+    "AgentInvocationError",
+    "RetryPolicy",
+    "TaskResultCache",
+    "CircuitBreaker",
+    "CheckpointStore",
+    "SQLiteCheckpointStore",
+    "CheckpointError",
+    "CapabilityPlanner",
+    "PlanStep",
     "GleanPublisher",
     "MockGleanPublisher",
     "JourneyDashboardService",
@@ -0,0 +1,345 @@
+"""
+Unit of Work Checkpoints
+
+Durable execution state, so a unit of work interrupted by a crash can be
+resumed instead of re-run. Based on Journey State Machine Design (DES-002).
+
+A checkpoint is the unit of work as it was when execution started (one
+UnitOfWork.to_dict record) followed by small deltas: after every task
+transition the executor appends only the task fields that changed
+(status, result, error, retry_count, timestamps). Loading replays the
+deltas over the base record. Starting execution again (e.g. on resume)
+rewrites the base record and drops the replayed deltas.
+
+CheckpointStore is the backend interface; SQLiteCheckpointStore is the
+local default.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+import json
+import sqlite3
+import threading
+
+from .unit_of_work import UnitOfWork, Task, WorkStatus, TaskStatus
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS units ("
+    " work_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS deltas ("
+    " work_id TEXT NOT NULL, seq INTEGER NOT NULL, data TEXT NOT NULL,"
+    " PRIMARY KEY (work_id, seq)) WITHOUT ROWID",
+)
+
+
+class CheckpointError(IOError):
+    """Raised when the store is closed or a checkpoint cannot be written."""
+    pass
+
+
+def _encode(data: Dict[str, Any]) -> str:
+    try:
+        return json.dumps(data, separators=(",", ":"))
+    except (TypeError, ValueError) as e:
+        raise CheckpointError(f"Checkpoint state is not JSON serializable: {e}") from e
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def task_state(task: Task) -> Dict[str, Any]:
+    """Fields of a task that change during execution, serialized."""
+    return {
+        "status": task.status.value,
+        "retry_count": task.retry_count,
+        "started_at": _timestamp(task.started_at),
+        "completed_at": _timestamp(task.completed_at),
+        "error": task.error,
+        "result": task.result
+    }
+
+
+def task_delta(task: Task, recorded: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Task fields changed since they were last recorded.
+
+    Args:
+        task: Task after a transition
+        recorded: task_id -> last recorded state (updated in place)
+
+    Returns:
+        Delta with task_id and the changed fields, or None if nothing changed
+    """
+    state = task_state(task)
+    previous = recorded.get(task.task_id, {})
+    delta = {name: value for name, value in state.items() if previous.get(name, ...) != value}
+    if not delta:
+        return None
+    recorded[task.task_id] = state
+    delta["task_id"] = task.task_id
+    return delta
+
+
+def work_delta(uow: UnitOfWork) -> Dict[str, Any]:
+    """Unit of work fields set when execution finishes (a delta without task_id)."""
+    return {
+        "status": uow.status.value,
+        "completed_at": _timestamp(uow.completed_at),
+        "failed_task_id": uow.failed_task_id
+    }
+
+
+def apply_delta(uow: UnitOfWork, delta: Dict[str, Any]) -> None:
+    """Replay one delta onto a unit of work restored from its base record."""
+    if "task_id" not in delta:
+        if "status" in delta:
+            uow.status = WorkStatus(delta["status"])
+        if "completed_at" in delta:
+            uow.completed_at = _parse_timestamp(delta["completed_at"])
+        if "failed_task_id" in delta:
+            uow.failed_task_id = delta["failed_task_id"]
+        return
+
+    task = uow.get_task(delta["task_id"])
+    if task is None:
+        return
+    if "status" in delta:
+        task.status = TaskStatus(delta["status"])
+    if "retry_count" in delta:
+        task.retry_count = delta["retry_count"]
+    if "started_at" in delta:
+        task.started_at = _parse_timestamp(delta["started_at"])
+    if "completed_at" in delta:
+        task.completed_at = _parse_timestamp(delta["completed_at"])
+    if "error" in delta:
+        task.error = delta["error"]
+    if "result" in delta:
+        task.result = delta["result"]
+
+
+class CheckpointStore(ABC):
+    """
+    Abstract unit of work checkpoint backend.
+
+    The executor writes from its dispatching thread, once per task
+    transition; writes must be durable when they return.
+    """
+
+    @abstractmethod
+    def begin(self, uow: UnitOfWork) -> None:
+        """Store a unit of work's full state, replacing any earlier checkpoint of its work_id."""
+        pass
+
+    @abstractmethod
+    def append(self, work_id: str, deltas: List[Dict[str, Any]]) -> None:
+        """Add state deltas to a unit of work's checkpoint."""
+        pass
+
+    @abstractmethod
+    def load(self, work_id: str) -> Optional[UnitOfWork]:
+        """Get the last checkpointed state of a unit of work, or None if there is none."""
+        pass
+
+    @abstractmethod
+    def delete(self, work_id: str) -> None:
+        """Remove a unit of work's checkpoint."""
+        pass
+
+    @abstractmethod
+    def list_work_ids(self, status: Optional[WorkStatus] = None) -> List[str]:
+        """Get checkpointed work IDs, optionally only those with a given status."""
+        pass
+
+    def close(self) -> None:
+        """Release resources."""
+        pass
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """
+    SQLite checkpoint store.
+
+    Every write is its own transaction in WAL mode, so a checkpoint
+    survives the process dying right after the write returns.
+
+    Usage:
+        store = SQLiteCheckpointStore("/var/lib/a2acp/checkpoints.db")
+        executor = UnitOfWorkExecutor(agent_invoker, checkpoint_store=store)
+        ...
+        # After a restart
+        for work_id in store.list_work_ids(WorkStatus.IN_PROGRESS):
+            executor.resume(work_id)
+    """
+
+    def __init__(self, path: str, synchronous: bool = True):
+        """
+        Open (or create) a checkpoint database.
+
+        Args:
+            path: SQLite database file
+            synchronous: Sync to disk at WAL checkpoints, surviving power loss
+                         up to the last one (False leaves it to the OS, for
+                         tests and benchmarks; process crashes are survived
+                         either way)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._closed = False
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'NORMAL' if synchronous else 'OFF'}")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+        self._next_seq: Dict[str, int] = {}  # work_id -> next delta sequence number
+
+        self.metrics = {
+            "checkpoints": 0,
+            "deltas": 0,
+            "delta_bytes": 0,
+            "loads": 0
+        }
+
+    def begin(self, uow: UnitOfWork) -> None:
+        """
+        Store a unit of work's full state, dropping earlier deltas.
+
+        Raises:
+            CheckpointError: If the store is closed, the state is not JSON
+                             serializable or the write failed
+        """
+        data = _encode(uow.to_dict())
+        with self._lock:
+            self._transaction([
+                ("DELETE FROM deltas WHERE work_id = ?", (uow.work_id,)),
+                ("INSERT OR REPLACE INTO units VALUES (?, ?, ?)",
+                 (uow.work_id, data, datetime.utcnow().isoformat()))
+            ])
+            self._next_seq[uow.work_id] = 0
+            self.metrics["checkpoints"] += 1
+
+    def append(self, work_id: str, deltas: List[Dict[str, Any]]) -> None:
+        """
+        Add state deltas in one transaction.
+
+        Raises:
+            CheckpointError: If the store is closed, a delta is not JSON
+                             serializable or the write failed
+        """
+        if not deltas:
+            return
+        encoded = [_encode(delta) for delta in deltas]
+        with self._lock:
+            seq = self._next_seq.get(work_id)
+            if seq is None:
+                row = self._execute("SELECT MAX(seq) FROM deltas WHERE work_id = ?", (work_id,)).fetchone()
+                seq = row[0] + 1 if row[0] is not None else 0
+            rows = [(work_id, seq + offset, data) for offset, data in enumerate(encoded)]
+            self._transaction([("INSERT INTO deltas VALUES (?, ?, ?)", row) for row in rows])
+            self._next_seq[work_id] = seq + len(rows)
+            self.metrics["deltas"] += len(rows)
+            self.metrics["delta_bytes"] += sum(len(data) for data in encoded)
+
+    def load(self, work_id: str) -> Optional[UnitOfWork]:
+        """
+        Rebuild a unit of work from its base record and deltas.
+
+        Raises:
+            CheckpointError: If the store is closed or the read failed
+        """
+        with self._lock:
+            row = self._execute("SELECT data FROM units WHERE work_id = ?", (work_id,)).fetchone()
+            if row is None:
+                return None
+            deltas = self._execute(
+                "SELECT data FROM deltas WHERE work_id = ? ORDER BY seq", (work_id,)
+            ).fetchall()
+            self.metrics["loads"] += 1
+
+        uow = UnitOfWork.from_dict(json.loads(row[0]))
+        for (data,) in deltas:
+            apply_delta(uow, json.loads(data))
+        return uow
+
+    def delete(self, work_id: str) -> None:
+        """
+        Remove a unit of work's checkpoint.
+
+        Raises:
+            CheckpointError: If the store is closed or the write failed
+        """
+        with self._lock:
+            self._transaction([
+                ("DELETE FROM deltas WHERE work_id = ?", (work_id,)),
+                ("DELETE FROM units WHERE work_id = ?", (work_id,))
+            ])
+            self._next_seq.pop(work_id, None)
+
+    def list_work_ids(self, status: Optional[WorkStatus] = None) -> List[str]:
+        """
+        Get checkpointed work IDs, oldest checkpoint first.
+
+        Loads each checkpoint when filtering by status.
+
+        Raises:
+            CheckpointError: If the store is closed or the read failed
+        """
+        with self._lock:
+            work_ids = [work_id for (work_id,) in self._execute("SELECT work_id FROM units ORDER BY updated_at")]
+        if status is None:
+            return work_ids
+        matching = []
+        for work_id in work_ids:
+            uow = self.load(work_id)
+            if uow is not None and uow.status == status:
+                matching.append(work_id)
+        return matching
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get write and load counters."""
+        with self._lock:
+            return dict(self.metrics)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._conn.close()
+
+    def __enter__(self) -> "SQLiteCheckpointStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        """Run one statement (lock held)."""
+        if self._closed:
+            raise CheckpointError("Checkpoint store is closed")
+        try:
+            return self._conn.execute(sql, parameters)
+        except sqlite3.Error as e:
+            raise CheckpointError(f"Checkpoint read failed: {e}") from e
+
+    def _transaction(self, statements) -> None:
+        """Run statements in one transaction (lock held)."""
+        if self._closed:
+            raise CheckpointError("Checkpoint store is closed")
+        try:
+            self._conn.execute("BEGIN")
+            try:
+                for sql, parameters in statements:
+                    self._conn.execute(sql, parameters)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            raise CheckpointError(f"Checkpoint write failed: {e}") from e
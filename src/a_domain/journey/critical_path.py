@@ -0,0 +1,317 @@
+"""
+Critical Path Analysis
+
+Predicts how long a unit of work will take before it runs.
+Based on Journey State Machine Design (DES-002).
+
+UnitOfWorkExecutor records a latency histogram per (agent_id, intent);
+the analyzer turns them into task duration estimates and runs the
+critical path method over Task.depends_on:
+- makespan: the longest dependency path, i.e. the duration with
+  unlimited workers
+- gating tasks: tasks without slack, whose every delay delays completion
+- parallelism: peak width of the as-soon-as-possible schedule, and the
+  fewest workers whose simulated schedule stays close to the makespan
+"""
+
+from dataclasses import dataclass, field
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable
+import heapq
+import math
+
+from .unit_of_work import UnitOfWork, Task, TaskStatus
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency distribution.
+
+    Bucket bounds grow by 2^(1/4) from 1ms, so quantiles are within about
+    19% of the true value; everything above ~4 hours shares the last
+    bucket, whose quantiles report the maximum. Recording is O(1) and
+    memory is fixed. Not thread-safe.
+    """
+
+    MIN_SECONDS = 0.001
+    GROWTH = 2 ** 0.25
+    BUCKETS = 96
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one observation."""
+        if seconds <= self.MIN_SECONDS:
+            index = 0
+        else:
+            index = min(self.BUCKETS - 1, math.ceil(math.log(seconds / self.MIN_SECONDS, self.GROWTH)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean latency, or None without observations."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a latency quantile.
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            Upper bound of the bucket holding the quantile (clamped to the
+            observed range), or None without observations
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index == self.BUCKETS - 1:
+                    return self.maximum
+                bound = self.MIN_SECONDS * self.GROWTH ** index
+                return min(max(bound, self.minimum), self.maximum)
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary statistics."""
+        return {
+            "count": self.count,
+            "mean_seconds": self.mean,
+            "p50_seconds": self.quantile(0.5),
+            "p90_seconds": self.quantile(0.9),
+            "p99_seconds": self.quantile(0.99),
+            "max_seconds": self.maximum if self.count else None
+        }
+
+
+@dataclass
+class CriticalPathReport:
+    """Predicted schedule of a unit of work."""
+    work_id: str
+    makespan_seconds: float  # Longest dependency path (unlimited workers)
+    total_work_seconds: float  # Sum of task estimates (one worker)
+    critical_path: List[str]  # Task IDs along the longest path, first to last
+    gating_tasks: List[str]  # Tasks left to run without slack, in dependency order
+    slack_seconds: Dict[str, float]  # How long each task can slip without delaying completion
+    peak_parallelism: int  # Most tasks running at once when started as early as possible
+    recommended_parallelism: Optional[int] = None  # Fewest workers keeping close to the makespan
+    unestimated_tasks: List[str] = field(default_factory=list)  # Tasks without latency history
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "work_id": self.work_id,
+            "makespan_seconds": self.makespan_seconds,
+            "total_work_seconds": self.total_work_seconds,
+            "critical_path": self.critical_path,
+            "gating_tasks": self.gating_tasks,
+            "peak_parallelism": self.peak_parallelism,
+            "recommended_parallelism": self.recommended_parallelism,
+            "unestimated_tasks": self.unestimated_tasks
+        }
+
+
+class CriticalPathAnalyzer:
+    """
+    Critical path method over a unit of work's task DAG.
+
+    Task durations come from an estimator (typically backed by the
+    executor's latency histograms); tasks it cannot estimate use
+    default_seconds and are listed in the report. Completed tasks take no
+    time, so a partly executed unit of work is forecast from where it is.
+    """
+
+    def __init__(
+        self,
+        estimate: Callable[[Task], Optional[float]],
+        default_seconds: float = 1.0,
+        tolerance: float = 0.1
+    ):
+        """
+        Initialize analyzer.
+
+        Args:
+            estimate: Task -> expected duration in seconds (None if unknown)
+            default_seconds: Duration assumed for tasks without an estimate
+            tolerance: Recommended parallelism may exceed the makespan by
+                       this fraction
+        """
+        self._estimate = estimate
+        self.default_seconds = default_seconds
+        self.tolerance = tolerance
+
+    def analyze(self, uow: UnitOfWork, recommend: bool = True) -> CriticalPathReport:
+        """
+        Forecast a unit of work.
+
+        Args:
+            uow: Unit of work (not modified)
+            recommend: Also find the recommended parallelism (a few schedule
+                       simulations, O(log(peak) * tasks * log(tasks)))
+
+        Returns:
+            Critical path report
+
+        Raises:
+            ValueError: If the task graph has circular dependencies
+        """
+        order, dependencies, durations, unestimated = self._prepare(uow)
+
+        # Forward pass: earliest finish, remembering the predecessor that gates each task
+        finish: Dict[str, float] = {}
+        gate: Dict[str, Optional[str]] = {}
+        for task in order:
+            start, previous = 0.0, None
+            for dep_id in dependencies[task.task_id]:
+                if previous is None or finish[dep_id] > start:
+                    start, previous = finish[dep_id], dep_id
+            finish[task.task_id] = start + durations[task.task_id]
+            gate[task.task_id] = previous
+
+        makespan = max(finish.values(), default=0.0)
+
+        # Backward pass: latest finish that does not delay completion
+        latest: Dict[str, float] = {task.task_id: makespan for task in order}
+        for task in reversed(order):
+            latest_start = latest[task.task_id] - durations[task.task_id]
+            for dep_id in dependencies[task.task_id]:
+                if latest_start < latest[dep_id]:
+                    latest[dep_id] = latest_start
+
+        slack = {task_id: max(0.0, latest[task_id] - finish[task_id]) for task_id in finish}
+        epsilon = makespan * 1e-9
+        gating = [
+            task.task_id for task in order
+            if durations[task.task_id] > 0 and slack[task.task_id] <= epsilon
+        ]
+
+        critical_path: List[str] = []
+        if order:
+            current: Optional[str] = max(finish, key=lambda task_id: finish[task_id])
+            while current is not None:
+                critical_path.append(current)
+                current = gate[current]
+            critical_path.reverse()
+
+        report = CriticalPathReport(
+            work_id=uow.work_id,
+            makespan_seconds=makespan,
+            total_work_seconds=sum(durations.values()),
+            critical_path=critical_path,
+            gating_tasks=gating,
+            slack_seconds=slack,
+            peak_parallelism=self._peak_parallelism(finish, durations),
+            unestimated_tasks=unestimated
+        )
+        if recommend:
+            report.recommended_parallelism = self._recommend(order, dependencies, durations, report)
+        return report
+
+    def simulate(self, uow: UnitOfWork, workers: int) -> float:
+        """
+        Predict the makespan with a fixed number of workers.
+
+        Simulates the executor's policy: tasks start in the order they
+        become ready whenever a worker is free.
+
+        Args:
+            uow: Unit of work (not modified)
+            workers: Concurrent tasks allowed
+
+        Returns:
+            Predicted duration in seconds
+
+        Raises:
+            ValueError: If the task graph has circular dependencies
+        """
+        order, dependencies, durations, _ = self._prepare(uow)
+        return self._simulate(order, dependencies, durations, workers)
+
+    def _prepare(self, uow: UnitOfWork):
+        """Kahn order, deduplicated known dependencies, durations and unestimated task IDs."""
+        order = uow.get_execution_order()
+        if len(order) < len({task.task_id for task in uow.tasks}):
+            raise ValueError(f"Circular dependencies detected in UoW {uow.work_id}")
+
+        known = {task.task_id for task in order}
+        dependencies: Dict[str, List[str]] = {}
+        durations: Dict[str, float] = {}
+        unestimated: List[str] = []
+        for task in order:
+            dependencies[task.task_id] = [dep_id for dep_id in dict.fromkeys(task.depends_on) if dep_id in known]
+            if task.status == TaskStatus.COMPLETED:
+                durations[task.task_id] = 0.0
+                continue
+            estimate = self._estimate(task)
+            if estimate is None:
+                unestimated.append(task.task_id)
+                estimate = self.default_seconds
+            durations[task.task_id] = estimate
+        return order, dependencies, durations, unestimated
+
+    @staticmethod
+    def _peak_parallelism(finish: Dict[str, float], durations: Dict[str, float]) -> int:
+        """Most tasks overlapping in the as-soon-as-possible schedule."""
+        events = []
+        for task_id, end in finish.items():
+            if durations[task_id] > 0:
+                events.append((end - durations[task_id], 1))
+                events.append((end, -1))
+        events.sort()  # At equal times -1 sorts first: a task ending frees its slot
+        peak = running = 0
+        for _, change in events:
+            running += change
+            peak = max(peak, running)
+        return peak
+
+    def _recommend(self, order, dependencies, durations, report: CriticalPathReport) -> int:
+        """Fewest workers whose simulated makespan is within tolerance (binary search)."""
+        target = report.makespan_seconds * (1 + self.tolerance)
+        low, high = 1, max(1, report.peak_parallelism)
+        while low < high:
+            middle = (low + high) // 2
+            if self._simulate(order, dependencies, durations, middle) <= target:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    @staticmethod
+    def _simulate(order, dependencies, durations, workers: int) -> float:
+        """List-schedule the DAG on a number of workers, FIFO by readiness."""
+        dependents: Dict[str, List[str]] = {}
+        unmet: Dict[str, int] = {}
+        for task in order:
+            unmet[task.task_id] = len(dependencies[task.task_id])
+            for dep_id in dependencies[task.task_id]:
+                dependents.setdefault(dep_id, []).append(task.task_id)
+
+        ready = deque(task.task_id for task in order if not unmet[task.task_id])
+        running: List = []  # (finish time, sequence, task_id)
+        now = 0.0
+        sequence = 0
+        while ready or running:
+            while ready and len(running) < workers:
+                task_id = ready.popleft()
+                heapq.heappush(running, (now + durations[task_id], sequence, task_id))
+                sequence += 1
+            now, _, task_id = heapq.heappop(running)
+            for dependent_id in dependents.get(task_id, ()):
+                unmet[dependent_id] -= 1
+                if not unmet[dependent_id]:
+                    ready.append(dependent_id)
+        return now
@@ -12,6 +12,7 @@ from abc import ABC, abstractmethod
 
 from .state_machine import JourneyState, JourneyStage
 from .unit_of_work import UnitOfWork, WorkStatus
+from .critical_path import CriticalPathReport
 
 
 logger = logging.getLogger(__name__)
@@ -215,6 +216,11 @@ class JourneyDashboardService:
             JourneyStage.PILOT: 15.0,
             JourneyStage.PRODUCTION: 30.0
         }
+        self._uow_deadline_seconds = 3600.0  # Same 1 hour as the bottleneck check
+
+    def set_uow_deadline(self, seconds: float):
+        """Set the UoW execution time above which forecasts raise SLA risks (in seconds)"""
+        self._uow_deadline_seconds = seconds
 
     def set_sla_threshold(self, stage: JourneyStage, days: float):
         """Set SLA threshold for stage (in days)"""
@@ -285,7 +291,8 @@ class JourneyDashboardService:
         self,
         client_id: str,
         uow: UnitOfWork,
-        labor_cost: Optional[float] = None
+        labor_cost: Optional[float] = None,
+        forecast: Optional[CriticalPathReport] = None
     ) -> bool:
         """
         Publish unit of work execution metrics (AC4).
@@ -294,6 +301,7 @@ class JourneyDashboardService:
             client_id: Client identifier
             uow: Unit of work
             labor_cost: Labor cost for UoW execution
+            forecast: Forecast made before execution, to compare with the actual duration
 
         Returns:
             True if published successfully
@@ -308,7 +316,8 @@ class JourneyDashboardService:
             "completed_tasks": len(uow.get_completed_tasks()),
             "failed_tasks": len(uow.get_failed_tasks()),
             "duration_seconds": duration,
-            "labor_cost": labor_cost
+            "labor_cost": labor_cost,
+            "predicted_makespan_seconds": forecast.makespan_seconds if forecast else None
         }
 
         # Check for bottlenecks (AC3)
@@ -321,6 +330,60 @@ class JourneyDashboardService:
 
         return True
 
+    def publish_uow_forecast(
+        self,
+        client_id: str,
+        uow: UnitOfWork,
+        forecast: CriticalPathReport,
+        deadline_seconds: Optional[float] = None
+    ) -> bool:
+        """
+        Check a unit of work's forecast before it runs.
+
+        Raises an sla_risk alert naming the gating tasks when the predicted
+        makespan exceeds the deadline, so the bottleneck is visible before
+        execution rather than after (see UnitOfWorkExecutor.predict).
+
+        Args:
+            client_id: Client identifier
+            uow: Unit of work about to run
+            forecast: Critical path report for the unit of work
+            deadline_seconds: Allowed execution time (default: UoW deadline)
+
+        Returns:
+            True if the forecast is within the deadline
+        """
+        deadline = self._uow_deadline_seconds if deadline_seconds is None else deadline_seconds
+        makespan = forecast.makespan_seconds
+
+        logger.info(
+            f"UoW forecast for {client_id}",
+            extra={"client_id": client_id, "work_id": uow.work_id, "predicted_makespan_seconds": makespan}
+        )
+
+        if makespan <= deadline:
+            return True
+
+        self._publisher.publish_alert(
+            alert_type="sla_risk",
+            client_id=client_id,
+            message=(
+                f"UoW {uow.work_id} predicted to take {makespan:.0f}s (deadline {deadline:.0f}s); "
+                f"gated by {len(forecast.gating_tasks)} tasks"
+            ),
+            severity="medium",
+            metadata={
+                "work_id": uow.work_id,
+                "stage": uow.stage,
+                "predicted_makespan_seconds": makespan,
+                "deadline_seconds": deadline,
+                "gating_tasks": forecast.gating_tasks,
+                "recommended_parallelism": forecast.recommended_parallelism,
+                "unestimated_tasks": forecast.unestimated_tasks
+            }
+        )
+        return False
+
     def _check_sla_violation(
         self,
         client_id: str,
@@ -5,10 +5,15 @@ Executes multi-agent workflows with dependency resolution and compensation.
 Based on Journey State Machine Design (DES-002).
 """
 
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Tuple, Deque
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import heapq
+import queue
 import threading
 import logging
+import time
 
 from .unit_of_work import (
     UnitOfWork,
@@ -17,6 +22,12 @@ from .unit_of_work import (
     TaskStatus,
     ExecutionResult
 )
+from .scheduler import TaskScheduler
+from .critical_path import LatencyHistogram, CriticalPathAnalyzer, CriticalPathReport
+from .checkpoint import CheckpointStore, CheckpointError, task_state, task_delta, work_delta
+from .retry import RetryPolicy, CircuitBreaker, retry_after_seconds
+from .result_cache import TaskResultCache
+from ..protocol.message import ErrorResponse
 
 
 logger = logging.getLogger(__name__)
@@ -32,6 +43,24 @@ class AgentNotFoundError(Exception):
     pass
 
 
+class CheckpointNotFoundError(Exception):
+    """Raised when resuming a unit of work without a checkpoint"""
+    pass
+
+
+class AgentInvocationError(Exception):
+    """
+    Raised by agent invokers when an agent answers with an ErrorResponse.
+
+    Its retry_after is honored as the minimum delay before the task is
+    retried. Invokers may also return the ErrorResponse instead.
+    """
+
+    def __init__(self, error_response: ErrorResponse):
+        super().__init__(f"{error_response.code}: {error_response.message}")
+        self.error_response = error_response
+
+
 class UnitOfWorkExecutor:
     """
     Executes unit of work by orchestrating agent tasks.
@@ -39,16 +68,41 @@ class UnitOfWorkExecutor:
     Responsibilities:
     - Resolve task dependencies (topological sort)
     - Execute tasks via agent protocol
-    - Handle task failures and retries
+    - Handle task failures and retries (backoff, circuit breakers)
     - Manage saga compensation on failure
     - Track execution metrics
-
-    Thread-safe for concurrent UoW execution.
+    - Forecast makespan from per-(agent_id, intent) latency histograms
+    - Checkpoint task transitions and resume interrupted executions
+    - Serve cacheable tasks from a result cache shared across executions
+
+    Tasks are dispatched as soon as their dependencies complete. With
+    max_workers > 1 they run on a thread pool shared by all executions,
+    so a wide DAG takes about as long as its critical path; max_per_agent
+    additionally caps concurrent tasks of any one agent (across all
+    executions). With the default max_workers=1 tasks run one at a time
+    on the calling thread.
+
+    A failed task is retried after the retry policy's backoff (at least
+    the agent's retry_after); other ready tasks keep running meanwhile.
+    With breaker_threshold set, that many consecutive failures of an agent
+    open its circuit breaker: its tasks wait until a trial call succeeds.
+
+    Thread-safe for concurrent UoW execution. In parallel mode the
+    invoker is called from pool threads while other tasks' results are
+    being added to task_results; it should read only the results of the
+    task's dependencies, which are complete.
     """
 
     def __init__(
         self,
-        agent_invoker: Optional[Callable[[Task, Dict[str, Any]], Dict[str, Any]]] = None
+        agent_invoker: Optional[Callable[[Task, Dict[str, Any]], Dict[str, Any]]] = None,
+        max_workers: int = 1,
+        max_per_agent: Optional[int] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker_threshold: Optional[int] = None,
+        breaker_reset_seconds: float = 10.0,
+        result_cache: Optional[TaskResultCache] = None
     ):
         """
         Initialize executor.
@@ -56,10 +110,45 @@ class UnitOfWorkExecutor:
         Args:
             agent_invoker: Function to invoke agents (task, task_results) -> result
                           If None, uses mock implementation for testing
+            max_workers: Tasks run concurrently across all executions
+                         (1 runs them on the calling thread)
+            max_per_agent: Tasks of one agent run concurrently (None: no limit)
+            checkpoint_store: Store recording execution state after every task
+                              transition, for resume() (None: no checkpoints)
+            retry_policy: Backoff between attempts of a failed task
+                          (default: RetryPolicy())
+            breaker_threshold: Consecutive failures of an agent that open its
+                               circuit breaker (None: no circuit breakers)
+            breaker_reset_seconds: How long an open circuit rejects calls
+                                   before a trial call
+            result_cache: Cache serving tasks marked cacheable whose agent,
+                          intent and inputs match an earlier call (None: no
+                          caching)
+
+        Raises:
+            ValueError: If a limit is below 1
         """
+        if max_workers < 1 or (max_per_agent is not None and max_per_agent < 1):
+            raise ValueError("max_workers and max_per_agent must be at least 1")
+        if breaker_threshold is not None and breaker_threshold < 1:
+            raise ValueError("breaker_threshold must be at least 1")
+
         self._agent_invoker = agent_invoker or self._mock_agent_invoke
+        self.max_workers = max_workers
+        self.max_per_agent = max_per_agent
+        self._checkpoint_store = checkpoint_store
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}  # agent_id -> breaker (with breaker_threshold)
+        self._result_cache = result_cache
+        self._cache_counts: Dict[str, Dict[str, int]] = {}  # work_id -> cache hits and misses of the running UoW
         self._lock = threading.Lock()
+        self._slot_released = threading.Condition(self._lock)  # Signalled when an agent slot frees up
+        self._agent_active: Dict[str, int] = {}  # agent_id -> tasks dispatched and not finished
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="uow-task") if max_workers > 1 else None
         self._execution_metrics: Dict[str, Dict[str, Any]] = {}
+        self._latency: Dict[Tuple[str, str], LatencyHistogram] = {}  # (agent_id, intent) -> successful call latency
 
     def execute(self, uow: UnitOfWork) -> ExecutionResult:
         """
@@ -75,11 +164,12 @@ class UnitOfWorkExecutor:
             DependencyCycleError: If circular dependencies detected
         """
         with self._lock:
-            # Validate dependencies
-            if uow.has_circular_dependencies():
-                raise DependencyCycleError(
-                    f"Circular dependencies detected in UoW {uow.work_id}"
-                )
+            # Validate dependencies while forecasting from latency seen so far
+            # (one Kahn pass; no parallelism search)
+            try:
+                forecast = self._analyzer().analyze(uow, recommend=False)
+            except ValueError as e:
+                raise DependencyCycleError(str(e)) from e
 
             # Update status
             uow.status = WorkStatus.IN_PROGRESS
@@ -91,52 +181,14 @@ class UnitOfWorkExecutor:
             )
 
         # Execute tasks (release lock for long-running operations)
-        task_results = {}
-        completed_tasks = []
-        failed_tasks = []
+        # Tasks finished before this run (e.g. on resume) keep their outcome
+        task_results = {t.task_id: t.result for t in uow.tasks if t.status == TaskStatus.COMPLETED}
+        completed_tasks = list(task_results)
+        failed_tasks = [t.task_id for t in uow.tasks if t.status == TaskStatus.FAILED]
+        checkpoint = self._begin_checkpoint(uow)
 
         try:
-            while True:
-                with self._lock:
-                    runnable = uow.get_runnable_tasks()
-
-                    if not runnable:
-                        # Check if all tasks completed
-                        pending = uow.get_pending_tasks()
-                        if not pending:
-                            break  # All done
-
-                        # Some tasks blocked by failed dependencies
-                        logger.warning(
-                            f"No runnable tasks but {len(pending)} still pending",
-                            extra={"work_id": uow.work_id}
-                        )
-                        break
-
-                # Execute runnable tasks
-                for task in runnable:
-                    success = self._execute_task(task, task_results, uow)
-
-                    with self._lock:
-                        if success:
-                            # Only add to completed once
-                            if task.task_id not in completed_tasks:
-                                completed_tasks.append(task.task_id)
-                        elif task.status == TaskStatus.FAILED:
-                            # Only add to failed if truly failed (not retrying)
-                            if task.task_id not in failed_tasks:
-                                failed_tasks.append(task.task_id)
-                            uow.failed_task_id = task.task_id
-
-                            # Initiate compensation if saga enabled
-                            if uow.compensation_tasks:
-                                logger.info(
-                                    f"Task failed, initiating compensation",
-                                    extra={"work_id": uow.work_id, "failed_task": task.task_id}
-                                )
-                                self._execute_compensation(uow, task_results)
-                                uow.status = WorkStatus.COMPENSATED
-                                break
+            self._run_tasks(uow, task_results, completed_tasks, failed_tasks, checkpoint)
 
             # Determine final status
             with self._lock:
@@ -149,7 +201,9 @@ class UnitOfWorkExecutor:
                 duration = uow.get_execution_duration_seconds()
 
                 # Record metrics
-                self._record_metrics(uow, completed_tasks, failed_tasks, duration)
+                self._record_metrics(uow, completed_tasks, failed_tasks, duration, forecast)
+                if checkpoint is not None:
+                    self._write_checkpoint(uow, [work_delta(uow)])
 
                 logger.info(
                     f"UoW execution completed: {uow.work_id}",
@@ -178,6 +232,9 @@ class UnitOfWorkExecutor:
             with self._lock:
                 uow.status = WorkStatus.FAILED
                 uow.completed_at = datetime.utcnow()
+                self._cache_counts.pop(uow.work_id, None)
+                if checkpoint is not None:
+                    self._write_checkpoint(uow, [work_delta(uow)])
 
                 logger.error(
                     f"UoW execution failed with exception: {uow.work_id}",
@@ -195,12 +252,254 @@ class UnitOfWorkExecutor:
                     error=str(e)
                 )
 
+    def resume(self, work_id: str) -> ExecutionResult:
+        """
+        Resume a unit of work from its checkpoint.
+
+        Completed tasks are not run again; their checkpointed results are
+        passed to dependents as if they had just run. Tasks that were
+        running when execution stopped run again, so agent calls should be
+        idempotent. A unit of work that had already finished is not run;
+        its checkpointed outcome is returned.
+
+        Args:
+            work_id: Unit of work executed with this executor's checkpoint store
+
+        Returns:
+            Execution result covering every task, including those completed
+            before the interruption
+
+        Raises:
+            ValueError: If the executor has no checkpoint store
+            CheckpointNotFoundError: If no checkpoint exists for work_id
+            CheckpointError: If the checkpoint cannot be read
+        """
+        if self._checkpoint_store is None:
+            raise ValueError("resume requires a checkpoint_store")
+
+        uow = self._checkpoint_store.load(work_id)
+        if uow is None:
+            raise CheckpointNotFoundError(f"No checkpoint for UoW {work_id}")
+
+        if uow.status in (WorkStatus.COMPLETED, WorkStatus.FAILED, WorkStatus.COMPENSATED):
+            return ExecutionResult(
+                success=(uow.status == WorkStatus.COMPLETED),
+                work_id=uow.work_id,
+                status=uow.status,
+                completed_tasks=[t.task_id for t in uow.get_completed_tasks()],
+                failed_tasks=[t.task_id for t in uow.get_failed_tasks()],
+                task_results={t.task_id: t.result for t in uow.get_completed_tasks()},
+                error=uow.failed_task_id,
+                duration_seconds=uow.get_execution_duration_seconds(),
+                compensation_executed=(uow.status == WorkStatus.COMPENSATED)
+            )
+
+        interrupted = 0
+        for task in uow.tasks:
+            if task.status == TaskStatus.IN_PROGRESS:
+                task.status = TaskStatus.PENDING
+                task.started_at = None
+                interrupted += 1
+
+        logger.info(
+            f"Resuming UoW execution: {work_id}",
+            extra={
+                "work_id": work_id,
+                "completed": len(uow.get_completed_tasks()),
+                "interrupted": interrupted
+            }
+        )
+        return self.execute(uow)
+
+    def close(self) -> None:
+        """Wait for running tasks and shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def _run_tasks(
+        self,
+        uow: UnitOfWork,
+        task_results: Dict[str, Any],
+        completed_tasks: List[str],
+        failed_tasks: List[str],
+        checkpoint: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Dispatch tasks as their dependencies complete until none can run.
+
+        A failed task's dependents stay pending while independent tasks go
+        on, unless the UoW has compensation tasks: then dispatching stops,
+        running tasks are awaited and the saga is compensated. Tasks waiting
+        for a retry or for an open circuit breaker are held in a delay queue
+        and rejoin the ready queue when due. Cacheable tasks are looked up
+        before taking an agent slot or asking the agent's circuit breaker,
+        so a cache hit never holds either.
+
+        Args:
+            uow: Unit of work being executed
+            task_results: Receives results by task ID
+            completed_tasks: Receives IDs of completed tasks
+            failed_tasks: Receives IDs of failed tasks
+            checkpoint: Last checkpointed state by task ID (None: not
+                        checkpointing); each finished attempt is recorded
+
+        Raises:
+            Exception: Whatever a task raised outside the agent invocation,
+                       after running tasks have finished
+        """
+        done: "queue.Queue[Tuple[Task, bool, Optional[float], Optional[BaseException]]]" = queue.Queue()
+        running = 0
+        stopping = bool(failed_tasks and uow.compensation_tasks)  # Resumed after a failure
+        error: Optional[BaseException] = None
+
+        parked: Dict[str, Deque[Task]] = {}  # Ready tasks waiting for a slot of their agent
+        delayed: List[Tuple[float, int, Task]] = []  # Heap of (due time, sequence, task) waiting to retry
+        sequence = 0
+
+        with self._lock:
+            scheduler = TaskScheduler(uow.tasks)
+
+        while True:
+            dispatch: List[Tuple[Task, Optional[str]]] = []  # (task, result cache key)
+            served: List[Task] = []  # Served from the result cache
+            with self._lock:
+                if not stopping:
+                    now = time.monotonic()
+                    while delayed and delayed[0][0] <= now:
+                        scheduler.retry(heapq.heappop(delayed)[2])
+
+                    # Return as many parked tasks as their agents have free slots
+                    for agent_id in list(parked):
+                        waiting = parked[agent_id]
+                        free = self.max_per_agent - self._agent_active.get(agent_id, 0)
+                        scheduler.requeue(waiting.popleft() for _ in range(min(free, len(waiting))))
+                        if not waiting:
+                            del parked[agent_id]
+
+                    while running + len(dispatch) < self.max_workers:
+                        task = scheduler.pop()
+                        if task is None:
+                            break
+                        hit, cache_key = self._lookup_cache(task, task_results, uow)
+                        if hit:
+                            served.append(task)
+                            continue
+                        active = self._agent_active.get(task.agent_id, 0)
+                        if self.max_per_agent is not None and active >= self.max_per_agent:
+                            parked.setdefault(task.agent_id, deque()).append(task)
+                            continue
+                        breaker = self._breaker(task.agent_id)
+                        wait = breaker.acquire() if breaker is not None else 0.0
+                        if wait > 0:
+                            heapq.heappush(delayed, (now + wait, sequence, task))
+                            sequence += 1
+                            continue
+                        self._agent_active[task.agent_id] = active + 1
+                        task.status = TaskStatus.IN_PROGRESS
+                        dispatch.append((task, cache_key))
+
+                    if not dispatch and not served and not running:
+                        if not parked and not delayed:
+                            pending = uow.get_pending_tasks()
+                            if pending:
+                                # Some tasks blocked by failed dependencies
+                                logger.warning(
+                                    f"No runnable tasks but {len(pending)} still pending",
+                                    extra={"work_id": uow.work_id}
+                                )
+                            break
+                        # Every runnable task waits for a retry or an agent slot held by another UoW
+                        self._slot_released.wait(delayed[0][0] - now if delayed else None)
+                        continue
+                elif not running:
+                    break
+
+            for task in served:
+                running += 1
+                done.put((task, True, None, None))
+
+            for task, cache_key in dispatch:
+                running += 1
+                if self._pool is not None:
+                    self._pool.submit(self._run_dispatched, task, task_results, uow, done, cache_key)
+                else:
+                    self._run_dispatched(task, task_results, uow, done, cache_key)
+
+            try:
+                # Wake up for the next due retry while tasks run
+                timeout = max(0.0, delayed[0][0] - time.monotonic()) if delayed and not stopping else None
+                task, success, retry_after, task_error = done.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            running -= 1
+
+            with self._lock:
+                if task_error is not None:
+                    error = error or task_error
+                    stopping = True
+                elif success:
+                    completed_tasks.append(task.task_id)
+                    scheduler.complete(task.task_id)
+                elif task.status == TaskStatus.PENDING:
+                    due = time.monotonic() + self.retry_policy.delay(task.retry_count, retry_after)
+                    heapq.heappush(delayed, (due, sequence, task))
+                    sequence += 1
+                elif task.status == TaskStatus.FAILED:
+                    failed_tasks.append(task.task_id)
+                    uow.failed_task_id = task.task_id
+                    if uow.compensation_tasks:
+                        stopping = True
+
+            if checkpoint is not None:
+                delta = task_delta(task, checkpoint)
+                if delta is not None:
+                    self._write_checkpoint(uow, [delta])
+
+        if error is not None:
+            raise error
+
+        if failed_tasks and uow.compensation_tasks:
+            # Initiate compensation once every running task has finished
+            logger.info(
+                f"Task failed, initiating compensation",
+                extra={"work_id": uow.work_id, "failed_task": uow.failed_task_id}
+            )
+            self._execute_compensation(uow, task_results)
+            uow.status = WorkStatus.COMPENSATED
+
+    def _run_dispatched(
+        self,
+        task: Task,
+        task_results: Dict[str, Any],
+        uow: UnitOfWork,
+        done: "queue.Queue[Tuple[Task, bool, Optional[float], Optional[BaseException]]]",
+        cache_key: Optional[str] = None
+    ) -> None:
+        """Run one dispatched task, free its agent slot and report to the dispatcher."""
+        success = False
+        retry_after: Optional[float] = None
+        error: Optional[BaseException] = None
+        try:
+            success, retry_after = self._execute_task(task, task_results, uow, cache_key)
+        except BaseException as e:
+            error = e
+        finally:
+            with self._slot_released:
+                active = self._agent_active.get(task.agent_id, 1) - 1
+                if active > 0:
+                    self._agent_active[task.agent_id] = active
+                else:
+                    self._agent_active.pop(task.agent_id, None)
+                self._slot_released.notify_all()
+            done.put((task, success, retry_after, error))
+
     def _execute_task(
         self,
         task: Task,
         task_results: Dict[str, Any],
-        uow: UnitOfWork
-    ) -> bool:
+        uow: UnitOfWork,
+        cache_key: Optional[str] = None
+    ) -> Tuple[bool, Optional[float]]:
         """
         Execute individual task.
 
@@ -208,9 +507,11 @@ class UnitOfWorkExecutor:
             task: Task to execute
             task_results: Results from previous tasks
             uow: Parent unit of work
+            cache_key: Result cache key to store a successful result under
 
         Returns:
-            True if success, False if failed
+            (True if success, False if failed; retry_after seconds requested
+            by the agent's ErrorResponse, if any)
         """
         task.status = TaskStatus.IN_PROGRESS
         task.started_at = datetime.utcnow()
@@ -227,24 +528,48 @@ class UnitOfWorkExecutor:
 
         try:
             # Invoke agent via protocol
+            start = time.perf_counter()
             result = self._agent_invoker(task, task_results)
+            elapsed = time.perf_counter() - start
+            if isinstance(result, ErrorResponse):
+                raise AgentInvocationError(result)
+
+            with self._lock:
+                key = (task.agent_id, task.intent)
+                histogram = self._latency.get(key)
+                if histogram is None:
+                    histogram = self._latency[key] = LatencyHistogram()
+                histogram.record(elapsed)
+                breaker = self._breaker(task.agent_id)
+                if breaker is not None:
+                    breaker.record_success()
 
             task.status = TaskStatus.COMPLETED
             task.completed_at = datetime.utcnow()
             task.result = result
             task_results[task.task_id] = result
+            if cache_key is not None:
+                self._result_cache.put(cache_key, result)
 
             logger.info(
                 f"Task completed: {task.task_id}",
                 extra={"work_id": uow.work_id, "task_id": task.task_id}
             )
 
-            return True
+            return True, None
 
         except Exception as e:
             task.error = str(e)
             task.retry_count += 1
 
+            retry_after = None
+            if isinstance(e, AgentInvocationError):
+                retry_after = retry_after_seconds(e.error_response)
+            with self._lock:
+                breaker = self._breaker(task.agent_id)
+                if breaker is not None:
+                    breaker.record_failure(retry_after)
+
             # Retry logic
             if task.retry_count < task.max_retries:
                 logger.warning(
@@ -256,10 +581,10 @@ class UnitOfWorkExecutor:
                     }
                 )
 
-                # Reset status for retry
+                # Reset status for retry (the dispatcher applies the backoff)
                 task.status = TaskStatus.PENDING
                 task.started_at = None
-                return False
+                return False, retry_after
 
             else:
                 logger.error(
@@ -274,7 +599,46 @@ class UnitOfWorkExecutor:
 
                 task.status = TaskStatus.FAILED
                 task.completed_at = datetime.utcnow()
-                return False
+                return False, retry_after
+
+    def _lookup_cache(
+        self,
+        task: Task,
+        task_results: Dict[str, Any],
+        uow: UnitOfWork
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Complete a cacheable task from the result cache (lock held).
+
+        Args:
+            task: Ready task
+            task_results: Results from previous tasks
+            uow: Parent unit of work
+
+        Returns:
+            (True if the task was completed from the cache; key to store its
+            result under if it runs, None if it is not cached)
+        """
+        if self._result_cache is None or not task.cacheable:
+            return False, None
+
+        cache_key = self._result_cache.fingerprint(task, task_results)
+        hit, result = self._result_cache.get(cache_key) if cache_key is not None else (False, None)
+        counts = self._cache_counts.setdefault(uow.work_id, {"cache_hits": 0, "cache_misses": 0})
+        counts["cache_hits" if hit else "cache_misses"] += 1
+        if not hit:
+            return False, cache_key
+
+        task.status = TaskStatus.COMPLETED
+        task.started_at = task.completed_at = datetime.utcnow()
+        task.result = result
+        task_results[task.task_id] = result
+
+        logger.info(
+            f"Task served from result cache: {task.task_id}",
+            extra={"work_id": uow.work_id, "task_id": task.task_id}
+        )
+        return True, None
 
     def _execute_compensation(
         self,
@@ -330,14 +694,60 @@ class UnitOfWorkExecutor:
                 comp_task.error = str(e)
                 comp_task.completed_at = datetime.utcnow()
 
+    def get_circuit_breakers(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get circuit breaker states.
+
+        Returns:
+            agent_id -> state, consecutive failures and times opened
+            (empty without breaker_threshold)
+        """
+        with self._lock:
+            return {agent_id: breaker.to_dict() for agent_id, breaker in self._breakers.items()}
+
+    def _breaker(self, agent_id: str) -> Optional[CircuitBreaker]:
+        """Circuit breaker of an agent, None without breaker_threshold (call under lock)."""
+        if self.breaker_threshold is None:
+            return None
+        breaker = self._breakers.get(agent_id)
+        if breaker is None:
+            breaker = self._breakers[agent_id] = CircuitBreaker(self.breaker_threshold, self.breaker_reset_seconds)
+        return breaker
+
+    def _begin_checkpoint(self, uow: UnitOfWork) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Checkpoint the full state; returns the recorded task states (None if not checkpointing)."""
+        if self._checkpoint_store is None:
+            return None
+        try:
+            self._checkpoint_store.begin(uow)
+        except CheckpointError as e:
+            logger.error(
+                f"Checkpoint failed, executing without: {uow.work_id}",
+                extra={"work_id": uow.work_id, "error": str(e)}
+            )
+            return None
+        return {task.task_id: task_state(task) for task in uow.tasks}
+
+    def _write_checkpoint(self, uow: UnitOfWork, deltas: List[Dict[str, Any]]) -> None:
+        """Append state deltas; a failed write is logged and execution goes on."""
+        try:
+            self._checkpoint_store.append(uow.work_id, deltas)
+        except CheckpointError as e:
+            logger.error(
+                f"Checkpoint write failed: {uow.work_id}",
+                extra={"work_id": uow.work_id, "error": str(e)}
+            )
+
     def _record_metrics(
         self,
         uow: UnitOfWork,
         completed_tasks: List[str],
         failed_tasks: List[str],
-        duration_seconds: Optional[float]
+        duration_seconds: Optional[float],
+        forecast: Optional[CriticalPathReport] = None
     ):
         """Record execution metrics for analysis"""
+        cache_counts = self._cache_counts.pop(uow.work_id, {})
         self._execution_metrics[uow.work_id] = {
             "work_id": uow.work_id,
             "stage": uow.stage,
@@ -348,6 +758,11 @@ class UnitOfWorkExecutor:
             "failed_count": len(failed_tasks),
             "duration_seconds": duration_seconds,
             "compensation_executed": (uow.status == WorkStatus.COMPENSATED),
+            "predicted_makespan_seconds": forecast.makespan_seconds if forecast else None,
+            "critical_path": forecast.critical_path if forecast else [],
+            "gating_tasks": forecast.gating_tasks if forecast else [],
+            "cache_hits": cache_counts.get("cache_hits", 0),
+            "cache_misses": cache_counts.get("cache_misses", 0),
             "timestamp": datetime.utcnow().isoformat()
         }
 
@@ -366,6 +781,65 @@ class UnitOfWorkExecutor:
                 return self._execution_metrics.get(work_id, {})
             return self._execution_metrics.copy()
 
+    def predict(
+        self,
+        uow: UnitOfWork,
+        quantile: Optional[float] = None,
+        recommend: bool = True
+    ) -> CriticalPathReport:
+        """
+        Forecast a unit of work from observed task latencies.
+
+        Each task is estimated from the latency histogram of its
+        (agent_id, intent); tasks never seen before use the mean over all
+        agents (1s before any observation) and are reported as unestimated.
+
+        Args:
+            uow: Unit of work to forecast (not modified)
+            quantile: Estimate tasks at this latency quantile (e.g. 0.9 for a
+                      pessimistic forecast) instead of the mean
+            recommend: Also compute the recommended parallelism
+
+        Returns:
+            Critical path report
+
+        Raises:
+            DependencyCycleError: If circular dependencies detected
+        """
+        with self._lock:
+            analyzer = self._analyzer(quantile)
+            try:
+                return analyzer.analyze(uow, recommend=recommend)
+            except ValueError as e:
+                raise DependencyCycleError(str(e)) from e
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Get observed task latencies.
+
+        Returns:
+            agent_id -> intent -> histogram summary (count, mean, p50/p90/p99, max)
+        """
+        with self._lock:
+            stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (agent_id, intent), histogram in self._latency.items():
+                stats.setdefault(agent_id, {})[intent] = histogram.to_dict()
+            return stats
+
+    def _analyzer(self, quantile: Optional[float] = None) -> CriticalPathAnalyzer:
+        """Critical path analyzer over the current histograms (call under lock)."""
+        histograms = self._latency
+        count = sum(histogram.count for histogram in histograms.values())
+        default = sum(histogram.total for histogram in histograms.values()) / count if count else 1.0
+
+        def estimate(task: Task) -> Optional[float]:
+            histogram = histograms.get((task.agent_id, task.intent))
+            if histogram is None:
+                return None
+            return histogram.mean if quantile is None else histogram.quantile(quantile)
+
+        return CriticalPathAnalyzer(estimate, default_seconds=default)
+
     def _mock_agent_invoke(
         self,
         task: Task,
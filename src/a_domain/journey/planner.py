@@ -0,0 +1,399 @@
+"""
+Capability Planner
+
+Turns a target intent into a UnitOfWork by resolving the `requires`
+chains of registered capabilities against what other agents `provide`.
+Based on Journey State Machine Design (DES-002).
+
+The planner keeps its own provides -> agents and intent -> agents
+indexes, fed by registry change events, and memoizes the best sub-plan
+for every capability. A registry change only drops the memoized plans
+that consulted the changed agent, so replanning after a registration
+touches just the affected part of the graph.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Set, Tuple, FrozenSet
+from uuid import uuid4
+import threading
+
+from ..protocol.discovery import CapabilityRegistry, CapabilitySpec
+from .unit_of_work import Task, UnitOfWork
+from .executor import AgentNotFoundError, DependencyCycleError
+
+
+# Graph nodes: ("intent", name), ("provides", name) or ("agent", agent_id)
+Node = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """
+    One agent in a resolved plan.
+
+    Steps are shared between the plans that use them, so a plan is a DAG
+    of PlanSteps rooted at the agent handling the target intent.
+    """
+    agent_id: str
+    capability: str  # Intent or provided capability the step serves
+    dependencies: Tuple["PlanStep", ...]  # Providers of the agent's requirements
+    agents: FrozenSet[str]  # Every agent in this sub-plan
+
+    @property
+    def size(self) -> int:
+        """Number of distinct agents in the sub-plan."""
+        return len(self.agents)
+
+
+@dataclass(frozen=True)
+class _Unresolved:
+    """Memoized failure: no agent can serve a node."""
+    reason: str
+    cycle: bool  # Every candidate failed because of a dependency cycle
+
+
+class CapabilityPlanner:
+    """
+    Plans multi-agent work from capability requirements.
+
+    For a target intent the planner picks the handling agent whose
+    requirement tree needs the fewest distinct agents, resolving each
+    required capability the same way (ties broken by agent ID). A
+    capability needed twice is served by one step, so the plan is a DAG.
+    Candidates whose requirements lead back to themselves are skipped;
+    planning fails with DependencyCycleError only if no acyclic choice
+    exists.
+
+    Usage:
+        planner = CapabilityPlanner(discovery.registry)
+        uow = planner.plan("deploy_pilot", client_id="acme", stage="pilot")
+        executor.execute(uow)
+
+    Thread-safe. Call close() to stop following the registry.
+    """
+
+    def __init__(self, registry: CapabilityRegistry):
+        """
+        Initialize planner and index the registry's current capabilities.
+
+        Args:
+            registry: Capability registry to plan against
+        """
+        self.registry = registry
+
+        self._specs: Dict[str, CapabilitySpec] = {}
+        self._providers: Dict[str, Set[str]] = {}  # capability -> agents providing it
+        self._handlers: Dict[str, Set[str]] = {}   # intent -> agents handling it
+        self._memo: Dict[Node, Any] = {}           # node -> PlanStep or _Unresolved
+        self._readers: Dict[Node, Set[Node]] = {}  # node -> memoized nodes that consulted it
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "plans": 0,
+            "memo_hits": 0,
+            "memo_misses": 0,
+            "invalidated": 0
+        }
+
+        # Subscribe before loading so no change is missed; agents changed in
+        # between are already current and are not overwritten by the load
+        self._touched: Optional[Set[str]] = set()
+        registry.add_listener(self._on_capability_changed)
+        for spec in registry.get_all_capabilities():
+            with self._lock:
+                if spec.agent_id not in self._touched:
+                    self._apply(spec.agent_id, spec)
+        with self._lock:
+            self._touched = None
+
+    def plan(
+        self,
+        intent: str,
+        client_id: str,
+        stage: str,
+        work_id: Optional[str] = None
+    ) -> UnitOfWork:
+        """
+        Build a unit of work that fulfils an intent.
+
+        Tasks are listed in dependency order (providers first), one per
+        agent, with depends_on naming the tasks of the providers chosen
+        for the agent's requirements.
+
+        Args:
+            intent: Target intent
+            client_id: Client the work is for
+            stage: Journey stage the work belongs to
+            work_id: Unit of work ID (generated if omitted)
+
+        Returns:
+            Unit of work ready for the executor
+
+        Raises:
+            AgentNotFoundError: If no agent handles the intent or a
+                                requirement has no provider
+            DependencyCycleError: If every way to fulfil the intent is cyclic
+        """
+        root = self.resolve(intent)
+        work_id = work_id or f"uow-{uuid4()}"
+
+        tasks = [self._task(step) for step in self._topological(root)]
+        return UnitOfWork(
+            work_id=work_id,
+            stage=stage,
+            client_id=client_id,
+            tasks=tasks,
+            metadata={"planned_intent": intent, "planned_agents": root.size}
+        )
+
+    def resolve(self, intent: str) -> PlanStep:
+        """
+        Resolve an intent to a plan DAG without building tasks.
+
+        Args:
+            intent: Target intent
+
+        Returns:
+            Root step (the agent handling the intent)
+
+        Raises:
+            AgentNotFoundError: If no agent handles the intent or a
+                                requirement has no provider
+            DependencyCycleError: If every way to fulfil the intent is cyclic
+        """
+        with self._lock:
+            self.metrics["plans"] += 1
+            result, _ = self._resolve(("intent", intent), {}, 0)
+
+        if isinstance(result, _Unresolved):
+            if result.cycle:
+                raise DependencyCycleError(f"Cannot plan intent {intent}: {result.reason}")
+            raise AgentNotFoundError(f"Cannot plan intent {intent}: {result.reason}")
+        return result
+
+    def providers(self, capability: str) -> List[str]:
+        """
+        Get the agents providing a capability.
+
+        Args:
+            capability: Capability name
+
+        Returns:
+            Agent IDs, sorted
+        """
+        with self._lock:
+            return sorted(self._providers.get(capability, ()))
+
+    def close(self) -> None:
+        """Stop following registry changes."""
+        self.registry.remove_listener(self._on_capability_changed)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get planner metrics.
+
+        Returns:
+            Counters plus indexed agent and memoized node counts
+        """
+        with self._lock:
+            return {
+                **self.metrics,
+                "agents": len(self._specs),
+                "memoized": len(self._memo)
+            }
+
+    def _on_capability_changed(
+        self,
+        agent_id: str,
+        previous: Optional[CapabilitySpec],
+        current: Optional[CapabilitySpec]
+    ) -> None:
+        """Registry listener: reindex the agent and drop plans that consulted it."""
+        with self._lock:
+            if self._touched is not None:
+                self._touched.add(agent_id)
+            # Events of concurrent writers may arrive out of order: re-read
+            self._apply(agent_id, self.registry.get_capability(agent_id))
+
+    def _apply(self, agent_id: str, spec: Optional[CapabilitySpec]) -> None:
+        """Replace an agent's indexed capability (caller holds the lock)."""
+        old = self._specs.pop(agent_id, None)
+        stale: List[Node] = [("agent", agent_id)]
+
+        if old is not None:
+            for capability in old.provides:
+                self._discard(self._providers, capability, agent_id)
+                stale.append(("provides", capability))
+            for intent in old.intents:
+                self._discard(self._handlers, intent, agent_id)
+                stale.append(("intent", intent))
+
+        if spec is not None:
+            self._specs[agent_id] = spec
+            for capability in spec.provides:
+                self._providers.setdefault(capability, set()).add(agent_id)
+                stale.append(("provides", capability))
+            for intent in spec.intents:
+                self._handlers.setdefault(intent, set()).add(agent_id)
+                stale.append(("intent", intent))
+
+        self._invalidate(stale)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, agent_id: str) -> None:
+        members = index.get(key)
+        if members is not None:
+            members.discard(agent_id)
+            if not members:
+                del index[key]
+
+    def _invalidate(self, nodes: List[Node]) -> None:
+        """Drop memoized results of nodes and, transitively, of their readers."""
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            if self._memo.pop(node, None) is not None:
+                self.metrics["invalidated"] += 1
+            stack.extend(self._readers.pop(node, ()))
+
+    def _resolve(self, node: Node, active: Dict[Node, int], depth: int) -> Tuple[Any, int]:
+        """
+        Resolve a node to a PlanStep or _Unresolved.
+
+        active maps nodes on the current resolution path to their depth.
+        Returns the result and the shallowest active depth it ran into;
+        a result that hit a node above it depends on the path taken and
+        is not memoized.
+        """
+        cached = self._memo.get(node)
+        if cached is not None:
+            self.metrics["memo_hits"] += 1
+            return cached, depth + 1
+
+        if node in active:
+            return _Unresolved(f"{node[0]} {node[1]} depends on itself", cycle=True), active[node]
+
+        self.metrics["memo_misses"] += 1
+        active[node] = depth
+        try:
+            if node[0] == "agent":
+                result, reached, consulted = self._resolve_agent(node[1], active, depth)
+            else:
+                result, reached, consulted = self._resolve_capability(node, active, depth)
+        finally:
+            del active[node]
+
+        if reached >= depth:
+            self._memo[node] = result
+            for dependency in consulted:
+                self._readers.setdefault(dependency, set()).add(node)
+        return result, reached
+
+    def _resolve_capability(
+        self,
+        node: Node,
+        active: Dict[Node, int],
+        depth: int
+    ) -> Tuple[Any, int, List[Node]]:
+        """Pick the agent with the smallest sub-plan for an intent or capability."""
+        kind, name = node
+        candidates = sorted((self._handlers if kind == "intent" else self._providers).get(name, ()))
+        consulted: List[Node] = []
+        reached = depth + 1
+        best: Optional[PlanStep] = None
+        failures: List[_Unresolved] = []
+
+        for agent_id in candidates:
+            agent_node = ("agent", agent_id)
+            consulted.append(agent_node)
+            result, hit = self._resolve(agent_node, active, depth + 1)
+            reached = min(reached, hit)
+            if isinstance(result, _Unresolved):
+                failures.append(result)
+            elif best is None or result.size < best.size:
+                best = result
+
+        if best is not None:
+            return PlanStep(best.agent_id, name, best.dependencies, best.agents), reached, consulted
+
+        if not candidates:
+            what = "handles intent" if kind == "intent" else "provides"
+            return _Unresolved(f"no agent {what} {name}", cycle=False), reached, consulted
+        cycle = all(failure.cycle for failure in failures)
+        return _Unresolved(failures[0].reason, cycle=cycle), reached, consulted
+
+    def _resolve_agent(
+        self,
+        agent_id: str,
+        active: Dict[Node, int],
+        depth: int
+    ) -> Tuple[Any, int, List[Node]]:
+        """Resolve every requirement of an agent."""
+        spec = self._specs.get(agent_id)
+        if spec is None:
+            return _Unresolved(f"agent {agent_id} not registered", cycle=False), depth + 1, []
+
+        consulted: List[Node] = []
+        reached = depth + 1
+        dependencies: List[PlanStep] = []
+        agents = {agent_id}
+
+        for capability in dict.fromkeys(spec.requires):
+            requirement = ("provides", capability)
+            consulted.append(requirement)
+            result, hit = self._resolve(requirement, active, depth + 1)
+            reached = min(reached, hit)
+            if isinstance(result, _Unresolved):
+                return _Unresolved(
+                    f"{agent_id} requires {capability}: {result.reason}", cycle=result.cycle
+                ), reached, consulted
+            dependencies.append(result)
+            agents.update(result.agents)
+
+        # Capability steps are keyed by what they serve; the agent step itself by its intent
+        intent = spec.intents[0] if spec.intents else agent_id
+        return PlanStep(agent_id, intent, tuple(dependencies), frozenset(agents)), reached, consulted
+
+    @staticmethod
+    def _topological(root: PlanStep) -> List[PlanStep]:
+        """Steps of a plan DAG, one per agent, providers before consumers."""
+        ordered: List[PlanStep] = []
+        seen: Set[str] = set()
+        stack: List[Tuple[PlanStep, int]] = [(root, 0)]
+        while stack:
+            step, index = stack.pop()
+            if index == 0 and step.agent_id in seen:
+                continue
+            if index < len(step.dependencies):
+                stack.append((step, index + 1))
+                dependency = step.dependencies[index]
+                if dependency.agent_id not in seen:
+                    stack.append((dependency, 0))
+                continue
+            if step.agent_id not in seen:
+                seen.add(step.agent_id)
+                ordered.append(step)
+        return ordered
+
+    def _task(self, step: PlanStep) -> Task:
+        """
+        Build the task for one plan step.
+
+        The task is named after the capability it serves, but its intent must
+        be one the agent handles: a provider step serving "dataset" is sent
+        its agent's own intent, not the capability name.
+        """
+        spec = self._specs.get(step.agent_id)
+        intent = step.capability
+        if spec is not None and spec.intents and intent not in spec.intents:
+            intent = spec.intents[0]
+        return Task(
+            task_id=f"task-{step.agent_id}",
+            name=step.capability,
+            description=spec.description if spec is not None else "",
+            agent_id=step.agent_id,
+            intent=intent,
+            input_schema=spec.input_schema if spec is not None else {},
+            output_schema=spec.output_schema if spec is not None else {},
+            depends_on=list(dict.fromkeys(f"task-{dep.agent_id}" for dep in step.dependencies))
+        )
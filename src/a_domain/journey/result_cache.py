@@ -0,0 +1,166 @@
+"""
+Task Result Cache
+
+Memoizes agent results across units of work, so identical tasks re-run
+by later UoWs (same agent, intent and inputs) skip the agent call.
+Based on Journey State Machine Design (DES-002).
+
+Entries are keyed by a fingerprint of the task's agent_id, intent,
+input_schema and upstream results. Task IDs are not part of it, so a
+task matches across UoWs whose IDs differ. Results are stored as JSON,
+which also isolates cached values from callers that mutate their results;
+results that are not JSON serializable are never cached.
+
+Only tasks marked cacheable are looked up: an agent call with side
+effects must not be replaced by a cached result.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Callable
+import hashlib
+import json
+import threading
+import time
+
+from .unit_of_work import Task
+
+
+class TaskResultCache:
+    """
+    Thread-safe result cache with TTL expiry and LRU eviction.
+
+    Usage:
+        cache = TaskResultCache(max_entries=10000, ttl_seconds=3600)
+        executor = UnitOfWorkExecutor(agent_invoker, result_cache=cache)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Entries kept; the least recently used is evicted beyond
+            ttl_seconds: Age at which an entry expires (None: never)
+            clock: Monotonic clock in seconds (injectable for tests)
+
+        Raises:
+            ValueError: If max_entries is below 1 or ttl_seconds not positive
+        """
+        if max_entries < 1 or (ttl_seconds is not None and ttl_seconds <= 0):
+            raise ValueError("TaskResultCache needs max_entries >= 1 and ttl_seconds > 0")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (stored at, JSON result)
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    @staticmethod
+    def fingerprint(task: Task, task_results: Dict[str, Any]) -> Optional[str]:
+        """
+        Stable key of a task's inputs.
+
+        Args:
+            task: Task about to run
+            task_results: Results of completed tasks (its dependencies' are used)
+
+        Returns:
+            SHA-256 hex digest of agent_id, intent, input_schema and upstream
+            results in dependency order, or None if they are not JSON
+            serializable
+        """
+        upstream = [task_results.get(dep_id) for dep_id in dict.fromkeys(task.depends_on)]
+        try:
+            canonical = json.dumps(
+                [task.agent_id, task.intent, task.input_schema, upstream],
+                sort_keys=True,
+                separators=(",", ":")
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a result.
+
+        Args:
+            key: Fingerprint
+
+        Returns:
+            (True, a fresh copy of the result) on a hit, (False, None) otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and self.clock() - entry[0] >= self.ttl_seconds:
+                del self._entries[key]
+                self.metrics["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.metrics["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.metrics["hits"] += 1
+        return True, json.loads(entry[1])
+
+    def put(self, key: str, result: Optional[Dict[str, Any]]) -> bool:
+        """
+        Store a result.
+
+        Args:
+            key: Fingerprint
+            result: Agent result
+
+        Returns:
+            True if stored, False if the result is not JSON serializable
+        """
+        try:
+            data = json.dumps(result, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return False
+
+        with self._lock:
+            self._entries[key] = (self.clock(), data)
+            self._entries.move_to_end(key)
+            self.metrics["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics["evictions"] += 1
+        return True
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get cache metrics.
+
+        Returns:
+            Counters plus entry count and hit rate (None before any lookup)
+        """
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "entries": len(self._entries),
+                "hit_rate": self.metrics["hits"] / lookups if lookups else None
+            }
@@ -0,0 +1,175 @@
+"""
+Task Retry Policy
+
+Backoff between task attempts and per-agent circuit breakers for
+unit of work execution. Based on Journey State Machine Design (DES-002).
+
+A failed task is retried after an exponentially growing, jittered delay,
+or later if the agent's ErrorResponse asked for it (retry_after), so a
+struggling agent is not hammered and max_retries spans real time. A
+circuit breaker stops calling an agent after consecutive failures and
+lets a single trial call through once it has rested.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable
+import random
+import time
+
+from ..protocol.message import ErrorResponse
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with jitter between attempts of a failed task."""
+
+    base_delay: float = 0.1   # Seconds before the first retry (before jitter)
+    max_delay: float = 30.0   # Cap on the backoff (retry_after hints may exceed it)
+    multiplier: float = 2.0   # Backoff growth per retry
+    jitter: float = 1.0       # Fraction of the backoff randomized (1.0: full jitter)
+
+    def __post_init__(self):
+        if self.base_delay < 0 or self.max_delay < self.base_delay or self.multiplier < 1:
+            raise ValueError("RetryPolicy needs 0 <= base_delay <= max_delay and multiplier >= 1")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("RetryPolicy jitter must be between 0 and 1")
+
+    def delay(
+        self,
+        retry: int,
+        retry_after: Optional[float] = None,
+        rand: Callable[[], float] = random.random
+    ) -> float:
+        """
+        Seconds to wait before a retry.
+
+        Args:
+            retry: Retry number (1 for the first retry)
+            retry_after: Minimum wait requested by the agent, if any
+            rand: Uniform [0, 1) source (injectable for tests)
+
+        Returns:
+            Backoff of base_delay * multiplier^(retry - 1), capped at
+            max_delay and reduced by up to jitter of itself, but at least
+            retry_after
+        """
+        backoff = min(self.max_delay, self.base_delay * self.multiplier ** max(0, retry - 1))
+        backoff *= 1 - self.jitter * rand()
+        if retry_after:
+            backoff = max(backoff, retry_after)
+        return backoff
+
+
+def retry_after_seconds(error: ErrorResponse) -> Optional[float]:
+    """
+    Retry hint of an agent's error response.
+
+    Prefers the exact retry_after_seconds detail (as set by admission
+    control) over the whole-second retry_after field.
+
+    Returns:
+        Seconds to wait, or None if the response has no hint
+    """
+    exact = (error.details or {}).get("retry_after_seconds")
+    if exact is not None:
+        return float(exact)
+    return float(error.retry_after) if error.retry_after > 0 else None
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one agent.
+
+    CLOSED: calls go through; failure_threshold consecutive failures open
+    the circuit. OPEN: no calls for reset_timeout seconds (or the agent's
+    retry_after, if longer). HALF_OPEN: one trial call; success closes the
+    circuit, failure opens it again.
+
+    Not thread-safe: the executor drives it under its lock.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            clock: Monotonic clock in seconds (injectable for tests)
+
+        Raises:
+            ValueError: If failure_threshold is below 1 or reset_timeout negative
+        """
+        if failure_threshold < 1 or reset_timeout < 0:
+            raise ValueError("CircuitBreaker needs failure_threshold >= 1 and reset_timeout >= 0")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0         # Consecutive failures
+        self.opened = 0           # Times the circuit opened
+        self._open_until = 0.0
+        self._trial_running = False
+
+    def acquire(self) -> float:
+        """
+        Ask to call the agent.
+
+        Returns:
+            0.0 if the call may go ahead (in HALF_OPEN it is the trial), else
+            seconds to wait before asking again
+        """
+        if self.state == self.CLOSED:
+            return 0.0
+
+        now = self.clock()
+        if self.state == self.OPEN:
+            if now < self._open_until:
+                return self._open_until - now
+            self.state = self.HALF_OPEN
+
+        if self._trial_running:
+            # Check back a few times per reset period for the trial's outcome
+            return max(self.reset_timeout / 10, 0.001)
+        self._trial_running = True
+        return 0.0
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        self.failures = 0
+        self._trial_running = False
+        self.state = self.CLOSED
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record a failed call.
+
+        Args:
+            retry_after: Wait requested by the agent; keeps an opening circuit
+                         open at least this long
+        """
+        self.failures += 1
+        trial = self._trial_running
+        self._trial_running = False
+        if trial or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._open_until = self.clock() + max(self.reset_timeout, retry_after or 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened
+        }
@@ -0,0 +1,98 @@
+"""
+Task Scheduler
+
+Indexed dependency tracking for unit of work execution.
+Based on Journey State Machine Design (DES-002).
+
+Instead of rescanning every pending task after each completion, the
+scheduler keeps per-task counts of unmet dependencies and reverse
+adjacency lists, so finishing a task only visits its dependents and the
+ready queue is always current. Building it is O(tasks + dependencies);
+each completion costs O(dependents).
+"""
+
+from collections import deque
+from typing import Dict, List, Iterable, Deque, Optional
+
+from .unit_of_work import Task, TaskStatus
+
+
+class TaskScheduler:
+    """
+    Ready queue of a unit of work's tasks.
+
+    A task is ready when it is PENDING and every task it depends on is
+    COMPLETED; dependencies on unknown task IDs are never met. Tasks
+    already COMPLETED when the scheduler is built count as met, so a
+    partly executed unit of work resumes where it stopped.
+
+    Not thread-safe: the executor drives it under its lock.
+    """
+
+    def __init__(self, tasks: Iterable[Task]):
+        """
+        Index tasks and their dependencies.
+
+        Args:
+            tasks: Tasks of a unit of work
+        """
+        self.tasks: Dict[str, Task] = {}  # task_id -> Task (first of duplicate IDs)
+        for task in tasks:
+            self.tasks.setdefault(task.task_id, task)
+
+        self._dependents: Dict[str, List[str]] = {}  # task_id -> tasks depending on it
+        self._unmet: Dict[str, int] = {}  # task_id -> dependencies not yet completed
+        self._ready: Deque[Task] = deque()
+
+        for task_id, task in self.tasks.items():
+            unmet = 0
+            for dep_id in dict.fromkeys(task.depends_on):
+                self._dependents.setdefault(dep_id, []).append(task_id)
+                dependency = self.tasks.get(dep_id)
+                if dependency is None or dependency.status != TaskStatus.COMPLETED:
+                    unmet += 1
+            self._unmet[task_id] = unmet
+            if unmet == 0 and task.status == TaskStatus.PENDING:
+                self._ready.append(task)
+
+    def pop(self) -> Optional[Task]:
+        """
+        Dequeue the next ready task.
+
+        Returns:
+            Task that became ready earliest, or None if none is ready
+        """
+        return self._ready.popleft() if self._ready else None
+
+    def complete(self, task_id: str) -> List[Task]:
+        """
+        Record a completed task and queue dependents it unblocks.
+
+        Args:
+            task_id: Task that completed
+
+        Returns:
+            Tasks that became ready
+        """
+        unblocked = []
+        for dependent_id in self._dependents.get(task_id, ()):
+            self._unmet[dependent_id] -= 1
+            if self._unmet[dependent_id] == 0:
+                dependent = self.tasks[dependent_id]
+                if dependent.status == TaskStatus.PENDING:
+                    self._ready.append(dependent)
+                    unblocked.append(dependent)
+        return unblocked
+
+    def requeue(self, tasks: Iterable[Task]) -> None:
+        """Put dequeued tasks that were not dispatched back at the front, in order."""
+        self._ready.extendleft(reversed(list(tasks)))
+
+    def retry(self, task: Task) -> None:
+        """Queue a task that was reset to PENDING for another attempt."""
+        self._ready.append(task)
+
+    def __len__(self) -> int:
+        """Number of ready tasks."""
+        return len(self._ready)
+
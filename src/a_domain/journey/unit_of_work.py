@@ -5,6 +5,7 @@ Defines unit of work structure for stage execution orchestration.
 Based on Journey State Machine Design (DES-002).
 """
 
+from collections import deque
 from enum import Enum
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
@@ -58,6 +59,7 @@ class Task:
     completed_at: Optional[datetime] = None
     error: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
+    cacheable: bool = False  # Result depends only on inputs; may be served from a result cache
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize task to dictionary"""
@@ -76,7 +78,8 @@ class Task:
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "error": self.error,
-            "result": self.result
+            "result": self.result,
+            "cacheable": self.cacheable
         }
 
     @classmethod
@@ -97,7 +100,8 @@ class Task:
             started_at=datetime.fromisoformat(data["started_at"]) if data.get("started_at") else None,
             completed_at=datetime.fromisoformat(data["completed_at"]) if data.get("completed_at") else None,
             error=data.get("error"),
-            result=data.get("result")
+            result=data.get("result"),
+            cacheable=data.get("cacheable", False)
         )
 
 
@@ -123,6 +127,9 @@ class UnitOfWork:
     compensation_tasks: List[Task] = field(default_factory=list)
     failed_task_id: Optional[str] = None
 
+    # task_id -> position in tasks, rebuilt when tasks change
+    _positions: Optional[Dict[str, int]] = field(default=None, init=False, repr=False, compare=False)
+
     def to_dict(self) -> Dict[str, Any]:
         """Serialize unit of work to dictionary"""
         return {
@@ -157,11 +164,26 @@ class UnitOfWork:
         )
 
     def get_task(self, task_id: str) -> Optional[Task]:
-        """Get task by ID"""
-        for task in self.tasks:
-            if task.task_id == task_id:
-                return task
-        return None
+        """Get task by ID (indexed; the index is rebuilt if tasks were changed)"""
+        positions = self._positions
+        if positions is None or len(positions) != len(self.tasks):
+            positions = self._index_tasks()
+        position = positions.get(task_id)
+        if position is not None and position < len(self.tasks) and self.tasks[position].task_id == task_id:
+            return self.tasks[position]
+
+        # Missing or moved: the list may have changed in place
+        positions = self._index_tasks()
+        position = positions.get(task_id)
+        return self.tasks[position] if position is not None else None
+
+    def _index_tasks(self) -> Dict[str, int]:
+        """Rebuild the task_id -> position index (first task wins on duplicate IDs)"""
+        positions: Dict[str, int] = {}
+        for position, task in enumerate(self.tasks):
+            positions.setdefault(task.task_id, position)
+        self._positions = positions
+        return positions
 
     def get_pending_tasks(self) -> List[Task]:
         """Get all tasks that are pending"""
@@ -192,6 +214,41 @@ class UnitOfWork:
 
         return runnable
 
+    def get_execution_order(self) -> List[Task]:
+        """
+        Order tasks so every task follows its dependencies (Kahn's algorithm).
+
+        Iterative, so arbitrarily deep chains work. Dependencies on unknown
+        task IDs are ignored; tasks whose dependencies are met keep their
+        relative order.
+
+        Returns:
+            Tasks in dependency order; tasks on (or behind) a dependency
+            cycle are left out
+        """
+        by_id: Dict[str, Task] = {}
+        for task in self.tasks:
+            by_id.setdefault(task.task_id, task)
+
+        dependents: Dict[str, List[str]] = {}
+        in_degree: Dict[str, int] = {}
+        for task_id, task in by_id.items():
+            known = [dep_id for dep_id in dict.fromkeys(task.depends_on) if dep_id in by_id]
+            in_degree[task_id] = len(known)
+            for dep_id in known:
+                dependents.setdefault(dep_id, []).append(task_id)
+
+        ready = deque(task_id for task_id, degree in in_degree.items() if degree == 0)
+        order = []
+        while ready:
+            task_id = ready.popleft()
+            order.append(by_id[task_id])
+            for dependent_id in dependents.get(task_id, ()):
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
+                    ready.append(dependent_id)
+        return order
+
     def has_circular_dependencies(self) -> bool:
         """
         Check for circular dependencies in task graph.
@@ -199,33 +256,7 @@ class UnitOfWork:
         Returns:
             True if circular dependencies detected, False otherwise
         """
-        # Build adjacency list
-        graph = {t.task_id: t.depends_on for t in self.tasks}
-
-        # Detect cycles using DFS
-        visited = set()
-        rec_stack = set()
-
-        def has_cycle(node_id: str) -> bool:
-            visited.add(node_id)
-            rec_stack.add(node_id)
-
-            for dep_id in graph.get(node_id, []):
-                if dep_id not in visited:
-                    if has_cycle(dep_id):
-                        return True
-                elif dep_id in rec_stack:
-                    return True
-
-            rec_stack.remove(node_id)
-            return False
-
-        for task_id in graph:
-            if task_id not in visited:
-                if has_cycle(task_id):
-                    return True
-
-        return False
+        return len(self.get_execution_order()) < len({task.task_id for task in self.tasks})
 
     def get_execution_duration_seconds(self) -> Optional[float]:
         """Get total execution duration in seconds"""
@@ -7,8 +7,18 @@ across all domains in the a_domain platform.
 
 from .message import ProtocolMessage, Agent, Security, ErrorResponse
 from .broker import ProtocolBrokerAgent
+from .async_broker import AsyncProtocolBroker, BackpressurePolicy
+from .sharding import ShardedProtocolBroker, ConsistentHashRing, ShardError
 from .validator import MessageValidator, ContractValidator
-from .discovery import CapabilityDiscoveryAgent, CapabilitySpec, AgentMatch
+from .codec import MessageCodec, JSONCodec, BinaryCodec, CodecError
+from .expiry import ExpiryScheduler
+from .admission import AdmissionController, RateLimit
+from .correlation import CorrelationTable
+from .message_log import MessageLog, MessageLogError
+from .discovery import CapabilityDiscoveryAgent, CapabilitySpec, AgentMatch, CapabilityQuery, DiscoveryCache
+from .registry_store import RegistryStore, SQLiteRegistryStore, RegistryStoreError
+from .semver import Version, VersionRange
+from .schema import CompiledSchema, SchemaCache, SchemaError, compile_schema
 
 __version__ = "1.0.0"
 
@@ -18,9 +28,35 @@ __all__ = [
     "Security",
     "ErrorResponse",
     "ProtocolBrokerAgent",
+    "AsyncProtocolBroker",
+    "BackpressurePolicy",
+    "ShardedProtocolBroker",
+    "ConsistentHashRing",
+    "ShardError",
     "MessageValidator",
     "ContractValidator",
+    "MessageCodec",
+    "JSONCodec",
+    "BinaryCodec",
+    "CodecError",
+    "ExpiryScheduler",
+    "AdmissionController",
+    "RateLimit",
+    "CorrelationTable",
+    "MessageLog",
+    "MessageLogError",
     "CapabilityDiscoveryAgent",
     "CapabilitySpec",
     "AgentMatch",
+    "CapabilityQuery",
+    "DiscoveryCache",
+    "RegistryStore",
+    "SQLiteRegistryStore",
+    "RegistryStoreError",
+    "Version",
+    "VersionRange",
+    "CompiledSchema",
+    "SchemaCache",
+    "SchemaError",
+    "compile_schema",
 ]
@@ -0,0 +1,315 @@
+"""
+Admission Control
+
+Token-bucket rate limiting per source agent and per contract, plus a
+global cap on concurrent handler deliveries. Every check is O(1) so it
+can sit on the routing hot path.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+from dataclasses import dataclass
+import math
+import threading
+import time
+
+from .message import ErrorCode
+from .validator import ValidationResult
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Sustained rate and burst allowance for a token bucket."""
+
+    rate: float   # Tokens (messages) added per second
+    burst: float  # Bucket capacity: messages allowed back-to-back
+
+    def __post_init__(self):
+        if self.rate <= 0 or self.burst < 1:
+            raise ValueError("RateLimit needs rate > 0 and burst >= 1")
+
+
+class TokenBucket:
+    """
+    Token bucket refilled lazily from a monotonic clock.
+
+    Starts full, so a new sender gets its whole burst allowance.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "_lock")
+
+    def __init__(self, limit: RateLimit, now: float):
+        self.rate = limit.rate
+        self.burst = limit.burst
+        self.tokens = limit.burst
+        self.updated = now
+        self._lock = threading.Lock()
+
+    def acquire(self, now: float, tokens: float = 1.0) -> float:
+        """
+        Take tokens if available.
+
+        Args:
+            now: Current monotonic time in seconds
+            tokens: Tokens to take
+
+        Returns:
+            0.0 if taken, else seconds until enough tokens will be available
+        """
+        with self._lock:
+            available = self.tokens
+            if now > self.updated:
+                available += (now - self.updated) * self.rate
+                if available > self.burst:
+                    available = self.burst
+                self.updated = now
+
+            if available >= tokens:
+                self.tokens = available - tokens
+                return 0.0
+            self.tokens = available
+            return (tokens - available) / self.rate
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Return tokens taken for a message that was rejected later."""
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + tokens)
+
+
+class AdmissionController:
+    """
+    Decides whether the broker accepts a message right now.
+
+    Limits (each optional):
+    - agent_limit: per source agent token bucket (agent_overrides per ID)
+    - contract_limit: per contract token bucket
+    - max_in_flight: global cap on concurrent handler deliveries; excess
+      messages are shed immediately instead of queueing behind slow handlers
+
+    Rejections use RATE_LIMIT_EXCEEDED with retry_after (whole seconds, as
+    in ErrorResponse) and retry_after_seconds (exact) in details.
+    """
+
+    # Bucket tables are keyed by caller-supplied IDs. At this size, buckets
+    # that have refilled to full (no different from new ones) are evicted;
+    # if none have, new keys share one overflow bucket per table and limit.
+    MAX_BUCKETS = 100_000
+
+    def __init__(
+        self,
+        agent_limit: Optional[RateLimit] = None,
+        contract_limit: Optional[RateLimit] = None,
+        max_in_flight: Optional[int] = None,
+        agent_overrides: Optional[Dict[str, RateLimit]] = None,
+        clock=time.monotonic
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            agent_limit: Default rate limit per source agent
+            contract_limit: Rate limit per contract
+            max_in_flight: Max concurrent deliveries across all handlers
+            agent_overrides: Per-agent limits replacing agent_limit
+            clock: Monotonic clock in seconds (injectable for tests)
+        """
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.agent_limit = agent_limit
+        self.contract_limit = contract_limit
+        self.max_in_flight = max_in_flight
+        self.agent_overrides = dict(agent_overrides or {})
+        self.clock = clock
+
+        self._agent_buckets: Dict[str, TokenBucket] = {}
+        self._contract_buckets: Dict[str, TokenBucket] = {}
+        self._overflow_buckets: Dict[Tuple[int, RateLimit], TokenBucket] = {}  # (table, limit) -> bucket
+        self._next_sweep: Dict[int, float] = {}  # table -> earliest time a stored bucket can be full
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "admitted": 0,
+            "rejected_agent": 0,
+            "rejected_contract": 0,
+            "shed": 0,
+            "evicted_buckets": 0,
+            "overflow_checks": 0
+        }
+
+    def check_agent(self, agent_id: str) -> Optional[ValidationResult]:
+        """
+        Charge one message to a source agent's bucket.
+
+        Args:
+            agent_id: Source agent ID
+
+        Returns:
+            None if admitted, else a RATE_LIMIT_EXCEEDED ValidationResult
+        """
+        limit = self.agent_overrides.get(agent_id, self.agent_limit) if self.agent_overrides else self.agent_limit
+        if limit is None:
+            return None
+
+        now = self.clock()
+        wait = self._bucket(self._agent_buckets, agent_id, limit, now).acquire(now)
+        if wait:
+            with self._lock:
+                self.metrics["rejected_agent"] += 1
+            return self._rate_limited(
+                f"Rate limit exceeded for agent: {agent_id}", wait, limit="agent", agent_id=agent_id
+            )
+        return None
+
+    def check_contract(self, contract_id: str, agent_id: Optional[str] = None) -> Optional[ValidationResult]:
+        """
+        Charge one message to a contract's bucket.
+
+        If the contract is over its limit, the token already charged to
+        agent_id (if given) is refunded.
+
+        Args:
+            contract_id: Contract ID
+            agent_id: Source agent charged by check_agent() for this message
+
+        Returns:
+            None if admitted, else a RATE_LIMIT_EXCEEDED ValidationResult
+        """
+        if self.contract_limit is None:
+            return None
+
+        now = self.clock()
+        wait = self._bucket(self._contract_buckets, contract_id, self.contract_limit, now).acquire(now)
+        if wait:
+            with self._lock:
+                self.metrics["rejected_contract"] += 1
+            if agent_id is not None:
+                bucket = self._agent_buckets.get(agent_id)
+                if bucket:
+                    bucket.refund()
+            return self._rate_limited(
+                f"Rate limit exceeded for contract: {contract_id}", wait, limit="contract", contract_id=contract_id
+            )
+        return None
+
+    def try_enter(self) -> bool:
+        """
+        Reserve a delivery slot under max_in_flight.
+
+        Returns:
+            True if a slot was reserved (call leave() when delivery ends)
+        """
+        if self.max_in_flight is None:
+            return True  # Uncapped: nothing to count
+
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self.metrics["shed"] += 1
+                return False
+            self._in_flight += 1
+            self.metrics["admitted"] += 1
+            return True
+
+    def leave(self) -> None:
+        """Release a delivery slot reserved by try_enter()."""
+        if self.max_in_flight is None:
+            return
+
+        with self._lock:
+            self._in_flight -= 1
+
+    def overloaded(self) -> ValidationResult:
+        """Build the rejection result for a shed delivery."""
+        return ValidationResult(
+            valid=False,
+            error_code=ErrorCode.RATE_LIMIT_EXCEEDED,
+            error_message=f"Broker at capacity: {self.max_in_flight} deliveries in flight",
+            details={"retry_after": 1, "retry_after_seconds": 0.0, "limit": "in_flight"}
+        )
+
+    def forget_contract(self, contract_id: str) -> None:
+        """Drop the bucket of a terminated contract."""
+        with self._lock:
+            self._contract_buckets.pop(contract_id, None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get admission metrics.
+
+        Returns:
+            Counters plus current in-flight deliveries and bucket counts
+        """
+        with self._lock:
+            return {
+                **self.metrics,
+                "in_flight": self._in_flight,
+                "agent_buckets": len(self._agent_buckets),
+                "contract_buckets": len(self._contract_buckets)
+            }
+
+    def _bucket(
+        self,
+        buckets: Dict[str, TokenBucket],
+        key: str,
+        limit: RateLimit,
+        now: float
+    ) -> TokenBucket:
+        """Get or create the bucket for a key."""
+        bucket = buckets.get(key)
+        if bucket is not None:
+            return bucket
+
+        with self._lock:
+            bucket = buckets.get(key)
+            if bucket is not None:
+                return bucket
+
+            if len(buckets) >= self.MAX_BUCKETS:
+                self._evict_full(buckets, now)
+            if len(buckets) < self.MAX_BUCKETS:
+                bucket = buckets[key] = TokenBucket(limit, now)
+                return bucket
+
+            # Every stored bucket is in use: new keys share one bucket, so
+            # rotating IDs does not earn fresh allowances
+            self.metrics["overflow_checks"] += 1
+            overflow_key = (id(buckets), limit)
+            bucket = self._overflow_buckets.get(overflow_key)
+            if bucket is None:
+                bucket = self._overflow_buckets[overflow_key] = TokenBucket(limit, now)
+            return bucket
+
+    def _evict_full(self, buckets: Dict[str, TokenBucket], now: float) -> None:
+        """
+        Drop the buckets of a table that have refilled to full (lock held).
+
+        A scan also records when the next stored bucket can be full, so a
+        table of busy senders is not rescanned on every new key.
+        """
+        table = id(buckets)
+        if now < self._next_sweep.get(table, 0.0):
+            return
+
+        soonest = math.inf
+        for key, bucket in list(buckets.items()):
+            full_at = bucket.updated + (bucket.burst - bucket.tokens) / bucket.rate
+            if full_at <= now:
+                del buckets[key]
+                self.metrics["evicted_buckets"] += 1
+            elif full_at < soonest:
+                soonest = full_at
+        self._next_sweep[table] = soonest
+
+    @staticmethod
+    def _rate_limited(error_message: str, wait: float, **details: Any) -> ValidationResult:
+        """Build a RATE_LIMIT_EXCEEDED result carrying retry hints."""
+        return ValidationResult(
+            valid=False,
+            error_code=ErrorCode.RATE_LIMIT_EXCEEDED,
+            error_message=error_message,
+            details={
+                **details,
+                "retry_after": math.ceil(wait),
+                "retry_after_seconds": wait
+            }
+        )
@@ -0,0 +1,559 @@
+"""
+Async Protocol Broker
+
+Asyncio-native broker mode with per-agent bounded inboxes.
+Each registered agent gets its own bounded queue and a dedicated consumer
+task, so a slow handler only delays its own inbox instead of every sender.
+"""
+
+from typing import Dict, Any, Optional, Callable, List
+from dataclasses import dataclass
+import asyncio
+import inspect
+import logging
+import threading
+
+from .message import ProtocolMessage, ErrorCode
+from .broker import ProtocolBrokerAgent
+from .validator import ValidationResult
+from .admission import AdmissionController
+from .message_log import MessageLog
+from .expiry import ExpiryScheduler
+from .discovery import CapabilityDiscoveryAgent
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackpressurePolicy:
+    """Behaviour of route_message when the target inbox is full."""
+
+    BLOCK = "block"              # Wait for space (optionally bounded by enqueue_timeout)
+    DROP_OLDEST = "drop_oldest"  # Evict the oldest queued message to make room
+    REJECT = "reject"            # Fail fast with RATE_LIMIT_EXCEEDED
+
+    ALL = (BLOCK, DROP_OLDEST, REJECT)
+
+
+@dataclass
+class AgentInbox:
+    """Bounded inbox and consumer state for one registered agent."""
+
+    agent_id: str
+    handler: Callable
+    queue: asyncio.Queue
+    is_async: bool = False
+    handle_batch: Optional[Callable] = None  # Handler's handle_batch(messages), if it has one
+    batch_is_async: bool = False
+    consumer: Optional[asyncio.Task] = None
+    delivered: int = 0
+    dropped: int = 0
+    rejected: int = 0
+    handler_errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert inbox statistics to dictionary format."""
+        return {
+            "agent_id": self.agent_id,
+            "queue_depth": self.queue.qsize(),
+            "queue_maxsize": self.queue.maxsize,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "handler_errors": self.handler_errors,
+            "consumer_running": self.consumer is not None and not self.consumer.done()
+        }
+
+
+class AsyncMessageRouter:
+    """Routes messages into per-agent bounded asyncio inboxes."""
+
+    def __init__(
+        self,
+        inbox_size: int = 1000,
+        backpressure: str = BackpressurePolicy.BLOCK,
+        enqueue_timeout: Optional[float] = None,
+        offload_sync_handlers: bool = True
+    ):
+        """
+        Initialize async message router.
+
+        Args:
+            inbox_size: Maximum queued messages per agent
+            backpressure: One of BackpressurePolicy.ALL
+            enqueue_timeout: Max seconds to wait under BLOCK (None waits forever)
+            offload_sync_handlers: Run plain (non-async) handlers in the default
+                                   executor so they cannot block the event loop
+        """
+        if backpressure not in BackpressurePolicy.ALL:
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        if inbox_size < 1:
+            raise ValueError("inbox_size must be at least 1")
+
+        self.inbox_size = inbox_size
+        self.backpressure = backpressure
+        self.enqueue_timeout = enqueue_timeout
+        self.offload_sync_handlers = offload_sync_handlers
+        self.inboxes: Dict[str, AgentInbox] = {}
+        self._lock = threading.Lock()
+
+    def register_agent(self, agent_id: str, handler: Callable) -> None:
+        """
+        Register an agent message handler.
+
+        The consumer task starts immediately when called from a running
+        event loop, otherwise on the next call to start(). Handlers that
+        implement handle_batch(messages) (sync or async) receive everything
+        queued in their inbox at once instead of one message per call.
+
+        Args:
+            agent_id: Agent ID
+            handler: Callable (sync or async) that accepts ProtocolMessage
+        """
+        is_async = (
+            inspect.iscoroutinefunction(handler) or
+            inspect.iscoroutinefunction(getattr(handler, "__call__", None))
+        )
+        handle_batch = getattr(handler, "handle_batch", None)
+        inbox = AgentInbox(
+            agent_id=agent_id,
+            handler=handler,
+            queue=asyncio.Queue(maxsize=self.inbox_size),
+            is_async=is_async,
+            handle_batch=handle_batch,
+            batch_is_async=inspect.iscoroutinefunction(handle_batch)
+        )
+
+        with self._lock:
+            previous = self.inboxes.get(agent_id)
+            self.inboxes[agent_id] = inbox
+
+        if previous and previous.consumer:
+            previous.consumer.cancel()
+
+        self._start_consumer(inbox)
+
+    def unregister_agent(self, agent_id: str) -> None:
+        """Unregister an agent, discarding any queued messages."""
+        with self._lock:
+            inbox = self.inboxes.pop(agent_id, None)
+
+        if inbox and inbox.consumer:
+            inbox.consumer.cancel()
+
+    def is_agent_registered(self, agent_id: str) -> bool:
+        """Check if agent is registered."""
+        with self._lock:
+            return agent_id in self.inboxes
+
+    async def start(self) -> None:
+        """Start consumer tasks for all inboxes that are not yet running."""
+        with self._lock:
+            inboxes = list(self.inboxes.values())
+
+        for inbox in inboxes:
+            self._start_consumer(inbox)
+
+    async def stop(self, drain: bool = True) -> None:
+        """
+        Stop all consumer tasks.
+
+        Args:
+            drain: Wait for queued messages to be handled before stopping
+        """
+        if drain:
+            await self.join()
+
+        with self._lock:
+            consumers = [i.consumer for i in self.inboxes.values() if i.consumer]
+            for inbox in self.inboxes.values():
+                inbox.consumer = None
+
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+
+    async def join(self) -> None:
+        """Wait until every inbox has been fully processed."""
+        with self._lock:
+            queues = [i.queue for i in self.inboxes.values()]
+
+        await asyncio.gather(*(q.join() for q in queues))
+
+    async def route_message(self, message: ProtocolMessage) -> ValidationResult:
+        """
+        Enqueue message on the target agent's inbox.
+
+        Args:
+            message: Protocol message
+
+        Returns:
+            ValidationResult indicating whether the message was accepted
+        """
+        target_id = message.target_agent.agent_id
+
+        with self._lock:
+            inbox = self.inboxes.get(target_id)
+
+        if not inbox:
+            return ValidationResult(
+                valid=False,
+                error_code=ErrorCode.CAPABILITY_NOT_FOUND,
+                error_message=f"Target agent not registered: {target_id}"
+            )
+
+        queue = inbox.queue
+
+        if self.backpressure == BackpressurePolicy.REJECT:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                return self._reject(inbox)
+
+        elif self.backpressure == BackpressurePolicy.DROP_OLDEST:
+            while queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                queue.task_done()
+                inbox.dropped += 1
+            queue.put_nowait(message)
+
+        else:
+            try:
+                await asyncio.wait_for(queue.put(message), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                return self._reject(inbox)
+
+        return ValidationResult(valid=True)
+
+    async def route_batch(
+        self,
+        target_id: str,
+        messages: List[ProtocolMessage]
+    ) -> List[ValidationResult]:
+        """
+        Enqueue a batch of messages on one target agent's inbox.
+
+        Backpressure applies per message, so a batch may be partially accepted.
+
+        Args:
+            target_id: Target agent ID
+            messages: Messages addressed to the target
+
+        Returns:
+            ValidationResult per message, in input order
+        """
+        return [await self.route_message(message) for message in messages]
+
+    def get_inbox_stats(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get inbox statistics for an agent.
+
+        Args:
+            agent_id: Agent ID
+
+        Returns:
+            Statistics dictionary or None if not registered
+        """
+        with self._lock:
+            inbox = self.inboxes.get(agent_id)
+            return inbox.to_dict() if inbox else None
+
+    def _reject(self, inbox: AgentInbox) -> ValidationResult:
+        """Build the rejection result for a full inbox."""
+        inbox.rejected += 1
+        return ValidationResult(
+            valid=False,
+            error_code=ErrorCode.RATE_LIMIT_EXCEEDED,
+            error_message=f"Inbox full for agent: {inbox.agent_id}",
+            details={"queue_depth": inbox.queue.qsize(), "queue_maxsize": inbox.queue.maxsize}
+        )
+
+    def _start_consumer(self, inbox: AgentInbox) -> None:
+        """Start the consumer task for an inbox if a loop is running."""
+        if inbox.consumer and not inbox.consumer.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Deferred until start()
+
+        inbox.consumer = loop.create_task(
+            self._consume(inbox),
+            name=f"inbox-{inbox.agent_id}"
+        )
+
+    async def _consume(self, inbox: AgentInbox) -> None:
+        """
+        Deliver queued messages to the agent handler.
+
+        Plain handlers get one message at a time; batch handlers get every
+        message queued when they become free.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await inbox.queue.get()]
+            if inbox.handle_batch is not None:
+                while not inbox.queue.empty():
+                    batch.append(inbox.queue.get_nowait())
+                handler, is_async, argument = inbox.handle_batch, inbox.batch_is_async, batch
+            else:
+                handler, is_async, argument = inbox.handler, inbox.is_async, batch[0]
+
+            try:
+                if is_async:
+                    await handler(argument)
+                elif self.offload_sync_handlers:
+                    await loop.run_in_executor(None, handler, argument)
+                else:
+                    result = handler(argument)
+                    if inspect.isawaitable(result):
+                        await result
+                inbox.delivered += len(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                inbox.handler_errors += 1
+                logger.error(
+                    f"Handler failed for agent: {inbox.agent_id}",
+                    extra={
+                        "agent_id": inbox.agent_id,
+                        "message_ids": [message.message_id for message in batch],
+                        "error": str(e)
+                    },
+                    exc_info=True
+                )
+            finally:
+                for _ in batch:
+                    inbox.queue.task_done()
+
+
+class AsyncProtocolBroker(ProtocolBrokerAgent):
+    """
+    Protocol broker with asynchronous, per-agent inbox delivery.
+
+    Handshakes, contracts and validation behave exactly like
+    ProtocolBrokerAgent; only delivery differs. route_message is awaitable
+    and returns once the message is enqueued, not once it is handled.
+
+    Usage:
+        async with AsyncProtocolBroker(backpressure=BackpressurePolicy.REJECT) as broker:
+            broker.register_agent("agent-b", handler)
+            result = await broker.route_message(message)
+    """
+
+    def __init__(
+        self,
+        jwt_secret: Optional[str] = None,
+        inbox_size: int = 1000,
+        backpressure: str = BackpressurePolicy.BLOCK,
+        enqueue_timeout: Optional[float] = None,
+        offload_sync_handlers: bool = True,
+        admission: Optional[AdmissionController] = None,
+        message_log: Optional[MessageLog] = None,
+        expiry_scheduler: Optional[ExpiryScheduler] = None,
+        discovery: Optional[CapabilityDiscoveryAgent] = None
+    ):
+        """
+        Initialize async protocol broker.
+
+        Args:
+            jwt_secret: Secret key for JWT validation (optional)
+            inbox_size: Maximum queued messages per agent
+            backpressure: One of BackpressurePolicy.ALL
+            enqueue_timeout: Max seconds to wait under BLOCK (None waits forever)
+            offload_sync_handlers: Run plain handlers in the default executor
+            admission: Rate limits (max_in_flight is not used; inboxes
+                       bound pending deliveries instead)
+            message_log: Log of messages accepted by an inbox (none if omitted)
+            expiry_scheduler: Scheduler for handshake, contract, collaboration
+                              and pending request expiry (created if omitted)
+            discovery: Capability registry contract schemas are loaded from
+                       (contracts carry no schemas if omitted)
+        """
+        super().__init__(
+            jwt_secret=jwt_secret,
+            expiry_scheduler=expiry_scheduler,
+            admission=admission,
+            message_log=message_log,
+            discovery=discovery
+        )
+        self.message_router = AsyncMessageRouter(
+            inbox_size=inbox_size,
+            backpressure=backpressure,
+            enqueue_timeout=enqueue_timeout,
+            offload_sync_handlers=offload_sync_handlers
+        )
+
+    async def route_message(self, message: ProtocolMessage) -> ValidationResult:
+        """
+        Validate a protocol message and enqueue it for the target agent.
+
+        Args:
+            message: Protocol message
+
+        Returns:
+            ValidationResult indicating success or failure
+        """
+        admission = self._admit_message(message)
+        if not admission.valid:
+            return admission
+
+        # Responses to pending request() calls go to the waiting caller
+        if len(self.correlations) and self.correlations.resolve(message):
+            result = admission
+        else:
+            result = await self.message_router.route_message(message)
+
+        # Only messages accepted by an inbox are logged for redelivery
+        if self.message_log and result.valid:
+            self.message_log.append(message)
+        return result
+
+    async def route_many(self, messages: List[ProtocolMessage]) -> List[ValidationResult]:
+        """
+        Validate and enqueue a batch of protocol messages.
+
+        Contract checks run once per (target, contract) group, as in
+        ProtocolBrokerAgent.route_many. Messages are enqueued one by one
+        (backpressure applies per message); handlers implementing
+        handle_batch(messages) receive whatever has queued up when their
+        consumer drains the inbox, which may span or split groups.
+
+        Args:
+            messages: Protocol messages
+
+        Returns:
+            ValidationResult per message, in input order
+        """
+        results, groups = self._admit_many(messages)
+        self._resolve_responses(messages, results, groups)
+
+        for (target_id, _), indices in groups.items():
+            batch_results = await self.message_router.route_batch(
+                target_id, [messages[i] for i in indices]
+            )
+            for i, result in zip(indices, batch_results):
+                results[i] = result
+
+        # Only messages accepted by an inbox are logged for redelivery
+        if self.message_log:
+            self._log_messages(messages, [i for i, result in enumerate(results) if result.valid])
+        return results
+
+    async def redeliver(self, contract_id: Optional[str] = None, from_offset: int = 0) -> int:
+        """
+        Re-enqueue logged messages for the currently registered handlers.
+
+        As ProtocolBrokerAgent.redeliver, but awaits each enqueue, so
+        backpressure applies to replayed messages too.
+
+        Args:
+            contract_id: Only re-deliver this contract's messages
+            from_offset: First log offset to re-deliver
+
+        Returns:
+            Number of messages enqueued
+
+        Raises:
+            ValueError: If the broker has no message log
+        """
+        if not self.message_log:
+            raise ValueError("Broker has no message log")
+
+        delivered = 0
+        for _, message in self.message_log.replay(from_offset, contract_id=contract_id):
+            if (await self.message_router.route_message(message)).valid:
+                delivered += 1
+        return delivered
+
+    async def send_request(
+        self,
+        message: ProtocolMessage,
+        timeout: Optional[float] = None
+    ) -> asyncio.Future:
+        """
+        Route a request and return a future for its response.
+
+        Like ProtocolBrokerAgent.send_request, but the future is an
+        asyncio.Future bound to the running loop.
+
+        Args:
+            message: Request message
+            timeout: Seconds before the future resolves to a TIMEOUT error
+                     (DEFAULT_REQUEST_TIMEOUT if omitted)
+
+        Returns:
+            Future resolved with the response or error ProtocolMessage
+        """
+        if timeout is None:
+            timeout = self.DEFAULT_REQUEST_TIMEOUT
+
+        key = message.correlation_key
+        response = asyncio.wrap_future(self.correlations.register(message, timeout))
+
+        result = await self.route_message(message)
+        if not result.valid:
+            self.correlations.fail(key, result.to_error_response(correlation_id=key))
+        return response
+
+    async def request(
+        self,
+        message: ProtocolMessage,
+        timeout: Optional[float] = None
+    ) -> ProtocolMessage:
+        """
+        Route a request and await its response.
+
+        Many requests can be awaited concurrently (e.g. with asyncio.gather);
+        each resolves when its response is routed through the broker.
+
+        Args:
+            message: Request message
+            timeout: Seconds to wait (DEFAULT_REQUEST_TIMEOUT if omitted)
+
+        Returns:
+            Response message, or an error message on routing failure/timeout
+        """
+        if timeout is None:
+            timeout = self.DEFAULT_REQUEST_TIMEOUT
+
+        response = await self.send_request(message, timeout)
+
+        # asyncio.wait does not cancel on timeout, so the table can still resolve it
+        done, _ = await asyncio.wait({response}, timeout=timeout)
+        if not done:
+            self.correlations.expire(message.correlation_key)
+        return await response
+
+    async def start(self) -> None:
+        """Start consumer tasks for all registered agents."""
+        await self.message_router.start()
+
+    async def stop(self, drain: bool = True) -> None:
+        """
+        Stop all consumer tasks.
+
+        Args:
+            drain: Wait for queued messages to be handled before stopping
+        """
+        await self.message_router.stop(drain=drain)
+
+    async def join(self) -> None:
+        """Wait until all queued messages have been handled."""
+        await self.message_router.join()
+
+    def get_inbox_stats(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Get inbox statistics for an agent."""
+        return self.message_router.get_inbox_stats(agent_id)
+
+    async def __aenter__(self) -> "AsyncProtocolBroker":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop(drain=exc_type is None)
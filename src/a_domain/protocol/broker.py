@@ -5,7 +5,8 @@ Implements the central message broker for agent-to-agent communication.
 Based on System Architecture (ARCH-002).
 """
 
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from uuid import uuid4
@@ -14,6 +15,16 @@ from queue import Queue
 
 from .message import ProtocolMessage, Agent, ErrorResponse, ErrorCode
 from .validator import MessageValidator, ContractValidator, ValidationResult
+from .codec import MessageCodec, DEFAULT_CODEC, negotiate_codec, create_codec
+from .expiry import ExpiryScheduler
+from .admission import AdmissionController
+from .correlation import CorrelationTable
+from .message_log import MessageLog
+from .discovery import CapabilityDiscoveryAgent
+from .schema import CompiledSchema, compile_schema
+
+# Payload keys carrying protocol routing data rather than application data
+_ENVELOPE_KEYS = ("contract_id", "correlation_id")
 
 
 @dataclass
@@ -27,6 +38,7 @@ class Handshake:
     status: str  # pending, accepted, rejected
     created_at: datetime
     expires_at: datetime
+    codecs: List[str] = field(default_factory=lambda: [DEFAULT_CODEC])  # Offered by source, in preference order
 
     def is_expired(self) -> bool:
         """Check if handshake has expired."""
@@ -44,6 +56,7 @@ class Contract:
     security_policy: Dict[str, Any]
     created_at: datetime
     status: str  # active, completed, terminated
+    codec: str = DEFAULT_CODEC  # Wire codec negotiated at handshake
 
 
 @dataclass
@@ -59,24 +72,41 @@ class Collaboration:
 
 
 class HandshakeManager:
-    """Manages agent handshakes."""
+    """
+    Manages agent handshakes.
+
+    Every handshake is scheduled for removal at its expiry time, so expired
+    handshakes are dropped without scanning the whole table. Due expiries
+    are processed on each create_handshake(), by cleanup_expired(), or by
+    the scheduler's background thread if started.
+    """
 
-    def __init__(self, timeout_seconds: int = 5):
+    def __init__(
+        self,
+        timeout_seconds: int = 5,
+        scheduler: Optional[ExpiryScheduler] = None,
+        on_expired: Optional[Callable[[Handshake], None]] = None
+    ):
         """
         Initialize handshake manager.
 
         Args:
             timeout_seconds: Handshake timeout in seconds
+            scheduler: Expiry scheduler (shared with other broker components)
+            on_expired: Called with each handshake removed on expiry
         """
         self.timeout_seconds = timeout_seconds
         self.handshakes: Dict[str, Handshake] = {}
+        self.scheduler = scheduler if scheduler is not None else ExpiryScheduler()
+        self.on_expired = on_expired
         self._lock = threading.Lock()
 
     def create_handshake(
         self,
         source_agent_id: str,
         target_agent_id: str,
-        intent: str
+        intent: str,
+        codecs: Optional[List[str]] = None
     ) -> Handshake:
         """
         Create a new handshake.
@@ -85,10 +115,13 @@ class HandshakeManager:
             source_agent_id: Source agent ID
             target_agent_id: Target agent ID
             intent: Requested intent
+            codecs: Wire codecs offered by the source, in preference order
 
         Returns:
             Created handshake
         """
+        self.scheduler.run_pending()
+
         handshake_id = f"handshake-{uuid4()}"
         handshake = Handshake(
             handshake_id=handshake_id,
@@ -97,12 +130,19 @@ class HandshakeManager:
             intent=intent,
             status="pending",
             created_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(seconds=self.timeout_seconds)
+            expires_at=datetime.utcnow() + timedelta(seconds=self.timeout_seconds),
+            codecs=list(codecs) if codecs else [DEFAULT_CODEC]
         )
 
         with self._lock:
             self.handshakes[handshake_id] = handshake
 
+        self.scheduler.schedule(
+            ("handshake", handshake_id),
+            self.timeout_seconds,
+            lambda: self._expire(handshake_id)
+        )
+
         return handshake
 
     def get_handshake(self, handshake_id: str) -> Optional[Handshake]:
@@ -132,24 +172,46 @@ class HandshakeManager:
         """
         Remove expired handshakes.
 
+        Runs every due expiry on the scheduler, in O(expired) time.
+
         Returns:
-            Number of handshakes removed
+            Number of handshakes removed by this call
         """
+        expired = self.scheduler.run_pending()
+        return sum(1 for kind, _ in expired if kind == "handshake")
+
+    def _expire(self, handshake_id: str) -> None:
+        """Remove a handshake whose expiry time has passed."""
         with self._lock:
-            expired = [
-                hid for hid, h in self.handshakes.items()
-                if h.is_expired()
-            ]
-            for hid in expired:
-                del self.handshakes[hid]
-            return len(expired)
+            handshake = self.handshakes.pop(handshake_id, None)
+
+        if handshake and self.on_expired:
+            self.on_expired(handshake)
 
 
 class ContractStore:
-    """Stores and manages contracts."""
+    """
+    Stores and manages contracts.
 
-    def __init__(self):
+    Terminated contracts stay readable for terminated_ttl_seconds and are
+    then removed by the expiry scheduler.
+    """
+
+    def __init__(
+        self,
+        scheduler: Optional[ExpiryScheduler] = None,
+        terminated_ttl_seconds: float = 300
+    ):
+        """
+        Initialize contract store.
+
+        Args:
+            scheduler: Expiry scheduler (shared with other broker components)
+            terminated_ttl_seconds: Retention of terminated contracts
+        """
         self.contracts: Dict[str, Contract] = {}
+        self.scheduler = scheduler if scheduler is not None else ExpiryScheduler()
+        self.terminated_ttl_seconds = terminated_ttl_seconds
         self._lock = threading.Lock()
 
     def store_contract(self, contract: Contract) -> None:
@@ -174,10 +236,23 @@ class ContractStore:
         """
         with self._lock:
             contract = self.contracts.get(contract_id)
-            if contract:
-                contract.status = "terminated"
-                return True
-            return False
+            if not contract:
+                return False
+            contract.status = "terminated"
+
+        self.scheduler.schedule(
+            ("contract", contract_id),
+            self.terminated_ttl_seconds,
+            lambda: self._expire(contract_id)
+        )
+        return True
+
+    def _expire(self, contract_id: str) -> None:
+        """Remove a contract whose terminated retention has passed."""
+        with self._lock:
+            contract = self.contracts.get(contract_id)
+            if contract and contract.status == "terminated":
+                del self.contracts[contract_id]
 
 
 class MessageRouter:
@@ -227,6 +302,34 @@ class MessageRouter:
         else:
             return False
 
+    def route_batch(self, target_id: str, messages: List[ProtocolMessage]) -> bool:
+        """
+        Route a batch of messages to one target agent.
+
+        Handlers opt into batch delivery by exposing a handle_batch(messages)
+        method; other handlers are called once per message.
+
+        Args:
+            target_id: Target agent ID
+            messages: Messages addressed to the target
+
+        Returns:
+            True if routed, False if target not found
+        """
+        with self._lock:
+            handler = self.routes.get(target_id)
+
+        if not handler:
+            return False
+
+        handle_batch = getattr(handler, "handle_batch", None)
+        if handle_batch:
+            handle_batch(messages)
+        else:
+            for message in messages:
+                handler(message)
+        return True
+
     def is_agent_registered(self, agent_id: str) -> bool:
         """Check if agent is registered."""
         with self._lock:
@@ -244,28 +347,66 @@ class ProtocolBrokerAgent:
     - Track active collaborations
     """
 
-    def __init__(self, jwt_secret: Optional[str] = None):
+    # Number of locks guarding per-collaboration stats. Updates for different
+    # contracts rarely share a stripe, so routing is not serialized on self._lock.
+    COLLABORATION_LOCK_STRIPES = 64
+
+    # Collaborations with no messages for this long stop being tracked
+    COLLABORATION_IDLE_SECONDS = 3600
+
+    # Seconds request() waits for a response when no timeout is given
+    DEFAULT_REQUEST_TIMEOUT = 30.0
+
+    def __init__(
+        self,
+        jwt_secret: Optional[str] = None,
+        expiry_scheduler: Optional[ExpiryScheduler] = None,
+        admission: Optional[AdmissionController] = None,
+        message_log: Optional[MessageLog] = None,
+        discovery: Optional[CapabilityDiscoveryAgent] = None
+    ):
         """
         Initialize protocol broker.
 
         Args:
             jwt_secret: Secret key for JWT validation (optional)
+            expiry_scheduler: Scheduler for handshake, contract and
+                              collaboration expiry (created if omitted)
+            admission: Rate limits and concurrency cap (none if omitted)
+            message_log: Write-ahead log of admitted messages (none if omitted)
+            discovery: Capability registry contract schemas are loaded from
+                       (contracts carry no schemas if omitted)
         """
-        self.handshake_manager = HandshakeManager()
-        self.contract_store = ContractStore()
+        self.expiry_scheduler = (
+            expiry_scheduler if expiry_scheduler is not None else ExpiryScheduler()
+        )
+        self.handshake_manager = HandshakeManager(scheduler=self.expiry_scheduler)
+        self.contract_store = ContractStore(scheduler=self.expiry_scheduler)
         self.message_router = MessageRouter()
         self.message_validator = MessageValidator()
         self.contract_validator = ContractValidator()
+        self.admission = admission
+        self.correlations = CorrelationTable(scheduler=self.expiry_scheduler)
+        self.message_log = message_log
+        self.discovery = discovery
 
         # Track active collaborations
         self.collaborations: Dict[str, Collaboration] = {}
-        self._lock = threading.Lock()
+        self._codecs: Dict[str, MessageCodec] = {}  # contract_id -> codec
+        # contract_id -> compiled (input, output) schemas, None where unconstrained
+        self._payload_schemas: Dict[str, Tuple[Optional[CompiledSchema], Optional[CompiledSchema]]] = {}
+        self._collaborations_by_contract: Dict[str, Collaboration] = {}  # contract_id -> collaboration
+        self._lock = threading.Lock()  # Guards collaboration creation/removal
+        self._stat_locks = [
+            threading.Lock() for _ in range(self.COLLABORATION_LOCK_STRIPES)
+        ]
 
     def initiate_handshake(
         self,
         source_agent_id: str,
         target_agent_id: str,
-        intent: str
+        intent: str,
+        codecs: Optional[List[str]] = None
     ) -> ValidationResult:
         """
         Initiate handshake between two agents.
@@ -274,6 +415,7 @@ class ProtocolBrokerAgent:
             source_agent_id: Source agent ID
             target_agent_id: Target agent ID
             intent: Requested intent/capability
+            codecs: Wire codecs the source supports, in preference order
 
         Returns:
             ValidationResult with handshake ID if successful
@@ -290,7 +432,8 @@ class ProtocolBrokerAgent:
         handshake = self.handshake_manager.create_handshake(
             source_agent_id=source_agent_id,
             target_agent_id=target_agent_id,
-            intent=intent
+            intent=intent,
+            codecs=codecs
         )
 
         return ValidationResult(
@@ -298,12 +441,26 @@ class ProtocolBrokerAgent:
             details={"handshake_id": handshake.handshake_id}
         )
 
-    def accept_handshake(self, handshake_id: str) -> ValidationResult:
+    def accept_handshake(
+        self,
+        handshake_id: str,
+        codecs: Optional[List[str]] = None,
+        input_schema: Optional[Dict[str, Any]] = None,
+        output_schema: Optional[Dict[str, Any]] = None
+    ) -> ValidationResult:
         """
         Accept a handshake and create contract.
 
+        The contract's wire codec is the first codec offered by the source
+        that the target also supports (JSON if none match). Its schemas
+        default to the target's registered capability: requests on the
+        contract must match input_schema, responses output_schema.
+
         Args:
             handshake_id: Handshake ID
+            codecs: Wire codecs the target supports
+            input_schema: Schema of request payloads (overrides the registry)
+            output_schema: Schema of response payloads (overrides the registry)
 
         Returns:
             ValidationResult with contract ID if successful
@@ -327,16 +484,25 @@ class ProtocolBrokerAgent:
         # Update handshake status
         self.handshake_manager.update_status(handshake_id, "accepted")
 
+        capability = (
+            self.discovery.registry.get_capability(handshake.target_agent_id)
+            if self.discovery is not None else None
+        )
+        if capability is not None:
+            input_schema = input_schema if input_schema is not None else capability.input_schema
+            output_schema = output_schema if output_schema is not None else capability.output_schema
+
         # Create contract
         contract_id = f"contract-{uuid4()}"
         contract = Contract(
             contract_id=contract_id,
             participants=[handshake.source_agent_id, handshake.target_agent_id],
-            input_schema={},  # TODO: Load from capability registry
-            output_schema={},  # TODO: Load from capability registry
+            input_schema=input_schema if input_schema is not None else {},
+            output_schema=output_schema if output_schema is not None else {},
             security_policy={},
             created_at=datetime.utcnow(),
-            status="active"
+            status="active",
+            codec=negotiate_codec(handshake.codecs, codecs)
         )
 
         # Validate contract
@@ -349,9 +515,31 @@ class ProtocolBrokerAgent:
 
         return ValidationResult(
             valid=True,
-            details={"contract_id": contract_id}
+            details={"contract_id": contract_id, "codec": contract.codec}
         )
 
+    def get_codec(self, contract_id: str) -> Optional[MessageCodec]:
+        """
+        Get the wire codec negotiated for a contract.
+
+        Args:
+            contract_id: Contract ID
+
+        Returns:
+            Codec instance (shared per contract) or None if contract not found
+        """
+        codec = self._codecs.get(contract_id)
+        if codec:
+            return codec
+
+        contract = self.contract_store.get_contract(contract_id)
+        if not contract:
+            return None
+
+        codec = create_codec(contract.codec, agent_ids=contract.participants)
+        with self._lock:
+            return self._codecs.setdefault(contract_id, codec)
+
     def route_message(self, message: ProtocolMessage) -> ValidationResult:
         """
         Route a protocol message to target agent.
@@ -362,44 +550,437 @@ class ProtocolBrokerAgent:
         Returns:
             ValidationResult indicating success or failure
         """
+        # Shed load before doing any work if handlers are saturated
+        if self.admission and not self.admission.try_enter():
+            return self.admission.overloaded()
+
+        try:
+            admission = self._admit_message(message)
+            if not admission.valid:
+                return admission
+
+            # Responses to pending request() calls go to the waiting caller
+            if len(self.correlations) and self.correlations.resolve(message):
+                if self.message_log:
+                    self.message_log.append(message)
+                return admission
+
+            # Log ahead of delivery, but never a message the router will reject
+            if self.message_log and self.message_router.is_agent_registered(message.target_agent.agent_id):
+                self.message_log.append(message)
+
+            # Route message
+            success = self.message_router.route_message(message)
+        finally:
+            if self.admission:
+                self.admission.leave()
+
+        if not success:
+            return ValidationResult(
+                valid=False,
+                error_code=ErrorCode.CAPABILITY_NOT_FOUND,
+                error_message=f"Target agent not registered: {message.target_agent.agent_id}"
+            )
+
+        return ValidationResult(valid=True)
+
+    def _admit_message(self, message: ProtocolMessage) -> ValidationResult:
+        """
+        Run the checks a message must pass before delivery.
+
+        Validates message format, applies rate limits, verifies the
+        contract (if any) and the payload against the contract's schema and
+        updates collaboration tracking. Shared by the sync and async routing
+        paths, which log the message once its delivery is accepted.
+
+        Args:
+            message: Protocol message
+
+        Returns:
+            ValidationResult indicating whether the message may be delivered
+        """
         # Validate message format
-        validation = self.message_validator.validate(message.to_dict())
+        validation = self.message_validator.validate_message(message)
         if not validation.valid:
             return validation
 
+        source_id = message.source_agent.agent_id
+        if self.admission:
+            limited = self.admission.check_agent(source_id)
+            if limited:
+                return limited
+
         # Verify contract if contract_id present
         contract_id = message.contract_id
         if contract_id:
-            contract = self.contract_store.get_contract(contract_id)
-            if not contract:
-                return ValidationResult(
-                    valid=False,
-                    error_code=ErrorCode.CONTRACT_VIOLATION,
-                    error_message=f"Contract not found: {contract_id}"
-                )
+            contract_check = self._check_contract(contract_id)
+            if not contract_check.valid:
+                return contract_check
 
-            if contract.status != "active":
-                return ValidationResult(
-                    valid=False,
-                    error_code=ErrorCode.CONTRACT_VIOLATION,
-                    error_message=f"Contract not active: {contract.status}"
-                )
+            mismatch = self._check_payload(contract_id, message)
+            if mismatch:
+                return mismatch
+
+            if self.admission:
+                limited = self.admission.check_contract(contract_id, source_id)
+                if limited:
+                    return limited
 
             # Update collaboration tracking
             self._update_collaboration(contract_id, message)
 
-        # Route message
-        success = self.message_router.route_message(message)
+        return ValidationResult(valid=True)
+
+    def route_many(self, messages: List[ProtocolMessage]) -> List[ValidationResult]:
+        """
+        Route a batch of protocol messages.
 
-        if not success:
+        Messages are grouped by target agent and contract. Each contract is
+        checked and each handler looked up once per group, and handlers that
+        implement handle_batch(messages) receive the whole group at once.
+        Delivery order is preserved within a group. Rate limits apply per
+        message; the concurrency cap counts one slot per group delivery and
+        is checked before the group is charged to rate limits or tracked,
+        so shed groups leave no trace.
+
+        Args:
+            messages: Protocol messages
+
+        Returns:
+            ValidationResult per message, in input order
+        """
+        results, groups = self._check_many(messages)
+
+        for (target_id, contract_id), indices in groups.items():
+            if self.admission and not self.admission.try_enter():
+                overloaded = self.admission.overloaded()
+                for i in indices:
+                    results[i] = overloaded
+                continue
+
+            try:
+                indices = self._charge_group(messages, results, contract_id, indices)
+                pending = self._resolve_group(messages, results, indices)
+                if self.message_log and indices:
+                    # Log ahead of delivery, but never messages the router will reject
+                    if pending and not self.message_router.is_agent_registered(target_id):
+                        indices = [i for i in indices if results[i] is not None]
+                    self._log_messages(messages, indices)
+                routed = bool(pending) and self.message_router.route_batch(
+                    target_id, [messages[i] for i in pending]
+                )
+            finally:
+                if self.admission:
+                    self.admission.leave()
+            for i in pending:
+                results[i] = ValidationResult(valid=True) if routed else ValidationResult(
+                    valid=False,
+                    error_code=ErrorCode.CAPABILITY_NOT_FOUND,
+                    error_message=f"Target agent not registered: {target_id}"
+                )
+
+        return results
+
+    def _admit_many(
+        self,
+        messages: List[ProtocolMessage]
+    ) -> Tuple[List[Optional[ValidationResult]], Dict[Tuple[str, Optional[str]], List[int]]]:
+        """
+        Run pre-delivery checks for a batch of messages.
+
+        Returns:
+            (results, groups): results holds failures for rejected messages
+            and None for admitted ones; groups maps (target_id, contract_id)
+            to the indices of admitted messages, in input order
+        """
+        results, groups = self._check_many(messages)
+
+        for (target_id, contract_id), indices in list(groups.items()):
+            admitted = self._charge_group(messages, results, contract_id, indices)
+            if admitted:
+                groups[(target_id, contract_id)] = admitted
+            else:
+                del groups[(target_id, contract_id)]
+
+        return results, groups
+
+    def _check_many(
+        self,
+        messages: List[ProtocolMessage]
+    ) -> Tuple[List[Optional[ValidationResult]], Dict[Tuple[str, Optional[str]], List[int]]]:
+        """
+        Validate a batch of messages, their contracts and payloads.
+
+        Has no side effects: rate limits are charged and collaborations
+        tracked by _charge_group().
+
+        Returns:
+            (results, groups) as for _admit_many()
+        """
+        results: List[Optional[ValidationResult]] = self.message_validator.validate_many(messages)
+        groups: Dict[Tuple[str, Optional[str]], List[int]] = {}
+
+        for i, message in enumerate(messages):
+            if results[i].valid:
+                results[i] = None
+                key = (message.target_agent.agent_id, message.contract_id)
+                groups.setdefault(key, []).append(i)
+
+        for (target_id, contract_id), indices in list(groups.items()):
+            if not contract_id:
+                continue
+
+            contract_check = self._check_contract(contract_id)
+            if not contract_check.valid:
+                for i in indices:
+                    results[i] = contract_check
+                del groups[(target_id, contract_id)]
+                continue
+
+            schemas = self._contract_schemas(contract_id)
+            if schemas != (None, None):
+                admitted = []
+                for i in indices:
+                    mismatch = self._check_payload(contract_id, messages[i], schemas)
+                    if mismatch:
+                        results[i] = mismatch
+                    else:
+                        admitted.append(i)
+                if not admitted:
+                    del groups[(target_id, contract_id)]
+                    continue
+                groups[(target_id, contract_id)] = admitted
+
+        return results, groups
+
+    def _charge_group(
+        self,
+        messages: List[ProtocolMessage],
+        results: List[Optional[ValidationResult]],
+        contract_id: Optional[str],
+        indices: List[int]
+    ) -> List[int]:
+        """
+        Charge a checked group to rate limits and track its collaboration.
+
+        Returns:
+            Indices of the messages within their limits (the others get a
+            RATE_LIMIT_EXCEEDED result)
+        """
+        admission = self.admission
+        if admission:
+            admitted = []
+            for i in indices:
+                source_id = messages[i].source_agent.agent_id
+                limited = admission.check_agent(source_id)
+                if not limited and contract_id:
+                    limited = admission.check_contract(contract_id, source_id)
+                if limited:
+                    results[i] = limited
+                else:
+                    admitted.append(i)
+            indices = admitted
+
+        if contract_id and indices:
+            self._update_collaboration(contract_id, messages[indices[-1]], count=len(indices))
+        return indices
+
+    def _log_messages(self, messages: List[ProtocolMessage], indices: List[int]) -> None:
+        """Append the messages at indices to the message log (if any)."""
+        if self.message_log and indices:
+            self.message_log.append_many([messages[i] for i in indices])
+
+    def _resolve_responses(
+        self,
+        messages: List[ProtocolMessage],
+        results: List[Optional[ValidationResult]],
+        groups: Dict[Tuple[str, Optional[str]], List[int]]
+    ) -> None:
+        """Hand admitted responses to pending request() calls, removing them from groups."""
+        if not len(self.correlations):
+            return
+
+        for key, indices in list(groups.items()):
+            remaining = self._resolve_group(messages, results, indices)
+            if remaining:
+                groups[key] = remaining
+            else:
+                del groups[key]
+
+    def _resolve_group(
+        self,
+        messages: List[ProtocolMessage],
+        results: List[Optional[ValidationResult]],
+        indices: List[int]
+    ) -> List[int]:
+        """Hand a group's responses to pending request() calls; returns the rest."""
+        if not len(self.correlations):
+            return indices
+
+        remaining = []
+        for i in indices:
+            if self.correlations.resolve(messages[i]):
+                results[i] = ValidationResult(valid=True)
+            else:
+                remaining.append(i)
+        return remaining
+
+    def send_request(self, message: ProtocolMessage, timeout: Optional[float] = None) -> Future:
+        """
+        Route a request and return a future for its response.
+
+        The target replies by routing message.create_response(...) (or an
+        error response) through the broker; that response resolves the
+        future instead of being delivered to a handler. If routing fails or
+        no response arrives within timeout, the future resolves to an error
+        message (code from the routing failure, or TIMEOUT).
+
+        Args:
+            message: Request message
+            timeout: Seconds to wait (DEFAULT_REQUEST_TIMEOUT if omitted)
+
+        Returns:
+            Future resolved with the response or error ProtocolMessage
+
+        Raises:
+            ValueError: If a request with the same correlation key is pending
+        """
+        if timeout is None:
+            timeout = self.DEFAULT_REQUEST_TIMEOUT
+
+        future = self.correlations.register(message, timeout)
+        result = self.route_message(message)
+        if not result.valid:
+            key = message.correlation_key
+            self.correlations.fail(key, result.to_error_response(correlation_id=key))
+        return future
+
+    def request(self, message: ProtocolMessage, timeout: Optional[float] = None) -> ProtocolMessage:
+        """
+        Route a request and wait for its response.
+
+        Args:
+            message: Request message
+            timeout: Seconds to wait (DEFAULT_REQUEST_TIMEOUT if omitted)
+
+        Returns:
+            Response message, or an error message on routing failure/timeout
+        """
+        if timeout is None:
+            timeout = self.DEFAULT_REQUEST_TIMEOUT
+
+        future = self.send_request(message, timeout)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            self.correlations.expire(message.correlation_key)
+            return future.result()
+
+    def redeliver(self, contract_id: Optional[str] = None, from_offset: int = 0) -> int:
+        """
+        Re-deliver logged messages to the currently registered handlers.
+
+        Used after a restart to recover in-flight collaborations: messages
+        were admitted when first logged, so they are not re-validated or
+        logged again. Messages whose target is not registered are skipped.
+
+        Args:
+            contract_id: Only re-deliver this contract's messages
+            from_offset: First log offset to re-deliver
+
+        Returns:
+            Number of messages delivered
+
+        Raises:
+            ValueError: If the broker has no message log
+        """
+        if not self.message_log:
+            raise ValueError("Broker has no message log")
+
+        delivered = 0
+        for _, message in self.message_log.replay(from_offset, contract_id=contract_id):
+            if self.message_router.route_message(message):
+                delivered += 1
+        return delivered
+
+    def _check_contract(self, contract_id: str) -> ValidationResult:
+        """Verify a contract exists and is active."""
+        contract = self.contract_store.get_contract(contract_id)
+        if not contract:
             return ValidationResult(
                 valid=False,
-                error_code=ErrorCode.CAPABILITY_NOT_FOUND,
-                error_message=f"Target agent not registered: {message.target_agent.agent_id}"
+                error_code=ErrorCode.CONTRACT_VIOLATION,
+                error_message=f"Contract not found: {contract_id}"
+            )
+
+        if contract.status != "active":
+            return ValidationResult(
+                valid=False,
+                error_code=ErrorCode.CONTRACT_VIOLATION,
+                error_message=f"Contract not active: {contract.status}"
             )
 
         return ValidationResult(valid=True)
 
+    def _contract_schemas(self, contract_id: str) -> Tuple[Optional[CompiledSchema], Optional[CompiledSchema]]:
+        """Compiled (input, output) schemas of a contract, compiled on first use."""
+        schemas = self._payload_schemas.get(contract_id)
+        if schemas is not None:
+            return schemas
+
+        contract = self.contract_store.get_contract(contract_id)
+        if not contract:
+            return None, None
+
+        compiled = tuple(
+            None if schema.accepts_all else schema
+            for schema in (compile_schema(contract.input_schema), compile_schema(contract.output_schema))
+        )
+        with self._lock:
+            return self._payload_schemas.setdefault(contract_id, compiled)
+
+    def _check_payload(
+        self,
+        contract_id: str,
+        message: ProtocolMessage,
+        schemas: Optional[Tuple[Optional[CompiledSchema], Optional[CompiledSchema]]] = None
+    ) -> Optional[ValidationResult]:
+        """
+        Validate the payload of a contract-bound message.
+
+        Requests are checked against the contract's input schema and
+        responses against its output schema; events and errors are not
+        checked. Envelope keys (contract_id, correlation_id) are not part
+        of the application payload and are left out of the check.
+
+        Returns:
+            None if the payload conforms, else a SCHEMA_MISMATCH result
+        """
+        if message.message_type == "request":
+            index, direction = 0, "input"
+        elif message.message_type == "response":
+            index, direction = 1, "output"
+        else:
+            return None
+
+        schema = (schemas if schemas is not None else self._contract_schemas(contract_id))[index]
+        if schema is None:
+            return None
+
+        payload = message.payload
+        if any(key in payload for key in _ENVELOPE_KEYS):
+            payload = {key: value for key, value in payload.items() if key not in _ENVELOPE_KEYS}
+
+        error = schema.validate(payload)
+        if error is None:
+            return None
+        return ValidationResult(
+            valid=False,
+            error_code=ErrorCode.SCHEMA_MISMATCH,
+            error_message=f"Payload does not match contract {direction} schema: {error}",
+            details={"contract_id": contract_id, "schema": direction, "error": error}
+        )
+
     def terminate_collaboration(self, collaboration_id: str) -> ValidationResult:
         """
         Terminate an active collaboration.
@@ -424,9 +1005,34 @@ class ProtocolBrokerAgent:
 
             # Remove collaboration
             del self.collaborations[collaboration_id]
+            self._collaborations_by_contract.pop(collaboration.contract_id, None)
+            self._codecs.pop(collaboration.contract_id, None)
+            self._payload_schemas.pop(collaboration.contract_id, None)
+
+        if self.admission:
+            self.admission.forget_contract(collaboration.contract_id)
+        self.expiry_scheduler.cancel(("collaboration", collaboration.contract_id))
 
         return ValidationResult(valid=True)
 
+    def start_expiry(self, interval: float = 0.5) -> None:
+        """
+        Start background expiry of handshakes, terminated contracts and
+        idle collaborations.
+
+        Args:
+            interval: Maximum seconds between sweeps
+        """
+        self.expiry_scheduler.start(interval)
+
+    def stop_expiry(self) -> None:
+        """Stop background expiry."""
+        self.expiry_scheduler.stop()
+
+    def get_expiry_metrics(self) -> Dict[str, Any]:
+        """Get expiry scheduler metrics."""
+        return self.expiry_scheduler.get_metrics()
+
     def register_agent(self, agent_id: str, handler: Callable) -> None:
         """
         Register an agent with the broker.
@@ -458,9 +1064,10 @@ class ProtocolBrokerAgent:
         """
         with self._lock:
             collaboration = self.collaborations.get(collaboration_id)
-            if not collaboration:
-                return None
+        if not collaboration:
+            return None
 
+        with self._stat_lock(collaboration.contract_id):
             duration = datetime.utcnow() - collaboration.started_at
 
             return {
@@ -473,29 +1080,70 @@ class ProtocolBrokerAgent:
                 "last_activity": collaboration.last_activity.isoformat()
             }
 
-    def _update_collaboration(self, contract_id: str, message: ProtocolMessage) -> None:
-        """Update collaboration tracking for a message."""
-        with self._lock:
-            # Find collaboration by contract_id
-            collab = None
-            for c in self.collaborations.values():
-                if c.contract_id == contract_id:
-                    collab = c
-                    break
-
-            # Create collaboration if it doesn't exist
-            if not collab:
-                collaboration_id = f"collab-{uuid4()}"
-                contract = self.contract_store.get_contract(contract_id)
-                if contract:
+    def _stat_lock(self, contract_id: str) -> threading.Lock:
+        """Get the striped lock guarding stats for a contract's collaboration."""
+        return self._stat_locks[hash(contract_id) % self.COLLABORATION_LOCK_STRIPES]
+
+    def _update_collaboration(
+        self,
+        contract_id: str,
+        message: ProtocolMessage,
+        count: int = 1
+    ) -> None:
+        """Update collaboration tracking for a message (or count messages)."""
+        # O(1) lookup; dict reads are atomic so the common path takes no global lock
+        collab = self._collaborations_by_contract.get(contract_id)
+
+        # Create collaboration if it doesn't exist
+        if not collab:
+            with self._lock:
+                collab = self._collaborations_by_contract.get(contract_id)
+                if not collab:
+                    contract = self.contract_store.get_contract(contract_id)
+                    if not contract:
+                        return
                     collab = Collaboration(
-                        collaboration_id=collaboration_id,
+                        collaboration_id=f"collab-{uuid4()}",
                         contract_id=contract_id,
                         participants=contract.participants
                     )
-                    self.collaborations[collaboration_id] = collab
+                    self.collaborations[collab.collaboration_id] = collab
+                    self._collaborations_by_contract[contract_id] = collab
+                    self._schedule_idle_check(contract_id, self.COLLABORATION_IDLE_SECONDS)
+
+        # Update stats
+        with self._stat_lock(contract_id):
+            collab.message_count += count
+            collab.last_activity = datetime.utcnow()
+
+    def _schedule_idle_check(self, contract_id: str, delay_seconds: float) -> None:
+        """Schedule the idle check for a contract's collaboration."""
+        self.expiry_scheduler.schedule(
+            ("collaboration", contract_id),
+            delay_seconds,
+            lambda: self._expire_idle_collaboration(contract_id)
+        )
+
+    def _expire_idle_collaboration(self, contract_id: str) -> None:
+        """
+        Stop tracking a collaboration with no recent activity.
+
+        Activity is recorded without touching the scheduler, so a
+        collaboration that saw messages since the check was scheduled is
+        rescheduled for the remainder of its idle window instead.
+        """
+        with self._lock:
+            collab = self._collaborations_by_contract.get(contract_id)
+            if not collab:
+                return
+
+            with self._stat_lock(contract_id):
+                idle = (datetime.utcnow() - collab.last_activity).total_seconds()
+
+            remaining = self.COLLABORATION_IDLE_SECONDS - idle
+            if remaining <= 0:
+                del self.collaborations[collab.collaboration_id]
+                del self._collaborations_by_contract[contract_id]
+                return
 
-            # Update stats
-            if collab:
-                collab.message_count += 1
-                collab.last_activity = datetime.utcnow()
+        self._schedule_idle_check(contract_id, remaining)
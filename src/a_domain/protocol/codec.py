@@ -0,0 +1,312 @@
+"""
+Protocol Message Codecs
+
+Pluggable wire encodings for ProtocolMessage. JSON remains the default;
+the compact binary codec is negotiated per contract at handshake time.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+import json
+
+from .message import ProtocolMessage, Agent, Security
+
+
+class CodecError(ValueError):
+    """Raised when a message cannot be decoded."""
+    pass
+
+
+class MessageCodec:
+    """Base class for ProtocolMessage wire encodings."""
+
+    name = ""
+
+    def encode(self, message: ProtocolMessage) -> bytes:
+        """Encode a message to bytes."""
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> ProtocolMessage:
+        """Decode a message from bytes."""
+        raise NotImplementedError
+
+
+class JSONCodec(MessageCodec):
+    """A2ACP v1.0 JSON encoding (ProtocolMessage.to_json/from_json)."""
+
+    name = "json"
+
+    def encode(self, message: ProtocolMessage) -> bytes:
+        return message.to_json().encode("utf-8")
+
+    def decode(self, data: bytes) -> ProtocolMessage:
+        try:
+            return ProtocolMessage.from_json(data)
+        except (ValueError, KeyError, TypeError) as e:
+            raise CodecError(f"Invalid JSON message: {e}") from e
+
+
+# Shared encoder: json.dumps() with non-default options builds a new
+# JSONEncoder on every call.
+_PAYLOAD_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 varint, returning (value, new_pos)."""
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+
+    value = byte & 0x7F
+    shift = 7
+    pos += 1
+    while True:
+        byte = data[pos]
+        value |= (byte & 0x7F) << shift
+        pos += 1
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _format_uuid(raw: bytes) -> str:
+    """Format 16 raw bytes as a canonical lowercase UUID string."""
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _pack_uuid(value: str) -> Optional[bytes]:
+    """Pack a canonical UUID string to 16 bytes, or None if not canonical."""
+    if len(value) != 36 or value[8] != "-" or value[23] != "-":
+        return None
+    try:
+        raw = bytes.fromhex(value.replace("-", ""))
+    except ValueError:
+        return None
+    if len(raw) != 16 or _format_uuid(raw) != value:
+        return None
+    return raw
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    """Append a varint length-prefixed UTF-8 string."""
+    encoded = value.encode("utf-8")
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[str, int]:
+    """Read a varint length-prefixed UTF-8 string."""
+    length, pos = _read_varint(data, pos)
+    end = pos + length
+    if end > len(data):
+        raise CodecError("Truncated string field")
+    return data[pos:end].decode("utf-8"), end
+
+
+class BinaryCodec(MessageCodec):
+    """
+    Compact length-prefixed binary encoding.
+
+    Layout (all strings are varint length + UTF-8):
+        u8      format version
+        varint  header flags (message type, intent/encryption/id/version bits)
+        [str]   protocol_version, only if not the default "1.0"
+        id      16 raw bytes if message_id is a UUID, else str
+        str     timestamp
+        agent   source: varint ref (0 = literal agent_id str follows,
+                n = agent_ids[n - 1]), then domain str, version str
+        agent   target (same)
+        [str]   intent, if present
+        str     auth_token
+        bytes   payload as compact JSON, to end of buffer
+
+    Agent IDs listed at construction (the contract participants) are
+    interned, so the common case sends a one-byte reference instead of
+    the full ID on every message.
+    """
+
+    name = "binary"
+
+    FORMAT_VERSION = 0xA1
+    MESSAGE_TYPES = ("request", "response", "event", "error")
+
+    _FLAG_INTENT = 0x04
+    _FLAG_AES256 = 0x08
+    _FLAG_UUID_ID = 0x10
+    _FLAG_CUSTOM_VERSION = 0x20
+
+    def __init__(self, agent_ids: Sequence[str] = ()):
+        """
+        Initialize binary codec.
+
+        Args:
+            agent_ids: Agent IDs to intern (both peers must use the same list)
+        """
+        self.agent_ids: Tuple[str, ...] = tuple(agent_ids)
+        self._agent_refs: Dict[str, int] = {
+            agent_id: i + 1 for i, agent_id in enumerate(self.agent_ids)
+        }
+
+    def encode(self, message: ProtocolMessage) -> bytes:
+        try:
+            flags = self.MESSAGE_TYPES.index(message.message_type)
+        except ValueError:
+            raise CodecError(f"Unknown message type: {message.message_type}")
+
+        if message.intent is not None:
+            flags |= self._FLAG_INTENT
+        if message.security.encryption == "aes256":
+            flags |= self._FLAG_AES256
+        if message.protocol_version != "1.0":
+            flags |= self._FLAG_CUSTOM_VERSION
+
+        message_id_bytes = _pack_uuid(message.message_id)
+        if message_id_bytes is not None:
+            flags |= self._FLAG_UUID_ID
+
+        out = bytearray((self.FORMAT_VERSION,))
+        _write_varint(out, flags)
+
+        if flags & self._FLAG_CUSTOM_VERSION:
+            _write_str(out, message.protocol_version)
+
+        if message_id_bytes is not None:
+            out += message_id_bytes
+        else:
+            _write_str(out, message.message_id)
+
+        _write_str(out, message.timestamp)
+        self._write_agent(out, message.source_agent)
+        self._write_agent(out, message.target_agent)
+
+        if message.intent is not None:
+            _write_str(out, message.intent)
+
+        _write_str(out, message.security.auth_token)
+        out += _PAYLOAD_ENCODER.encode(message.payload).encode("utf-8")
+
+        return bytes(out)
+
+    def decode(self, data: bytes) -> ProtocolMessage:
+        try:
+            if data[0] != self.FORMAT_VERSION:
+                raise CodecError(f"Unsupported binary format version: {data[0]}")
+
+            flags, pos = _read_varint(data, 1)
+
+            protocol_version = "1.0"
+            if flags & self._FLAG_CUSTOM_VERSION:
+                protocol_version, pos = _read_str(data, pos)
+
+            if flags & self._FLAG_UUID_ID:
+                if pos + 16 > len(data):
+                    raise CodecError("Truncated message_id")
+                message_id = _format_uuid(data[pos:pos + 16])
+                pos += 16
+            else:
+                message_id, pos = _read_str(data, pos)
+
+            timestamp, pos = _read_str(data, pos)
+            source_agent, pos = self._read_agent(data, pos)
+            target_agent, pos = self._read_agent(data, pos)
+
+            intent = None
+            if flags & self._FLAG_INTENT:
+                intent, pos = _read_str(data, pos)
+
+            auth_token, pos = _read_str(data, pos)
+            payload = json.loads(data[pos:])
+        except CodecError:
+            raise
+        except (IndexError, ValueError) as e:
+            raise CodecError(f"Invalid binary message: {e}") from e
+
+        return ProtocolMessage(
+            protocol_version=protocol_version,
+            message_id=message_id,
+            timestamp=timestamp,
+            source_agent=source_agent,
+            target_agent=target_agent,
+            message_type=self.MESSAGE_TYPES[flags & 0x03],
+            intent=intent,
+            payload=payload,
+            security=Security(
+                auth_token=auth_token,
+                encryption="aes256" if flags & self._FLAG_AES256 else "none"
+            )
+        )
+
+    def _write_agent(self, out: bytearray, agent: Agent) -> None:
+        ref = self._agent_refs.get(agent.agent_id, 0)
+        _write_varint(out, ref)
+        if not ref:
+            _write_str(out, agent.agent_id)
+        _write_str(out, agent.domain)
+        _write_str(out, agent.version)
+
+    def _read_agent(self, data: bytes, pos: int) -> Tuple[Agent, int]:
+        ref, pos = _read_varint(data, pos)
+        if ref:
+            if ref > len(self.agent_ids):
+                raise CodecError(f"Unknown interned agent reference: {ref}")
+            agent_id = self.agent_ids[ref - 1]
+        else:
+            agent_id, pos = _read_str(data, pos)
+        domain, pos = _read_str(data, pos)
+        version, pos = _read_str(data, pos)
+        return Agent.intern(agent_id, domain, version), pos
+
+
+# Registered codecs, keyed by negotiated name
+CODECS: Dict[str, Type[MessageCodec]] = {
+    JSONCodec.name: JSONCodec,
+    BinaryCodec.name: BinaryCodec,
+}
+
+DEFAULT_CODEC = JSONCodec.name
+
+
+def negotiate_codec(offered: Optional[List[str]], accepted: Optional[List[str]]) -> str:
+    """
+    Pick the wire codec for a contract.
+
+    Args:
+        offered: Codecs the initiating agent supports, in preference order
+        accepted: Codecs the accepting agent supports
+
+    Returns:
+        First offered codec both sides and the broker support, else "json"
+    """
+    accepted_set = set(accepted or [DEFAULT_CODEC])
+    for name in offered or [DEFAULT_CODEC]:
+        if name in accepted_set and name in CODECS:
+            return name
+    return DEFAULT_CODEC
+
+
+def create_codec(name: str, agent_ids: Sequence[str] = ()) -> MessageCodec:
+    """
+    Create a codec instance by name.
+
+    Args:
+        name: Registered codec name
+        agent_ids: Agent IDs to intern (ignored by codecs without interning)
+
+    Returns:
+        Codec instance
+
+    Raises:
+        KeyError: If no codec is registered under name
+    """
+    codec_cls = CODECS[name]
+    if codec_cls is BinaryCodec:
+        return BinaryCodec(agent_ids)
+    return codec_cls()
@@ -0,0 +1,161 @@
+"""
+Request/Response Correlation
+
+Matches response and error messages to the request that caused them, so
+callers can wait on a future instead of polling handler-side lists.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+from concurrent.futures import Future
+import threading
+
+from .message import ProtocolMessage, ErrorResponse, ErrorCode
+from .expiry import ExpiryScheduler
+
+
+class CorrelationTable:
+    """
+    Pending requests keyed by correlation key.
+
+    A request's key is its payload correlation_id, else its message_id;
+    ProtocolMessage.create_response() copies the key into the response.
+    Each pending entry holds a concurrent.futures.Future (wrap with
+    asyncio.wrap_future() in async code) and is scheduled to expire, so
+    abandoned requests resolve to a TIMEOUT error message instead of
+    leaking.
+    """
+
+    def __init__(self, scheduler: Optional[ExpiryScheduler] = None):
+        """
+        Initialize correlation table.
+
+        Args:
+            scheduler: Expiry scheduler for request timeouts (created if omitted)
+        """
+        self.scheduler = scheduler if scheduler is not None else ExpiryScheduler()
+        self._pending: Dict[str, Tuple[ProtocolMessage, Future, float]] = {}  # key -> (request, future, timeout)
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "registered": 0,
+            "resolved": 0,
+            "timed_out": 0
+        }
+
+    def register(self, request: ProtocolMessage, timeout: float) -> Future:
+        """
+        Start waiting for the response to a request.
+
+        Args:
+            request: Outgoing request message
+            timeout: Seconds before the request resolves to a TIMEOUT error
+
+        Returns:
+            Future resolved with the response (or error) ProtocolMessage
+
+        Raises:
+            ValueError: If a request with the same key is already pending
+        """
+        key = request.correlation_key
+        future: Future = Future()
+
+        with self._lock:
+            if key in self._pending:
+                raise ValueError(f"Request already pending for correlation_id: {key}")
+            self._pending[key] = (request, future, timeout)
+            self.metrics["registered"] += 1
+
+        self.scheduler.schedule(("request", key), timeout, lambda: self.expire(key))
+        return future
+
+    def resolve(self, response: ProtocolMessage) -> bool:
+        """
+        Complete the pending request a response belongs to.
+
+        Args:
+            response: Incoming response or error message
+
+        Returns:
+            True if the response matched a pending request
+        """
+        if response.message_type not in ("response", "error"):
+            return False
+
+        key = response.correlation_id
+        if not self._complete(key, response):
+            return False
+
+        with self._lock:
+            self.metrics["resolved"] += 1
+        return True
+
+    def fail(self, key: str, error: ErrorResponse) -> bool:
+        """
+        Complete a pending request with an error message.
+
+        Args:
+            key: Correlation key
+            error: Error to report to the requester
+
+        Returns:
+            True if the request was pending
+        """
+        with self._lock:
+            entry = self._pending.get(key)
+        if not entry:
+            return False
+
+        return self._complete(key, entry[0].create_error_response(error))
+
+    def expire(self, key: str) -> bool:
+        """
+        Complete a pending request with a TIMEOUT error message.
+
+        Args:
+            key: Correlation key
+
+        Returns:
+            True if the request was still pending
+        """
+        with self._lock:
+            entry = self._pending.get(key)
+        if not entry:
+            return False
+
+        timed_out = self.fail(key, ErrorResponse(
+            code=ErrorCode.TIMEOUT,
+            message=f"No response within {entry[2]} seconds",
+            correlation_id=key
+        ))
+        if timed_out:
+            with self._lock:
+                self.metrics["timed_out"] += 1
+        return timed_out
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get correlation metrics.
+
+        Returns:
+            Counters plus the number of pending requests
+        """
+        with self._lock:
+            return {**self.metrics, "pending": len(self._pending)}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _complete(self, key: Optional[str], message: ProtocolMessage) -> bool:
+        """Pop a pending entry and resolve its future with message."""
+        if key is None:
+            return False
+
+        with self._lock:
+            entry = self._pending.pop(key, None)
+        if not entry:
+            return False
+
+        self.scheduler.cancel(("request", key))
+        if not entry[1].done():  # The waiter may have cancelled it
+            entry[1].set_result(message)
+        return True
@@ -5,12 +5,43 @@ Implements agent capability registration and discovery.
 Based on System Architecture (ARCH-002) and Technical Design (DES-001).
 """
 
-from typing import Dict, Any, Optional, List, Set
-from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Set, Tuple, FrozenSet, Iterable, Mapping, Union, Callable, TYPE_CHECKING
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from types import MappingProxyType
+import heapq
+import logging
+import math
+import os
 import threading
 import re
 
+from .semver import Version, VersionRange, VersionTable, parse_range, parse_version
+from .schema import CompiledSchema, SchemaError, compile_schema, compatibility_issues
+
+if TYPE_CHECKING:
+    from .registry_store import RegistryStore
+
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Called as listener(agent_id, previous, current) when an agent's current capability changes
+CapabilityListener = Callable[[str, Optional["CapabilitySpec"], Optional["CapabilitySpec"]], None]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split free text or an identifier into lowercase search tokens.
+
+    "provision_test_dataset" and "Provision test dataset" both give
+    ["provision", "test", "dataset"]. Single characters are dropped.
+    """
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
 
 @dataclass
 class CapabilitySpec:
@@ -72,6 +103,27 @@ class AgentMatch:
         }
 
 
+@dataclass
+class CapabilityQuery:
+    """
+    Multi-predicate capability query.
+
+    Every structured predicate must hold (AND). text matches description
+    and intent/capability name tokens; at least one token must match, and
+    the share of matched tokens (IDF-weighted) drives the ranking.
+    """
+
+    intents: List[str] = field(default_factory=list)   # Agent must support all
+    provides: List[str] = field(default_factory=list)  # Agent must provide all
+    requires: List[str] = field(default_factory=list)  # Agent must require all
+    domain: Optional[str] = None
+    version_range: Optional[str] = None  # Semver range, e.g. "^1.2" or ">=2.0,<3"
+    min_version: Optional[str] = None  # Inclusive
+    max_version: Optional[str] = None  # Exclusive
+    text: str = ""
+    limit: Optional[int] = None  # Top-k; None returns every match
+
+
 @dataclass
 class CompatibilityResult:
     """Result of compatibility check between two agents."""
@@ -95,76 +147,434 @@ class CompatibilityResult:
         }
 
 
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """
+    Immutable point-in-time view of a CapabilityRegistry.
+
+    Mappings are read-only proxies over dicts that are never mutated after
+    publication, and index entries are frozensets (version tables are
+    private copies), so a snapshot can be read from any thread without
+    locking. best_version_cache memoizes resolutions against this snapshot
+    only, so it can never serve a result from another registry state.
+    """
+
+    capabilities: Mapping[str, CapabilitySpec]
+    intent_index: Mapping[str, FrozenSet[str]]
+    domain_index: Mapping[str, FrozenSet[str]]
+    provides_index: Mapping[str, FrozenSet[str]]
+    requires_index: Mapping[str, FrozenSet[str]]
+    token_index: Mapping[str, FrozenSet[str]]
+    term_counts: Mapping[str, Tuple[int, int]]
+    versions: Mapping[str, VersionTable]  # agent_id -> every registered version
+    intent_versions: Mapping[str, VersionTable]  # intent -> supporting versions of all agents
+    epoch: int = 0  # Registry epoch this snapshot reflects
+    best_version_cache: Dict[str, Dict[Optional[str], Optional[CapabilitySpec]]] = field(
+        default_factory=dict, compare=False
+    )
+
+    @classmethod
+    def empty(cls) -> "RegistrySnapshot":
+        """Snapshot of an empty registry."""
+        empty = MappingProxyType({})
+        return cls(empty, empty, empty, empty, empty, empty, empty, empty, empty)
+
+    def updated(self, registry: "CapabilityRegistry", changed: Iterable[CapabilitySpec]) -> "RegistrySnapshot":
+        """
+        Derive the next snapshot after a write (registry lock held).
+
+        Only the maps a change touches are copied, and within them only the
+        touched entries are re-frozen from the registry's live indexes;
+        everything else is shared with this snapshot.
+
+        Args:
+            registry: Registry whose live state to copy from
+            changed: Every capability version added, replaced or removed,
+                     plus the old and new current version of each agent
+
+        Returns:
+            New snapshot
+        """
+        agent_ids: Set[str] = set()
+        touched: Dict[str, Set[str]] = {}
+        for capability in changed:
+            agent_ids.add(capability.agent_id)
+            for name, keys in registry._index_keys(capability):
+                touched.setdefault(name, set()).update(keys)
+
+        if not agent_ids:
+            return self if self.epoch == registry._epoch else replace(self, epoch=registry._epoch)
+
+        capabilities = dict(self.capabilities)
+        term_counts = dict(self.term_counts)
+        versions = dict(self.versions)
+        for agent_id in agent_ids:
+            capability = registry.capabilities.get(agent_id)
+            if capability is None:
+                capabilities.pop(agent_id, None)
+                term_counts.pop(agent_id, None)
+                versions.pop(agent_id, None)
+            else:
+                capabilities[agent_id] = capability
+                term_counts[agent_id] = registry.term_counts[agent_id]
+                versions[agent_id] = registry.versions[agent_id].copy()
+
+        intents = touched.get("intent_index", set())
+        intent_versions = dict(self.intent_versions)
+        for intent in intents:
+            table = registry.intent_versions.get(intent)
+            if table:
+                intent_versions[intent] = table.copy()
+            else:
+                intent_versions.pop(intent, None)
+
+        # Resolutions of untouched intents still hold; share them
+        best_version_cache = {
+            intent: ranges for intent, ranges in self.best_version_cache.items() if intent not in intents
+        }
+
+        indexes = {}
+        for name in registry._INDEXES:
+            keys = touched.get(name)
+            if not keys:
+                indexes[name] = getattr(self, name)
+                continue
+            live = getattr(registry, name)
+            index = dict(getattr(self, name))
+            for key in keys:
+                agent_set = live.get(key)
+                if agent_set:
+                    index[key] = frozenset(agent_set)
+                else:
+                    index.pop(key, None)
+            indexes[name] = MappingProxyType(index)
+
+        return RegistrySnapshot(
+            capabilities=MappingProxyType(capabilities),
+            term_counts=MappingProxyType(term_counts),
+            versions=MappingProxyType(versions),
+            intent_versions=MappingProxyType(intent_versions),
+            epoch=registry._epoch,
+            best_version_cache=best_version_cache,
+            **indexes
+        )
+
+
 class CapabilityRegistry:
     """
     Registry for agent capabilities.
 
-    Thread-safe storage and retrieval of capability specifications.
+    Thread-safe storage and retrieval of capability specifications, with
+    inverted indexes (term -> agent IDs) kept in step on every register and
+    unregister so queries never scan the full registry.
+
+    Several versions of an agent can be registered side by side (rolling
+    upgrades). Each agent's versions are kept in a sorted VersionTable;
+    the highest one is its current capability, which is what the indexes
+    and get_capability() serve. Per-intent version tables answer "best
+    version for this intent in this range" by binary search, memoized
+    until a write touches the intent.
+
+    With snapshot_reads=True, writers additionally publish an immutable
+    RegistrySnapshot after every change (copy-on-write: only the index
+    entries a write touches are rebuilt) and swap it in with a single
+    reference assignment, so reads never take the lock. This suits
+    read-heavy use; each write costs a shallow copy of the touched maps.
+
+    Every write bumps the registry epoch, so callers can cache anything
+    derived from the registry and revalidate it with one integer compare.
+
+    With a store, the registry starts from the stored capabilities and
+    hands every write to the store (see registry_store). Loading only
+    fills the version tables; the indexes (and, in snapshot mode, the
+    first snapshot) are built on the first read that needs them, so a
+    warm start costs little more than reading the store.
     """
 
-    def __init__(self):
-        self.capabilities: Dict[str, CapabilitySpec] = {}  # agent_id -> capability
+    # Weights of the text and specificity components when both apply
+    TEXT_WEIGHT = 0.7
+    SPECIFICITY_WEIGHT = 0.3
+
+    _INDEXES = ("intent_index", "domain_index", "provides_index", "requires_index", "token_index")
+
+    # Cached ranges per intent before that intent's cache is reset
+    MAX_CACHED_RANGES = 64
+
+    def __init__(self, snapshot_reads: bool = False, store: Optional["RegistryStore"] = None):
+        """
+        Initialize capability registry.
+
+        Args:
+            snapshot_reads: Serve reads lock-free from copy-on-write snapshots
+            store: Persistence backend to load from and write through to
+        """
+        self.capabilities: Dict[str, CapabilitySpec] = {}  # agent_id -> current (highest) version
+        self.versions: Dict[str, VersionTable] = {}  # agent_id -> every registered version
+        self.intent_versions: Dict[str, VersionTable] = {}  # intent -> supporting versions of all agents
+        self.best_version_cache: Dict[str, Dict[Optional[str], Optional[CapabilitySpec]]] = {}
         self.intent_index: Dict[str, Set[str]] = {}  # intent -> set of agent_ids
         self.domain_index: Dict[str, Set[str]] = {}  # domain -> set of agent_ids
+        self.provides_index: Dict[str, Set[str]] = {}  # provided capability -> set of agent_ids
+        self.requires_index: Dict[str, Set[str]] = {}  # required capability -> set of agent_ids
+        self.token_index: Dict[str, Set[str]] = {}  # search token -> set of agent_ids
+        self.term_counts: Dict[str, Tuple[int, int]] = {}  # agent_id -> (distinct intents, distinct provides)
         self._lock = threading.Lock()
+        self._epoch = 0  # Bumped by every write
+        self._stats: Optional[Tuple[int, Dict[str, Any]]] = None  # (epoch, stats)
+        self._snapshot_reads = snapshot_reads
+        self._snapshot: Optional[RegistrySnapshot] = RegistrySnapshot.empty() if snapshot_reads else None
+        self._indexed = True  # False until the indexes of loaded capabilities are built
+        self._listeners: List[CapabilityListener] = []
+
+        self.store = store
+        if store is not None:
+            self._load(store.load())
+
+    @property
+    def snapshot_reads(self) -> bool:
+        """Whether reads are served from published snapshots."""
+        return self._snapshot_reads
+
+    @property
+    def epoch(self) -> int:
+        """
+        Write counter: changes whenever the registry's contents change.
+
+        Reads that start after observing an epoch see at least that state
+        (in snapshot mode this is the published snapshot's epoch).
+        """
+        snapshot = self._snapshot
+        return snapshot.epoch if snapshot is not None else self._epoch
+
+    def add_listener(self, listener: CapabilityListener) -> None:
+        """
+        Subscribe to changes of agents' current capabilities.
+
+        The listener is called as listener(agent_id, previous, current)
+        after the write completes, on the writer's thread and outside the
+        registry lock; previous is None for a new agent and current is None
+        for a removed one. Registering a non-current (older) version does
+        not notify. Notifications of concurrent writers may interleave, so
+        listeners should treat them as hints and re-read the registry.
+
+        Args:
+            listener: Callback
+        """
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener: CapabilityListener) -> bool:
+        """
+        Unsubscribe a listener.
+
+        Returns:
+            True if the listener was subscribed
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                return False
+            self._listeners = [existing for existing in self._listeners if existing != listener]
+            return True
 
     def register(self, capability: CapabilitySpec) -> None:
         """
-        Register an agent's capability.
+        Register a version of an agent's capability.
+
+        Registering a version that already exists replaces it; other
+        versions of the agent are kept.
 
         Args:
             capability: Capability specification
+
+        Raises:
+            ValueError: If capability.version is not a semantic version
+        """
+        self.register_many([capability])
+
+    def register_many(self, capabilities: List[CapabilitySpec]) -> None:
         """
+        Register several capabilities, publishing one snapshot for the batch.
+
+        Args:
+            capabilities: Capability specifications
+
+        Raises:
+            ValueError: If any version is not a semantic version (nothing
+                        is registered then)
+        """
+        parsed = [parse_version(capability.version) for capability in capabilities]
+
         with self._lock:
-            agent_id = capability.agent_id
+            if self.store is not None:
+                self.store.save(capabilities)
 
-            # Store capability
-            self.capabilities[agent_id] = capability
+            changed = []
+            transitions = []
+            for capability, version in zip(capabilities, parsed):
+                agent_id = capability.agent_id
+                table = self.versions.setdefault(agent_id, VersionTable())
 
-            # Index by intents
-            for intent in capability.intents:
-                if intent not in self.intent_index:
-                    self.intent_index[intent] = set()
-                self.intent_index[intent].add(agent_id)
+                # Re-registering a version replaces it
+                replaced = table.put(version, capability)
+                if replaced is not None:
+                    self._unindex_version(replaced, version)
+                    changed.append(replaced)
+                self._index_version(capability, version)
+                changed.append(capability)
 
-            # Index by domain
-            if capability.domain not in self.domain_index:
-                self.domain_index[capability.domain] = set()
-            self.domain_index[capability.domain].add(agent_id)
+                self._update_current(agent_id, changed, transitions)
 
-    def unregister(self, agent_id: str) -> bool:
+            self._epoch += 1
+            if self._snapshot is not None:
+                self._publish(changed)
+
+        self._notify(transitions)
+
+    def unregister(self, agent_id: str, version: Optional[str] = None) -> bool:
         """
         Unregister an agent's capability.
 
         Args:
             agent_id: Agent ID
+            version: Remove only this version (default: all versions); the
+                     next highest remaining version becomes current
 
         Returns:
             True if unregistered, False if not found
+
+        Raises:
+            ValueError: If version is not a semantic version
         """
+        parsed = parse_version(version) if version is not None else None
+
         with self._lock:
-            if agent_id not in self.capabilities:
+            table = self.versions.get(agent_id)
+            if table is None:
                 return False
 
-            capability = self.capabilities[agent_id]
+            if parsed is None:
+                removed = [(parse_version(capability.version), capability) for capability in table]
+            else:
+                capability = table.get(parsed)
+                if capability is None:
+                    return False
+                removed = [(parsed, capability)]
+
+            if self.store is not None:
+                self.store.delete([capability for _, capability in removed])
+            if parsed is None:
+                table = VersionTable()
+            else:
+                table.remove(parsed)
+
+            if not table:
+                del self.versions[agent_id]
+            changed = []
+            transitions = []
+            for removed_version, capability in removed:
+                self._unindex_version(capability, removed_version)
+                changed.append(capability)
+            self._update_current(agent_id, changed, transitions)
+
+            self._epoch += 1
+            if self._snapshot is not None:
+                self._publish(changed)
+
+        self._notify(transitions)
+        return True
+
+    def snapshot(self) -> "RegistrySnapshot":
+        """
+        Get a consistent, immutable view of the registry.
 
-            # Remove from intent index
-            for intent in capability.intents:
-                if intent in self.intent_index:
-                    self.intent_index[intent].discard(agent_id)
-                    if not self.intent_index[intent]:
-                        del self.intent_index[intent]
+        In snapshot mode this is the current published snapshot (free);
+        otherwise one is built under the lock (O(registry size)).
 
-            # Remove from domain index
-            if capability.domain in self.domain_index:
-                self.domain_index[capability.domain].discard(agent_id)
-                if not self.domain_index[capability.domain]:
-                    del self.domain_index[capability.domain]
+        Returns:
+            Registry snapshot
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            self._ensure_indexed()
+            if self._snapshot is not None:
+                return self._snapshot
+            return RegistrySnapshot.empty().updated(
+                self, [capability for table in self.versions.values() for capability in table]
+            )
 
-            # Remove capability
-            del self.capabilities[agent_id]
+    def get_versions(self, agent_id: str) -> List[CapabilitySpec]:
+        """
+        Get every registered version of an agent.
 
-            return True
+        Args:
+            agent_id: Agent ID
+
+        Returns:
+            Capability specifications, lowest version first
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            table = snapshot.versions.get(agent_id)
+            return table.select() if table is not None else []
+        with self._lock:
+            table = self.versions.get(agent_id)
+            return table.select() if table is not None else []
+
+    def resolve_version(self, agent_id: str, version_range: Optional[str] = None) -> Optional[CapabilitySpec]:
+        """
+        Get an agent's highest version satisfying a range (binary search).
+
+        Args:
+            agent_id: Agent ID
+            version_range: Semver range such as "^1.2" or "1.4.0" (None for
+                           the current version)
+
+        Returns:
+            Capability specification or None if no version matches
+
+        Raises:
+            ValueError: If version_range is malformed
+        """
+        parsed = parse_range(version_range) if version_range is not None else None
+
+        snapshot = self._snapshot
+        if snapshot is not None:
+            table = snapshot.versions.get(agent_id)
+            return table.best(parsed) if table is not None else None
+        with self._lock:
+            table = self.versions.get(agent_id)
+            return table.best(parsed) if table is not None else None
+
+    def best_for_intent(self, intent: str, version_range: Optional[str] = None) -> Optional[CapabilitySpec]:
+        """
+        Get the highest registered version, across agents, supporting an intent.
+
+        Considers every registered version, not only current ones, so an
+        intent dropped by an agent's newest release still resolves to the
+        older release that serves it. Ties between agents on the same
+        version go to the greater agent ID. Results are cached per
+        (intent, range) until a write touches the intent.
+
+        Args:
+            intent: Intent to resolve
+            version_range: Semver range to satisfy (None for any version)
+
+        Returns:
+            Capability specification or None if nothing matches
+
+        Raises:
+            ValueError: If version_range is malformed
+        """
+        parsed = parse_range(version_range) if version_range is not None else None
+
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return self._resolve_intent(snapshot, intent, version_range, parsed)
+        with self._lock:
+            self._ensure_indexed()
+            return self._resolve_intent(self, intent, version_range, parsed)
 
     def get_capability(self, agent_id: str) -> Optional[CapabilitySpec]:
         """
@@ -176,11 +586,17 @@ class CapabilityRegistry:
         Returns:
             Capability specification or None if not found
         """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot.capabilities.get(agent_id)
         with self._lock:
             return self.capabilities.get(agent_id)
 
     def get_all_capabilities(self) -> List[CapabilitySpec]:
         """Get all registered capabilities."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return list(snapshot.capabilities.values())
         with self._lock:
             return list(self.capabilities.values())
 
@@ -194,7 +610,11 @@ class CapabilityRegistry:
         Returns:
             List of agent IDs
         """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return list(snapshot.intent_index.get(intent, ()))
         with self._lock:
+            self._ensure_indexed()
             return list(self.intent_index.get(intent, set()))
 
     def find_by_domain(self, domain: str) -> List[str]:
@@ -207,40 +627,479 @@ class CapabilityRegistry:
         Returns:
             List of agent IDs
         """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return list(snapshot.domain_index.get(domain, ()))
         with self._lock:
+            self._ensure_indexed()
             return list(self.domain_index.get(domain, set()))
 
+    def find_by_provides(self, capability_name: str) -> List[str]:
+        """
+        Find agents that provide a capability.
+
+        Args:
+            capability_name: Capability to search for
+
+        Returns:
+            List of agent IDs
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return list(snapshot.provides_index.get(capability_name, ()))
+        with self._lock:
+            self._ensure_indexed()
+            return list(self.provides_index.get(capability_name, set()))
+
     def get_agent_count(self) -> int:
         """Get total number of registered agents."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return len(snapshot.capabilities)
         with self._lock:
             return len(self.capabilities)
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get agent, domain and intent statistics.
+
+        Counts come from the sizes of the domain and intent indexes, which
+        every write keeps current, so no capability is visited; the result
+        is built once per epoch and shared until the next write.
+
+        Returns:
+            Statistics dictionary (shared: do not modify)
+        """
+        cached = self._stats
+        if cached is not None and cached[0] == self.epoch:
+            return cached[1]
+
+        snapshot = self._snapshot
+        if snapshot is not None:
+            stats = self._build_stats(snapshot)
+            epoch = snapshot.epoch
+        else:
+            with self._lock:
+                self._ensure_indexed()
+                stats = self._build_stats(self)
+                epoch = self._epoch
+        self._stats = (epoch, stats)
+        return stats
+
+    @staticmethod
+    def _build_stats(view: Union["CapabilityRegistry", RegistrySnapshot]) -> Dict[str, Any]:
+        """Statistics from the index sizes of the registry or a snapshot."""
+        domain_counts = {domain: len(agent_ids) for domain, agent_ids in view.domain_index.items()}
+        return {
+            "total_agents": len(view.capabilities),
+            "domains": len(domain_counts),
+            "domain_distribution": domain_counts,
+            "unique_intents": len(view.intent_index),
+            "intents": sorted(view.intent_index)
+        }
+
+    def query(self, query: CapabilityQuery) -> List[Tuple[CapabilitySpec, float]]:
+        """
+        Run a multi-predicate query against the indexes.
+
+        Candidates come from the smallest matching posting list and are
+        checked for membership in the others, so cost follows the most
+        selective predicate rather than the registry size. A text-only
+        query walks token postings rarest first. Scores are in [0, 1]:
+        - text: IDF-weighted share of query tokens the agent matches
+        - specificity: share of the agent's intents (and provides) the
+          query asked for, averaged over the queried dimensions, so
+          specialists outrank generalists
+        Both combine with TEXT_WEIGHT / SPECIFICITY_WEIGHT; a query with
+        neither (e.g. domain only) scores every match 1.0.
+
+        With a limit, scanning stops as soon as no unvisited candidate can
+        outrank the current top-k (for text-only queries, agents seen only
+        in the remaining, commoner token postings are bounded by those
+        tokens' weight). Which of several equally scored agents fill the
+        last slots is then unspecified.
+
+        Args:
+            query: Query predicates, text and limit
+
+        Returns:
+            (capability, score) pairs, best first (ties by agent ID)
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return self._run_query(snapshot, query)
+        with self._lock:
+            self._ensure_indexed()
+            return self._run_query(self, query)
+
+    def _run_query(
+        self,
+        view: Union["CapabilityRegistry", RegistrySnapshot],
+        query: CapabilityQuery
+    ) -> List[Tuple[CapabilitySpec, float]]:
+        """Evaluate a query against the registry or a snapshot of it."""
+        if query.limit is not None and query.limit <= 0:
+            return []
+
+        tokens = list(dict.fromkeys(tokenize(query.text))) if query.text else []
+        query_intents = len(set(query.intents))
+        query_provides = len(set(query.provides))
+        dimensions = (query_intents > 0) + (query_provides > 0)
+        version_ranges = []
+        if query.version_range:
+            version_ranges.append(parse_range(query.version_range))
+        if query.min_version or query.max_version:
+            version_ranges.append(VersionRange.between(query.min_version, query.max_version))
+
+        postings: List[Set[str]] = []
+        for intent in query.intents:
+            postings.append(view.intent_index.get(intent, set()))
+        for name in query.provides:
+            postings.append(view.provides_index.get(name, set()))
+        for name in query.requires:
+            postings.append(view.requires_index.get(name, set()))
+        if query.domain is not None:
+            postings.append(view.domain_index.get(query.domain, set()))
+
+        token_postings = [view.token_index.get(token, set()) for token in tokens]
+        if tokens:
+            total = len(view.capabilities)
+            weights = [math.log(1 + total / max(1, len(p))) for p in token_postings]
+            weight_sum = sum(weights)
+
+        # Candidate phases: (agent IDs, best score any agent first seen
+        # in this phase or later can reach)
+        rest: List[Set[str]] = []
+        if postings:
+            postings.sort(key=len)
+            phases = [(postings[0], 1.0)]
+            rest = postings[1:]
+        elif tokens:
+            order = sorted(range(len(tokens)), key=lambda i: -weights[i])
+            remaining = weight_sum
+            phases = []
+            for i in order:
+                phases.append((token_postings[i], remaining / weight_sum))
+                remaining -= weights[i]
+        else:
+            phases = [(view.capabilities.keys(), 1.0)]
+        seen: Optional[Set[str]] = set() if len(phases) > 1 else None
+
+        limit = query.limit
+        heap: List[Tuple[float, str]] = []  # Min-heap of the best (score, agent_id) so far
+        scored: List[Tuple[float, str]] = []
+
+        for candidates, bound in phases:
+            if limit is not None and len(heap) == limit and heap[0][0] >= bound:
+                break  # No unvisited agent can outrank the current top-k
+            for agent_id in candidates:
+                if seen is not None:
+                    if agent_id in seen:
+                        continue
+                    seen.add(agent_id)
+                if rest and not all(agent_id in posting for posting in rest):
+                    continue
+
+                capability = view.capabilities[agent_id]
+                if version_ranges:
+                    version = parse_version(capability.version)
+                    if not all(version_range.contains(version) for version_range in version_ranges):
+                        continue
+
+                if dimensions:
+                    agent_intents, agent_provides = view.term_counts[agent_id]
+                    specificity = 0.0
+                    if query_intents:
+                        specificity += query_intents / max(query_intents, agent_intents)
+                    if query_provides:
+                        specificity += query_provides / max(query_provides, agent_provides)
+                    specificity /= dimensions
+
+                if tokens:
+                    matched = 0.0
+                    for posting, weight in zip(token_postings, weights):
+                        if agent_id in posting:
+                            matched += weight
+                    if not matched:
+                        continue
+                    score = matched / weight_sum
+                    if dimensions:
+                        score = self.TEXT_WEIGHT * score + self.SPECIFICITY_WEIGHT * specificity
+                elif dimensions:
+                    score = specificity
+                else:
+                    score = 1.0
+
+                if limit is None:
+                    scored.append((score, agent_id))
+                elif len(heap) < limit:
+                    heapq.heappush(heap, (score, agent_id))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, agent_id))
+
+                if limit is not None and len(heap) == limit and heap[0][0] >= bound:
+                    break  # The same bound covers the rest of this phase
+
+        ranked = sorted(scored if limit is None else heap, key=lambda item: (-item[0], item[1]))
+        return [(view.capabilities[agent_id], score) for score, agent_id in ranked]
+
+    def _index(self, capability: CapabilitySpec) -> None:
+        """Add a capability to every index (lock held)."""
+        if not self._indexed:
+            return
+        agent_id = capability.agent_id
+        for name, keys in self._index_keys(capability):
+            index = getattr(self, name)
+            for key in keys:
+                index.setdefault(key, set()).add(agent_id)
+        self.term_counts[agent_id] = (len(set(capability.intents)), len(set(capability.provides)))
+
+    def _unindex(self, capability: CapabilitySpec) -> None:
+        """Remove a capability from every index (lock held)."""
+        if not self._indexed:
+            return
+        agent_id = capability.agent_id
+        for name, keys in self._index_keys(capability):
+            index = getattr(self, name)
+            for key in keys:
+                agent_ids = index.get(key)
+                if agent_ids is not None:
+                    agent_ids.discard(agent_id)
+                    if not agent_ids:
+                        del index[key]
+        self.term_counts.pop(agent_id, None)
+
+    def _update_current(
+        self,
+        agent_id: str,
+        changed: List[CapabilitySpec],
+        transitions: List[Tuple[str, Optional[CapabilitySpec], Optional[CapabilitySpec]]]
+    ) -> None:
+        """
+        Make the agent's highest version its indexed, current capability (lock held).
+
+        Args:
+            agent_id: Agent whose versions changed
+            changed: Receives the previous and new current capabilities
+            transitions: Receives (agent_id, previous, current) if it changed
+        """
+        table = self.versions.get(agent_id)
+        latest = table.latest() if table is not None else None
+        current = self.capabilities.get(agent_id)
+        if latest is current:
+            return
+
+        if current is not None:
+            self._unindex(current)
+            del self.capabilities[agent_id]
+            changed.append(current)
+        if latest is not None:
+            self.capabilities[agent_id] = latest
+            self._index(latest)
+            changed.append(latest)
+        transitions.append((agent_id, current, latest))
+
+    def _notify(self, transitions: List[Tuple[str, Optional[CapabilitySpec], Optional[CapabilitySpec]]]) -> None:
+        """Deliver current-capability changes to listeners (lock not held)."""
+        if not transitions:
+            return
+        listeners = self._listeners
+        for agent_id, previous, current in transitions:
+            for listener in listeners:
+                try:
+                    listener(agent_id, previous, current)
+                except Exception as e:
+                    logger.error(
+                        f"Capability listener failed for agent: {agent_id}",
+                        extra={"error": str(e)},
+                        exc_info=True
+                    )
+
+    def _index_version(self, capability: CapabilitySpec, version: Version) -> None:
+        """Add a capability version to the per-intent version tables (lock held)."""
+        if not self._indexed:
+            return
+        for intent in capability.intents:
+            self.intent_versions.setdefault(intent, VersionTable()).put(version, capability, capability.agent_id)
+            self.best_version_cache.pop(intent, None)
+
+    def _unindex_version(self, capability: CapabilitySpec, version: Version) -> None:
+        """Remove a capability version from the per-intent version tables (lock held)."""
+        if not self._indexed:
+            return
+        for intent in capability.intents:
+            table = self.intent_versions.get(intent)
+            if table is not None:
+                table.remove(version, capability.agent_id)
+                if not table:
+                    del self.intent_versions[intent]
+            self.best_version_cache.pop(intent, None)
+
+    def _resolve_intent(
+        self,
+        view: Union["CapabilityRegistry", RegistrySnapshot],
+        intent: str,
+        expression: Optional[str],
+        version_range: Optional[VersionRange]
+    ) -> Optional[CapabilitySpec]:
+        """Memoized best-version lookup against the registry or a snapshot."""
+        table = view.intent_versions.get(intent)
+        if table is None:
+            return None  # Unknown intents are not cached, keeping the cache bounded
+
+        ranges = view.best_version_cache.get(intent)
+        if ranges is None:
+            ranges = view.best_version_cache.setdefault(intent, {})
+        if expression in ranges:
+            return ranges[expression]
+
+        best = table.best(version_range)
+        if len(ranges) >= self.MAX_CACHED_RANGES:
+            ranges.clear()
+        ranges[expression] = best
+        return best
+
+    def _load(self, capabilities: List[CapabilitySpec]) -> None:
+        """
+        Bulk-load stored capabilities into an empty registry, deferring indexing.
+
+        Only version tables and current capabilities are filled; indexes
+        wait for _ensure_indexed(). In snapshot mode no snapshot is
+        published until then, so reads fall back to the lock and the first
+        one that needs an index builds everything.
+        """
+        for capability in capabilities:
+            self.versions.setdefault(capability.agent_id, VersionTable()).put(
+                parse_version(capability.version), capability
+            )
+        for agent_id, table in self.versions.items():
+            self.capabilities[agent_id] = table.latest()
+
+        if self.capabilities:
+            self._indexed = False
+            self._snapshot = None
+            self._epoch += 1
+
+    def _ensure_indexed(self) -> None:
+        """Build the indexes of bulk-loaded capabilities if still pending (lock held)."""
+        if self._indexed:
+            return
+        self._indexed = True
+        for table in self.versions.values():
+            for capability in table:
+                self._index_version(capability, parse_version(capability.version))
+        for capability in self.capabilities.values():
+            self._index(capability)
+        if self._snapshot_reads:
+            self._snapshot = RegistrySnapshot.empty().updated(
+                self, [capability for table in self.versions.values() for capability in table]
+            )
+
+    def _publish(self, changed: List[CapabilitySpec]) -> None:
+        """Swap in a snapshot reflecting changes to these capabilities (lock held)."""
+        self._snapshot = self._snapshot.updated(self, changed)
+
+    @classmethod
+    def _index_keys(cls, capability: CapabilitySpec) -> Tuple[Tuple[str, Any], ...]:
+        """(index attribute, keys) pairs a capability is indexed under."""
+        return (
+            ("intent_index", capability.intents),
+            ("domain_index", (capability.domain,)),
+            ("provides_index", capability.provides),
+            ("requires_index", capability.requires),
+            ("token_index", cls._tokens(capability))
+        )
+
+    @staticmethod
+    def _tokens(capability: CapabilitySpec) -> Set[str]:
+        """Search tokens of a capability: description plus intent/provides names."""
+        tokens = set(tokenize(capability.description))
+        for name in capability.intents:
+            tokens.update(tokenize(name))
+        for name in capability.provides:
+            tokens.update(tokenize(name))
+        return tokens
+
 
 class CompatibilityMatrix:
     """
     Tracks compatibility between agent pairs.
 
-    Caches compatibility checks to avoid redundant validation.
+    Caches compatibility checks to avoid redundant validation. Cached pairs
+    are indexed by agent, so a schema change drops only that agent's pairs.
+    Each agent also has a generation counter, bumped on invalidation, so a
+    check computed against a schema that changed meanwhile is not cached.
     """
 
     def __init__(self):
-        self.matrix: Dict[str, CompatibilityResult] = {}  # key: "agent_a:agent_b"
+        self.matrix: Dict[Tuple[str, str], CompatibilityResult] = {}  # (lower ID, higher ID) -> result
+        self._pairs_by_agent: Dict[str, Set[Tuple[str, str]]] = {}  # agent_id -> cached keys involving it
+        self._generations: Dict[str, int] = {}
         self._lock = threading.Lock()
 
-    def _get_key(self, agent_a: str, agent_b: str) -> str:
+    @staticmethod
+    def _get_key(agent_a: str, agent_b: str) -> Tuple[str, str]:
         """Generate cache key for agent pair (order-independent)."""
-        return f"{min(agent_a, agent_b)}:{max(agent_a, agent_b)}"
+        return (agent_a, agent_b) if agent_a <= agent_b else (agent_b, agent_a)
 
-    def set_compatibility(self, result: CompatibilityResult) -> None:
+    def generation(self, agent_id: str) -> int:
+        """
+        Get an agent's invalidation generation.
+
+        Read it before loading the agent's capability and pass it to
+        set_compatibility() so results computed from a stale schema are
+        discarded.
+        """
+        return self._generations.get(agent_id, 0)
+
+    def set_compatibility(
+        self,
+        result: CompatibilityResult,
+        generations: Optional[Tuple[int, int]] = None
+    ) -> bool:
         """
         Store compatibility result.
 
         Args:
             result: Compatibility result
+            generations: generation() of agent_a and agent_b read before the
+                         check; if either changed since, nothing is stored
+
+        Returns:
+            True if stored
         """
         key = self._get_key(result.agent_a, result.agent_b)
         with self._lock:
-            self.matrix[key] = result
+            if generations is not None and generations != (
+                self._generations.get(result.agent_a, 0),
+                self._generations.get(result.agent_b, 0)
+            ):
+                return False
+            self._store(key, result)
+            return True
+
+    def set_many(self, results: List[CompatibilityResult], generations: Dict[str, int]) -> int:
+        """
+        Store a batch of results under one lock acquisition.
+
+        Args:
+            results: Compatibility results
+            generations: agent_id -> generation() read before the checks
+
+        Returns:
+            Number of results stored (stale ones are skipped)
+        """
+        stored = 0
+        with self._lock:
+            current = self._generations
+            for result in results:
+                if current.get(result.agent_a, 0) != generations.get(result.agent_a, 0):
+                    continue
+                if current.get(result.agent_b, 0) != generations.get(result.agent_b, 0):
+                    continue
+                self._store(self._get_key(result.agent_a, result.agent_b), result)
+                stored += 1
+        return stored
 
     def get_compatibility(self, agent_a: str, agent_b: str) -> Optional[CompatibilityResult]:
         """
@@ -257,10 +1116,158 @@ class CompatibilityMatrix:
         with self._lock:
             return self.matrix.get(key)
 
+    def invalidate_agent(self, agent_id: str) -> List[CompatibilityResult]:
+        """
+        Drop every cached pair involving an agent.
+
+        Cost is proportional to the agent's cached pairs, not the matrix.
+
+        Args:
+            agent_id: Agent whose schema changed or who left
+
+        Returns:
+            The dropped results (e.g. to recompute them)
+        """
+        with self._lock:
+            self._generations[agent_id] = self._generations.get(agent_id, 0) + 1
+            dropped = []
+            for key in self._pairs_by_agent.pop(agent_id, ()):
+                result = self.matrix.pop(key, None)
+                if result is not None:
+                    dropped.append(result)
+                other = key[1] if key[0] == agent_id else key[0]
+                partner_keys = self._pairs_by_agent.get(other)
+                if partner_keys is not None:
+                    partner_keys.discard(key)
+                    if not partner_keys:
+                        del self._pairs_by_agent[other]
+            return dropped
+
+    def cached_keys(self) -> Set[Tuple[str, str]]:
+        """Get the keys of all cached pairs."""
+        with self._lock:
+            return set(self.matrix)
+
     def clear(self) -> None:
         """Clear all cached compatibility results."""
         with self._lock:
             self.matrix.clear()
+            self._pairs_by_agent.clear()
+            for agent_id in self._generations:
+                self._generations[agent_id] += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.matrix)
+
+    def _store(self, key: Tuple[str, str], result: CompatibilityResult) -> None:
+        """Store a result and index it under both agents (lock held)."""
+        self.matrix[key] = result
+        self._pairs_by_agent.setdefault(key[0], set()).add(key)
+        self._pairs_by_agent.setdefault(key[1], set()).add(key)
+
+
+class DiscoveryCache:
+    """
+    LRU cache of discovery results keyed on (query, registry epoch).
+
+    Entries of older epochs can never be hit again, so the first store
+    for a newer epoch drops them all at once.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize discovery cache.
+
+        Args:
+            max_entries: Cached queries kept for the current epoch
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Any, ...], List[AgentMatch]]" = OrderedDict()
+        self._epoch = -1
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0
+        }
+
+    def get(self, key: Tuple[Any, ...], epoch: int) -> Optional[List[AgentMatch]]:
+        """
+        Look up cached results.
+
+        Args:
+            key: Query key (see query_key())
+            epoch: Registry epoch read before the lookup
+
+        Returns:
+            Cached matches, or None on a miss
+        """
+        with self._lock:
+            if epoch == self._epoch:
+                matches = self._entries.get(key)
+                if matches is not None:
+                    self._entries.move_to_end(key)
+                    self.metrics["hits"] += 1
+                    return matches
+            self.metrics["misses"] += 1
+            return None
+
+    def put(self, key: Tuple[Any, ...], epoch: int, matches: List[AgentMatch]) -> None:
+        """
+        Store results computed at an epoch.
+
+        Results of an epoch older than the newest stored one are dropped.
+
+        Args:
+            key: Query key
+            epoch: Registry epoch read before running the query
+            matches: Query results
+        """
+        with self._lock:
+            if epoch < self._epoch:
+                return
+            if epoch > self._epoch:
+                self._entries.clear()
+                self._epoch = epoch
+            self._entries[key] = matches
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get cache metrics.
+
+        Returns:
+            Counters plus the current entry count and epoch
+        """
+        with self._lock:
+            return {**self.metrics, "entries": len(self._entries), "epoch": self._epoch}
+
+    @staticmethod
+    def query_key(query: CapabilityQuery) -> Tuple[Any, ...]:
+        """Hashable key of a query's predicates."""
+        return (
+            tuple(query.intents),
+            tuple(query.provides),
+            tuple(query.requires),
+            query.domain,
+            query.version_range,
+            query.min_version,
+            query.max_version,
+            query.text,
+            query.limit
+        )
 
 
 class CapabilityDiscoveryAgent:
@@ -274,9 +1281,28 @@ class CapabilityDiscoveryAgent:
     - Track compatibility matrix
     """
 
-    def __init__(self):
-        self.registry = CapabilityRegistry()
+    def __init__(
+        self,
+        snapshot_reads: bool = False,
+        cache_size: int = 1024,
+        store: Optional["RegistryStore"] = None
+    ):
+        """
+        Initialize discovery agent.
+
+        Args:
+            snapshot_reads: Serve registry reads lock-free from copy-on-write
+                            snapshots (for read-heavy deployments)
+            cache_size: Discovery results cached per registry epoch (0 disables)
+            store: Registry persistence backend; stored capabilities are
+                   available immediately and every change is written back
+        """
+        self.registry = CapabilityRegistry(snapshot_reads=snapshot_reads, store=store)
         self.compatibility_matrix = CompatibilityMatrix()
+        self.discovery_cache = DiscoveryCache(cache_size) if cache_size > 0 else None
+        # agent_id -> (spec, compiled schemas); reused while the spec is current
+        self._compiled: Dict[str, Tuple[CapabilitySpec, Tuple[Optional[CompiledSchema], Optional[CompiledSchema]]]] = {}
+        self.registry.add_listener(self._on_capability_changed)
 
     def register_capability(
         self,
@@ -303,6 +1329,9 @@ class CapabilityDiscoveryAgent:
             requires: Required capabilities from other agents
             provides: Capabilities this agent offers
             description: Human-readable description
+
+        Raises:
+            ValueError: If version is not a semantic version
         """
         capability = CapabilitySpec(
             agent_id=agent_id,
@@ -318,17 +1347,55 @@ class CapabilityDiscoveryAgent:
 
         self.registry.register(capability)
 
-    def unregister_capability(self, agent_id: str) -> bool:
+    def unregister_capability(self, agent_id: str, version: Optional[str] = None) -> bool:
         """
         Unregister an agent's capability.
 
         Args:
             agent_id: Agent ID
+            version: Remove only this version (default: all versions)
 
         Returns:
             True if unregistered, False if not found
         """
-        return self.registry.unregister(agent_id)
+        return self.registry.unregister(agent_id, version)
+
+    def discover(self, query: CapabilityQuery) -> List[AgentMatch]:
+        """
+        Discover agents matching a multi-predicate query, best match first.
+
+        Results are cached until the next registry write, so repeated
+        queries return the same AgentMatch objects (in a new list); treat
+        them as read-only.
+
+        Args:
+            query: Query predicates (intents, provides, requires, domain,
+                   version bounds, free text) and optional top-k limit
+
+        Returns:
+            List of matching agents with their match scores
+        """
+        cache = self.discovery_cache
+        if cache is not None:
+            key = cache.query_key(query)
+            epoch = self.registry.epoch  # Read first: results are at least this fresh
+            matches = cache.get(key, epoch)
+            if matches is not None:
+                return list(matches)
+
+        matches = [
+            AgentMatch(
+                agent_id=capability.agent_id,
+                domain=capability.domain,
+                version=capability.version,
+                capability=capability,
+                match_score=score
+            )
+            for capability, score in self.registry.query(query)
+        ]
+        if cache is not None:
+            cache.put(key, epoch, matches)
+        return list(matches)
 
     def discover_by_intent(self, intent: str) -> List[AgentMatch]:
         """
@@ -338,24 +1405,9 @@ class CapabilityDiscoveryAgent:
             intent: Intent to search for (e.g., "provision_test_dataset")
 
         Returns:
-            List of matching agents
+            List of matching agents, most specialized first
         """
-        agent_ids = self.registry.find_by_intent(intent)
-
-        matches = []
-        for agent_id in agent_ids:
-            capability = self.registry.get_capability(agent_id)
-            if capability:
-                match = AgentMatch(
-                    agent_id=agent_id,
-                    domain=capability.domain,
-                    version=capability.version,
-                    capability=capability,
-                    match_score=1.0  # Exact intent match
-                )
-                matches.append(match)
-
-        return matches
+        return self.discover(CapabilityQuery(intents=[intent]))
 
     def discover_by_capability(self, capability_name: str) -> List[AgentMatch]:
         """
@@ -365,23 +1417,9 @@ class CapabilityDiscoveryAgent:
             capability_name: Capability to search for
 
         Returns:
-            List of matching agents
+            List of matching agents, most specialized first
         """
-        all_capabilities = self.registry.get_all_capabilities()
-
-        matches = []
-        for capability in all_capabilities:
-            if capability_name in capability.provides:
-                match = AgentMatch(
-                    agent_id=capability.agent_id,
-                    domain=capability.domain,
-                    version=capability.version,
-                    capability=capability,
-                    match_score=1.0
-                )
-                matches.append(match)
-
-        return matches
+        return self.discover(CapabilityQuery(provides=[capability_name]))
 
     def discover_by_domain(self, domain: str) -> List[AgentMatch]:
         """
@@ -393,22 +1431,7 @@ class CapabilityDiscoveryAgent:
         Returns:
             List of matching agents
         """
-        agent_ids = self.registry.find_by_domain(domain)
-
-        matches = []
-        for agent_id in agent_ids:
-            capability = self.registry.get_capability(agent_id)
-            if capability:
-                match = AgentMatch(
-                    agent_id=agent_id,
-                    domain=capability.domain,
-                    version=capability.version,
-                    capability=capability,
-                    match_score=1.0
-                )
-                matches.append(match)
-
-        return matches
+        return self.discover(CapabilityQuery(domain=domain))
 
     def check_compatibility(
         self,
@@ -433,6 +1456,13 @@ class CapabilityDiscoveryAgent:
             if cached:
                 return cached
 
+        # Read generations before capabilities: a concurrent schema change
+        # then makes the store below a no-op instead of caching a stale result
+        generations = (
+            self.compatibility_matrix.generation(agent_a),
+            self.compatibility_matrix.generation(agent_b)
+        )
+
         # Get capabilities
         cap_a = self.registry.get_capability(agent_a)
         cap_b = self.registry.get_capability(agent_b)
@@ -447,39 +1477,133 @@ class CapabilityDiscoveryAgent:
             )
             return result
 
-        # Check schema compatibility
-        issues = []
+        result = self._compute_compatibility(cap_a, cap_b)
+
+        # Cache result
+        self.compatibility_matrix.set_compatibility(result, generations)
+
+        return result
+
+    def precompute_all(self, parallel: bool = True, max_workers: Optional[int] = None) -> int:
+        """
+        Fill the compatibility matrix for every pair of registered agents.
 
-        # Check if output of A matches input of B
-        a_output_keys = set(cap_a.output_schema.keys())
-        b_input_keys = set(cap_b.input_schema.keys())
+        Pairs already cached are skipped. Schemas are compiled once per
+        agent (and compared once per distinct schema pair), and rows of the
+        pair triangle are spread over a thread pool.
 
-        missing_from_a = b_input_keys - a_output_keys
-        if missing_from_a:
-            issues.append(f"Agent A missing required output fields: {missing_from_a}")
+        Args:
+            parallel: Compute on a worker pool (False: on the calling thread)
+            max_workers: Pool size (default: CPU count)
 
-        # Check if output of B matches input of A (bidirectional)
-        b_output_keys = set(cap_b.output_schema.keys())
-        a_input_keys = set(cap_a.input_schema.keys())
+        Returns:
+            Number of pairs computed and stored
+        """
+        capabilities = sorted(self.registry.get_all_capabilities(), key=lambda cap: cap.agent_id)
+        matrix = self.compatibility_matrix
+        generations = {cap.agent_id: matrix.generation(cap.agent_id) for cap in capabilities}
+        cached = matrix.cached_keys()
+        schemas = [self._compiled_schemas(cap) for cap in capabilities]
+        count = len(capabilities)
+
+        def compute_rows(rows: Iterable[int]) -> int:
+            results = []
+            for i in rows:
+                cap_a = capabilities[i]
+                a_input, a_output = schemas[i]
+                for j in range(i + 1, count):
+                    cap_b = capabilities[j]
+                    if (cap_a.agent_id, cap_b.agent_id) in cached:
+                        continue
+                    b_input, b_output = schemas[j]
+                    results.append(self._compatibility_from_schemas(
+                        cap_a.agent_id, cap_b.agent_id, a_input, a_output, b_input, b_output
+                    ))
+            return matrix.set_many(results, generations)
+
+        workers = max_workers or os.cpu_count() or 1
+        if not parallel or workers == 1 or count < 2:
+            return compute_rows(range(count))
+
+        # Interleave rows so every worker gets a similar share of the triangle
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compatibility") as pool:
+            return sum(pool.map(compute_rows, [range(k, count, workers) for k in range(workers)]))
+
+    def _compute_compatibility(self, cap_a: CapabilitySpec, cap_b: CapabilitySpec) -> CompatibilityResult:
+        """Check schema compatibility between two capabilities."""
+        a_input, a_output = self._compiled_schemas(cap_a)
+        b_input, b_output = self._compiled_schemas(cap_b)
+        return self._compatibility_from_schemas(
+            cap_a.agent_id, cap_b.agent_id, a_input, a_output, b_input, b_output
+        )
 
-        missing_from_b = a_input_keys - b_output_keys
-        if missing_from_b:
-            issues.append(f"Agent B missing required output fields: {missing_from_b}")
+    def _compiled_schemas(self, cap: CapabilitySpec) -> Tuple[Optional[CompiledSchema], Optional[CompiledSchema]]:
+        """Compiled (input, output) schemas of a capability; None for a malformed schema."""
+        cached = self._compiled.get(cap.agent_id)
+        if cached is not None and cached[0] is cap:
+            return cached[1]
+
+        compiled = []
+        for schema in (cap.input_schema, cap.output_schema):
+            try:
+                compiled.append(compile_schema(schema))
+            except SchemaError:
+                logger.warning("Invalid schema in capability of %s", cap.agent_id)
+                compiled.append(None)
+        schemas = (compiled[0], compiled[1])
+        self._compiled[cap.agent_id] = (cap, schemas)
+        return schemas
+
+    @staticmethod
+    def _compatibility_from_schemas(
+        agent_a: str,
+        agent_b: str,
+        a_input: Optional[CompiledSchema],
+        a_output: Optional[CompiledSchema],
+        b_input: Optional[CompiledSchema],
+        b_output: Optional[CompiledSchema]
+    ) -> CompatibilityResult:
+        """Build a compatibility result from the agents' compiled schemas."""
+        issues = []
 
-        compatible = len(issues) == 0
+        # Output of A must satisfy input of B, and (bidirectional) B's output A's input
+        for label, output, input_schema in (("Agent A", a_output, b_input), ("Agent B", b_output, a_input)):
+            if output is None or input_schema is None:
+                issues.append(f"{label}: invalid schema")
+                continue
+            for issue in compatibility_issues(output, input_schema):
+                issues.append(f"{label} output incompatible with input: {issue}")
 
-        result = CompatibilityResult(
-            compatible=compatible,
+        return CompatibilityResult(
+            compatible=not issues,
             agent_a=agent_a,
             agent_b=agent_b,
             schema_version="1.0",
             issues=issues
         )
 
-        # Cache result
-        self.compatibility_matrix.set_compatibility(result)
-
-        return result
+    def _on_capability_changed(
+        self,
+        agent_id: str,
+        previous: Optional[CapabilitySpec],
+        current: Optional[CapabilitySpec]
+    ) -> None:
+        """Registry listener: refresh only the cached pairs of an agent whose schema changed."""
+        if current is None:
+            self._compiled.pop(agent_id, None)
+        if previous is None:
+            return  # New agent: nothing cached yet
+        if current is not None and (
+            current.input_schema == previous.input_schema
+            and current.output_schema == previous.output_schema
+        ):
+            return
+
+        dropped = self.compatibility_matrix.invalidate_agent(agent_id)
+        if current is None:
+            return
+        for result in dropped:
+            self.check_compatibility(result.agent_a, result.agent_b, force_recheck=True)
 
     def get_capability_schema(self, agent_id: str, version: str) -> Optional[CapabilitySpec]:
         """
@@ -487,17 +1611,50 @@ class CapabilityDiscoveryAgent:
 
         Args:
             agent_id: Agent ID
-            version: Version to retrieve
+            version: Exact version ("1.2.3") or semver range ("^1.2",
+                     ">=2.0,<3"); a range resolves to its highest match
 
         Returns:
             Capability specification or None if not found
+
+        Raises:
+            ValueError: If version is not a valid version or range
         """
-        capability = self.registry.get_capability(agent_id)
+        return self.registry.resolve_version(agent_id, version)
 
-        if capability and capability.version == version:
-            return capability
+    def list_versions(self, agent_id: str) -> List[str]:
+        """
+        List the registered versions of an agent.
 
-        return None
+        Args:
+            agent_id: Agent ID
+
+        Returns:
+            Version strings, lowest first
+        """
+        return [capability.version for capability in self.registry.get_versions(agent_id)]
+
+    def discover_best_version(self, intent: str, version_range: Optional[str] = None) -> Optional[AgentMatch]:
+        """
+        Resolve the highest registered version supporting an intent.
+
+        Args:
+            intent: Intent to resolve
+            version_range: Semver range to satisfy (e.g. "^2"); None for any
+
+        Returns:
+            Matching agent version, or None if nothing satisfies the range
+        """
+        capability = self.registry.best_for_intent(intent, version_range)
+        if capability is None:
+            return None
+        return AgentMatch(
+            agent_id=capability.agent_id,
+            domain=capability.domain,
+            version=capability.version,
+            capability=capability,
+            match_score=1.0
+        )
 
     def list_all_agents(self) -> List[Dict[str, Any]]:
         """
@@ -524,24 +1681,6 @@ class CapabilityDiscoveryAgent:
         Get registry statistics.
 
         Returns:
-            Statistics dictionary
+            Statistics dictionary (a copy; nested values are shared)
         """
-        capabilities = self.registry.get_all_capabilities()
-
-        # Count by domain
-        domain_counts = {}
-        for cap in capabilities:
-            domain_counts[cap.domain] = domain_counts.get(cap.domain, 0) + 1
-
-        # Count unique intents
-        all_intents = set()
-        for cap in capabilities:
-            all_intents.update(cap.intents)
-
-        return {
-            "total_agents": self.registry.get_agent_count(),
-            "domains": len(domain_counts),
-            "domain_distribution": domain_counts,
-            "unique_intents": len(all_intents),
-            "intents": sorted(list(all_intents))
-        }
+        return dict(self.registry.get_stats())
@@ -0,0 +1,219 @@
+"""
+Expiry Scheduler
+
+Deadline-ordered expiry for broker state (handshakes, terminated contracts,
+idle collaborations). Entries live in a min-heap keyed on a monotonic
+deadline, so a sweep only touches what has actually expired instead of
+scanning every tracked object.
+"""
+
+from typing import Dict, Any, Optional, Callable, Hashable, List, Tuple
+import heapq
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryScheduler:
+    """
+    Min-heap of keyed deadlines with lazy cancellation.
+
+    Scheduling a key that is already pending replaces its deadline; the old
+    heap entry is left in place and skipped when popped. Callbacks run
+    outside the scheduler lock, on whichever thread calls run_pending()
+    (the background sweeper when started).
+
+    Usage:
+        scheduler = ExpiryScheduler()
+        scheduler.schedule(("handshake", hid), 5.0, lambda: expire(hid))
+        scheduler.start(interval=0.5)
+    """
+
+    # Rebuild the heap once stale (cancelled/replaced) entries outnumber live ones
+    COMPACT_MIN_STALE = 64
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize expiry scheduler.
+
+        Args:
+            clock: Monotonic clock in seconds (injectable for tests)
+        """
+        self.clock = clock
+        self._heap: List[Tuple[float, int, Hashable, Callable[[], None]]] = []
+        self._entries: Dict[Hashable, int] = {}  # key -> sequence of live heap entry
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self.metrics = {
+            "scheduled": 0,
+            "cancelled": 0,
+            "expired": 0,
+            "callback_errors": 0,
+            "sweeps": 0
+        }
+
+    def schedule(
+        self,
+        key: Hashable,
+        delay_seconds: float,
+        callback: Callable[[], None]
+    ) -> None:
+        """
+        Schedule (or reschedule) a key to expire.
+
+        Args:
+            key: Identifier of the tracked object
+            delay_seconds: Seconds from now until expiry
+            callback: Called with no arguments when the key expires
+        """
+        deadline = self.clock() + delay_seconds
+        with self._lock:
+            self._sequence += 1
+            replaced = self._entries.get(key) is not None
+            self._entries[key] = self._sequence
+            heapq.heappush(self._heap, (deadline, self._sequence, key, callback))
+            self.metrics["scheduled"] += 1
+            if replaced:
+                self._maybe_compact()
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel a pending expiry.
+
+        Args:
+            key: Identifier passed to schedule()
+
+        Returns:
+            True if the key was pending
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self.metrics["cancelled"] += 1
+            self._maybe_compact()
+            return True
+
+    def is_scheduled(self, key: Hashable) -> bool:
+        """Check if a key has a pending expiry."""
+        with self._lock:
+            return key in self._entries
+
+    def run_pending(self, now: Optional[float] = None) -> List[Hashable]:
+        """
+        Expire every key whose deadline has passed.
+
+        Cost is proportional to the number of expired (and stale) entries;
+        when nothing is due this is a single heap peek.
+
+        Args:
+            now: Clock reading to expire against (defaults to clock())
+
+        Returns:
+            Keys expired by this call, in deadline order
+        """
+        if now is None:
+            now = self.clock()
+
+        due: List[Tuple[Hashable, Callable[[], None]]] = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                _, sequence, key, callback = heapq.heappop(heap)
+                if self._entries.get(key) != sequence:
+                    continue  # Cancelled or rescheduled
+                del self._entries[key]
+                due.append((key, callback))
+            self.metrics["sweeps"] += 1
+            self.metrics["expired"] += len(due)
+
+        for key, callback in due:
+            try:
+                callback()
+            except Exception as e:
+                with self._lock:
+                    self.metrics["callback_errors"] += 1
+                logger.error(
+                    f"Expiry callback failed for key: {key!r}",
+                    extra={"error": str(e)},
+                    exc_info=True
+                )
+
+        return [key for key, _ in due]
+
+    def next_deadline(self) -> Optional[float]:
+        """Get the earliest pending deadline (may be a stale entry), or None."""
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def start(self, interval: float = 0.5) -> None:
+        """
+        Start a daemon thread that sweeps expired keys.
+
+        Args:
+            interval: Maximum seconds between sweeps
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._sweep_loop,
+            args=(interval,),
+            name="expiry-scheduler",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background sweeper thread."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get scheduler metrics.
+
+        Returns:
+            Counters plus current pending and heap sizes
+        """
+        with self._lock:
+            return {
+                **self.metrics,
+                "pending": len(self._entries),
+                "heap_size": len(self._heap),
+                "running": self._thread is not None and self._thread.is_alive()
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _sweep_loop(self, interval: float) -> None:
+        """Background loop: sweep, then sleep until the next deadline or interval."""
+        while not self._stop_event.is_set():
+            self.run_pending()
+
+            wait = interval
+            deadline = self.next_deadline()
+            if deadline is not None:
+                wait = min(interval, max(0.0, deadline - self.clock()))
+            self._stop_event.wait(wait)
+
+    def _maybe_compact(self) -> None:
+        """Drop stale heap entries once they dominate the heap (lock held)."""
+        stale = len(self._heap) - len(self._entries)
+        if stale < self.COMPACT_MIN_STALE or stale < len(self._entries):
+            return
+
+        entries = self._entries
+        self._heap = [item for item in self._heap if entries.get(item[2]) == item[1]]
+        heapq.heapify(self._heap)
@@ -6,15 +6,77 @@ Based on Protocol Specification v1.0 (TECH-001).
 """
 
 from dataclasses import dataclass, field, asdict
-from datetime import datetime
-from typing import Dict, Any, Optional, Literal
-from uuid import uuid4
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Literal, Tuple, Union
 import json
+import os
+import sys
+import threading
+import time
 
 
-@dataclass
+# Message clock: wall-clock nanoseconds advanced by the monotonic clock, so
+# timestamps never go backwards and cost one integer read at construction.
+_WALL_ANCHOR_NS = time.time_ns()
+_MONOTONIC_ANCHOR_NS = time.monotonic_ns()
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _now_ns() -> int:
+    """Current message clock reading in nanoseconds since the Unix epoch."""
+    return _WALL_ANCHOR_NS + (time.monotonic_ns() - _MONOTONIC_ANCHOR_NS)
+
+
+def _format_timestamp(timestamp_ns: int) -> str:
+    """Format nanoseconds since the epoch as an ISO 8601 UTC timestamp."""
+    return (_EPOCH + timedelta(microseconds=timestamp_ns // 1000)).isoformat() + "Z"
+
+
+def _formatted_timestamp_length(timestamp_ns: int) -> int:
+    """Length of _format_timestamp(timestamp_ns), without formatting (years 1970-9999)."""
+    # isoformat() leaves out the fraction when microseconds are zero
+    return 27 if timestamp_ns // 1000 % 1_000_000 else 20
+
+
+# Random bytes for message IDs are read from os.urandom in blocks rather than
+# one syscall per message; per-thread, and reset in forked children.
+_ID_POOL_BYTES = 4096
+_id_pool = threading.local()
+
+
+def _reset_id_pool() -> None:
+    global _id_pool
+    _id_pool = threading.local()
+
+
+os.register_at_fork(after_in_child=_reset_id_pool)
+
+
+def _new_message_id() -> str:
+    """Generate a random (version 4) UUID string."""
+    pool = _id_pool
+    buffer = getattr(pool, "buffer", b"")
+    offset = getattr(pool, "offset", 0)
+    if offset >= len(buffer):
+        buffer = pool.buffer = os.urandom(_ID_POOL_BYTES)
+        offset = 0
+    raw = bytearray(buffer[offset:offset + 16])
+    pool.offset = offset + 16
+
+    raw[6] = (raw[6] & 0x0F) | 0x40  # Version 4
+    raw[8] = (raw[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+@dataclass(frozen=True, slots=True)
 class Agent:
-    """Agent identifier with domain and version."""
+    """
+    Agent identifier with domain and version.
+
+    Immutable, so identical identities can be shared between messages;
+    use Agent.intern() on hot paths that create many messages.
+    """
 
     agent_id: str
     domain: str
@@ -27,8 +89,39 @@ class Agent:
             "version": self.version
         }
 
+    @classmethod
+    def intern(cls, agent_id: str, domain: str, version: str) -> "Agent":
+        """
+        Get the shared Agent instance for an identity.
+
+        Args:
+            agent_id: Agent ID
+            domain: Agent domain
+            version: Agent version
+
+        Returns:
+            Canonical Agent for (agent_id, domain, version)
+        """
+        key = (agent_id, domain, version)
+        agent = _AGENT_INTERN_TABLE.get(key)
+        if agent is not None:
+            return agent
+
+        agent = cls(sys.intern(agent_id), sys.intern(domain), sys.intern(version))
+        with _AGENT_INTERN_LOCK:
+            if len(_AGENT_INTERN_TABLE) >= _AGENT_INTERN_LIMIT:
+                return agent  # Table full; stay correct, just unshared
+            return _AGENT_INTERN_TABLE.setdefault(key, agent)
+
 
-@dataclass
+# Agent identities are few and long-lived; the limit only guards against
+# unbounded growth if IDs are ever generated per message.
+_AGENT_INTERN_LIMIT = 100_000
+_AGENT_INTERN_TABLE: Dict[Tuple[str, str, str], Agent] = {}
+_AGENT_INTERN_LOCK = threading.Lock()
+
+
+@dataclass(slots=True)
 class Security:
     """Security information for message authentication and encryption."""
 
@@ -42,7 +135,7 @@ class Security:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorResponse:
     """Error response format per protocol specification."""
 
@@ -65,12 +158,16 @@ class ErrorResponse:
         return result
 
 
-@dataclass
+@dataclass(slots=True, init=False)
 class ProtocolMessage:
     """
     Base protocol message format for agent-to-agent communication.
 
     Implements the A2ACP v1.0 JSON message schema defined in TECH-001.
+
+    Slotted to keep retained messages (replay buffers, logs) small. The
+    timestamp is stored as integer nanoseconds and only formatted as an
+    ISO string when first read.
     """
 
     source_agent: Agent
@@ -78,17 +175,83 @@ class ProtocolMessage:
     message_type: Literal["request", "response", "event", "error"]
     payload: Dict[str, Any]
     security: Security
-    protocol_version: str = "1.0"
-    message_id: str = field(default_factory=lambda: str(uuid4()))
-    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
-    intent: Optional[str] = None
+    protocol_version: str
+    message_id: str
+    intent: Optional[str]
+
+    # Timestamp storage: ISO string (explicit or formatted on first read) and clock reading
+    _timestamp: Optional[str] = field(repr=False, compare=False)
+    _timestamp_ns: Optional[int] = field(repr=False, compare=False)
+
+    # Encoding metadata, not part of the message itself
+    wire_size: Optional[int] = field(repr=False, compare=False)
+    _encoded_sizes: Optional[Tuple[int, int]] = field(repr=False, compare=False)
+
+    def __init__(
+        self,
+        source_agent: Agent,
+        target_agent: Agent,
+        message_type: Literal["request", "response", "event", "error"],
+        payload: Dict[str, Any],
+        security: Security,
+        protocol_version: str = "1.0",
+        message_id: Optional[str] = None,
+        timestamp: Optional[str] = None,
+        intent: Optional[str] = None
+    ):
+        self.source_agent = source_agent
+        self.target_agent = target_agent
+        self.message_type = message_type
+        self.payload = payload
+        self.security = security
+        self.protocol_version = protocol_version
+        self.message_id = message_id if message_id is not None else _new_message_id()
+        self.intent = intent
+        self._timestamp = timestamp
+        self._timestamp_ns = None if timestamp is not None else _now_ns()
+        self.wire_size = None
+        self._encoded_sizes = None
+
+    @property
+    def timestamp(self) -> str:
+        """ISO 8601 UTC timestamp, formatted on first access."""
+        if self._timestamp is None:
+            self._timestamp = _format_timestamp(self._timestamp_ns)
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: str) -> None:
+        self._timestamp = value
+        self._timestamp_ns = None
+
+    @property
+    def has_timestamp(self) -> bool:
+        """Whether the message carries a timestamp (checked without formatting it)."""
+        return self._timestamp_ns is not None or isinstance(self._timestamp, str)
+
+    @property
+    def timestamp_ns(self) -> int:
+        """Timestamp as integer nanoseconds since the Unix epoch."""
+        if self._timestamp_ns is None:
+            parsed = datetime.fromisoformat(self._timestamp.rstrip("Z"))
+            if parsed.tzinfo is not None:
+                parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+            delta = parsed - _EPOCH
+            self._timestamp_ns = (
+                (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+            ) * 1000
+        return self._timestamp_ns
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary format."""
+        return self._to_dict(self.timestamp)
+
+    def _to_dict(self, timestamp: str) -> Dict[str, Any]:
+        """to_dict() with the given timestamp string."""
         return {
             "protocol_version": self.protocol_version,
             "message_id": self.message_id,
-            "timestamp": self.timestamp,
+            "timestamp": timestamp,
             "source_agent": self.source_agent.to_dict(),
             "target_agent": self.target_agent.to_dict(),
             "message_type": self.message_type,
@@ -106,10 +269,10 @@ class ProtocolMessage:
         """Create message from dictionary."""
         return cls(
             protocol_version=data.get("protocol_version", "1.0"),
-            message_id=data.get("message_id", str(uuid4())),
-            timestamp=data.get("timestamp", datetime.utcnow().isoformat() + "Z"),
-            source_agent=Agent(**data["source_agent"]),
-            target_agent=Agent(**data["target_agent"]),
+            message_id=data.get("message_id"),
+            timestamp=data.get("timestamp"),
+            source_agent=Agent.intern(**data["source_agent"]),
+            target_agent=Agent.intern(**data["target_agent"]),
             message_type=data["message_type"],
             intent=data.get("intent"),
             payload=data.get("payload", {}),
@@ -117,10 +280,42 @@ class ProtocolMessage:
         )
 
     @classmethod
-    def from_json(cls, json_str: str) -> "ProtocolMessage":
-        """Create message from JSON string."""
+    def from_json(cls, json_str: Union[str, bytes]) -> "ProtocolMessage":
+        """
+        Create message from JSON string.
+
+        Records the received size in wire_size so validation can bound the
+        message size without re-serializing it.
+        """
         data = json.loads(json_str)
-        return cls.from_dict(data)
+        message = cls.from_dict(data)
+        if isinstance(json_str, str):
+            message.wire_size = len(json_str.encode("utf-8"))
+        else:
+            message.wire_size = len(json_str)
+        return message
+
+    def encoded_sizes(self) -> Tuple[int, int]:
+        """
+        Get (message_bytes, payload_bytes) of the to_json() encoding.
+
+        The payload is serialized once and spliced into the size of the
+        envelope, so the result equals len(self.to_json().encode()) exactly
+        without building the full JSON string. Cached after the first call;
+        messages are treated as immutable once routed.
+        """
+        if self._encoded_sizes is None:
+            # json.dumps defaults to ensure_ascii, so characters == bytes
+            payload_size = len(json.dumps(self.payload))
+            if self._timestamp is None:
+                # Size a lazy timestamp with a placeholder of its formatted length
+                envelope = self._to_dict("0" * _formatted_timestamp_length(self._timestamp_ns))
+            else:
+                envelope = self.to_dict()
+            envelope["payload"] = None
+            message_size = len(json.dumps(envelope)) - len("null") + payload_size
+            self._encoded_sizes = (message_size, payload_size)
+        return self._encoded_sizes
 
     def create_response(
         self,
@@ -131,7 +326,12 @@ class ProtocolMessage:
         Create a response message to this message.
 
         Swaps source/target agents and creates new message with response payload.
+        The payload carries this message's correlation key (its correlation_id,
+        else its message_id) so the broker can match the response to the request.
         """
+        if "correlation_id" not in payload:
+            payload = {**payload, "correlation_id": self.correlation_key}
+
         return ProtocolMessage(
             source_agent=self.target_agent,  # Swap
             target_agent=self.source_agent,  # Swap
@@ -153,6 +353,11 @@ class ProtocolMessage:
         """Get correlation ID from payload if present."""
         return self.payload.get("correlation_id")
 
+    @property
+    def correlation_key(self) -> str:
+        """Key that responses to this message carry as their correlation_id."""
+        return self.payload.get("correlation_id") or self.message_id
+
     @property
     def contract_id(self) -> Optional[str]:
         """Get contract ID from payload if present."""
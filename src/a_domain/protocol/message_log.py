@@ -0,0 +1,384 @@
+"""
+Message Log
+
+Durable, append-only log of routed protocol messages. Records are written
+to size-rotated segment files, made durable by a background thread that
+batches fsyncs (group commit), and read back through mmap for replay.
+
+Layout:
+    <directory>/<base offset, 20 digits>.log   one file per segment
+    record = u32 body length | u32 crc32(body) | body
+    body   = u16 contract_id length | contract_id | encoded message
+
+Offsets are record sequence numbers, starting at 0 and continuous across
+segments. A torn or corrupt tail (crash mid-write) is truncated on open.
+"""
+
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from bisect import bisect_right
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from .message import ProtocolMessage
+from .codec import MessageCodec, BinaryCodec
+
+
+_HEADER = struct.Struct("<II")
+_CONTRACT_LEN = struct.Struct("<H")
+_SEGMENT_SUFFIX = ".log"
+
+
+class MessageLogError(IOError):
+    """Raised when the log is closed or a sealed segment is corrupt."""
+    pass
+
+
+def _segment_name(base_offset: int) -> str:
+    return f"{base_offset:020d}{_SEGMENT_SUFFIX}"
+
+
+def _scan_records(data, limit: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Walk valid records in a segment buffer.
+
+    Yields (record_start, body_start, body_end) and stops at the first
+    truncated or CRC-mismatched record.
+    """
+    pos = 0
+    header_size = _HEADER.size
+    while pos + header_size <= limit:
+        length, crc = _HEADER.unpack_from(data, pos)
+        body_start = pos + header_size
+        body_end = body_start + length
+        if body_end > limit or zlib.crc32(data[body_start:body_end]) != crc:
+            return
+        yield pos, body_start, body_end
+        pos = body_end
+
+
+class MessageLog:
+    """
+    Segmented write-ahead log of ProtocolMessages.
+
+    append() buffers the record and returns its offset immediately; the
+    flusher thread fsyncs at most every sync_interval seconds, or as soon
+    as an appender asks to wait, so concurrent waiters share one fsync.
+
+    Usage:
+        with MessageLog("/var/lib/a2acp/log") as log:
+            offset = log.append(message, wait=True)
+            for offset, message in log.replay(contract_id=contract_id):
+                ...
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        sync_interval: float = 0.005,
+        codec: Optional[MessageCodec] = None,
+        fsync: bool = True
+    ):
+        """
+        Open (or create) a message log, recovering from any torn tail.
+
+        Args:
+            directory: Directory holding segment files
+            segment_bytes: Roll to a new segment beyond this size
+            sync_interval: Max seconds between background fsyncs
+            codec: Message encoding (compact binary by default)
+            fsync: fsync on commit (False only flushes to the OS, for tests
+                   and benchmarks)
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.sync_interval = sync_interval
+        self.codec = codec or BinaryCodec()
+        self.fsync = fsync
+
+        self._cond = threading.Condition()     # Guards writer state
+        self._io_lock = threading.Lock()       # Serializes fsync with segment rotation
+        self._closed = False
+        self._sync_requested = False
+        self._generation = 0                   # Bumped when the active file changes
+
+        self.metrics = {
+            "appended": 0,
+            "bytes": 0,
+            "fsyncs": 0,
+            "truncated_bytes": 0
+        }
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments: List[int] = self._list_segments()
+        self._next_offset = self._recover()
+        self._durable_offset = self._next_offset
+        self._file = open(self._segment_path(self._segments[-1]), "ab")
+        self._file_size = self._file.tell()
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="message-log-flusher", daemon=True)
+        self._flusher.start()
+
+    @property
+    def next_offset(self) -> int:
+        """Offset the next appended record will get."""
+        return self._next_offset
+
+    @property
+    def durable_offset(self) -> int:
+        """All records below this offset are on stable storage."""
+        return self._durable_offset
+
+    def append(
+        self,
+        message: ProtocolMessage,
+        contract_id: Optional[str] = None,
+        wait: bool = False
+    ) -> int:
+        """
+        Append a message.
+
+        Args:
+            message: Message to log
+            contract_id: Contract to index under (defaults to message.contract_id)
+            wait: Block until the record is durable
+
+        Returns:
+            Offset of the record
+        """
+        return self.append_many([message], wait=wait, contract_ids=[contract_id])[0]
+
+    def append_many(
+        self,
+        messages: List[ProtocolMessage],
+        wait: bool = False,
+        contract_ids: Optional[List[Optional[str]]] = None
+    ) -> List[int]:
+        """
+        Append a batch of messages with one lock acquisition.
+
+        Args:
+            messages: Messages to log, in order
+            wait: Block until the batch is durable
+            contract_ids: Per-message contract override (None entries use
+                          message.contract_id)
+
+        Returns:
+            Offsets of the records, in input order
+        """
+        # Encode outside the lock so appenders only serialize on the write
+        records = []
+        for i, message in enumerate(messages):
+            contract_id = (contract_ids[i] if contract_ids else None) or message.contract_id or ""
+            contract = contract_id.encode("utf-8")
+            body = b"".join((_CONTRACT_LEN.pack(len(contract)), contract, self.codec.encode(message)))
+            records.append(_HEADER.pack(len(body), zlib.crc32(body)) + body)
+
+        with self._cond:
+            if self._closed:
+                raise MessageLogError("Message log is closed")
+
+            first = self._next_offset
+            for record in records:
+                if self._file_size and self._file_size + len(record) > self.segment_bytes:
+                    self._rotate()
+                self._file.write(record)
+                self._file_size += len(record)
+                self._next_offset += 1
+                self.metrics["bytes"] += len(record)
+            self.metrics["appended"] += len(records)
+            end = self._next_offset
+
+            if wait:
+                self._sync_requested = True
+                self._cond.notify_all()
+                while self._durable_offset < end and not self._closed:
+                    self._cond.wait()
+
+        return list(range(first, end))
+
+    def sync(self) -> None:
+        """Block until every appended record is durable."""
+        with self._cond:
+            end = self._next_offset
+            self._sync_requested = True
+            self._cond.notify_all()
+            while self._durable_offset < end and not self._closed:
+                self._cond.wait()
+
+    def replay(
+        self,
+        from_offset: int = 0,
+        contract_id: Optional[str] = None
+    ) -> Iterator[Tuple[int, ProtocolMessage]]:
+        """
+        Read logged messages in offset order.
+
+        Sees every record appended before the call (durable or not).
+        Records of other contracts are skipped without being decoded.
+
+        Args:
+            from_offset: First offset to return
+            contract_id: Only return messages logged under this contract
+
+        Yields:
+            (offset, message) pairs
+
+        Raises:
+            MessageLogError: If a record before the end of the log is corrupt
+        """
+        with self._cond:
+            if self._closed:
+                raise MessageLogError("Message log is closed")
+            self._file.flush()  # Make buffered records visible to the reader
+            segments = list(self._segments)
+            end_offset = self._next_offset
+
+        wanted = contract_id.encode("utf-8") if contract_id is not None else None
+        start = max(0, bisect_right(segments, from_offset) - 1)
+
+        for index in range(start, len(segments)):
+            base = segments[index]
+            if base >= end_offset:
+                break
+            offset = base
+            for body in self._read_segment(base):
+                if offset >= end_offset:
+                    break
+                if offset >= from_offset:
+                    (contract_len,) = _CONTRACT_LEN.unpack_from(body, 0)
+                    message_start = _CONTRACT_LEN.size + contract_len
+                    if wanted is None or body[_CONTRACT_LEN.size:message_start] == wanted:
+                        yield offset, self.codec.decode(body[message_start:])
+                offset += 1
+
+            if offset < min(end_offset, segments[index + 1] if index + 1 < len(segments) else end_offset):
+                raise MessageLogError(f"Corrupt record at offset {offset} in segment {_segment_name(base)}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get log metrics.
+
+        Returns:
+            Counters plus offsets and segment count
+        """
+        with self._cond:
+            return {
+                **self.metrics,
+                "next_offset": self._next_offset,
+                "durable_offset": self._durable_offset,
+                "segments": len(self._segments)
+            }
+
+    def close(self) -> None:
+        """Make all records durable and stop the flusher."""
+        with self._cond:
+            if self._closed:
+                return
+        self.sync()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        with self._io_lock:
+            self._file.close()
+
+    def __enter__(self) -> "MessageLog":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _segment_path(self, base_offset: int) -> str:
+        return os.path.join(self.directory, _segment_name(base_offset))
+
+    def _list_segments(self) -> List[int]:
+        """Base offsets of existing segments, sorted."""
+        return sorted(
+            int(name[:-len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(_SEGMENT_SUFFIX) and name[:-len(_SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def _recover(self) -> int:
+        """Validate the last segment, truncate any torn tail, return next offset."""
+        if not self._segments:
+            self._segments = [0]
+            open(self._segment_path(0), "ab").close()
+            return 0
+
+        base = self._segments[-1]
+        path = self._segment_path(base)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        count = 0
+        valid_end = 0
+        for _, _, body_end in _scan_records(data, len(data)):
+            count += 1
+            valid_end = body_end
+
+        if valid_end < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(valid_end)
+                os.fsync(f.fileno())
+            self.metrics["truncated_bytes"] = len(data) - valid_end
+
+        return base + count
+
+    def _read_segment(self, base: int) -> Iterator[bytes]:
+        """Yield record bodies of one segment through a read-only mmap."""
+        path = self._segment_path(base)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as data:
+                for _, body_start, body_end in _scan_records(data, size):
+                    yield data[body_start:body_end]
+
+    def _rotate(self) -> None:
+        """Seal the active segment and start a new one (caller holds _cond)."""
+        with self._io_lock:
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._durable_offset = self._next_offset
+            self._generation += 1
+
+            self._segments.append(self._next_offset)
+            self._file = open(self._segment_path(self._next_offset), "ab")
+            self._file_size = 0
+
+    def _flush_loop(self) -> None:
+        """Background group commit: flush and fsync pending records."""
+        while True:
+            with self._cond:
+                if not self._sync_requested and not self._closed:
+                    self._cond.wait(self.sync_interval)
+                if self._closed:
+                    return
+                if self._durable_offset == self._next_offset:
+                    self._sync_requested = False
+                    continue
+
+                self._file.flush()
+                target = self._next_offset
+                generation = self._generation
+                fd = self._file.fileno()
+                self._sync_requested = False
+
+            # fsync without _cond so appenders keep writing meanwhile
+            with self._io_lock:
+                if self.fsync and generation == self._generation:
+                    os.fsync(fd)
+                # else: rotation already fsynced the old segment up to target
+
+            with self._cond:
+                self._durable_offset = max(self._durable_offset, target)
+                self.metrics["fsyncs"] += 1
+                self._cond.notify_all()
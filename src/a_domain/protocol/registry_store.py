@@ -0,0 +1,374 @@
+"""
+Capability Registry Store
+
+Persistence for CapabilityRegistry, so a restarted broker can serve
+discovery before agents re-register. RegistryStore is the backend
+interface; SQLiteRegistryStore is the local default.
+
+Registry writes are handed to the store under the registry lock and only
+queued there. A background thread writes them in batches (write-behind),
+one transaction per batch, coalescing repeated writes of the same agent
+version. Every batch bumps the database generation.
+
+Startup reads one snapshot file (pickled capability tuples) if it was
+written at the current generation, and otherwise scans the database and
+rewrites the snapshot for the next start. The snapshot is a cache of the
+database, written by close(); like the database it must only be writable
+by the service itself.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+
+from .discovery import CapabilitySpec
+from .semver import parse_version
+
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_FORMAT = 1
+_SPEC_FIELDS = tuple(spec_field.name for spec_field in fields(CapabilitySpec))
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS capabilities ("
+    " agent_id TEXT NOT NULL, version TEXT NOT NULL, data TEXT NOT NULL,"
+    " PRIMARY KEY (agent_id, version)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+)
+
+
+class RegistryStoreError(IOError):
+    """Raised when the store is closed or a batch cannot be written."""
+    pass
+
+
+def _key(capability: CapabilitySpec) -> Tuple[str, str]:
+    """Storage key: agent ID and normalized version ("1.2" and "1.2.0" are one row)."""
+    return capability.agent_id, str(parse_version(capability.version))
+
+
+def _encode(capability: CapabilitySpec) -> str:
+    return json.dumps(capability.to_dict(), separators=(",", ":"))
+
+
+def _decode(data: str) -> CapabilitySpec:
+    values = json.loads(data)
+    values["registered_at"] = datetime.fromisoformat(values["registered_at"])
+    return CapabilitySpec(**values)
+
+
+class RegistryStore(ABC):
+    """
+    Abstract capability registry persistence backend.
+
+    The registry calls save() and delete() while holding its lock, so
+    implementations should queue the change and return immediately.
+    """
+
+    @abstractmethod
+    def load(self) -> List[CapabilitySpec]:
+        """Get every stored capability version."""
+        pass
+
+    @abstractmethod
+    def save(self, capabilities: List[CapabilitySpec]) -> None:
+        """Store capability versions, replacing equal (agent, version) entries."""
+        pass
+
+    @abstractmethod
+    def delete(self, capabilities: List[CapabilitySpec]) -> None:
+        """Remove capability versions."""
+        pass
+
+    def flush(self) -> None:
+        """Block until every change so far is stored."""
+        pass
+
+    def close(self) -> None:
+        """Store pending changes and release resources."""
+        pass
+
+
+class SQLiteRegistryStore(RegistryStore):
+    """
+    SQLite registry store with write-behind batching and a snapshot file.
+
+    Usage:
+        store = SQLiteRegistryStore("/var/lib/a2acp/registry.db")
+        discovery = CapabilityDiscoveryAgent(store=store)  # Loads stored agents
+        ...
+        store.close()  # Flushes and writes the snapshot for a fast restart
+    """
+
+    def __init__(
+        self,
+        path: str,
+        snapshot_path: Optional[str] = None,
+        flush_interval: float = 0.05,
+        max_batch: int = 1000,
+        synchronous: bool = True
+    ):
+        """
+        Open (or create) a registry database.
+
+        Args:
+            path: SQLite database file
+            snapshot_path: Snapshot file (default: path + ".snapshot")
+            flush_interval: Max seconds a change waits before being written
+            max_batch: Write as soon as this many changes are pending
+            synchronous: Sync commits to disk (False leaves it to the OS,
+                         for tests and benchmarks)
+        """
+        self.path = path
+        self.snapshot_path = snapshot_path or path + ".snapshot"
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'NORMAL' if synchronous else 'OFF'}")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+
+        self._cond = threading.Condition()  # Guards the queue
+        self._io_lock = threading.Lock()    # Serializes database and snapshot I/O
+        self._pending: Dict[Tuple[str, str], Optional[CapabilitySpec]] = {}  # None: delete
+        self._queued = 0    # Changes queued so far
+        self._written = 0   # Changes written so far
+        self._flush_requested = False
+        self._error: Optional[Exception] = None  # Failure of the last batch
+        self._closed = False
+        self._generation = row[0] if row else 0
+
+        self.metrics = {
+            "queued": 0,
+            "written": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "snapshot_loads": 0,
+            "database_loads": 0
+        }
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="registry-store-flusher", daemon=True)
+        self._flusher.start()
+
+    def load(self) -> List[CapabilitySpec]:
+        """
+        Get every stored capability version.
+
+        Pending changes are written first. Reads the snapshot file if it is
+        current, otherwise the database (then rewriting the snapshot).
+
+        Returns:
+            Capability specifications
+
+        Raises:
+            RegistryStoreError: If the store is closed or pending changes
+                                cannot be written
+        """
+        self.flush()
+        with self._io_lock:
+            capabilities = self._read_snapshot()
+            if capabilities is not None:
+                self.metrics["snapshot_loads"] += 1
+                return capabilities
+
+            capabilities = [_decode(data) for (data,) in self._conn.execute("SELECT data FROM capabilities")]
+            self.metrics["database_loads"] += 1
+            self._write_snapshot(capabilities)
+            return capabilities
+
+    def save(self, capabilities: List[CapabilitySpec]) -> None:
+        """
+        Queue capability versions for writing.
+
+        Raises:
+            RegistryStoreError: If the store is closed
+        """
+        self._enqueue([(_key(capability), capability) for capability in capabilities])
+
+    def delete(self, capabilities: List[CapabilitySpec]) -> None:
+        """
+        Queue capability versions for removal.
+
+        Raises:
+            RegistryStoreError: If the store is closed
+        """
+        self._enqueue([(_key(capability), None) for capability in capabilities])
+
+    def flush(self) -> None:
+        """
+        Block until every change queued so far is written.
+
+        Raises:
+            RegistryStoreError: If the store is closed or the batch failed
+        """
+        with self._cond:
+            if self._closed:
+                raise RegistryStoreError("Registry store is closed")
+            target = self._queued
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._written < target:
+                if self._error is not None:
+                    raise RegistryStoreError(f"Registry store write failed: {self._error}") from self._error
+                self._cond.wait()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get store metrics.
+
+        Returns:
+            Counters plus pending change count and database generation
+        """
+        with self._cond:
+            return {
+                **self.metrics,
+                "pending": len(self._pending),
+                "generation": self._generation
+            }
+
+    def close(self) -> None:
+        """Write pending changes and a current snapshot, then stop the flusher."""
+        with self._cond:
+            if self._closed:
+                return
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._flusher.join()
+
+        with self._io_lock:
+            if self._snapshot_generation() != self._generation:
+                self._write_snapshot(
+                    [_decode(data) for (data,) in self._conn.execute("SELECT data FROM capabilities")]
+                )
+            self._conn.close()
+
+    def __enter__(self) -> "SQLiteRegistryStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _enqueue(self, changes: List[Tuple[Tuple[str, str], Optional[CapabilitySpec]]]) -> None:
+        """Queue changes; a later change to the same key replaces an earlier one."""
+        with self._cond:
+            if self._closed:
+                raise RegistryStoreError("Registry store is closed")
+            for key, capability in changes:
+                self._pending[key] = capability
+            self._queued += len(changes)
+            self.metrics["queued"] += len(changes)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+
+    def _flush_loop(self) -> None:
+        """Background write-behind: write pending changes in one transaction per batch."""
+        while True:
+            with self._cond:
+                if not self._flush_requested and not self._closed and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                self._flush_requested = False
+                if not self._pending:
+                    self._written = self._queued
+                    self._cond.notify_all()
+                    if self._closed:
+                        return
+                    continue
+                batch, self._pending = self._pending, {}
+                target = self._queued
+
+            try:
+                with self._io_lock:
+                    self._write(batch)
+            except Exception as e:
+                logger.error("Registry store batch failed", extra={"error": str(e)}, exc_info=True)
+                with self._cond:
+                    # Keep the batch unless newer changes superseded it
+                    for key, capability in batch.items():
+                        self._pending.setdefault(key, capability)
+                    self._error = e
+                    self.metrics["failed_batches"] += 1
+                    self._cond.notify_all()
+                    if self._closed:
+                        return
+                continue
+
+            with self._cond:
+                self._written = max(self._written, target)
+                self._error = None
+                self.metrics["written"] += len(batch)
+                self.metrics["batches"] += 1
+                self._cond.notify_all()
+
+    def _write(self, batch: Dict[Tuple[str, str], Optional[CapabilitySpec]]) -> None:
+        """Apply a batch and bump the generation (io lock held)."""
+        rows = [(key[0], key[1], _encode(capability)) for key, capability in batch.items() if capability is not None]
+        deleted = [key for key, capability in batch.items() if capability is None]
+
+        self._conn.execute("BEGIN")
+        try:
+            if deleted:
+                self._conn.executemany("DELETE FROM capabilities WHERE agent_id = ? AND version = ?", deleted)
+            if rows:
+                self._conn.executemany("INSERT OR REPLACE INTO capabilities VALUES (?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (self._generation + 1,)
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._generation += 1
+
+    def _snapshot_generation(self) -> Optional[int]:
+        """Generation the snapshot file was written at, None if missing or unreadable (io lock held)."""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot_format, generation = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable registry snapshot", extra={"error": str(e)})
+            return None
+        return generation if snapshot_format == _SNAPSHOT_FORMAT else None
+
+    def _read_snapshot(self) -> Optional[List[CapabilitySpec]]:
+        """Capabilities from the snapshot file, or None if missing, stale or unreadable (io lock held)."""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot_format, generation = pickle.load(f)
+                if snapshot_format != _SNAPSHOT_FORMAT or generation != self._generation:
+                    return None
+                rows = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable registry snapshot", extra={"error": str(e)})
+            return None
+        return [CapabilitySpec(*row) for row in rows]
+
+    def _write_snapshot(self, capabilities: List[CapabilitySpec]) -> None:
+        """Atomically replace the snapshot file with the current generation (io lock held)."""
+        rows = [tuple(getattr(capability, name) for name in _SPEC_FIELDS) for capability in capabilities]
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, "wb") as f:
+            # Header first, so staleness checks need not read the rows
+            pickle.dump((_SNAPSHOT_FORMAT, self._generation), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.snapshot_path)
@@ -0,0 +1,770 @@
+"""
+Payload Schemas
+
+Compiles JSON Schemas into validator closures and checks structural
+compatibility between schemas. Compiled validators and compatibility
+results are cached by a hash of the canonical schema, so each distinct
+schema is compiled once however many contracts or capabilities use it.
+
+Supported keywords: type, properties, required, additionalProperties,
+items, enum, const, anyOf, minimum, maximum, minLength, maxLength,
+minItems, maxItems and pattern. Annotations (title, description, format,
+default, $schema, ...) are accepted and ignored.
+
+Capability schemas written as plain field maps ({"field": "string"}) are
+read as objects whose fields are all required.
+"""
+
+from typing import Dict, Any, Optional, List, Tuple, Callable, Union
+from collections import OrderedDict
+import hashlib
+import json
+import re
+import threading
+
+
+# Returns None if the value is valid, else a message naming the first violation
+Validator = Callable[[Any], Optional[str]]
+
+_MISSING = object()
+_NO_TYPES: frozenset = frozenset()
+
+_JSON_TYPES = ("string", "integer", "number", "boolean", "object", "array", "null")
+
+_NUMBER = (int, float)
+
+# Keyword -> accepted value types; a field map whose fields happen to share
+# a keyword's name (say "type": "category") fails these shape checks
+_KEYWORDS: Dict[str, Any] = {
+    "type": (str, list),
+    "properties": dict,
+    "required": list,
+    "additionalProperties": (bool, dict),
+    "items": (bool, dict),
+    "enum": list,
+    "const": object,
+    "anyOf": list,
+    "minimum": _NUMBER,
+    "maximum": _NUMBER,
+    "minLength": int,
+    "maxLength": int,
+    "minItems": int,
+    "maxItems": int,
+    "pattern": str,
+}
+
+_BOOLEAN_KEYWORDS = frozenset({"additionalProperties", "items", "const"})
+
+_ANNOTATIONS = frozenset({"title", "description", "format", "default", "examples", "definitions"})
+
+# Type names accepted in field-map schemas, beyond the JSON Schema ones
+_FIELD_MAP_TYPES = {
+    "str": {"type": "string"},
+    "int": {"type": "integer"},
+    "float": {"type": "number"},
+    "bool": {"type": "boolean"},
+    "dict": {"type": "object"},
+    "list": {"type": "array"},
+    "uuid": {"type": "string", "format": "uuid"},
+    "date": {"type": "string", "format": "date"},
+    "datetime": {"type": "string", "format": "date-time"},
+    "email": {"type": "string", "format": "email"},
+    "uri": {"type": "string", "format": "uri"},
+}
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool))
+    or (isinstance(v, float) and v.is_integer()),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, (list, tuple)),
+    "null": lambda v: v is None,
+}
+
+_EXACT_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list, tuple),
+    "null": (type(None),),
+}
+
+
+class SchemaError(ValueError):
+    """Raised when a schema cannot be compiled."""
+    pass
+
+
+def is_json_schema(schema: Dict[str, Any]) -> bool:
+    """
+    Tell a JSON Schema from a field-map schema.
+
+    A schema counts as JSON Schema when it only uses schema keywords,
+    annotations or $-prefixed keys, with values of the right shape, and
+    has at least one constraint keyword. An empty schema is both, and
+    accepts anything either way.
+
+    Args:
+        schema: Schema dictionary
+
+    Returns:
+        True if the schema is read as JSON Schema
+    """
+    constrained = False
+    for key in schema:
+        if key.startswith("$") or key in _ANNOTATIONS:
+            continue
+        shape = _KEYWORDS.get(key)
+        value = schema[key]
+        if shape is None or not isinstance(value, shape):
+            return False
+        if isinstance(value, bool) and key not in _BOOLEAN_KEYWORDS:
+            return False  # bool is an int, but not a valid bound
+        if key == "type" and isinstance(value, str) and value not in _JSON_TYPES:
+            return False
+        constrained = True
+    return constrained
+
+
+def normalize_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a field-map schema to JSON Schema.
+
+    JSON Schemas are returned unchanged. In a field map every key is a
+    required field; values name a type, or are nested field maps or
+    JSON Schemas.
+
+    Args:
+        schema: Schema dictionary
+
+    Returns:
+        Equivalent JSON Schema
+
+    Raises:
+        SchemaError: If the schema is not a dictionary
+    """
+    if not isinstance(schema, dict):
+        raise SchemaError(f"Schema must be a dictionary, got {type(schema).__name__}")
+    if not schema or is_json_schema(schema):
+        return schema
+
+    return {
+        "type": "object",
+        "properties": {name: _normalize_field(value) for name, value in schema.items()},
+        "required": list(schema)
+    }
+
+
+def _normalize_field(value: Any) -> Dict[str, Any]:
+    """Schema for one field of a field-map schema."""
+    if isinstance(value, dict):
+        return normalize_schema(value)
+    if isinstance(value, str):
+        name = value.lower()
+        if name in _JSON_TYPES:
+            return {"type": name}
+        return dict(_FIELD_MAP_TYPES.get(name, {}))
+    if isinstance(value, list):
+        return {"type": "array"}
+    return {}  # Unknown description: no constraint
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    """
+    Hash a schema by its canonical JSON form.
+
+    Args:
+        schema: Schema dictionary
+
+    Returns:
+        Hex digest, equal for schemas that differ only in key order
+    """
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CompiledSchema:
+    """
+    A schema compiled to a validator closure.
+
+    Usage:
+        compiled = compile_schema({"type": "object", "required": ["id"]})
+        error = compiled.validate(payload)  # None if valid
+    """
+
+    __slots__ = ("schema", "hash", "_validator")
+
+    def __init__(self, schema: Dict[str, Any], hash: str, validator: Optional[Validator]):
+        self.schema = schema          # Normalized JSON Schema
+        self.hash = hash
+        self._validator = validator   # None: accepts every value
+
+    @property
+    def accepts_all(self) -> bool:
+        """True if the schema places no constraint on values."""
+        return self._validator is None
+
+    def validate(self, value: Any) -> Optional[str]:
+        """
+        Validate a value.
+
+        Args:
+            value: Value to check (e.g. a message payload)
+
+        Returns:
+            None if valid, else a message naming the first violation
+        """
+        validator = self._validator
+        return validator(value) if validator is not None else None
+
+    def is_valid(self, value: Any) -> bool:
+        """Check a value without building an error message."""
+        return self.validate(value) is None
+
+    def __repr__(self) -> str:
+        return f"CompiledSchema({self.hash})"
+
+
+class SchemaCache:
+    """
+    Bounded LRU cache of compiled schemas and compatibility results.
+
+    Both tables are keyed by schema hash, so equal schemas from different
+    sources share one compiled validator.
+    """
+
+    def __init__(self, max_schemas: int = 1024, max_pairs: int = 4096):
+        """
+        Initialize schema cache.
+
+        Args:
+            max_schemas: Compiled schemas kept
+            max_pairs: Compatibility results kept
+        """
+        self.max_schemas = max_schemas
+        self.max_pairs = max_pairs
+
+        self._schemas: "OrderedDict[str, CompiledSchema]" = OrderedDict()
+        self._pairs: "OrderedDict[Tuple[str, str], Tuple[str, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "compiled": 0,
+            "hits": 0,
+            "compatibility_checks": 0,
+            "compatibility_hits": 0
+        }
+
+    def compile(self, schema: Union[Dict[str, Any], CompiledSchema]) -> CompiledSchema:
+        """
+        Get the compiled form of a schema, compiling it on first use.
+
+        Args:
+            schema: Schema dictionary (or an already compiled schema)
+
+        Returns:
+            Compiled schema
+
+        Raises:
+            SchemaError: If the schema is malformed
+        """
+        if isinstance(schema, CompiledSchema):
+            return schema
+
+        normalized = normalize_schema(schema)
+        key = schema_hash(normalized)
+        with self._lock:
+            compiled = self._schemas.get(key)
+            if compiled is not None:
+                self._schemas.move_to_end(key)
+                self.metrics["hits"] += 1
+                return compiled
+
+        # Compile outside the lock; a concurrent compile of the same schema is harmless
+        compiled = CompiledSchema(normalized, key, _compile(normalized, "$"))
+        with self._lock:
+            self.metrics["compiled"] += 1
+            compiled = self._schemas.setdefault(key, compiled)
+            if len(self._schemas) > self.max_schemas:
+                self._schemas.popitem(last=False)
+        return compiled
+
+    def compatibility(
+        self,
+        provided: Union[Dict[str, Any], CompiledSchema],
+        expected: Union[Dict[str, Any], CompiledSchema]
+    ) -> Tuple[str, ...]:
+        """
+        Check that every value matching provided also matches expected.
+
+        The check is structural and conservative: it reports constraints
+        of expected that provided does not guarantee (missing or optional
+        required fields, wider types, values outside an enum, looser
+        bounds, fields expected forbids).
+
+        Args:
+            provided: Schema of the data produced
+            expected: Schema of the data consumed
+
+        Returns:
+            Issues found (empty if compatible)
+
+        Raises:
+            SchemaError: If either schema is malformed
+        """
+        provided = self.compile(provided)
+        expected = self.compile(expected)
+        key = (provided.hash, expected.hash)
+        with self._lock:
+            self.metrics["compatibility_checks"] += 1
+            issues = self._pairs.get(key)
+            if issues is not None:
+                self._pairs.move_to_end(key)
+                self.metrics["compatibility_hits"] += 1
+                return issues
+
+        found: List[str] = []
+        _subschema_issues(provided.schema, expected.schema, "$", found)
+        issues = tuple(found)
+        with self._lock:
+            self._pairs[key] = issues
+            if len(self._pairs) > self.max_pairs:
+                self._pairs.popitem(last=False)
+        return issues
+
+    def clear(self) -> None:
+        """Drop all cached schemas and results."""
+        with self._lock:
+            self._schemas.clear()
+            self._pairs.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get cache metrics.
+
+        Returns:
+            Counters plus current table sizes
+        """
+        with self._lock:
+            return {
+                **self.metrics,
+                "schemas": len(self._schemas),
+                "pairs": len(self._pairs)
+            }
+
+
+_default_cache = SchemaCache()
+
+
+def compile_schema(schema: Union[Dict[str, Any], CompiledSchema]) -> CompiledSchema:
+    """
+    Compile a schema through the shared cache.
+
+    Args:
+        schema: JSON Schema or field-map schema
+
+    Returns:
+        Compiled schema
+
+    Raises:
+        SchemaError: If the schema is malformed
+    """
+    return _default_cache.compile(schema)
+
+
+def compatibility_issues(
+    provided: Union[Dict[str, Any], CompiledSchema],
+    expected: Union[Dict[str, Any], CompiledSchema]
+) -> Tuple[str, ...]:
+    """
+    Check schema compatibility through the shared cache.
+
+    Args:
+        provided: Schema of the data produced
+        expected: Schema of the data consumed
+
+    Returns:
+        Issues found (empty if compatible)
+
+    Raises:
+        SchemaError: If either schema is malformed
+    """
+    return _default_cache.compatibility(provided, expected)
+
+
+def get_schema_cache() -> SchemaCache:
+    """Get the shared schema cache (for metrics and tests)."""
+    return _default_cache
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+
+def _type_name(value: Any) -> str:
+    """JSON type name of a Python value, for error messages."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, (list, tuple)):
+        return "array"
+    return type(value).__name__
+
+
+def _types(schema: Dict[str, Any], path: str) -> Tuple[str, ...]:
+    """Declared types of a schema (empty if untyped)."""
+    declared = schema.get("type")
+    if declared is None:
+        return ()
+    types = (declared,) if isinstance(declared, str) else tuple(declared)
+    for name in types:
+        if name not in _TYPE_CHECKS:
+            raise SchemaError(f"{path}: unknown type {name!r}")
+    return types
+
+
+def _compile(schema: Any, path: str) -> Optional[Validator]:
+    """Compile a normalized schema; None if it accepts every value."""
+    if schema is True or schema == {}:
+        return None
+    if schema is False:
+        return lambda value: f"{path}: no value is allowed"
+    if not isinstance(schema, dict):
+        raise SchemaError(f"{path}: schema must be an object, got {_type_name(schema)}")
+
+    types = _types(schema, path)
+    checks: List[Validator] = []
+
+    object_check = _compile_object(schema, path, typed="object" in types and len(types) == 1)
+    if object_check is not None and types == ("object",):
+        types = ()  # The object check also verifies the type
+    if types:
+        checks.append(_compile_type(types, path))
+    if "enum" in schema or "const" in schema:
+        checks.append(_compile_enum(schema, path))
+    checks.extend(_compile_bounds(schema, path))
+    if object_check is not None:
+        checks.append(object_check)
+    items = _compile_items(schema, path)
+    if items is not None:
+        checks.append(items)
+    if "anyOf" in schema:
+        checks.append(_compile_any_of(schema["anyOf"], path))
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    checks_tuple = tuple(checks)
+
+    def check_all(value: Any) -> Optional[str]:
+        for check in checks_tuple:
+            error = check(value)
+            if error is not None:
+                return error
+        return None
+
+    return check_all
+
+
+def _compile_type(types: Tuple[str, ...], path: str) -> Validator:
+    expected = " or ".join(types)
+    # Exact type lookup settles the common case; predicates handle
+    # subclasses and integral floats
+    exact = frozenset(t for name in types for t in _EXACT_TYPES[name])
+    predicates = tuple(_TYPE_CHECKS[name] for name in types)
+
+    def check_type(value: Any) -> Optional[str]:
+        if type(value) in exact:
+            return None
+        for predicate in predicates:
+            if predicate(value):
+                return None
+        return f"{path}: expected {expected}, got {_type_name(value)}"
+
+    check_type.exact_types = exact  # Lets object checks settle type-only fields inline
+    return check_type
+
+
+def _compile_enum(schema: Dict[str, Any], path: str) -> Validator:
+    allowed = [schema["const"]] if "const" in schema else list(schema["enum"])
+    try:
+        lookup = frozenset(allowed)
+    except TypeError:
+        lookup = None  # Unhashable members: compare one by one
+
+    def check_enum(value: Any) -> Optional[str]:
+        try:
+            if lookup is not None and value in lookup:
+                return None
+        except TypeError:
+            pass
+        if lookup is None and value in allowed:
+            return None
+        return f"{path}: {value!r} is not one of {allowed!r}"
+
+    return check_enum
+
+
+def _compile_bounds(schema: Dict[str, Any], path: str) -> List[Validator]:
+    checks: List[Validator] = []
+
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    if minimum is not None or maximum is not None:
+        def check_range(value: Any) -> Optional[str]:
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return None
+            if minimum is not None and value < minimum:
+                return f"{path}: {value} is below minimum {minimum}"
+            if maximum is not None and value > maximum:
+                return f"{path}: {value} is above maximum {maximum}"
+            return None
+        checks.append(check_range)
+
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    pattern = None
+    if "pattern" in schema:
+        try:
+            pattern = re.compile(schema["pattern"])
+        except re.error as e:
+            raise SchemaError(f"{path}: invalid pattern: {e}") from e
+    if min_length is not None or max_length is not None or pattern is not None:
+        def check_string(value: Any) -> Optional[str]:
+            if not isinstance(value, str):
+                return None
+            if min_length is not None and len(value) < min_length:
+                return f"{path}: shorter than {min_length} characters"
+            if max_length is not None and len(value) > max_length:
+                return f"{path}: longer than {max_length} characters"
+            if pattern is not None and not pattern.search(value):
+                return f"{path}: does not match pattern {pattern.pattern!r}"
+            return None
+        checks.append(check_string)
+
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    if min_items is not None or max_items is not None:
+        def check_size(value: Any) -> Optional[str]:
+            if not isinstance(value, (list, tuple)):
+                return None
+            if min_items is not None and len(value) < min_items:
+                return f"{path}: fewer than {min_items} items"
+            if max_items is not None and len(value) > max_items:
+                return f"{path}: more than {max_items} items"
+            return None
+        checks.append(check_size)
+
+    return checks
+
+
+def _compile_object(schema: Dict[str, Any], path: str, typed: bool) -> Optional[Validator]:
+    """Compile object keywords; typed also rejects non-object values."""
+    properties = schema.get("properties") or {}
+    required = tuple(schema.get("required") or ())
+    additional = schema.get("additionalProperties", True)
+    if not properties and not required and additional is True:
+        return None
+
+    fields = tuple(
+        (name, getattr(validator, "exact_types", _NO_TYPES), validator)
+        for name, validator in (
+            (name, _compile(sub, f"{path}.{name}")) for name, sub in properties.items()
+        )
+        if validator is not None
+    )
+    declared = frozenset(properties)
+    forbid_extra = additional is False
+    extra = _compile(additional, f"{path}.*") if isinstance(additional, dict) else None
+
+    def check_object(value: Any) -> Optional[str]:
+        if not isinstance(value, dict):
+            return f"{path}: expected object, got {_type_name(value)}" if typed else None
+        for name in required:
+            if name not in value:
+                return f"{path}: missing required field '{name}'"
+        for name, exact, validator in fields:
+            item = value.get(name, _MISSING)
+            if item is _MISSING or type(item) in exact:
+                continue
+            error = validator(item)
+            if error is not None:
+                return error
+        if forbid_extra or extra is not None:
+            for name, item in value.items():
+                if name in declared:
+                    continue
+                if forbid_extra:
+                    return f"{path}: unexpected field '{name}'"
+                error = extra(item)
+                if error is not None:
+                    return error
+        return None
+
+    return check_object
+
+
+def _compile_items(schema: Dict[str, Any], path: str) -> Optional[Validator]:
+    items = schema.get("items")
+    if not isinstance(items, dict):
+        return None
+    validator = _compile(items, f"{path}[]")
+    if validator is None:
+        return None
+
+    def check_items(value: Any) -> Optional[str]:
+        if not isinstance(value, (list, tuple)):
+            return None
+        for item in value:
+            error = validator(item)
+            if error is not None:
+                return error
+        return None
+
+    return check_items
+
+
+def _compile_any_of(branches: List[Any], path: str) -> Validator:
+    validators = tuple(_compile(branch, path) for branch in branches)
+    if any(validator is None for validator in validators):
+        return lambda value: None
+
+    def check_any_of(value: Any) -> Optional[str]:
+        errors = []
+        for validator in validators:
+            error = validator(value)
+            if error is None:
+                return None
+            errors.append(error)
+        return f"{path}: matches no alternative ({'; '.join(errors)})"
+
+    return check_any_of
+
+
+# ---------------------------------------------------------------------------
+# Compatibility
+
+def _within(name: str, accepted: Tuple[str, ...]) -> bool:
+    return name in accepted or (name == "integer" and "number" in accepted)
+
+
+def _subschema_issues(provided: Any, expected: Any, path: str, issues: List[str]) -> None:
+    """Append constraints of expected that provided does not guarantee."""
+    if expected is True or expected == {}:
+        return
+    if provided is True:
+        provided = {}
+    if not isinstance(provided, dict) or not isinstance(expected, dict):
+        if provided != expected:
+            issues.append(f"{path}: schemas cannot be compared")
+        return
+
+    if provided.get("anyOf"):
+        # Every alternative the producer may send must be accepted
+        rest = {key: value for key, value in provided.items() if key != "anyOf"}
+        for branch in provided["anyOf"]:
+            _subschema_issues({**rest, **branch} if isinstance(branch, dict) else branch,
+                              expected, path, issues)
+        return
+    if expected.get("anyOf"):
+        for branch in expected["anyOf"]:
+            branch_issues: List[str] = []
+            _subschema_issues(provided, branch, path, branch_issues)
+            if not branch_issues:
+                break
+        else:
+            issues.append(f"{path}: matches no alternative of the expected schema")
+        rest = {key: value for key, value in expected.items() if key != "anyOf"}
+        if rest:
+            _subschema_issues(provided, rest, path, issues)
+        return
+
+    expected_types = _types(expected, path)
+    provided_types = _types(provided, path)
+    if expected_types:
+        if not provided_types:
+            issues.append(f"{path}: type not declared, expected {' or '.join(expected_types)}")
+        else:
+            wider = [name for name in provided_types if not _within(name, expected_types)]
+            if wider:
+                issues.append(
+                    f"{path}: type {' or '.join(wider)} not accepted, expected {' or '.join(expected_types)}"
+                )
+
+    expected_values = _enum_values(expected)
+    if expected_values is not None:
+        provided_values = _enum_values(provided)
+        if provided_values is None:
+            issues.append(f"{path}: values not restricted to {expected_values!r}")
+        else:
+            extra = [value for value in provided_values if value not in expected_values]
+            if extra:
+                issues.append(f"{path}: values {extra!r} not in {expected_values!r}")
+
+    for keyword in ("minimum", "minLength", "minItems"):
+        bound = expected.get(keyword)
+        if bound is not None and not (provided.get(keyword) is not None and provided[keyword] >= bound):
+            issues.append(f"{path}: {keyword} {bound} not guaranteed")
+    for keyword in ("maximum", "maxLength", "maxItems"):
+        bound = expected.get(keyword)
+        if bound is not None and not (provided.get(keyword) is not None and provided[keyword] <= bound):
+            issues.append(f"{path}: {keyword} {bound} not guaranteed")
+
+    _object_issues(provided, expected, path, issues)
+
+    expected_items = expected.get("items")
+    if isinstance(expected_items, dict):
+        provided_items = provided.get("items")
+        _subschema_issues(provided_items if isinstance(provided_items, dict) else {},
+                          expected_items, f"{path}[]", issues)
+
+
+def _enum_values(schema: Dict[str, Any]) -> Optional[List[Any]]:
+    if "const" in schema:
+        return [schema["const"]]
+    if "enum" in schema:
+        return list(schema["enum"])
+    return None
+
+
+def _object_issues(provided: Dict[str, Any], expected: Dict[str, Any], path: str, issues: List[str]) -> None:
+    expected_properties = expected.get("properties") or {}
+    provided_properties = provided.get("properties") or {}
+    provided_required = set(provided.get("required") or ())
+
+    for name in expected.get("required") or ():
+        if name in provided_required:
+            continue
+        if name in provided_properties:
+            issues.append(f"{path}: field '{name}' is required but optional in provided schema")
+        else:
+            issues.append(f"{path}: missing required field '{name}'")
+
+    for name, sub in expected_properties.items():
+        if name in provided_properties:
+            _subschema_issues(provided_properties[name], sub, f"{path}.{name}", issues)
+
+    additional = expected.get("additionalProperties", True)
+    if additional is True:
+        return
+    for name, sub in provided_properties.items():
+        if name in expected_properties:
+            continue
+        if additional is False:
+            issues.append(f"{path}: field '{name}' is not allowed")
+        else:
+            _subschema_issues(sub, additional, f"{path}.{name}", issues)
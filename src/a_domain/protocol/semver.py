@@ -0,0 +1,382 @@
+"""
+Semantic Versioning
+
+Version parsing, range expressions and sorted version tables for
+capability resolution. Ranges follow the npm/cargo conventions agents
+already use in their manifests:
+
+    1.2.3          exactly 1.2.3
+    ^1.2           >=1.2.0, <2.0.0        (^0.2 -> <0.3.0, ^0.0.3 -> <0.0.4)
+    ~1.2.3         >=1.2.3, <1.3.0
+    1.x, 1.2.*     >=1.0.0, <2.0.0 / >=1.2.0, <1.3.0 (a bare "1.2" is the same as 1.2.x)
+    >=2.0,<3       comparators joined by "," or whitespace (AND)
+    ^1 || ^3       alternatives (OR)
+    *              any version
+
+Upper bounds implied by ^, ~ and wildcards exclude pre-releases of the
+next version (2.0.0-beta does not satisfy ^1.2).
+"""
+
+from typing import Any, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+import re
+
+
+_VERSION_PATTERN = re.compile(
+    r"^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?"
+    r"(?:-([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?"
+    r"(?:\+[0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*)?$"
+)
+_PARTIAL_PATTERN = re.compile(r"^v?(\d+|[xX*])(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?$")
+_COMPARATOR_PATTERN = re.compile(r"^(\^|~|>=|<=|>|<|=)?\s*(.+)$")
+
+
+@dataclass(frozen=True, order=True)
+class Version:
+    """
+    Parsed semantic version, ordered by semver precedence.
+
+    Build metadata is ignored. Missing minor/patch parts default to 0.
+    """
+
+    major: int
+    minor: int = 0
+    patch: int = 0
+    # Pre-release precedence key; (1,) sorts a release after all its pre-releases
+    prerelease: Tuple[Any, ...] = (1,)
+
+    @classmethod
+    def parse(cls, text: str) -> "Version":
+        """
+        Parse a version string such as "1.2.3", "v2.0" or "1.0.0-rc.1".
+
+        Raises:
+            ValueError: If text is not a version
+        """
+        return parse_version(text)
+
+    @property
+    def is_prerelease(self) -> bool:
+        return self.prerelease != (1,)
+
+    def bump_major(self) -> "Version":
+        return Version(self.major + 1, 0, 0, _FLOOR_PRERELEASE)
+
+    def bump_minor(self) -> "Version":
+        return Version(self.major, self.minor + 1, 0, _FLOOR_PRERELEASE)
+
+    def bump_patch(self) -> "Version":
+        return Version(self.major, self.minor, self.patch + 1, _FLOOR_PRERELEASE)
+
+    def __str__(self) -> str:
+        text = f"{self.major}.{self.minor}.{self.patch}"
+        if self.is_prerelease:
+            text += "-" + ".".join(str(part) for _, part in self.prerelease[1])
+        return text
+
+
+# Lowest possible pre-release ("-0"): the exclusive upper bound of ^/~/x ranges
+_FLOOR_PRERELEASE: Tuple[Any, ...] = (0, ((0, 0),))
+
+
+def _prerelease_key(text: Optional[str]) -> Tuple[Any, ...]:
+    """Precedence key: numeric identifiers sort before (and numerically), then alphanumeric."""
+    if not text:
+        return (1,)
+    return (0, tuple((0, int(part)) if part.isdigit() else (1, part) for part in text.split(".")))
+
+
+@lru_cache(maxsize=4096)
+def parse_version(text: str) -> Version:
+    """
+    Parse a version string (cached; versions repeat across agents).
+
+    Args:
+        text: Version such as "1.2.3", "v2.0" or "1.0.0-rc.1"
+
+    Returns:
+        Parsed version
+
+    Raises:
+        ValueError: If text is not a version
+    """
+    match = _VERSION_PATTERN.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid version: {text!r}")
+    major, minor, patch, prerelease = match.groups()
+    return Version(int(major), int(minor or 0), int(patch or 0), _prerelease_key(prerelease))
+
+
+@dataclass(frozen=True)
+class _Interval:
+    """Contiguous version interval; None bounds are unbounded."""
+
+    lower: Optional[Version] = None
+    lower_inclusive: bool = True
+    upper: Optional[Version] = None
+    upper_inclusive: bool = False
+
+    def contains(self, version: Version) -> bool:
+        if self.lower is not None:
+            if version < self.lower or (version == self.lower and not self.lower_inclusive):
+                return False
+        if self.upper is not None:
+            if version > self.upper or (version == self.upper and not self.upper_inclusive):
+                return False
+        return True
+
+    def intersect(self, other: "_Interval") -> "_Interval":
+        lower, lower_inclusive = self.lower, self.lower_inclusive
+        if other.lower is not None and (
+            lower is None or other.lower > lower or (other.lower == lower and not other.lower_inclusive)
+        ):
+            lower, lower_inclusive = other.lower, other.lower_inclusive
+
+        upper, upper_inclusive = self.upper, self.upper_inclusive
+        if other.upper is not None and (
+            upper is None or other.upper < upper or (other.upper == upper and not other.upper_inclusive)
+        ):
+            upper, upper_inclusive = other.upper, other.upper_inclusive
+
+        return _Interval(lower, lower_inclusive, upper, upper_inclusive)
+
+
+_EMPTY = _Interval(Version(0), False, Version(0), False)
+
+
+class VersionRange:
+    """
+    Set of versions described by a range expression (see module docstring).
+
+    Usage:
+        VersionRange.parse("^1.2").contains(Version.parse("1.9.0"))  # True
+    """
+
+    __slots__ = ("expression", "intervals")
+
+    def __init__(self, expression: str, intervals: List[_Interval]):
+        self.expression = expression
+        self.intervals = intervals
+
+    @classmethod
+    def parse(cls, expression: str) -> "VersionRange":
+        """
+        Parse a range expression.
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        return parse_range(expression)
+
+    @classmethod
+    def between(cls, minimum: Optional[str] = None, maximum: Optional[str] = None) -> "VersionRange":
+        """Range >= minimum (inclusive) and < maximum (exclusive)."""
+        interval = _Interval(
+            parse_version(minimum) if minimum else None, True,
+            parse_version(maximum) if maximum else None, False
+        )
+        return cls(f">={minimum or '0'},<{maximum or '*'}", [interval])
+
+    def contains(self, version: Version) -> bool:
+        """Check whether a version satisfies the range."""
+        return any(interval.contains(version) for interval in self.intervals)
+
+    def __contains__(self, version: Version) -> bool:
+        return self.contains(version)
+
+    def __repr__(self) -> str:
+        return f"VersionRange({self.expression!r})"
+
+
+def _partial_interval(operator: str, text: str) -> _Interval:
+    """Interval for one comparator; text may be partial ("1", "1.2") or a wildcard."""
+    full = _VERSION_PATTERN.match(text)
+    partial = _PARTIAL_PATTERN.match(text)
+    if not full and not partial:
+        raise ValueError(f"Invalid version in range: {text!r}")
+
+    if full and full.group(3) is not None:
+        version, precision = parse_version(text), 3
+    else:
+        parts = []
+        for part in (partial or full).groups()[:3]:
+            if part is None or part in ("x", "X", "*"):
+                break
+            parts.append(int(part))
+        precision = len(parts)
+        version = Version(*(parts + [0] * (3 - len(parts))))
+
+    if precision == 0:
+        # Wildcard operand: only ">*" and "<*" exclude anything
+        return _EMPTY if operator in (">", "<") else _Interval()
+
+    # First version past a partial's precision ("1.2" -> 1.3.0-0); None if exact
+    following = {1: version.bump_major, 2: version.bump_minor}.get(precision, lambda: None)()
+
+    if operator == "^":
+        if version.major > 0 or precision == 1:
+            upper = version.bump_major()
+        elif version.minor > 0 or precision == 2:
+            upper = version.bump_minor()
+        else:
+            upper = version.bump_patch()
+        return _Interval(version, True, upper, False)
+    if operator == "~":
+        upper = version.bump_major() if precision == 1 else version.bump_minor()
+        return _Interval(version, True, upper, False)
+    if operator == ">=":
+        return _Interval(version, True)
+    if operator == ">":
+        return _Interval(version, False) if following is None else _Interval(following, True)
+    if operator == "<":
+        return _Interval(upper=version, upper_inclusive=False)
+    if operator == "<=":
+        return _Interval(upper=version, upper_inclusive=True) if following is None else \
+            _Interval(upper=following, upper_inclusive=False)
+
+    # "=" or bare operand: exact when fully specified, a wildcard otherwise
+    if following is None:
+        return _Interval(version, True, version, True)
+    return _Interval(version, True, following, False)
+
+
+@lru_cache(maxsize=1024)
+def parse_range(expression: str) -> VersionRange:
+    """
+    Parse a range expression (cached; queries repeat the same ranges).
+
+    Args:
+        expression: Range such as "^1.2", ">=2.0,<3" or "^1 || ^3"
+
+    Returns:
+        Parsed range
+
+    Raises:
+        ValueError: If the expression is malformed
+    """
+    intervals = []
+    for alternative in expression.split("||"):
+        # Glue operators to their operand so ">= 2.0" and ">=2.0" split alike
+        text = re.sub(r"(\^|~|>=|<=|>|<|=)\s+", r"\1", alternative)
+        comparators = [part for part in re.split(r"[,\s]+", text.strip()) if part]
+        if not comparators:
+            raise ValueError(f"Empty version range alternative in {expression!r}")
+
+        interval = _Interval()
+        for comparator in comparators:
+            operator, operand = _COMPARATOR_PATTERN.match(comparator).groups()
+            interval = interval.intersect(_partial_interval(operator or "=", operand))
+        intervals.append(interval)
+
+    return VersionRange(expression, intervals)
+
+
+class VersionTable:
+    """
+    Values kept sorted by (version, tiebreak) for range lookups.
+
+    best() answers "highest version in range" with one binary search per
+    range alternative. Tables handed to snapshots are copies that are
+    never mutated afterwards.
+    """
+
+    __slots__ = ("_keys", "_versions", "_values")
+
+    def __init__(self):
+        self._keys: List[Tuple[Version, str]] = []
+        self._versions: List[Version] = []  # Parallel to _keys, for bisecting on version alone
+        self._values: List[Any] = []
+
+    def put(self, version: Version, value: Any, tiebreak: str = "") -> Optional[Any]:
+        """
+        Insert or replace the value at (version, tiebreak).
+
+        Returns:
+            The replaced value, or None
+        """
+        key = (version, tiebreak)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            previous = self._values[index]
+            self._values[index] = value
+            return previous
+        self._keys.insert(index, key)
+        self._versions.insert(index, version)
+        self._values.insert(index, value)
+        return None
+
+    def remove(self, version: Version, tiebreak: str = "") -> Optional[Any]:
+        """
+        Remove the value at (version, tiebreak).
+
+        Returns:
+            The removed value, or None if absent
+        """
+        key = (version, tiebreak)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+            del self._versions[index]
+            return self._values.pop(index)
+        return None
+
+    def get(self, version: Version, tiebreak: str = "") -> Optional[Any]:
+        """Get the value at exactly (version, tiebreak)."""
+        key = (version, tiebreak)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return self._values[index]
+        return None
+
+    def best(self, version_range: Optional[VersionRange] = None) -> Optional[Any]:
+        """
+        Get the value with the highest version in range.
+
+        Args:
+            version_range: Range to satisfy (None for any version)
+
+        Returns:
+            Value, or None if no version satisfies the range
+        """
+        if not self._values:
+            return None
+        if version_range is None:
+            return self._values[-1]
+
+        best_index = -1
+        versions = self._versions
+        for interval in version_range.intervals:
+            if interval.upper is None:
+                index = len(versions) - 1
+            elif interval.upper_inclusive:
+                index = bisect_right(versions, interval.upper) - 1
+            else:
+                index = bisect_left(versions, interval.upper) - 1
+            if index > best_index and index >= 0 and interval.contains(versions[index]):
+                best_index = index
+        return self._values[best_index] if best_index >= 0 else None
+
+    def select(self, version_range: Optional[VersionRange] = None) -> List[Any]:
+        """Get every value in range, lowest version first."""
+        if version_range is None:
+            return list(self._values)
+        return [value for version, value in zip(self._versions, self._values) if version_range.contains(version)]
+
+    def latest(self) -> Optional[Any]:
+        """Get the value with the highest version."""
+        return self._values[-1] if self._values else None
+
+    def copy(self) -> "VersionTable":
+        table = VersionTable()
+        table._keys = list(self._keys)
+        table._versions = list(self._versions)
+        table._values = list(self._values)
+        return table
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
@@ -0,0 +1,516 @@
+"""
+Sharded Protocol Broker
+
+Multi-process broker mode. Agents are placed on N worker processes by
+consistent hashing of agent_id; each worker runs an ordinary
+ProtocolBrokerAgent, so validation, contract checks and delivery for
+different shards run on different cores. A front router in the calling
+process forwards messages to workers over multiprocessing pipes.
+
+Handshakes and contracts live on the shard that owns the handshake's
+target agent. Contract-bound messages are admitted (validated, contract
+checked, collaboration tracked) on the contract's shard and then, if the
+target agent lives elsewhere, forwarded to the target's shard for delivery.
+
+The front router remembers which shard owns each pending handshake and
+each contract. Handshake entries expire with the handshake; contract
+entries are dropped when the contract is terminated.
+"""
+
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from bisect import bisect
+import hashlib
+import multiprocessing
+import os
+import threading
+
+from .message import ProtocolMessage, ErrorCode
+from .broker import ProtocolBrokerAgent
+from .expiry import ExpiryScheduler
+from .validator import ValidationResult
+
+
+class ShardError(RuntimeError):
+    """Raised when a shard worker fails or is not running."""
+    pass
+
+
+def _ring_hash(key: str) -> int:
+    """Stable 64-bit hash (process-independent, unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """
+    Consistent hash ring with virtual nodes.
+
+    Adding or removing a node only moves the keys that hash to that node's
+    virtual points, roughly 1/N of all keys.
+    """
+
+    def __init__(self, nodes: Optional[List[int]] = None, replicas: int = 100):
+        """
+        Initialize hash ring.
+
+        Args:
+            nodes: Initial node IDs
+            replicas: Virtual points per node (higher evens out placement)
+        """
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[int] = []
+        self.nodes: List[int] = []
+
+        for node in nodes or []:
+            self.add_node(node)
+
+    def add_node(self, node: int) -> None:
+        """Add a node to the ring."""
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        ring = list(zip(self._points, self._owners))
+        ring.extend((_ring_hash(f"{node}#{i}"), node) for i in range(self.replicas))
+        ring.sort()
+        self._points = [point for point, _ in ring]
+        self._owners = [owner for _, owner in ring]
+
+    def remove_node(self, node: int) -> None:
+        """Remove a node from the ring."""
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        ring = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [point for point, _ in ring]
+        self._owners = [owner for _, owner in ring]
+
+    def get_node(self, key: str) -> int:
+        """
+        Get the node that owns a key.
+
+        Args:
+            key: Key to place (e.g. agent_id)
+
+        Returns:
+            Owning node ID
+
+        Raises:
+            ShardError: If the ring has no nodes
+        """
+        if not self._points:
+            raise ShardError("Hash ring has no nodes")
+        index = bisect(self._points, _ring_hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+def _deliver(
+    broker: ProtocolBrokerAgent,
+    messages: List[ProtocolMessage],
+    indices: List[int],
+    target_id: str,
+    results: List[Optional[ValidationResult]],
+    delivered: Dict[str, int]
+) -> None:
+    """Deliver a group of admitted messages to a local agent."""
+    routed = broker.message_router.route_batch(target_id, [messages[i] for i in indices])
+    if routed:
+        delivered[target_id] = delivered.get(target_id, 0) + len(indices)
+        result = ValidationResult(valid=True)
+    else:
+        result = ValidationResult(
+            valid=False,
+            error_code=ErrorCode.CAPABILITY_NOT_FOUND,
+            error_message=f"Target agent not registered: {target_id}"
+        )
+    for i in indices:
+        results[i] = result
+
+
+def _shard_main(shard_id: int, conn) -> None:
+    """
+    Worker process loop: serve requests from the front router.
+
+    Requests are (op, args) tuples; replies are (True, value) or
+    (False, error message).
+    """
+    broker = ProtocolBrokerAgent()
+    delivered: Dict[str, int] = {}
+
+    def initiate_handshake(*args: Any) -> ValidationResult:
+        # Tell the front router when to forget the handshake
+        result = broker.initiate_handshake(*args)
+        if result.valid:
+            result.details["timeout_seconds"] = broker.handshake_manager.timeout_seconds
+        return result
+
+    def terminate_contract(contract_id: str) -> ValidationResult:
+        collaboration = broker._collaborations_by_contract.get(contract_id)
+        if collaboration:
+            return broker.terminate_collaboration(collaboration.collaboration_id)
+        if broker.contract_store.terminate_contract(contract_id):
+            return ValidationResult(valid=True)
+        return ValidationResult(
+            valid=False,
+            error_code=ErrorCode.CONTRACT_VIOLATION,
+            error_message=f"Contract not found: {contract_id}"
+        )
+
+    def route(messages: List[ProtocolMessage]) -> List[Optional[ValidationResult]]:
+        # Admit here; deliver locally, leave None for targets on other shards
+        results, groups = broker._admit_many(messages)
+        for (target_id, _), indices in groups.items():
+            if broker.message_router.is_agent_registered(target_id):
+                _deliver(broker, messages, indices, target_id, results, delivered)
+        return results
+
+    def deliver(messages: List[ProtocolMessage]) -> List[Optional[ValidationResult]]:
+        # Already admitted on the contract's shard
+        results: List[Optional[ValidationResult]] = [None] * len(messages)
+        groups: Dict[str, List[int]] = {}
+        for i, message in enumerate(messages):
+            groups.setdefault(message.target_agent.agent_id, []).append(i)
+        for target_id, indices in groups.items():
+            _deliver(broker, messages, indices, target_id, results, delivered)
+        return results
+
+    def stats() -> Dict[str, Any]:
+        return {
+            "shard_id": shard_id,
+            "pid": os.getpid(),
+            "agents": sorted(broker.message_router.routes),
+            "handshakes": len(broker.handshake_manager.handshakes),
+            "contracts": len(broker.contract_store.contracts),
+            "collaborations": len(broker.collaborations),
+            "delivered": dict(delivered)
+        }
+
+    operations: Dict[str, Callable] = {
+        "register_agent": broker.register_agent,
+        "unregister_agent": broker.unregister_agent,
+        "initiate_handshake": initiate_handshake,
+        "accept_handshake": broker.accept_handshake,
+        "terminate_contract": terminate_contract,
+        "route": route,
+        "deliver": deliver,
+        "stats": stats,
+    }
+
+    while True:
+        try:
+            op, args = conn.recv()
+        except EOFError:
+            return
+        if op == "stop":
+            conn.send((True, None))
+            return
+        try:
+            conn.send((True, operations[op](*args)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+class ShardedProtocolBroker:
+    """
+    Front router for a set of ProtocolBrokerAgent worker processes.
+
+    Handlers run inside the worker that owns their agent, so they must be
+    picklable (module-level functions or instances of module-level
+    classes) and report results through their own side effects.
+
+    Requests to different shards in one route_many() call run in parallel;
+    the front router itself serializes calls, so use large batches.
+
+    Usage:
+        with ShardedProtocolBroker(num_shards=4) as broker:
+            broker.register_agent("agent-b", CountingHandler())
+            results = broker.route_many(messages)
+    """
+
+    def __init__(
+        self,
+        num_shards: int = 0,
+        replicas: int = 100,
+        mp_context: Optional[str] = None,
+        expiry_scheduler: Optional[ExpiryScheduler] = None
+    ):
+        """
+        Initialize sharded broker.
+
+        Args:
+            num_shards: Worker processes (0 uses one per CPU)
+            replicas: Virtual nodes per shard on the hash ring
+            mp_context: multiprocessing start method (default for platform)
+            expiry_scheduler: Scheduler for forgetting expired handshakes
+                              (created if omitted)
+        """
+        self.num_shards = num_shards or multiprocessing.cpu_count()
+        self.ring = ConsistentHashRing(list(range(self.num_shards)), replicas=replicas)
+        self._context = multiprocessing.get_context(mp_context)
+        self._processes: List[multiprocessing.Process] = []
+        self._connections: List[Any] = []
+        self._handshake_shards: Dict[str, int] = {}  # handshake_id -> shard
+        self._contract_shards: Dict[str, int] = {}  # contract_id -> owning shard
+        self.expiry_scheduler = (
+            expiry_scheduler if expiry_scheduler is not None else ExpiryScheduler()
+        )
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start worker processes."""
+        with self._lock:
+            if self._processes:
+                return
+            for shard_id in range(self.num_shards):
+                parent_conn, child_conn = self._context.Pipe()
+                process = self._context.Process(
+                    target=_shard_main,
+                    args=(shard_id, child_conn),
+                    name=f"broker-shard-{shard_id}",
+                    daemon=True
+                )
+                process.start()
+                child_conn.close()
+                self._processes.append(process)
+                self._connections.append(parent_conn)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop worker processes."""
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.send(("stop", ()))
+                    conn.recv()
+                except (EOFError, OSError):
+                    pass
+                conn.close()
+            for process in self._processes:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+            self._processes = []
+            self._connections = []
+
+    def shard_for(self, agent_id: str) -> int:
+        """Get the shard that owns an agent."""
+        return self.ring.get_node(agent_id)
+
+    def register_agent(self, agent_id: str, handler: Callable) -> None:
+        """
+        Register an agent on its owning shard.
+
+        Args:
+            agent_id: Agent ID
+            handler: Picklable callable that accepts ProtocolMessage
+        """
+        self._call(self.shard_for(agent_id), "register_agent", agent_id, handler)
+
+    def unregister_agent(self, agent_id: str) -> None:
+        """Unregister an agent from its owning shard."""
+        self._call(self.shard_for(agent_id), "unregister_agent", agent_id)
+
+    def initiate_handshake(
+        self,
+        source_agent_id: str,
+        target_agent_id: str,
+        intent: str,
+        codecs: Optional[List[str]] = None
+    ) -> ValidationResult:
+        """
+        Initiate a handshake on the target agent's shard.
+
+        Args:
+            source_agent_id: Source agent ID
+            target_agent_id: Target agent ID
+            intent: Requested intent
+            codecs: Wire codecs the source supports, in preference order
+
+        Returns:
+            ValidationResult with handshake ID if successful
+        """
+        self.expiry_scheduler.run_pending()
+
+        shard = self.shard_for(target_agent_id)
+        result = self._call(shard, "initiate_handshake", source_agent_id, target_agent_id, intent, codecs)
+        if result.valid:
+            handshake_id = result.details["handshake_id"]
+            with self._lock:
+                self._handshake_shards[handshake_id] = shard
+            self.expiry_scheduler.schedule(
+                ("handshake", handshake_id),
+                result.details.pop("timeout_seconds"),
+                lambda: self._forget_handshake(handshake_id)
+            )
+        return result
+
+    def accept_handshake(
+        self,
+        handshake_id: str,
+        codecs: Optional[List[str]] = None
+    ) -> ValidationResult:
+        """
+        Accept a handshake; the contract is owned by the handshake's shard.
+
+        Args:
+            handshake_id: Handshake ID
+            codecs: Wire codecs the target supports
+
+        Returns:
+            ValidationResult with contract ID if successful
+        """
+        self.expiry_scheduler.run_pending()
+
+        with self._lock:
+            shard = self._handshake_shards.pop(handshake_id, None)
+        if shard is None:
+            return ValidationResult(
+                valid=False,
+                error_code=ErrorCode.TIMEOUT,
+                error_message="Handshake not found or expired"
+            )
+        self.expiry_scheduler.cancel(("handshake", handshake_id))
+
+        result = self._call(shard, "accept_handshake", handshake_id, codecs)
+        if result.valid:
+            with self._lock:
+                self._contract_shards[result.details["contract_id"]] = shard
+        return result
+
+    def terminate_contract(self, contract_id: str) -> ValidationResult:
+        """
+        Terminate a contract and its collaboration on the owning shard.
+
+        Later messages on the contract are rejected as contract violations.
+
+        Args:
+            contract_id: Contract ID
+
+        Returns:
+            ValidationResult indicating success
+        """
+        with self._lock:
+            shard = self._contract_shards.pop(contract_id, None)
+        if shard is None:
+            return ValidationResult(
+                valid=False,
+                error_code=ErrorCode.CONTRACT_VIOLATION,
+                error_message=f"Contract not found: {contract_id}"
+            )
+        return self._call(shard, "terminate_contract", contract_id)
+
+    def _forget_handshake(self, handshake_id: str) -> None:
+        """Drop the shard of a handshake that expired unaccepted."""
+        with self._lock:
+            self._handshake_shards.pop(handshake_id, None)
+
+    def route_message(self, message: ProtocolMessage) -> ValidationResult:
+        """
+        Route a protocol message through its shard.
+
+        Args:
+            message: Protocol message
+
+        Returns:
+            ValidationResult indicating success or failure
+        """
+        return self.route_many([message])[0]
+
+    def route_many(self, messages: List[ProtocolMessage]) -> List[ValidationResult]:
+        """
+        Route a batch of protocol messages across shards.
+
+        Each message is admitted on its contract's shard (or its target's
+        shard if it has no known contract); admitted messages whose target
+        lives on another shard are then forwarded there for delivery. Each
+        phase sends one request per shard and waits for all in parallel.
+
+        Args:
+            messages: Protocol messages
+
+        Returns:
+            ValidationResult per message, in input order
+        """
+        admission: Dict[int, List[int]] = {}
+        for i, message in enumerate(messages):
+            shard = self._contract_shards.get(message.contract_id) if message.contract_id else None
+            if shard is None:
+                shard = self.shard_for(message.target_agent.agent_id)
+            admission.setdefault(shard, []).append(i)
+
+        results: List[Optional[ValidationResult]] = [None] * len(messages)
+        forward: Dict[int, List[int]] = {}
+
+        for shard, indices, shard_results in self._scatter("route", messages, admission):
+            for i, result in zip(indices, shard_results):
+                if result is None:
+                    target_shard = self.shard_for(messages[i].target_agent.agent_id)
+                    forward.setdefault(target_shard, []).append(i)
+                else:
+                    results[i] = result
+
+        for shard, indices, shard_results in self._scatter("deliver", messages, forward):
+            for i, result in zip(indices, shard_results):
+                results[i] = result
+
+        return results
+
+    def get_shard_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get per-shard statistics.
+
+        Returns:
+            One dictionary per shard (agents, contracts, delivered counts, ...)
+        """
+        return [self._call(shard, "stats") for shard in range(self.num_shards)]
+
+    def _call(self, shard: int, op: str, *args: Any) -> Any:
+        """Send one request to a shard and wait for its reply."""
+        with self._lock:
+            conn = self._connection(shard)
+            conn.send((op, args))
+            return self._reply(shard, conn)
+
+    def _scatter(
+        self,
+        op: str,
+        messages: List[ProtocolMessage],
+        by_shard: Dict[int, List[int]]
+    ) -> List[Tuple[int, List[int], List[Optional[ValidationResult]]]]:
+        """Send one batch per shard, then gather every reply."""
+        with self._lock:
+            for shard, indices in by_shard.items():
+                self._connection(shard).send((op, ([messages[i] for i in indices],)))
+
+            # Drain every reply before raising so no pipe is left out of step
+            replies = []
+            error: Optional[ShardError] = None
+            for shard, indices in by_shard.items():
+                try:
+                    replies.append((shard, indices, self._reply(shard, self._connection(shard))))
+                except ShardError as e:
+                    error = error or e
+            if error:
+                raise error
+            return replies
+
+    def _connection(self, shard: int):
+        """Get the pipe to a shard (lock held)."""
+        if not self._connections:
+            raise ShardError("Sharded broker is not started")
+        return self._connections[shard]
+
+    def _reply(self, shard: int, conn) -> Any:
+        """Receive a shard reply, raising ShardError on failure."""
+        try:
+            ok, value = conn.recv()
+        except EOFError:
+            raise ShardError(f"Shard {shard} exited")
+        if not ok:
+            raise ShardError(f"Shard {shard} failed: {value}")
+        return value
+
+    def __enter__(self) -> "ShardedProtocolBroker":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -11,6 +11,9 @@ from datetime import datetime
 # import jwt  # TODO: Install PyJWT for JWT validation
 import json
 
+from .message import ProtocolMessage, Agent, Security, ErrorResponse
+from .schema import SchemaError, compile_schema, compatibility_issues, normalize_schema
+
 
 @dataclass
 class ValidationResult:
@@ -21,6 +24,25 @@ class ValidationResult:
     error_message: Optional[str] = None
     details: Optional[Dict[str, Any]] = None
 
+    def to_error_response(self, correlation_id: Optional[str] = None) -> ErrorResponse:
+        """
+        Convert a failed result to a protocol ErrorResponse.
+
+        Args:
+            correlation_id: Correlation ID of the rejected message, if any
+
+        Returns:
+            ErrorResponse carrying retry_after from details (0 if absent)
+        """
+        details = self.details or {}
+        return ErrorResponse(
+            code=self.error_code or "INTERNAL_ERROR",
+            message=self.error_message or "",
+            details=self.details,
+            retry_after=details.get("retry_after", 0),
+            correlation_id=correlation_id
+        )
+
 
 class MessageValidator:
     """
@@ -36,6 +58,15 @@ class MessageValidator:
     MAX_MESSAGE_SIZE_BYTES = 1_000_000  # 1 MB
     MAX_PAYLOAD_SIZE_BYTES = 900_000    # 900 KB
 
+    # Re-encoding a from_json() message canonically can grow it by at most this
+    # factor (worst case: short float literals such as "1E15"; non-ASCII text
+    # escapes to \uXXXX at <= 3x), plus slack for fields from_dict() defaults.
+    WIRE_EXPANSION_FACTOR = 6
+    WIRE_EXPANSION_SLACK_BYTES = 512
+
+    VALID_MESSAGE_TYPES = ("request", "response", "event", "error")
+    VALID_ENCRYPTION = ("none", "aes256")
+
     def __init__(self):
         self.required_fields = [
             "protocol_version",
@@ -120,6 +151,115 @@ class MessageValidator:
 
         return ValidationResult(valid=True)
 
+    def validate_message(self, message: ProtocolMessage) -> ValidationResult:
+        """
+        Validate a ProtocolMessage directly, without building its dictionary.
+
+        Applies the same checks and error codes as validate(message.to_dict())
+        using typed field checks. Sizes come from message.encoded_sizes()
+        (one payload serialization, cached on the message). For messages
+        decoded by ProtocolMessage.from_json, the received wire size bounds
+        the encoded size, so small messages skip serialization entirely.
+
+        Args:
+            message: Protocol message
+
+        Returns:
+            ValidationResult with validation status
+        """
+        payload_size = None
+        wire_size = message.wire_size
+        wire_bound = None
+        if wire_size is not None:
+            wire_bound = wire_size * self.WIRE_EXPANSION_FACTOR + self.WIRE_EXPANSION_SLACK_BYTES
+
+        # Check message size
+        if wire_bound is None or wire_bound > self.MAX_PAYLOAD_SIZE_BYTES:
+            message_size, payload_size = message.encoded_sizes()
+            if message_size > self.MAX_MESSAGE_SIZE_BYTES:
+                return ValidationResult(
+                    valid=False,
+                    error_code="MESSAGE_TOO_LARGE",
+                    error_message=f"Message size exceeds {self.MAX_MESSAGE_SIZE_BYTES} bytes"
+                )
+
+        # Check required fields (the timestamp stays unformatted)
+        for name in ("protocol_version", "message_id", "timestamp"):
+            present = message.has_timestamp if name == "timestamp" else isinstance(getattr(message, name), str)
+            if not present:
+                return ValidationResult(
+                    valid=False,
+                    error_code="MISSING_REQUIRED_FIELD",
+                    error_message=f"Required field missing: {name}"
+                )
+
+        # Validate protocol version
+        if not self._validate_protocol_version(message.protocol_version):
+            return ValidationResult(
+                valid=False,
+                error_code="INVALID_PROTOCOL_VERSION",
+                error_message=f"Invalid protocol version: {message.protocol_version}"
+            )
+
+        # Validate message type
+        if message.message_type not in self.VALID_MESSAGE_TYPES:
+            return ValidationResult(
+                valid=False,
+                error_code="INVALID_MESSAGE_TYPE",
+                error_message=f"Message type must be one of: {list(self.VALID_MESSAGE_TYPES)}"
+            )
+
+        # Validate agent structures
+        for agent_field in ("source_agent", "target_agent"):
+            agent = getattr(message, agent_field)
+            if not (
+                isinstance(agent, Agent) and
+                isinstance(agent.agent_id, str) and
+                isinstance(agent.domain, str) and
+                isinstance(agent.version, str)
+            ):
+                return ValidationResult(
+                    valid=False,
+                    error_code="INVALID_AGENT_STRUCTURE",
+                    error_message=f"Invalid {agent_field} structure"
+                )
+
+        # Validate security structure
+        security = message.security
+        if not (
+            isinstance(security, Security) and
+            isinstance(security.auth_token, str) and
+            security.encryption in self.VALID_ENCRYPTION
+        ):
+            return ValidationResult(
+                valid=False,
+                error_code="INVALID_SECURITY_STRUCTURE",
+                error_message="Invalid security structure"
+            )
+
+        # Validate payload size (already bounded when the wire bound fits)
+        if payload_size is not None and payload_size > self.MAX_PAYLOAD_SIZE_BYTES:
+            return ValidationResult(
+                valid=False,
+                error_code="PAYLOAD_TOO_LARGE",
+                error_message=f"Payload size exceeds {self.MAX_PAYLOAD_SIZE_BYTES} bytes"
+            )
+
+        return ValidationResult(valid=True)
+
+    def validate_many(self, messages: List[ProtocolMessage]) -> List[ValidationResult]:
+        """
+        Validate a batch of ProtocolMessages.
+
+        Args:
+            messages: Protocol messages
+
+        Returns:
+            ValidationResult per message, in input order
+        """
+        validate = self.validate_message
+        return [validate(message) for message in messages]
+
     def _validate_protocol_version(self, version: Any) -> bool:
         """Check protocol version format (e.g., '1.0')."""
         if not isinstance(version, str):
@@ -240,6 +380,14 @@ class ContractValidator:
                     error_code="INVALID_CONTRACT",
                     error_message=f"Invalid {schema_field}: must be a dictionary"
                 )
+            try:
+                compile_schema(contract[schema_field])
+            except SchemaError as e:
+                return ValidationResult(
+                    valid=False,
+                    error_code="INVALID_CONTRACT",
+                    error_message=f"Invalid {schema_field}: {e}"
+                )
 
         return ValidationResult(valid=True)
 
@@ -251,25 +399,40 @@ class ContractValidator:
         """
         Check if provided schema is compatible with expected schema.
 
+        Compatible means every value valid under the provided schema is
+        valid under the expected one: nested properties, types, required
+        fields, enums and bounds are compared structurally. Results are
+        cached by schema hash.
+
         Args:
             provided_schema: Schema provided by source agent
             expected_schema: Schema expected by target agent
 
         Returns:
-            ValidationResult with compatibility status
+            ValidationResult with compatibility status; on mismatch details
+            hold the issues found and the missing top-level fields
         """
-        # Simple key-based compatibility check
-        # In production, this would use JSON Schema validation
-        provided_keys = set(provided_schema.keys())
-        expected_keys = set(expected_schema.keys())
+        try:
+            issues = compatibility_issues(provided_schema, expected_schema)
+        except SchemaError as e:
+            return ValidationResult(
+                valid=False,
+                error_code="SCHEMA_MISMATCH",
+                error_message=f"Invalid schema: {e}"
+            )
 
-        missing_keys = expected_keys - provided_keys
-        if missing_keys:
+        if issues:
+            provided_fields = normalize_schema(provided_schema).get("properties") or {}
+            missing = [
+                name for name in normalize_schema(expected_schema).get("required") or ()
+                if name not in provided_fields
+            ]
             return ValidationResult(
                 valid=False,
                 error_code="SCHEMA_MISMATCH",
-                error_message="Provided schema missing required fields",
-                details={"missing_fields": list(missing_keys)}
+                error_message="Provided schema missing required fields" if missing
+                else "Provided schema incompatible with expected schema",
+                details={"missing_fields": missing, "issues": list(issues)}
             )
 
         return ValidationResult(valid=True)
@@ -0,0 +1,272 @@
+"""
+Performance tests for capability discovery.
+
+Checks that indexed queries stay sub-millisecond with thousands of
+registered agents.
+"""
+
+import time
+import pytest
+from src.a_domain.protocol.discovery import CapabilityDiscoveryAgent, CapabilityQuery, DiscoveryCache
+
+
+AGENT_COUNT = 5000
+
+
+@pytest.fixture(scope="module")
+def discovery():
+    """Discovery agent with 5000 agents over 20 domains and 200 intents (uncached queries)."""
+    discovery = CapabilityDiscoveryAgent(cache_size=0)
+    for i in range(AGENT_COUNT):
+        discovery.register_capability(
+            agent_id=f"agent-{i}",
+            domain=f"domain-{i % 20}",
+            version=f"{i % 3}.{i % 10}.0",
+            intents=[f"intent_{i % 200}", f"intent_{(i * 7) % 200}"],
+            input_schema={},
+            output_schema={},
+            provides=[f"capability_{i % 100}"],
+            requires=[f"capability_{(i + 1) % 100}"],
+            description=f"Agent {i} handles workload {i % 50} for tenant {i % 500}"
+        )
+    return discovery
+
+
+def mean_latency_ms(fn, iterations: int = 500) -> float:
+    """Average latency of fn() in milliseconds."""
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+class TestDiscoveryPerformance:
+    """Discovery latency tests."""
+
+    @pytest.mark.parametrize("name,query", [
+        ("intent", CapabilityQuery(intents=["intent_7"])),
+        ("provides", CapabilityQuery(provides=["capability_42"])),
+        ("intent+domain+version", CapabilityQuery(
+            intents=["intent_7"], domain="domain-7", min_version="1.0.0", max_version="2.0.0"
+        )),
+        ("text top-10", CapabilityQuery(text="workload 12 tenant 312", limit=10)),
+        ("domain top-5", CapabilityQuery(domain="domain-3", limit=5)),
+    ])
+    def test_query_latency_sub_millisecond(self, discovery, name, query):
+        """Test indexed queries over 5000 agents average under 1ms."""
+        latency = mean_latency_ms(lambda: discovery.discover(query))
+        matches = discovery.discover(query)
+
+        print(f"\nDiscovery '{name}' over {AGENT_COUNT} agents: {latency:.3f}ms ({len(matches)} matches)")
+
+        assert matches
+        assert latency < 1.0
+
+    def test_index_beats_full_scan(self, discovery):
+        """Test a provides query is faster than scanning every capability."""
+        def full_scan():
+            return [
+                cap for cap in discovery.registry.get_all_capabilities()
+                if "capability_42" in cap.provides
+            ]
+
+        scan = mean_latency_ms(full_scan, iterations=100)
+        indexed = mean_latency_ms(lambda: discovery.discover_by_capability("capability_42"), iterations=100)
+
+        print(f"\nProvides lookup: scan {scan:.3f}ms, indexed {indexed:.3f}ms")
+
+        assert len(discovery.discover_by_capability("capability_42")) == len(full_scan())
+        assert indexed < scan
+
+    def test_result_cache_and_stats(self, discovery):
+        """Test cached discovery and epoch-cached stats beat recomputation."""
+        def scan_stats():
+            domains, intents = {}, set()
+            for cap in discovery.registry.get_all_capabilities():
+                domains[cap.domain] = domains.get(cap.domain, 0) + 1
+                intents.update(cap.intents)
+            return domains, intents
+
+        uncached = mean_latency_ms(lambda: discovery.discover_by_intent("intent_7"), iterations=200)
+        discovery.discovery_cache = DiscoveryCache()
+        try:
+            cached = mean_latency_ms(lambda: discovery.discover_by_intent("intent_7"), iterations=200)
+            assert discovery.discover_by_intent("intent_7") == discovery.discover_by_intent("intent_7")
+        finally:
+            discovery.discovery_cache = None
+
+        scan = mean_latency_ms(scan_stats, iterations=20)
+        stats = mean_latency_ms(discovery.get_registry_stats, iterations=200)
+        domains, intents = scan_stats()
+
+        print(f"\nDiscovery by intent: uncached {uncached * 1000:.1f}us, cached {cached * 1000:.1f}us")
+        print(f"Registry stats: scan {scan:.3f}ms, epoch-cached {stats * 1000:.1f}us")
+
+        assert discovery.get_registry_stats()["domain_distribution"] == domains
+        assert discovery.get_registry_stats()["intents"] == sorted(intents)
+        assert cached < uncached / 2
+        assert stats < scan / 10
+
+
+def read_rate_with_writer(snapshot_reads: bool, duration: float = 0.5) -> dict:
+    """Run 4 reader threads against one writer; return reads/s and writes/s."""
+    import threading
+
+    discovery = CapabilityDiscoveryAgent(snapshot_reads=snapshot_reads)
+    for i in range(1000):
+        discovery.register_capability(
+            agent_id=f"agent-{i}",
+            domain=f"domain-{i % 10}",
+            version="1.0.0",
+            intents=[f"intent_{i % 100}"],
+            input_schema={},
+            output_schema={}
+        )
+    registry = discovery.registry
+    stop = threading.Event()
+    reads = [0] * 4
+    writes = [0]
+
+    def reader(slot):
+        count = 0
+        while not stop.is_set():
+            for agent_id in registry.find_by_intent(f"intent_{count % 100}"):
+                registry.get_capability(agent_id)
+            count += 1
+        reads[slot] = count
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            discovery.register_capability(
+                agent_id=f"agent-{i % 1000}",
+                domain=f"domain-{i % 10}",
+                version="1.0.1",
+                intents=[f"intent_{i % 100}"],
+                input_schema={},
+                output_schema={}
+            )
+            i += 1
+            time.sleep(0.001)  # Read-heavy mix: writes are comparatively rare
+        writes[0] = i
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(4)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {"reads": sum(reads) / duration, "writes": writes[0] / duration}
+
+
+class TestSnapshotReadPerformance:
+    """Copy-on-write snapshot read throughput."""
+
+    def test_snapshot_reads_outpace_locked_reads(self):
+        """Test lock-free snapshot reads beat locked reads under a concurrent writer."""
+        locked = read_rate_with_writer(snapshot_reads=False)
+        snapshot = read_rate_with_writer(snapshot_reads=True)
+
+        print(f"\nRegistry reads (find_by_intent + get_capability per match) with a concurrent writer:")
+        print(f"  locked:   {locked['reads']:.0f} queries/s ({locked['writes']:.0f} writes/s)")
+        print(f"  snapshot: {snapshot['reads']:.0f} queries/s ({snapshot['writes']:.0f} writes/s)")
+
+        assert snapshot["writes"] > 0
+        assert snapshot["reads"] > locked["reads"]
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    """2000 agents with three versions each, 20 agents per intent."""
+    discovery = CapabilityDiscoveryAgent()
+    for i in range(2000):
+        for version in ("1.4.0", "1.10.2", "2.0.0"):
+            discovery.register_capability(
+                agent_id=f"agent-{i}",
+                domain=f"domain-{i % 20}",
+                version=version,
+                intents=[f"intent_{i % 100}"],
+                input_schema={},
+                output_schema={}
+            )
+    return discovery
+
+
+class TestVersionResolutionPerformance:
+    """Semver resolution latency on a fleet mid rolling-upgrade."""
+
+    def test_range_resolution_sub_millisecond(self, fleet):
+        """Test per-agent range lookups and uncached best-version lookups stay well under 1ms."""
+        registry = fleet.registry
+        resolve = mean_latency_ms(lambda: fleet.get_capability_schema("agent-7", "^1.2"), iterations=2000)
+
+        counter = [0]
+
+        def uncached():
+            counter[0] += 1
+            registry.best_version_cache.clear()
+            return registry.best_for_intent(f"intent_{counter[0] % 100}", "^1")
+
+        best_uncached = mean_latency_ms(uncached, iterations=2000)
+        best_cached = mean_latency_ms(lambda: registry.best_for_intent("intent_3", "^1"), iterations=2000)
+
+        print(f"\nVersion resolution over 6000 registered versions:")
+        print(f"  agent range lookup:  {resolve * 1000:.1f}us")
+        print(f"  best for intent:     {best_uncached * 1000:.1f}us uncached, {best_cached * 1000:.1f}us cached")
+
+        assert fleet.get_capability_schema("agent-7", "^1.2").version == "1.10.2"
+        assert registry.best_for_intent("intent_3", "^1").version == "1.10.2"
+        assert resolve < 0.1
+        assert best_uncached < 0.1
+        assert best_cached <= best_uncached
+
+
+class TestCompatibilityMatrixPerformance:
+    """Compatibility matrix fill and refresh costs."""
+
+    @staticmethod
+    def make_discovery(count: int) -> CapabilityDiscoveryAgent:
+        discovery = CapabilityDiscoveryAgent()
+        for i in range(count):
+            discovery.register_capability(
+                agent_id=f"agent-{i:04d}",
+                domain="test",
+                version="1.0.0",
+                intents=["test"],
+                input_schema={f"field_{i % 7}": "string"},
+                output_schema={f"field_{j}": "string" for j in range(i % 5, i % 5 + 3)}
+            )
+        return discovery
+
+    def test_schema_change_refresh_is_targeted(self):
+        """Test one agent's schema change refreshes its pairs only, far faster than a rebuild."""
+        count = 400
+        pairs = count * (count - 1) // 2
+        discovery = self.make_discovery(count)
+
+        start = time.perf_counter()
+        assert discovery.precompute_all() == pairs
+        fill = time.perf_counter() - start
+
+        start = time.perf_counter()
+        discovery.register_capability(
+            agent_id="agent-0007",
+            domain="test",
+            version="1.1.0",
+            intents=["test"],
+            input_schema={"new_field": "string"},
+            output_schema={}
+        )
+        refresh = time.perf_counter() - start
+
+        print(f"\nCompatibility matrix ({count} agents, {pairs} pairs):")
+        print(f"  precompute_all: {fill * 1000:.1f}ms")
+        print(f"  schema change:  {refresh * 1000:.2f}ms ({count - 1} pairs recomputed)")
+
+        assert len(discovery.compatibility_matrix) == pairs
+        assert discovery.compatibility_matrix.get_compatibility("agent-0007", "agent-0001").compatible is False
+        assert refresh < fill / 20
@@ -0,0 +1,79 @@
+"""
+Memory and construction benchmarks for ProtocolMessage.
+
+Measures bytes per retained message and construction cost for a replay
+buffer of messages. Runs 100k messages by default; set
+A2ACP_BENCH_RETAINED_MESSAGES=1000000 for the full 1M benchmark.
+"""
+
+import os
+import pytest
+import time
+import tracemalloc
+from src.a_domain.protocol.message import ProtocolMessage, Agent, Security
+
+
+RETAINED_MESSAGES = int(os.environ.get("A2ACP_BENCH_RETAINED_MESSAGES", "100000"))
+
+
+def build_replay_buffer(count: int):
+    """Build a list of retained messages, as a replay buffer would hold them."""
+    security = Security(auth_token="test-token")
+    return [
+        ProtocolMessage(
+            source_agent=Agent.intern("sender", "test", "1.0.0"),
+            target_agent=Agent.intern(f"receiver-{i % 10}", "test", "1.0.0"),
+            message_type="request",
+            intent="test",
+            payload={"index": i},
+            security=security
+        )
+        for i in range(count)
+    ]
+
+
+class TestMessageMemory:
+    """Replay buffer memory and construction benchmarks."""
+
+    def test_retained_message_footprint(self):
+        """Test bytes per retained message and construction cost."""
+        start = time.perf_counter()
+        buffer = build_replay_buffer(RETAINED_MESSAGES)
+        construction_us = (time.perf_counter() - start) / RETAINED_MESSAGES * 1e6
+        del buffer
+
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            buffer = build_replay_buffer(RETAINED_MESSAGES)
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        bytes_per_message = (after - before) / RETAINED_MESSAGES
+
+        print(f"\nRetained Message Footprint ({RETAINED_MESSAGES} messages):")
+        print(f"  Bytes per message: {bytes_per_message:.0f}")
+        print(f"  Construction: {construction_us:.2f} us/message")
+
+        message = buffer[0]
+        assert not hasattr(message, "__dict__")  # Slotted
+        assert message.source_agent is buffer[-1].source_agent  # Interned
+        assert message.timestamp.endswith("Z")
+
+        # Message object, uuid string, payload dict and list slot
+        assert bytes_per_message < 650
+
+    def test_interned_decoding(self):
+        """Test decoded messages share Agent instances."""
+        wire = build_replay_buffer(2)[0].to_json()
+
+        first = ProtocolMessage.from_json(wire)
+        second = ProtocolMessage.from_json(wire)
+
+        assert first.source_agent is second.source_agent
+        assert first.target_agent is second.target_agent
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
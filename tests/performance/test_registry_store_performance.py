@@ -0,0 +1,95 @@
+"""
+Performance tests for the persistent capability registry.
+
+Stores 10,000 capabilities and checks that a restart loads them through
+the snapshot file well under a second, with the indexes built only when
+the first query needs them.
+"""
+
+import time
+import pytest
+from src.a_domain.protocol.discovery import CapabilityDiscoveryAgent, CapabilitySpec
+from src.a_domain.protocol.registry_store import SQLiteRegistryStore
+
+
+AGENTS = 10000
+
+
+def make_capability(index: int) -> CapabilitySpec:
+    return CapabilitySpec(
+        agent_id=f"agent-{index}",
+        domain=f"domain_{index % 20}",
+        version=f"1.{index % 5}.0",
+        intents=[f"intent_{index % 200}", f"intent_{(index + 7) % 200}"],
+        input_schema={"query": "string", "limit": "integer"},
+        output_schema={"result": "string", "count": "integer"},
+        requires=[f"capability_{(index + 1) % 100}"],
+        provides=[f"capability_{index % 100}"],
+        description=f"Agent {index} handles domain {index % 20} workloads"
+    )
+
+
+def elapsed_ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+@pytest.fixture(scope="module")
+def stored(tmp_path_factory):
+    """Registry database holding 10k capabilities, closed with a current snapshot."""
+    path = str(tmp_path_factory.mktemp("registry") / "registry.db")
+    with SQLiteRegistryStore(path, synchronous=False) as store:
+        discovery = CapabilityDiscoveryAgent(store=store)
+        discovery.registry.register_many([make_capability(i) for i in range(AGENTS)])
+    return path
+
+
+class TestRegistryStorePerformance:
+    """Warm start and write-behind costs."""
+
+    def test_cold_start(self, stored):
+        """Test a restart with 10k capabilities takes well under a second."""
+        def start():
+            store = SQLiteRegistryStore(stored, synchronous=False)
+            return store, CapabilityDiscoveryAgent(store=store)
+
+        startup, (store, discovery) = elapsed_ms(start)
+        try:
+            first_query, matches = elapsed_ms(lambda: discovery.discover_by_intent("intent_3"))
+            second_query, _ = elapsed_ms(lambda: discovery.discover_by_intent("intent_4"))
+            loads = store.get_metrics()["snapshot_loads"]
+        finally:
+            store.close()
+
+        print(f"\nCold start with {AGENTS} capabilities: {startup:.1f}ms")
+        print(f"First query (builds indexes): {first_query:.1f}ms, next query: {second_query:.3f}ms")
+
+        assert loads == 1
+        assert discovery.registry.get_agent_count() == AGENTS
+        assert len(matches) == 100
+        assert startup < 500
+        assert startup + first_query < 1000
+
+    def test_write_behind_batches_commits(self, tmp_path):
+        """Test write-behind registration beats committing every write."""
+        capabilities = [make_capability(i) for i in range(1000)]
+
+        def register_all(store, flush_each):
+            registry = CapabilityDiscoveryAgent(store=store).registry
+            for capability in capabilities:
+                registry.register(capability)
+                if flush_each:
+                    store.flush()
+            store.flush()
+
+        with SQLiteRegistryStore(str(tmp_path / "through.db"), synchronous=False) as store:
+            through, _ = elapsed_ms(lambda: register_all(store, flush_each=True))
+        with SQLiteRegistryStore(str(tmp_path / "behind.db"), synchronous=False) as store:
+            behind, _ = elapsed_ms(lambda: register_all(store, flush_each=False))
+            batches = store.get_metrics()["batches"]
+
+        print(f"\nRegister 1000: write-through {through:.1f}ms, write-behind {behind:.1f}ms ({batches} batches)")
+
+        assert batches < len(capabilities) / 10
+        assert behind < through / 2
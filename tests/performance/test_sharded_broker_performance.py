@@ -0,0 +1,97 @@
+"""
+Performance tests for ShardedProtocolBroker.
+
+Measures routing throughput as shards are added. Scaling is only asserted
+when the machine has enough cores to run the shards in parallel.
+"""
+
+import os
+import time
+import pytest
+from src.a_domain.protocol.broker import ProtocolBrokerAgent
+from src.a_domain.protocol.sharding import ShardedProtocolBroker
+from src.a_domain.protocol.message import ProtocolMessage, Agent, Security
+
+
+AGENTS = 32
+MESSAGES = 8000
+BATCH_SIZE = 1000
+MAX_SHARDS = 4
+
+
+class NullHandler:
+    """Picklable no-op handler."""
+
+    def __call__(self, message):
+        pass
+
+
+def make_messages(count: int):
+    """Create order-sized request messages spread over AGENTS targets."""
+    source = Agent.intern("sender", "test", "1.0.0")
+    security = Security(auth_token="test-token")
+    return [
+        ProtocolMessage(
+            source_agent=source,
+            target_agent=Agent.intern(f"agent-{i % AGENTS}", "test", "1.0.0"),
+            message_type="request",
+            intent="place_order",
+            payload={
+                "index": i,
+                "items": [{"sku": f"sku-{j}", "qty": j, "price": j * 1.5} for j in range(20)]
+            },
+            security=security
+        )
+        for i in range(count)
+    ]
+
+
+def throughput(broker) -> float:
+    """Route MESSAGES messages in batches and return messages per second."""
+    messages = make_messages(MESSAGES)
+
+    start = time.perf_counter()
+    for offset in range(0, MESSAGES, BATCH_SIZE):
+        results = broker.route_many(messages[offset:offset + BATCH_SIZE])
+        assert all(r.valid for r in results)
+    return MESSAGES / (time.perf_counter() - start)
+
+
+class TestShardedBrokerPerformance:
+    """Multi-core throughput tests."""
+
+    def test_throughput_scales_with_shards(self):
+        """Test routing throughput for 1..N shards against the in-process broker."""
+        cores = os.cpu_count() or 1
+        shard_counts = sorted({1, min(MAX_SHARDS, max(2, cores))})
+
+        single = ProtocolBrokerAgent()
+        for i in range(AGENTS):
+            single.register_agent(f"agent-{i}", NullHandler())
+        baseline = throughput(single)
+
+        rates = {}
+        for num_shards in shard_counts:
+            with ShardedProtocolBroker(num_shards=num_shards) as broker:
+                for i in range(AGENTS):
+                    broker.register_agent(f"agent-{i}", NullHandler())
+                rates[num_shards] = throughput(broker)
+
+                delivered = sum(
+                    sum(stats["delivered"].values()) for stats in broker.get_shard_stats()
+                )
+                assert delivered == MESSAGES
+
+        print(f"\nSharded Broker Throughput ({cores} cores, batch {BATCH_SIZE}):")
+        print(f"  in-process: {baseline:.0f} msg/s")
+        for num_shards, rate in rates.items():
+            print(f"  {num_shards} shard(s): {rate:.0f} msg/s ({rate / rates[1]:.2f}x)")
+
+        if cores < MAX_SHARDS:
+            pytest.skip(f"Scaling needs {MAX_SHARDS} cores, have {cores}")
+
+        assert rates[MAX_SHARDS] > rates[1] * 1.3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,167 @@
+"""
+Unit tests for Unit of Work Checkpoints
+
+Tests incremental checkpoint deltas and resuming executions interrupted
+mid-run without re-running completed tasks.
+"""
+
+import pytest
+
+from a_domain.journey.unit_of_work import TaskStatus, WorkStatus, Task, UnitOfWork
+from a_domain.journey.checkpoint import SQLiteCheckpointStore, CheckpointError
+from a_domain.journey.executor import UnitOfWorkExecutor, CheckpointNotFoundError
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-execution"""
+
+
+def make_task(task_id, depends_on=()):
+    return Task(
+        task_id=task_id,
+        name=task_id,
+        description="",
+        agent_id="agent",
+        intent="test",
+        input_schema={"large": "x" * 1000},
+        output_schema={},
+        depends_on=list(depends_on)
+    )
+
+
+def chain_uow(length=4):
+    tasks = [make_task("task-0")] + [make_task(f"task-{i}", [f"task-{i - 1}"]) for i in range(1, length)]
+    return UnitOfWork("uow-1", "sandbox", "client-123", tasks)
+
+
+class Recorder:
+    """Invoker logging calls, optionally crashing on one task"""
+
+    def __init__(self, crash_on=None):
+        self.calls = []
+        self.crash_on = crash_on
+
+    def __call__(self, task, task_results):
+        if task.task_id == self.crash_on:
+            raise Crash()
+        self.calls.append(task.task_id)
+        previous = [task_results[dep_id]["value"] for dep_id in task.depends_on]
+        return {"value": sum(previous) + 1}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoints.db")
+
+
+class TestCheckpointStore:
+    """Test base records and deltas"""
+
+    def test_deltas_replayed_on_load(self, path):
+        """Test loading applies deltas over the base record"""
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            UnitOfWorkExecutor(agent_invoker=Recorder(), checkpoint_store=store).execute(chain_uow())
+            uow = store.load("uow-1")
+
+        assert uow.status == WorkStatus.COMPLETED
+        assert [task.result["value"] for task in uow.tasks] == [1, 2, 3, 4]
+        assert all(task.completed_at is not None for task in uow.tasks)
+
+    def test_deltas_are_compact(self, path):
+        """Test deltas hold changed fields only, not the task definitions"""
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            UnitOfWorkExecutor(agent_invoker=Recorder(), checkpoint_store=store).execute(chain_uow())
+            metrics = store.get_metrics()
+
+        assert metrics["checkpoints"] == 1
+        assert metrics["deltas"] == 5  # One per task, one for the UoW outcome
+        assert metrics["delta_bytes"] < 1000
+
+    def test_missing_and_deleted(self, path):
+        """Test unknown and deleted work IDs have no checkpoint"""
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            assert store.load("missing") is None
+
+            store.begin(chain_uow())
+            assert store.list_work_ids() == ["uow-1"]
+            store.delete("uow-1")
+            assert store.load("uow-1") is None
+            assert store.list_work_ids() == []
+
+    def test_unserializable_result(self, path):
+        """Test results that are not JSON raise CheckpointError"""
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            with pytest.raises(CheckpointError):
+                store.append("uow-1", [{"task_id": "task-0", "result": object()}])
+
+    def test_closed(self, path):
+        """Test a closed store raises CheckpointError"""
+        store = SQLiteCheckpointStore(path, synchronous=False)
+        store.close()
+
+        with pytest.raises(CheckpointError):
+            store.load("uow-1")
+
+
+class TestResume:
+    """Test resuming interrupted executions"""
+
+    def test_resume_skips_completed_tasks(self, path):
+        """Test a crash mid-run resumes after the completed tasks, reusing their results"""
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            with pytest.raises(Crash):
+                UnitOfWorkExecutor(agent_invoker=Recorder(crash_on="task-2"), checkpoint_store=store).execute(chain_uow())
+
+        # Restarted process
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            assert store.list_work_ids(WorkStatus.IN_PROGRESS) == ["uow-1"]
+
+            invoker = Recorder()
+            result = UnitOfWorkExecutor(agent_invoker=invoker, checkpoint_store=store).resume("uow-1")
+
+            assert result.success
+            assert invoker.calls == ["task-2", "task-3"]
+            assert result.completed_tasks == ["task-0", "task-1", "task-2", "task-3"]
+            assert result.task_results["task-3"] == {"value": 4}
+            assert store.load("uow-1").status == WorkStatus.COMPLETED
+
+    def test_resume_finished(self, path):
+        """Test resuming a finished UoW returns its outcome without running tasks"""
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            UnitOfWorkExecutor(agent_invoker=Recorder(), checkpoint_store=store).execute(chain_uow())
+
+            invoker = Recorder()
+            result = UnitOfWorkExecutor(agent_invoker=invoker, checkpoint_store=store).resume("uow-1")
+
+        assert result.success
+        assert invoker.calls == []
+        assert result.task_results["task-3"] == {"value": 4}
+
+    def test_retry_count_checkpointed(self, path):
+        """Test retries spent before a crash are recorded with the task"""
+        attempts = []
+
+        def flaky(task, task_results):
+            attempts.append(task.task_id)
+            if task.task_id == "task-0" and len(attempts) == 1:
+                raise RuntimeError("transient")
+            if task.task_id == "task-1":
+                raise Crash()
+            return {"value": 1}
+
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            with pytest.raises(Crash):
+                UnitOfWorkExecutor(agent_invoker=flaky, checkpoint_store=store).execute(chain_uow(2))
+            uow = store.load("uow-1")
+
+        assert uow.tasks[0].status == TaskStatus.COMPLETED
+        assert uow.tasks[0].retry_count == 1
+
+    def test_resume_errors(self, path):
+        """Test resuming needs a store and an existing checkpoint"""
+        with pytest.raises(ValueError):
+            UnitOfWorkExecutor().resume("uow-1")
+
+        with SQLiteCheckpointStore(path, synchronous=False) as store:
+            with pytest.raises(CheckpointNotFoundError):
+                UnitOfWorkExecutor(checkpoint_store=store).resume("uow-1")
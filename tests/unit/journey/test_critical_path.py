@@ -0,0 +1,177 @@
+"""
+Unit tests for Critical Path Analysis
+
+Tests latency histograms, makespan and gating task prediction, and
+parallelism recommendations from executor latency history.
+"""
+
+import time
+import pytest
+
+from a_domain.journey.unit_of_work import TaskStatus, Task, UnitOfWork
+from a_domain.journey.critical_path import LatencyHistogram, CriticalPathAnalyzer
+from a_domain.journey.executor import UnitOfWorkExecutor, DependencyCycleError
+
+
+def make_task(task_id, depends_on=(), agent_id="agent", status=TaskStatus.PENDING):
+    return Task(
+        task_id=task_id,
+        name=task_id,
+        description="",
+        agent_id=agent_id,
+        intent="test",
+        input_schema={},
+        output_schema={},
+        depends_on=list(depends_on),
+        status=status
+    )
+
+
+def analyzer(durations, **kwargs):
+    return CriticalPathAnalyzer(lambda task: durations.get(task.task_id), **kwargs)
+
+
+def diamond():
+    """a -> (b: long, c: short) -> d"""
+    return UnitOfWork("uow-1", "sandbox", "client-123", [
+        make_task("a"), make_task("b", ["a"]), make_task("c", ["a"]), make_task("d", ["b", "c"])
+    ])
+
+
+DIAMOND = {"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0}
+
+
+class TestLatencyHistogram:
+    """Test latency distribution"""
+
+    def test_empty(self):
+        """Test an empty histogram has no statistics"""
+        histogram = LatencyHistogram()
+
+        assert histogram.mean is None
+        assert histogram.quantile(0.5) is None
+        assert histogram.to_dict()["count"] == 0
+
+    def test_quantiles(self):
+        """Test quantiles fall within a bucket of the true value"""
+        histogram = LatencyHistogram()
+        for i in range(1, 101):
+            histogram.record(i / 100)
+
+        assert histogram.count == 100
+        assert histogram.mean == pytest.approx(0.505)
+        assert 0.5 <= histogram.quantile(0.5) <= 0.5 * LatencyHistogram.GROWTH
+        assert 0.9 <= histogram.quantile(0.9) <= 0.9 * LatencyHistogram.GROWTH
+        assert histogram.quantile(1.0) == 1.0
+
+    def test_clamped_to_observed_range(self):
+        """Test sub-millisecond and very long latencies stay within observations"""
+        histogram = LatencyHistogram()
+        histogram.record(0.0001)
+        assert histogram.quantile(0.5) == 0.0001
+
+        histogram.record(10 ** 6)
+        assert histogram.quantile(1.0) == 10 ** 6
+
+
+class TestCriticalPathAnalyzer:
+    """Test makespan, gating tasks and parallelism"""
+
+    def test_makespan_and_critical_path(self):
+        """Test the longest path determines the makespan"""
+        report = analyzer(DIAMOND).analyze(diamond())
+
+        assert report.makespan_seconds == 7.0
+        assert report.total_work_seconds == 9.0
+        assert report.critical_path == ["a", "b", "d"]
+        assert report.gating_tasks == ["a", "b", "d"]
+        assert report.slack_seconds["c"] == 3.0
+
+    def test_parallelism(self):
+        """Test peak and recommended parallelism"""
+        uow = UnitOfWork("uow-1", "sandbox", "client-123", [make_task(f"t{i}") for i in range(8)])
+        an = analyzer({f"t{i}": 1.0 for i in range(8)})
+
+        report = an.analyze(uow)
+
+        assert report.makespan_seconds == 1.0
+        assert report.peak_parallelism == 8
+        assert report.recommended_parallelism == 8
+        assert an.simulate(uow, 1) == 8.0
+        assert an.simulate(uow, 4) == 2.0
+
+    def test_recommendation_tolerance(self):
+        """Test the fewest workers within tolerance of the makespan are recommended"""
+        report = analyzer(DIAMOND).analyze(diamond())
+
+        # One worker takes 9s, beyond 10% over the 7s makespan
+        assert report.peak_parallelism == 2
+        assert report.recommended_parallelism == 2
+
+        # Within 50% one worker suffices
+        report = analyzer(DIAMOND, tolerance=0.5).analyze(diamond())
+        assert report.recommended_parallelism == 1
+
+    def test_unestimated_and_completed_tasks(self):
+        """Test defaults for unknown tasks and zero time for completed ones"""
+        uow = diamond()
+        uow.tasks[0].status = TaskStatus.COMPLETED
+
+        report = analyzer({"b": 5.0}, default_seconds=2.0).analyze(uow)
+
+        assert report.unestimated_tasks == ["c", "d"]
+        assert report.makespan_seconds == 7.0
+        assert report.gating_tasks == ["b", "d"]
+
+    def test_cycle_rejected(self):
+        """Test circular dependencies raise ValueError"""
+        uow = UnitOfWork("uow-1", "sandbox", "client-123", [make_task("a", ["b"]), make_task("b", ["a"])])
+
+        with pytest.raises(ValueError):
+            analyzer({}).analyze(uow)
+
+
+class TestExecutorForecast:
+    """Test latency collection and prediction in the executor"""
+
+    def test_latency_stats_and_predict(self):
+        """Test histograms from executed tasks drive the forecast"""
+        def invoke(task, results):
+            time.sleep(0.02 if task.agent_id == "slow" else 0.001)
+            return {}
+
+        executor = UnitOfWorkExecutor(agent_invoker=invoke)
+        executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", [
+            make_task("a", agent_id="slow"), make_task("b", agent_id="fast")
+        ]))
+
+        stats = executor.get_latency_stats()
+        assert stats["slow"]["test"]["count"] == 1
+        assert stats["slow"]["test"]["mean_seconds"] >= 0.02
+
+        uow = UnitOfWork("uow-2", "sandbox", "client-123", [
+            make_task("x", agent_id="fast"),
+            make_task("y", ["x"], agent_id="slow"),
+            make_task("z", ["x"], agent_id="fast")
+        ])
+        report = executor.predict(uow)
+
+        assert report.critical_path == ["x", "y"]
+        assert report.unestimated_tasks == []
+        assert executor.predict(uow, quantile=0.9).makespan_seconds >= 0.02
+
+    def test_forecast_in_metrics(self):
+        """Test execution metrics carry the forecast made before the run"""
+        executor = UnitOfWorkExecutor()
+        executor.execute(diamond())
+
+        metrics = executor.get_metrics("uow-1")
+        assert metrics["critical_path"] == ["a", "b", "d"]
+        assert metrics["predicted_makespan_seconds"] == 3.0
+
+    def test_predict_rejects_cycles(self):
+        """Test predict raises DependencyCycleError like execute"""
+        uow = UnitOfWork("uow-1", "sandbox", "client-123", [make_task("a", ["b"]), make_task("b", ["a"])])
+
+        with pytest.raises(DependencyCycleError):
+            UnitOfWorkExecutor().predict(uow)
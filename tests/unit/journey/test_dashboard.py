@@ -12,6 +12,7 @@ from a_domain.journey.dashboard import (
     MockGleanPublisher,
     JourneyDashboardService
 )
+from a_domain.journey.critical_path import CriticalPathReport
 from a_domain.journey.state_machine import (
     JourneyStage,
     JourneyState
@@ -341,6 +342,32 @@ class TestJourneyDashboardService:
         assert alerts[0]["alert_type"] == "bottleneck"
         assert "exceeded 1 hour" in alerts[0]["message"]
 
+    def test_sla_risk_alert_from_forecast(self):
+        """Test a forecast over the deadline raises an SLA risk before execution"""
+        uow = UnitOfWork(
+            work_id="uow-1",
+            stage="sandbox",
+            client_id="client-123",
+            tasks=[]
+        )
+        forecast = CriticalPathReport(
+            work_id="uow-1",
+            makespan_seconds=7200.0,
+            total_work_seconds=9000.0,
+            critical_path=["task-1", "task-2"],
+            gating_tasks=["task-1", "task-2"],
+            slack_seconds={"task-1": 0.0, "task-2": 0.0, "task-3": 5400.0},
+            peak_parallelism=2
+        )
+
+        assert not self.service.publish_uow_forecast("client-123", uow, forecast)
+        assert self.service.publish_uow_forecast("client-123", uow, forecast, deadline_seconds=10000)
+
+        alerts = self.publisher.get_alerts("client-123")
+        assert len(alerts) == 1
+        assert alerts[0]["alert_type"] == "sla_risk"
+        assert alerts[0]["metadata"]["gating_tasks"] == ["task-1", "task-2"]
+
     def test_get_journey_summary(self):
         """Test getting comprehensive journey summary (AC1)"""
         past_date = datetime.utcnow() - timedelta(days=5)
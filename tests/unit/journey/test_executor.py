@@ -6,6 +6,8 @@ Validates AC2, AC3, and AC4 of P0-A2A-F1-002.
 """
 
 import pytest
+import threading
+import time
 from threading import Thread
 from time import sleep
 
@@ -505,3 +507,165 @@ class TestUnitOfWorkExecutor:
         # task-2 should receive task-1's results
         assert "task-1" in captured_inputs["task-2"]
         assert captured_inputs["task-2"]["task-1"]["output"] == "task-1-result"
+
+
+def make_task(task_id, depends_on=(), agent_id="agent"):
+    return Task(
+        task_id=task_id,
+        name=task_id,
+        description="",
+        agent_id=agent_id,
+        intent="test",
+        input_schema={},
+        output_schema={},
+        depends_on=list(depends_on)
+    )
+
+
+class ConcurrencyProbe:
+    """Invoker that sleeps and records peak concurrency, overall and per agent."""
+
+    def __init__(self, delays=None, default_delay=0.02):
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.events = []
+
+    def __call__(self, task, task_results):
+        with self.lock:
+            for key in (task.agent_id, "*"):
+                self.active[key] = self.active.get(key, 0) + 1
+                self.peak[key] = max(self.peak.get(key, 0), self.active[key])
+            self.events.append(("start", task.task_id))
+        sleep(self.delays.get(task.task_id, self.default_delay))
+        with self.lock:
+            for key in (task.agent_id, "*"):
+                self.active[key] -= 1
+            self.events.append(("end", task.task_id))
+        return {"status": "success"}
+
+
+class TestParallelExecution:
+    """Test concurrent dispatch of independent tasks"""
+
+    def test_wide_dag_runs_concurrently(self):
+        """Test independent tasks overlap so time follows the critical path"""
+        probe = ConcurrencyProbe(default_delay=0.05)
+        executor = UnitOfWorkExecutor(agent_invoker=probe, max_workers=8)
+        tasks = [make_task("root")] + [make_task(f"leaf-{i}", ["root"]) for i in range(8)]
+
+        start = time.perf_counter()
+        result = executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", tasks))
+        elapsed = time.perf_counter() - start
+        executor.close()
+
+        assert result.success
+        assert len(result.completed_tasks) == 9
+        assert probe.peak["*"] == 8
+        assert elapsed < 0.05 * 9 / 2
+
+    def test_dispatches_when_dependencies_complete(self):
+        """Test a task starts as soon as its own dependencies finish, not a whole wave"""
+        probe = ConcurrencyProbe(delays={"slow": 0.3, "fast": 0.01, "after-fast": 0.01})
+        executor = UnitOfWorkExecutor(agent_invoker=probe, max_workers=4)
+        tasks = [make_task("slow"), make_task("fast"), make_task("after-fast", ["fast"])]
+
+        assert executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", tasks)).success
+        executor.close()
+
+        assert probe.events.index(("end", "after-fast")) < probe.events.index(("end", "slow"))
+
+    def test_limits(self):
+        """Test global and per-agent parallelism limits hold"""
+        probe = ConcurrencyProbe(default_delay=0.01)
+        executor = UnitOfWorkExecutor(agent_invoker=probe, max_workers=4, max_per_agent=2)
+        tasks = [make_task(f"task-{i}", agent_id=f"agent-{i % 2}") for i in range(12)]
+        tasks += [make_task(f"other-{i}", agent_id=f"other-{i}") for i in range(4)]
+
+        result = executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", tasks))
+        executor.close()
+
+        assert result.success
+        assert probe.peak["*"] <= 4
+        assert probe.peak["agent-0"] <= 2 and probe.peak["agent-1"] <= 2
+
+    def test_per_agent_limit_across_executions(self):
+        """Test an agent's limit is shared by concurrent units of work"""
+        probe = ConcurrencyProbe(default_delay=0.02)
+        executor = UnitOfWorkExecutor(agent_invoker=probe, max_workers=8, max_per_agent=1)
+        results = []
+
+        def run(work_id):
+            tasks = [make_task(f"{work_id}-{i}", agent_id="shared") for i in range(3)]
+            results.append(executor.execute(UnitOfWork(work_id, "sandbox", "client-123", tasks)))
+
+        threads = [Thread(target=run, args=(f"uow-{i}",)) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        executor.close()
+
+        assert all(result.success for result in results)
+        assert probe.peak["shared"] == 1
+
+    def test_retry_in_parallel(self):
+        """Test failed attempts are retried while other tasks keep running"""
+        attempts = {}
+        lock = threading.Lock()
+
+        def flaky(task, task_results):
+            with lock:
+                attempts[task.task_id] = attempts.get(task.task_id, 0) + 1
+                count = attempts[task.task_id]
+            if task.task_id == "flaky" and count < 3:
+                raise Exception("Temporary failure")
+            return {"status": "success"}
+
+        executor = UnitOfWorkExecutor(agent_invoker=flaky, max_workers=4)
+        tasks = [make_task("flaky"), make_task("steady"), make_task("after", ["flaky"])]
+
+        result = executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", tasks))
+        executor.close()
+
+        assert result.success
+        assert attempts == {"flaky": 3, "steady": 1, "after": 1}
+
+    def test_compensation_waits_for_running_tasks(self):
+        """Test a failure stops dispatching and compensates after running tasks finish"""
+        finished = []
+
+        def invoke(task, task_results):
+            if task.task_id == "fails":
+                raise Exception("Task failed")
+            if task.task_id == "running":
+                sleep(0.1)
+            finished.append(task.task_id)
+            return {"status": "success"}
+
+        executor = UnitOfWorkExecutor(agent_invoker=invoke, max_workers=4)
+        fails = make_task("fails")
+        fails.max_retries = 1
+        comp_task = make_task("comp-1")
+        uow = UnitOfWork(
+            "uow-1", "sandbox", "client-123",
+            [make_task("running"), fails, make_task("later", ["fails"])],
+            compensation_tasks=[comp_task]
+        )
+
+        result = executor.execute(uow)
+        executor.close()
+
+        assert result.compensation_executed
+        assert result.failed_tasks == ["fails"]
+        assert finished == ["running", "comp-1"]
+        assert uow.get_task("later").status == TaskStatus.PENDING
+
+    def test_invalid_limits(self):
+        """Test limits below one are rejected"""
+        with pytest.raises(ValueError):
+            UnitOfWorkExecutor(max_workers=0)
+        with pytest.raises(ValueError):
+            UnitOfWorkExecutor(max_per_agent=0)
@@ -0,0 +1,191 @@
+"""
+Unit tests for Capability Planner
+
+Tests resolution of requires/provides chains into units of work,
+cycle handling and incremental replanning on registry changes.
+"""
+
+import pytest
+
+from a_domain.protocol.discovery import CapabilityDiscoveryAgent
+from a_domain.journey.planner import CapabilityPlanner
+from a_domain.journey.executor import (
+    UnitOfWorkExecutor,
+    AgentNotFoundError,
+    DependencyCycleError
+)
+
+
+@pytest.fixture
+def discovery():
+    return CapabilityDiscoveryAgent()
+
+
+def register(discovery, agent_id, intents, requires=(), provides=(), version="1.0.0"):
+    discovery.register_capability(
+        agent_id=agent_id,
+        domain="test",
+        version=version,
+        intents=list(intents),
+        input_schema={},
+        output_schema={},
+        requires=list(requires),
+        provides=list(provides),
+        description=f"{agent_id} agent"
+    )
+
+
+def task_graph(uow):
+    """Map agent ID -> agent IDs it depends on."""
+    by_id = {task.task_id: task.agent_id for task in uow.tasks}
+    return {task.agent_id: sorted(by_id[dep] for dep in task.depends_on) for task in uow.tasks}
+
+
+class TestCapabilityPlanner:
+    """Test planning units of work from capabilities"""
+
+    def test_plan_chain(self, discovery):
+        """Test requirements resolve into tasks with depends_on filled in"""
+        register(discovery, "deployer", ["deploy"], requires=["dataset"])
+        register(discovery, "data-agent", ["make_dataset"], requires=["config"], provides=["dataset"])
+        register(discovery, "config-agent", ["configure"], provides=["config"])
+
+        uow = CapabilityPlanner(discovery.registry).plan("deploy", client_id="acme", stage="pilot")
+
+        assert [task.agent_id for task in uow.tasks] == ["config-agent", "data-agent", "deployer"]
+        assert task_graph(uow) == {
+            "config-agent": [],
+            "data-agent": ["config-agent"],
+            "deployer": ["data-agent"]
+        }
+        assert [task.name for task in uow.tasks] == ["config", "dataset", "deploy"]
+        assert [task.intent for task in uow.tasks] == ["configure", "make_dataset", "deploy"]
+        assert uow.stage == "pilot" and uow.client_id == "acme"
+        assert uow.metadata == {"planned_intent": "deploy", "planned_agents": 3}
+        assert not uow.has_circular_dependencies()
+
+    def test_shared_requirement_is_one_task(self, discovery):
+        """Test a capability needed twice is served by a single task"""
+        register(discovery, "deployer", ["deploy"], requires=["dataset", "config"])
+        register(discovery, "data-agent", ["make_dataset"], requires=["config"], provides=["dataset"])
+        register(discovery, "config-agent", ["configure"], provides=["config"])
+
+        uow = CapabilityPlanner(discovery.registry).plan("deploy", "acme", "pilot")
+
+        assert task_graph(uow) == {
+            "config-agent": [],
+            "data-agent": ["config-agent"],
+            "deployer": ["config-agent", "data-agent"]
+        }
+
+    def test_picks_smallest_sub_plan(self, discovery):
+        """Test the provider needing the fewest agents wins"""
+        register(discovery, "deployer", ["deploy"], requires=["dataset"])
+        register(discovery, "heavy", ["make_dataset"], requires=["a", "b"], provides=["dataset"])
+        register(discovery, "light", ["make_dataset"], provides=["dataset"])
+        register(discovery, "a-agent", ["a"], provides=["a"])
+        register(discovery, "b-agent", ["b"], provides=["b"])
+
+        uow = CapabilityPlanner(discovery.registry).plan("deploy", "acme", "pilot")
+
+        assert task_graph(uow) == {"light": [], "deployer": ["light"]}
+
+    def test_missing_provider(self, discovery):
+        """Test unresolvable requirements raise AgentNotFoundError"""
+        register(discovery, "deployer", ["deploy"], requires=["dataset"])
+        planner = CapabilityPlanner(discovery.registry)
+
+        with pytest.raises(AgentNotFoundError, match="no agent provides dataset"):
+            planner.plan("deploy", "acme", "pilot")
+        with pytest.raises(AgentNotFoundError, match="no agent handles intent unknown"):
+            planner.plan("unknown", "acme", "pilot")
+
+    def test_cycle_detected(self, discovery):
+        """Test plans that can only be built cyclically raise DependencyCycleError"""
+        register(discovery, "deployer", ["deploy"], requires=["a"])
+        register(discovery, "a-agent", ["a"], requires=["b"], provides=["a"])
+        register(discovery, "b-agent", ["b"], requires=["a"], provides=["b"])
+
+        with pytest.raises(DependencyCycleError):
+            CapabilityPlanner(discovery.registry).plan("deploy", "acme", "pilot")
+
+    def test_cycle_avoided_when_alternative_exists(self, discovery):
+        """Test a cyclic provider is skipped in favour of an acyclic one"""
+        register(discovery, "deployer", ["deploy"], requires=["a"])
+        register(discovery, "a-agent", ["a"], requires=["b"], provides=["a"])
+        register(discovery, "b-cyclic", ["b"], requires=["a"], provides=["b"])
+        register(discovery, "b-plain", ["b"], requires=["c"], provides=["b"])
+        register(discovery, "c-agent", ["c"], provides=["c"])
+
+        uow = CapabilityPlanner(discovery.registry).plan("deploy", "acme", "pilot")
+
+        assert task_graph(uow) == {
+            "c-agent": [],
+            "b-plain": ["c-agent"],
+            "a-agent": ["b-plain"],
+            "deployer": ["a-agent"]
+        }
+
+    def test_replans_after_registry_changes(self, discovery):
+        """Test registrations and unregistrations invalidate affected plans"""
+        register(discovery, "deployer", ["deploy"], requires=["dataset"])
+        planner = CapabilityPlanner(discovery.registry)
+
+        with pytest.raises(AgentNotFoundError):
+            planner.plan("deploy", "acme", "pilot")
+
+        register(discovery, "data-agent", ["make_dataset"], provides=["dataset"])
+        assert task_graph(planner.plan("deploy", "acme", "pilot")) == {
+            "data-agent": [],
+            "deployer": ["data-agent"]
+        }
+
+        register(discovery, "data-agent-2", ["make_dataset"], provides=["dataset"])
+        discovery.unregister_capability("data-agent")
+        assert task_graph(planner.plan("deploy", "acme", "pilot")) == {
+            "data-agent-2": [],
+            "deployer": ["data-agent-2"]
+        }
+
+        # New version dropping the requirement
+        register(discovery, "deployer", ["deploy"], version="2.0.0")
+        assert task_graph(planner.plan("deploy", "acme", "pilot")) == {"deployer": []}
+
+    def test_memoized_until_invalidated(self, discovery):
+        """Test unrelated changes keep memoized sub-plans"""
+        register(discovery, "deployer", ["deploy"], requires=["dataset"])
+        register(discovery, "data-agent", ["make_dataset"], provides=["dataset"])
+        planner = CapabilityPlanner(discovery.registry)
+
+        first = planner.resolve("deploy")
+        register(discovery, "unrelated", ["other"], provides=["other"])
+        second = planner.resolve("deploy")
+
+        assert second is first
+        assert planner.get_metrics()["memo_hits"] >= 1
+
+    def test_close_stops_following(self, discovery):
+        """Test a closed planner no longer sees registry changes"""
+        planner = CapabilityPlanner(discovery.registry)
+        planner.close()
+
+        register(discovery, "data-agent", ["make_dataset"], provides=["dataset"])
+
+        assert planner.providers("dataset") == []
+
+    def test_plan_executes(self, discovery):
+        """Test planned work runs in dependency order on the executor"""
+        register(discovery, "deployer", ["deploy"], requires=["dataset"])
+        register(discovery, "data-agent", ["make_dataset"], provides=["dataset"])
+        uow = CapabilityPlanner(discovery.registry).plan("deploy", "acme", "pilot")
+
+        order = []
+
+        def invoke(task, results):
+            order.append(task.agent_id)
+            return {"ok": True}
+
+        result = UnitOfWorkExecutor(agent_invoker=invoke).execute(uow)
+
+        assert result.success
+        assert order == ["data-agent", "deployer"]
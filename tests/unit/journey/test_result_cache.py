@@ -0,0 +1,169 @@
+"""
+Unit tests for Task Result Cache
+
+Tests input fingerprints, TTL and LRU eviction, and skipping agent
+calls for cacheable tasks repeated across units of work.
+"""
+
+import pytest
+
+from a_domain.journey.unit_of_work import Task, UnitOfWork
+from a_domain.journey.result_cache import TaskResultCache
+from a_domain.journey.executor import UnitOfWorkExecutor
+
+
+def make_task(task_id, depends_on=(), intent="test", cacheable=True):
+    return Task(
+        task_id=task_id,
+        name=task_id,
+        description="",
+        agent_id="agent",
+        intent=intent,
+        input_schema={"query": "string"},
+        output_schema={},
+        depends_on=list(depends_on),
+        cacheable=cacheable
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTaskResultCache:
+    """Test keys, expiry and eviction"""
+
+    def test_fingerprint(self):
+        """Test keys ignore task IDs but follow intent and upstream results"""
+        key = TaskResultCache.fingerprint(make_task("b", ["a"]), {"a": {"value": 1}})
+
+        assert TaskResultCache.fingerprint(make_task("y", ["x"]), {"x": {"value": 1}}) == key
+        assert TaskResultCache.fingerprint(make_task("b", ["a"]), {"a": {"value": 2}}) != key
+        assert TaskResultCache.fingerprint(make_task("b", ["a"], intent="other"), {"a": {"value": 1}}) != key
+        assert TaskResultCache.fingerprint(make_task("b", ["a"]), {"a": {"value": object()}}) is None
+
+    def test_ttl(self):
+        """Test entries expire after ttl_seconds"""
+        clock = FakeClock()
+        cache = TaskResultCache(ttl_seconds=10.0, clock=clock)
+        cache.put("key", {"value": 1})
+
+        clock.now += 9.0
+        assert cache.get("key") == (True, {"value": 1})
+        clock.now += 1.0
+        assert cache.get("key") == (False, None)
+        assert cache.get_metrics()["expirations"] == 1
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted"""
+        cache = TaskResultCache(max_entries=2)
+        cache.put("a", {})
+        cache.put("b", {})
+        cache.get("a")
+        cache.put("c", {})
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a")[0] and cache.get("c")[0]
+        assert cache.get_metrics()["evictions"] == 1
+
+    def test_results_isolated(self):
+        """Test callers mutating a result do not change the cached value"""
+        cache = TaskResultCache()
+        result = {"items": [1]}
+        cache.put("key", result)
+        result["items"].append(2)
+
+        _, cached = cache.get("key")
+        cached["items"].append(3)
+
+        assert cache.get("key") == (True, {"items": [1]})
+        assert not cache.put("other", {"value": object()})
+
+    def test_invalid(self):
+        """Test invalid limits are rejected"""
+        with pytest.raises(ValueError):
+            TaskResultCache(max_entries=0)
+        with pytest.raises(ValueError):
+            TaskResultCache(ttl_seconds=0)
+
+
+class TestExecutorCaching:
+    """Test cached execution across UoWs"""
+
+    def setup_method(self):
+        self.calls = []
+
+        def invoke(task, task_results):
+            self.calls.append(task.task_id)
+            upstream = sum(task_results[dep_id]["value"] for dep_id in task.depends_on)
+            return {"value": upstream + 1}
+
+        self.executor = UnitOfWorkExecutor(agent_invoker=invoke, result_cache=TaskResultCache())
+
+    def uow(self, work_id, cacheable=True):
+        return UnitOfWork(work_id, "pilot", "client-123", [
+            make_task(f"{work_id}-a", cacheable=cacheable),
+            make_task(f"{work_id}-b", [f"{work_id}-a"], intent="next", cacheable=cacheable)
+        ])
+
+    def test_repeated_tasks_skip_agent_calls(self):
+        """Test a second UoW with identical tasks is served from the cache"""
+        first = self.executor.execute(self.uow("uow-1"))
+        second = self.executor.execute(self.uow("uow-2"))
+
+        assert self.calls == ["uow-1-a", "uow-1-b"]
+        assert second.success
+        assert second.task_results["uow-2-b"] == first.task_results["uow-1-b"] == {"value": 2}
+
+        assert self.executor.get_metrics("uow-1")["cache_misses"] == 2
+        assert self.executor.get_metrics("uow-2")["cache_hits"] == 2
+        assert self.executor.get_metrics("uow-2")["cache_misses"] == 0
+
+    def test_tasks_not_cacheable_by_default(self):
+        """Test tasks not marked cacheable always call their agent"""
+        self.executor.execute(self.uow("uow-1", cacheable=False))
+        self.executor.execute(self.uow("uow-2", cacheable=False))
+
+        assert len(self.calls) == 4
+        assert self.executor.get_metrics("uow-2")["cache_hits"] == 0
+
+    def test_cache_hit_skips_circuit_breaker(self):
+        """Test a cache hit neither waits for nor takes an open circuit's trial call"""
+        calls = []
+
+        def invoke(task, task_results):
+            calls.append(task.task_id)
+            if task.task_id == "fail":
+                raise Exception("Agent down")
+            return {"value": 1}
+
+        executor = UnitOfWorkExecutor(
+            agent_invoker=invoke,
+            result_cache=TaskResultCache(),
+            breaker_threshold=1,
+            breaker_reset_seconds=0.05
+        )
+        executor.execute(UnitOfWork("uow-1", "pilot", "client-123", [make_task("uow-1-a")]))
+
+        fail = make_task("fail", cacheable=False)
+        fail.max_retries = 1
+        result = executor.execute(UnitOfWork("uow-2", "pilot", "client-123", [
+            fail,
+            make_task("uow-2-a"),
+            make_task("b", ["uow-2-a"], intent="next", cacheable=False)
+        ]))
+
+        # The open circuit's trial call goes to b, which closes it
+        assert calls == ["uow-1-a", "fail", "b"]
+        assert result.completed_tasks == ["uow-2-a", "b"]
+        assert executor.get_metrics("uow-2")["cache_hits"] == 1
+        assert executor.get_circuit_breakers()["agent"]["state"] == "closed"
+
+    def test_cacheable_serialized(self):
+        """Test the cacheable flag survives to_dict/from_dict"""
+        assert Task.from_dict(make_task("a").to_dict()).cacheable
+        assert not Task.from_dict({**make_task("a").to_dict(), "cacheable": False}).cacheable
@@ -0,0 +1,203 @@
+"""
+Unit tests for Task Retry Policy
+
+Tests backoff with jitter, retry_after hints, circuit breakers, and
+that tasks waiting for a retry do not hold up other ready tasks.
+"""
+
+import time
+import pytest
+
+from a_domain.protocol.message import ErrorResponse
+from a_domain.journey.unit_of_work import Task, UnitOfWork
+from a_domain.journey.retry import RetryPolicy, CircuitBreaker, retry_after_seconds
+from a_domain.journey.executor import UnitOfWorkExecutor, AgentInvocationError
+
+
+def make_task(task_id, depends_on=(), agent_id="agent"):
+    return Task(
+        task_id=task_id,
+        name=task_id,
+        description="",
+        agent_id=agent_id,
+        intent="test",
+        input_schema={},
+        output_schema={},
+        depends_on=list(depends_on)
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy:
+    """Test backoff delays"""
+
+    def test_exponential_backoff_capped(self):
+        """Test delays double per retry up to max_delay"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0.0)
+
+        assert [policy.delay(retry) for retry in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_jitter(self):
+        """Test jitter takes up to its fraction off the backoff"""
+        policy = RetryPolicy(base_delay=1.0, jitter=0.5)
+
+        assert policy.delay(2, rand=lambda: 0.0) == 2.0
+        assert policy.delay(2, rand=lambda: 0.999) == pytest.approx(1.001)
+
+    def test_retry_after_is_a_floor(self):
+        """Test an agent's retry_after lengthens but never shortens the wait"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=2.0, jitter=0.0)
+
+        assert policy.delay(1, retry_after=60.0) == 60.0
+        assert policy.delay(1, retry_after=0.5) == 1.0
+
+    def test_invalid(self):
+        """Test inconsistent settings are rejected"""
+        with pytest.raises(ValueError):
+            RetryPolicy(base_delay=2.0, max_delay=1.0)
+        with pytest.raises(ValueError):
+            RetryPolicy(jitter=1.5)
+
+    def test_retry_after_seconds(self):
+        """Test hints are read from ErrorResponse, preferring exact seconds"""
+        assert retry_after_seconds(ErrorResponse("RATE_LIMIT_EXCEEDED", "", retry_after=2)) == 2.0
+        assert retry_after_seconds(ErrorResponse(
+            "RATE_LIMIT_EXCEEDED", "", details={"retry_after_seconds": 0.25}, retry_after=1
+        )) == 0.25
+        assert retry_after_seconds(ErrorResponse("INTERNAL_ERROR", "")) is None
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the circuit opens at the threshold and a success resets the count"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.acquire() == 0.0
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.acquire() == 10.0
+
+    def test_half_open_trial(self):
+        """Test one trial call after the reset timeout decides the state"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+        breaker.record_failure()
+
+        clock.now += 10.0
+        assert breaker.acquire() == 0.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.acquire() > 0  # Only one trial at a time
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        clock.now += 10.0
+        assert breaker.acquire() == 0.0
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.to_dict()["opened"] == 2
+
+    def test_retry_after_extends_open_period(self):
+        """Test an agent's retry_after keeps the circuit open longer"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1.0, clock=clock)
+
+        breaker.record_failure(retry_after=30.0)
+
+        assert breaker.acquire() == 30.0
+
+
+class TestExecutorRetries:
+    """Test retry scheduling in the executor"""
+
+    def test_other_tasks_run_during_backoff(self):
+        """Test a task waiting to retry does not block ready tasks"""
+        calls = []
+
+        def invoke(task, task_results):
+            calls.append(task.task_id)
+            if task.task_id == "flaky" and calls.count("flaky") == 1:
+                raise Exception("Temporary failure")
+            return {}
+
+        executor = UnitOfWorkExecutor(
+            agent_invoker=invoke,
+            retry_policy=RetryPolicy(base_delay=0.05, jitter=0.0)
+        )
+        start = time.monotonic()
+        result = executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", [
+            make_task("flaky"), make_task("b"), make_task("c")
+        ]))
+
+        assert result.success
+        assert calls == ["flaky", "b", "c", "flaky"]
+        assert time.monotonic() - start >= 0.05
+
+    def test_error_response_retry_after(self):
+        """Test an ErrorResponse, returned or raised, delays the retry by its retry_after"""
+        attempts = []
+        busy = ErrorResponse("RATE_LIMIT_EXCEEDED", "busy", details={"retry_after_seconds": 0.1})
+
+        def invoke(task, task_results):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                return busy
+            if len(attempts) == 2:
+                raise AgentInvocationError(busy)
+            return {}
+
+        executor = UnitOfWorkExecutor(agent_invoker=invoke, retry_policy=RetryPolicy(base_delay=0.0))
+        result = executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", [make_task("a")]))
+
+        assert result.success
+        assert len(attempts) == 3
+        assert attempts[1] - attempts[0] >= 0.1
+        assert attempts[2] - attempts[1] >= 0.1
+
+    def test_circuit_breaker_holds_agent_tasks(self):
+        """Test an open circuit holds an agent's tasks while others run"""
+        calls = []
+
+        def invoke(task, task_results):
+            calls.append(task.task_id)
+            if task.agent_id == "bad" and len(calls) == 1:
+                raise Exception("Agent down")
+            return {}
+
+        executor = UnitOfWorkExecutor(
+            agent_invoker=invoke,
+            retry_policy=RetryPolicy(base_delay=0.0),
+            breaker_threshold=1,
+            breaker_reset_seconds=0.05
+        )
+        result = executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", [
+            make_task("bad-1", agent_id="bad"),
+            make_task("bad-2", agent_id="bad"),
+            make_task("good", agent_id="good")
+        ]))
+
+        assert result.success
+        assert calls[:2] == ["bad-1", "good"]  # bad-2 held while the circuit is open
+        assert executor.get_circuit_breakers()["bad"] == {
+            "state": "closed", "consecutive_failures": 0, "opened": 1
+        }
+
+    def test_invalid_breaker_threshold(self):
+        """Test a breaker threshold below one is rejected"""
+        with pytest.raises(ValueError):
+            UnitOfWorkExecutor(breaker_threshold=0)
@@ -0,0 +1,143 @@
+"""
+Unit tests for Task Scheduler
+
+Tests indexed dependency tracking, Kahn ordering and cycle detection
+on deep task graphs.
+"""
+
+import pytest
+
+from a_domain.journey.unit_of_work import TaskStatus, Task, UnitOfWork
+from a_domain.journey.scheduler import TaskScheduler
+from a_domain.journey.executor import UnitOfWorkExecutor
+
+
+def make_task(task_id, depends_on=(), status=TaskStatus.PENDING):
+    return Task(
+        task_id=task_id,
+        name=task_id,
+        description="",
+        agent_id="agent",
+        intent="test",
+        input_schema={},
+        output_schema={},
+        depends_on=list(depends_on),
+        status=status
+    )
+
+
+def chain(length):
+    return [make_task("task-0")] + [make_task(f"task-{i}", [f"task-{i - 1}"]) for i in range(1, length)]
+
+
+def drain(scheduler):
+    ready = []
+    task = scheduler.pop()
+    while task is not None:
+        ready.append(task.task_id)
+        task = scheduler.pop()
+    return ready
+
+
+class TestTaskScheduler:
+    """Test the ready queue"""
+
+    def test_initial_ready(self):
+        """Test only tasks without unmet dependencies start ready, in order"""
+        scheduler = TaskScheduler([make_task("c", ["a"]), make_task("a"), make_task("b")])
+
+        assert drain(scheduler) == ["a", "b"]
+
+    def test_complete_unblocks_dependents(self):
+        """Test a task becomes ready once its last dependency completes"""
+        tasks = [make_task("a"), make_task("b"), make_task("c", ["a", "b", "a"])]
+        scheduler = TaskScheduler(tasks)
+        drain(scheduler)
+
+        tasks[0].status = TaskStatus.COMPLETED
+        assert scheduler.complete("a") == []
+        tasks[1].status = TaskStatus.COMPLETED
+        assert [task.task_id for task in scheduler.complete("b")] == ["c"]
+        assert drain(scheduler) == ["c"]
+
+    def test_completed_tasks_count_as_met(self):
+        """Test a partly executed unit of work resumes after its completed tasks"""
+        scheduler = TaskScheduler([
+            make_task("a", status=TaskStatus.COMPLETED),
+            make_task("b", ["a"]),
+            make_task("c", ["b"])
+        ])
+
+        assert drain(scheduler) == ["b"]
+
+    def test_unknown_dependency_never_ready(self):
+        """Test a dependency on a missing task blocks the task"""
+        assert drain(TaskScheduler([make_task("a", ["missing"])])) == []
+
+    def test_requeue_and_retry(self):
+        """Test requeued tasks go back to the front and retries to the back"""
+        scheduler = TaskScheduler([make_task("a"), make_task("b"), make_task("c")])
+        first, second = scheduler.pop(), scheduler.pop()
+
+        scheduler.retry(first)
+        scheduler.requeue([second])
+
+        assert drain(scheduler) == ["b", "c", "a"]
+
+
+class TestExecutionOrder:
+    """Test Kahn ordering and cycle detection"""
+
+    def test_order_follows_dependencies(self):
+        """Test dependencies come first and ready tasks keep input order"""
+        uow = UnitOfWork("uow-1", "sandbox", "client-123", [
+            make_task("d", ["b", "c"]), make_task("b", ["a"]), make_task("c", ["a"]), make_task("a")
+        ])
+
+        assert [task.task_id for task in uow.get_execution_order()] == ["a", "b", "c", "d"]
+
+    def test_cycle_detected(self):
+        """Test tasks on a cycle are left out of the order"""
+        uow = UnitOfWork("uow-1", "sandbox", "client-123", [
+            make_task("a"), make_task("b", ["a", "c"]), make_task("c", ["b"])
+        ])
+
+        assert [task.task_id for task in uow.get_execution_order()] == ["a"]
+        assert uow.has_circular_dependencies()
+
+    def test_deep_chain(self):
+        """Test chains beyond the recursion limit are handled"""
+        uow = UnitOfWork("uow-1", "sandbox", "client-123", chain(5000))
+
+        assert not uow.has_circular_dependencies()
+
+        uow.tasks[0].depends_on = ["task-4999"]
+        assert uow.has_circular_dependencies()
+
+    def test_deep_chain_executes(self):
+        """Test a deep chain runs to completion in order"""
+        order = []
+        executor = UnitOfWorkExecutor(agent_invoker=lambda task, results: order.append(task.task_id) or {})
+
+        result = executor.execute(UnitOfWork("uow-1", "sandbox", "client-123", chain(3000)))
+
+        assert result.success
+        assert order == [f"task-{i}" for i in range(3000)]
+
+
+class TestTaskLookup:
+    """Test indexed get_task"""
+
+    def test_get_task(self):
+        """Test lookups by ID, including after the task list changes"""
+        uow = UnitOfWork("uow-1", "sandbox", "client-123", [make_task("a"), make_task("b")])
+
+        assert uow.get_task("b").task_id == "b"
+        assert uow.get_task("missing") is None
+
+        uow.tasks.append(make_task("c"))
+        assert uow.get_task("c").task_id == "c"
+
+        uow.tasks[0] = make_task("z")
+        assert uow.get_task("z") is uow.tasks[0]
+        assert uow.get_task("a") is None
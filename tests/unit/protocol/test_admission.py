@@ -0,0 +1,179 @@
+"""
+Unit tests for admission control.
+
+Tests token buckets, per-agent/per-contract limits, load shedding and
+retry_after reporting.
+"""
+
+import pytest
+from src.a_domain.protocol.admission import (
+    AdmissionController,
+    RateLimit,
+    TokenBucket
+)
+from src.a_domain.protocol.validator import ValidationResult
+from src.a_domain.protocol.message import ErrorCode
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test token bucket behaviour."""
+
+    def test_burst_then_refill(self):
+        """Test a full bucket allows its burst, then refills at rate."""
+        bucket = TokenBucket(RateLimit(rate=2, burst=3), now=0.0)
+
+        assert [bucket.acquire(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.acquire(0.0) == pytest.approx(0.5)
+
+        assert bucket.acquire(0.5) == 0.0
+        assert bucket.acquire(0.5) > 0
+
+    def test_refill_capped_at_burst(self):
+        """Test idle time never banks more than the burst."""
+        bucket = TokenBucket(RateLimit(rate=10, burst=2), now=0.0)
+
+        allowed = sum(1 for _ in range(5) if bucket.acquire(100.0) == 0.0)
+
+        assert allowed == 2
+
+    def test_invalid_limit(self):
+        """Test nonsensical limits are rejected."""
+        with pytest.raises(ValueError):
+            RateLimit(rate=0, burst=1)
+
+
+class TestAdmissionController:
+    """Test admission decisions."""
+
+    def test_agent_limit(self):
+        """Test a noisy agent is limited without affecting others."""
+        clock = FakeClock()
+        controller = AdmissionController(agent_limit=RateLimit(rate=1, burst=2), clock=clock)
+
+        results = [controller.check_agent("noisy") for _ in range(3)]
+
+        assert [r is None for r in results] == [True, True, False]
+        assert results[2].error_code == ErrorCode.RATE_LIMIT_EXCEEDED
+        assert results[2].details["limit"] == "agent"
+        assert results[2].details["retry_after"] == 1
+        assert results[2].details["retry_after_seconds"] == pytest.approx(1.0)
+        assert controller.check_agent("quiet") is None
+
+        clock.now += 1
+        assert controller.check_agent("noisy") is None
+
+    def test_agent_override(self):
+        """Test per-agent overrides replace the default limit."""
+        controller = AdmissionController(
+            agent_limit=RateLimit(rate=1, burst=1),
+            agent_overrides={"trusted": RateLimit(rate=100, burst=100)},
+            clock=FakeClock()
+        )
+
+        assert all(controller.check_agent("trusted") is None for _ in range(50))
+        assert controller.check_agent("other") is None
+        assert controller.check_agent("other") is not None
+
+    def test_contract_limit_refunds_agent(self):
+        """Test a contract rejection does not also spend the agent's token."""
+        controller = AdmissionController(
+            agent_limit=RateLimit(rate=1, burst=2),
+            contract_limit=RateLimit(rate=1, burst=1),
+            clock=FakeClock()
+        )
+
+        assert controller.check_agent("agent-a") is None
+        assert controller.check_contract("contract-1", "agent-a") is None
+
+        assert controller.check_agent("agent-a") is None
+        limited = controller.check_contract("contract-1", "agent-a")
+        assert limited.details["limit"] == "contract"
+
+        # The refunded token is still available to the agent
+        assert controller.check_agent("agent-a") is None
+        assert controller.get_metrics()["rejected_contract"] == 1
+
+    def test_in_flight_cap(self):
+        """Test deliveries beyond max_in_flight are shed."""
+        controller = AdmissionController(max_in_flight=2)
+
+        assert controller.try_enter()
+        assert controller.try_enter()
+        assert not controller.try_enter()
+
+        controller.leave()
+        assert controller.try_enter()
+
+        metrics = controller.get_metrics()
+        assert metrics["in_flight"] == 2
+        assert metrics["shed"] == 1
+
+    def test_full_bucket_table(self):
+        """Test a full table evicts refilled buckets and otherwise shares an overflow bucket."""
+        clock = FakeClock()
+        controller = AdmissionController(agent_limit=RateLimit(rate=1, burst=1), clock=clock)
+        controller.MAX_BUCKETS = 2
+
+        assert controller.check_agent("agent-1") is None
+        assert controller.check_agent("agent-2") is None
+
+        # Rotating source IDs does not get around the limit
+        assert controller.check_agent("rotated-1") is None
+        assert controller.check_agent("rotated-2") is not None
+        assert controller.get_metrics()["overflow_checks"] == 2
+
+        # Once a bucket has refilled it is evicted to make room
+        clock.now += 1
+        assert controller.check_agent("agent-3") is None
+        assert controller.check_agent("agent-3") is not None
+
+        metrics = controller.get_metrics()
+        assert metrics["agent_buckets"] == 1
+        assert metrics["evicted_buckets"] == 2
+
+    def test_unlimited_by_default(self):
+        """Test a controller without limits admits everything."""
+        controller = AdmissionController()
+
+        assert all(controller.check_agent("agent-a") is None for _ in range(1000))
+        assert controller.check_contract("contract-1") is None
+
+
+class TestErrorResponseConversion:
+    """Test ValidationResult.to_error_response."""
+
+    def test_carries_retry_after(self):
+        """Test retry_after from details reaches the ErrorResponse."""
+        controller = AdmissionController(agent_limit=RateLimit(rate=0.5, burst=1), clock=FakeClock())
+        controller.check_agent("agent-a")
+
+        error = controller.check_agent("agent-a").to_error_response(correlation_id="corr-1")
+
+        assert error.code == ErrorCode.RATE_LIMIT_EXCEEDED
+        assert error.retry_after == 2
+        assert error.to_dict()["correlation_id"] == "corr-1"
+
+    def test_without_details(self):
+        """Test results without details convert with retry_after 0."""
+        error = ValidationResult(
+            valid=False,
+            error_code=ErrorCode.CONTRACT_VIOLATION,
+            error_message="Contract not found"
+        ).to_error_response()
+
+        assert error.retry_after == 0
+        assert error.message == "Contract not found"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,340 @@
+"""
+Unit tests for AsyncProtocolBroker.
+
+Tests per-agent bounded inboxes, consumer tasks and backpressure policies.
+"""
+
+import asyncio
+import time
+import pytest
+from src.a_domain.protocol.async_broker import (
+    AsyncProtocolBroker,
+    AsyncMessageRouter,
+    BackpressurePolicy
+)
+from src.a_domain.protocol.message_log import MessageLog
+from src.a_domain.protocol.message import (
+    ProtocolMessage,
+    Agent,
+    Security,
+    ErrorCode
+)
+
+
+def make_message(target_id: str = "agent-b", index: int = 0) -> ProtocolMessage:
+    """Create a simple request message."""
+    return ProtocolMessage(
+        source_agent=Agent(agent_id="agent-a", domain="test", version="1.0.0"),
+        target_agent=Agent(agent_id=target_id, domain="test", version="1.0.0"),
+        message_type="request",
+        intent="test",
+        payload={"index": index},
+        security=Security(auth_token="test-token")
+    )
+
+
+class TestAsyncMessageRouter:
+    """Test inbox-based routing."""
+
+    def test_rejects_unknown_policy(self):
+        """Test that an unknown backpressure policy is rejected."""
+        with pytest.raises(ValueError):
+            AsyncMessageRouter(backpressure="spill")
+
+    def test_unknown_target(self):
+        """Test routing to an unregistered agent."""
+        async def scenario():
+            router = AsyncMessageRouter()
+            return await router.route_message(make_message("missing"))
+
+        result = asyncio.run(scenario())
+
+        assert not result.valid
+        assert result.error_code == ErrorCode.CAPABILITY_NOT_FOUND
+
+    def test_reject_when_full(self):
+        """Test REJECT policy returns RATE_LIMIT_EXCEEDED on a full inbox."""
+        async def scenario():
+            router = AsyncMessageRouter(inbox_size=2, backpressure=BackpressurePolicy.REJECT)
+            router.register_agent("agent-b", lambda m: None)  # Consumer not started
+            results = [await router.route_message(make_message(index=i)) for i in range(3)]
+            return results, router.get_inbox_stats("agent-b")
+
+        results, stats = asyncio.run(scenario())
+
+        assert [r.valid for r in results] == [True, True, False]
+        assert results[2].error_code == ErrorCode.RATE_LIMIT_EXCEEDED
+        assert stats["rejected"] == 1
+        assert stats["queue_depth"] == 2
+
+    def test_drop_oldest_when_full(self):
+        """Test DROP_OLDEST policy evicts the oldest queued message."""
+        async def scenario():
+            received = []
+            router = AsyncMessageRouter(
+                inbox_size=2,
+                backpressure=BackpressurePolicy.DROP_OLDEST,
+                offload_sync_handlers=False
+            )
+            router.register_agent("agent-b", lambda m: received.append(m.payload["index"]))
+
+            # Enqueue before the consumer gets a chance to run
+            for i in range(4):
+                await router.route_message(make_message(index=i))
+
+            await router.start()
+            await router.stop(drain=True)
+            return received, router.get_inbox_stats("agent-b")
+
+        received, stats = asyncio.run(scenario())
+
+        assert received == [2, 3]
+        assert stats["dropped"] == 2
+
+    def test_block_with_timeout(self):
+        """Test BLOCK policy gives up after enqueue_timeout."""
+        async def scenario():
+            router = AsyncMessageRouter(
+                inbox_size=1,
+                backpressure=BackpressurePolicy.BLOCK,
+                enqueue_timeout=0.05
+            )
+            release = asyncio.Event()
+
+            async def handler(message):
+                await release.wait()
+
+            router.register_agent("agent-b", handler)
+            first = await router.route_message(make_message(index=0))
+            await asyncio.sleep(0)  # Consumer takes the first message and blocks
+            second = await router.route_message(make_message(index=1))
+            third = await router.route_message(make_message(index=2))
+            release.set()
+            await router.stop(drain=True)
+            return first, second, third
+
+        first, second, third = asyncio.run(scenario())
+
+        assert first.valid
+        assert second.valid
+        assert not third.valid
+        assert third.error_code == ErrorCode.RATE_LIMIT_EXCEEDED
+
+    def test_handler_error_does_not_stop_consumer(self):
+        """Test a failing handler is counted and the consumer keeps running."""
+        async def scenario():
+            received = []
+
+            async def handler(message):
+                if message.payload["index"] == 0:
+                    raise RuntimeError("boom")
+                received.append(message.payload["index"])
+
+            router = AsyncMessageRouter()
+            router.register_agent("agent-b", handler)
+            await router.start()
+            for i in range(3):
+                await router.route_message(make_message(index=i))
+            await router.stop(drain=True)
+            return received, router.get_inbox_stats("agent-b")
+
+        received, stats = asyncio.run(scenario())
+
+        assert received == [1, 2]
+        assert stats["handler_errors"] == 1
+        assert stats["delivered"] == 2
+
+
+class TestAsyncProtocolBroker:
+    """Test async broker end to end."""
+
+    def test_route_message_delivers(self):
+        """Test messages are delivered through the inbox."""
+        async def scenario():
+            received = []
+            async with AsyncProtocolBroker() as broker:
+                broker.register_agent("agent-b", lambda m: received.append(m))
+                result = await broker.route_message(make_message())
+            return result, received
+
+        result, received = asyncio.run(scenario())
+
+        assert result.valid
+        assert len(received) == 1
+
+    def test_validation_still_applies(self):
+        """Test invalid messages are rejected before enqueue."""
+        async def scenario():
+            async with AsyncProtocolBroker() as broker:
+                broker.register_agent("agent-b", lambda m: None)
+                message = make_message()
+                message.message_type = "invalid"
+                return await broker.route_message(message)
+
+        result = asyncio.run(scenario())
+
+        assert not result.valid
+        assert result.error_code == "INVALID_MESSAGE_TYPE"
+
+    def test_contract_tracking(self):
+        """Test contract-bound messages update collaboration tracking."""
+        async def scenario():
+            async with AsyncProtocolBroker() as broker:
+                broker.register_agent("agent-a", lambda m: None)
+                broker.register_agent("agent-b", lambda m: None)
+                handshake = broker.initiate_handshake("agent-a", "agent-b", "test")
+                accepted = broker.accept_handshake(handshake.details["handshake_id"])
+                contract_id = accepted.details["contract_id"]
+
+                message = make_message()
+                message.payload["contract_id"] = contract_id
+                result = await broker.route_message(message)
+                return result, list(broker.collaborations.values())
+
+        result, collaborations = asyncio.run(scenario())
+
+        assert result.valid
+        assert len(collaborations) == 1
+        assert collaborations[0].message_count == 1
+
+    def test_contract_schemas_from_discovery(self):
+        """Test contracts take their schemas from the discovery registry passed in."""
+        from src.a_domain.protocol.discovery import CapabilityDiscoveryAgent
+        from src.a_domain.protocol.expiry import ExpiryScheduler
+
+        discovery = CapabilityDiscoveryAgent()
+        discovery.register_capability(
+            agent_id="agent-b",
+            domain="test",
+            version="1.0.0",
+            intents=["test"],
+            input_schema={"type": "object", "required": ["index", "rows"]},
+            output_schema={}
+        )
+        scheduler = ExpiryScheduler()
+
+        async def scenario():
+            async with AsyncProtocolBroker(discovery=discovery, expiry_scheduler=scheduler) as broker:
+                broker.register_agent("agent-b", lambda m: None)
+                handshake = broker.initiate_handshake("agent-a", "agent-b", "test")
+                contract_id = broker.accept_handshake(handshake.details["handshake_id"]).details["contract_id"]
+
+                message = make_message()
+                message.payload["contract_id"] = contract_id
+                return broker, await broker.route_message(message)
+
+        broker, result = asyncio.run(scenario())
+
+        assert broker.expiry_scheduler is scheduler
+        assert result.error_code == ErrorCode.SCHEMA_MISMATCH
+
+    def test_route_many(self):
+        """Test batch routing enqueues admitted messages with per-message results."""
+        async def scenario():
+            received = []
+            async with AsyncProtocolBroker(inbox_size=2, backpressure=BackpressurePolicy.REJECT) as broker:
+                broker.register_agent("agent-b", lambda m: received.append(m.payload["index"]))
+                messages = [make_message(index=i) for i in range(2)] + [make_message("missing", 2)]
+                results = await broker.route_many(messages)
+            return results, received
+
+        results, received = asyncio.run(scenario())
+
+        assert [r.valid for r in results] == [True, True, False]
+        assert results[2].error_code == ErrorCode.CAPABILITY_NOT_FOUND
+        assert received == [0, 1]
+
+    def test_redeliver_from_log(self, tmp_path):
+        """Test logged messages are re-enqueued after a restart."""
+        async def scenario():
+            with MessageLog(str(tmp_path), fsync=False) as log:
+                async with AsyncProtocolBroker(message_log=log) as broker:
+                    broker.register_agent("agent-b", lambda m: None)
+                    await broker.route_many([make_message(index=i) for i in range(3)])
+
+            received = []
+            with MessageLog(str(tmp_path), fsync=False) as log:
+                async with AsyncProtocolBroker(message_log=log) as broker:
+                    broker.register_agent("agent-b", lambda m: received.append(m.payload["index"]))
+                    delivered = await broker.redeliver(from_offset=1)
+            return delivered, received
+
+        delivered, received = asyncio.run(scenario())
+
+        assert delivered == 2
+        assert received == [1, 2]
+
+    def test_rejected_messages_not_logged(self, tmp_path):
+        """Test messages refused by a full inbox are not redelivered."""
+        async def scenario():
+            with MessageLog(str(tmp_path), fsync=False) as log:
+                async with AsyncProtocolBroker(
+                    message_log=log, inbox_size=1, backpressure=BackpressurePolicy.REJECT
+                ) as broker:
+                    broker.register_agent("agent-b", lambda m: None)
+                    results = await broker.route_many([make_message(index=i) for i in range(3)])
+                    single = await broker.route_message(make_message("missing", 3))
+                return results, single, log.next_offset
+
+        results, single, logged = asyncio.run(scenario())
+
+        assert [r.valid for r in results] == [True, False, False]
+        assert not single.valid
+        assert logged == 1
+
+    def test_batch_handler_gets_queued_messages(self):
+        """Test handlers with handle_batch receive queued messages together."""
+        class BatchHandler:
+            def __init__(self):
+                self.batches = []
+
+            def __call__(self, message):
+                self.batches.append([message.payload["index"]])
+
+            async def handle_batch(self, messages):
+                self.batches.append([m.payload["index"] for m in messages])
+
+        async def scenario():
+            handler = BatchHandler()
+            async with AsyncProtocolBroker() as broker:
+                broker.register_agent("agent-b", handler)
+                results = await broker.route_many([make_message(index=i) for i in range(3)])
+            return results, handler.batches, broker.get_inbox_stats("agent-b")
+
+        results, batches, stats = asyncio.run(scenario())
+
+        assert all(r.valid for r in results)
+        assert batches == [[0, 1, 2]]
+        assert stats["delivered"] == 3
+
+    def test_slow_handler_does_not_stall_other_agents(self):
+        """Test a slow handler only delays its own inbox."""
+        async def scenario():
+            fast_done = asyncio.Event()
+
+            async def slow_handler(message):
+                await asyncio.sleep(0.5)
+
+            async def fast_handler(message):
+                fast_done.set()
+
+            async with AsyncProtocolBroker() as broker:
+                broker.register_agent("slow", slow_handler)
+                broker.register_agent("fast", fast_handler)
+
+                start = time.monotonic()
+                await broker.route_message(make_message("slow"))
+                await broker.route_message(make_message("fast"))
+                await asyncio.wait_for(fast_done.wait(), timeout=1.0)
+                fast_latency = time.monotonic() - start
+
+                await broker.stop(drain=False)
+            return fast_latency
+
+        fast_latency = asyncio.run(scenario())
+
+        assert fast_latency < 0.25
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -14,6 +14,8 @@ from src.a_domain.protocol.broker import (
     Handshake,
     Contract
 )
+from src.a_domain.protocol.expiry import ExpiryScheduler
+from src.a_domain.protocol.admission import AdmissionController, RateLimit
 from src.a_domain.protocol.message import (
     ProtocolMessage,
     Agent,
@@ -22,6 +24,16 @@ from src.a_domain.protocol.message import (
 )
 
 
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
 class TestHandshakeManager:
     """Test handshake management."""
 
@@ -94,6 +106,25 @@ class TestHandshakeManager:
         assert manager.get_handshake(handshake1.handshake_id) is None
         assert manager.get_handshake(handshake2.handshake_id) is None
 
+    def test_expiry_callback(self):
+        """Test expired handshakes are reported to on_expired."""
+        clock = FakeClock()
+        expired = []
+        manager = HandshakeManager(
+            timeout_seconds=5,
+            scheduler=ExpiryScheduler(clock=clock),
+            on_expired=expired.append
+        )
+        handshake = manager.create_handshake("agent-a", "agent-b", "test")
+
+        clock.now += 6
+        # Due expiries are also processed when the next handshake is created
+        manager.create_handshake("agent-c", "agent-d", "test")
+
+        assert expired == [handshake]
+        assert manager.get_handshake(handshake.handshake_id) is None
+        assert len(manager.handshakes) == 1
+
 
 class TestContractStore:
     """Test contract storage."""
@@ -147,6 +178,31 @@ class TestContractStore:
         retrieved = store.get_contract("test-contract")
         assert retrieved.status == "terminated"
 
+    def test_terminated_contract_expires(self):
+        """Test terminated contracts are removed after their retention."""
+        from datetime import datetime
+
+        clock = FakeClock()
+        store = ContractStore(scheduler=ExpiryScheduler(clock=clock), terminated_ttl_seconds=60)
+        store.store_contract(Contract(
+            contract_id="test-contract",
+            participants=["agent-a", "agent-b"],
+            input_schema={},
+            output_schema={},
+            security_policy={},
+            created_at=datetime.utcnow(),
+            status="active"
+        ))
+
+        store.terminate_contract("test-contract")
+        clock.now += 30
+        store.scheduler.run_pending()
+        assert store.get_contract("test-contract") is not None
+
+        clock.now += 31
+        store.scheduler.run_pending()
+        assert store.get_contract("test-contract") is None
+
 
 class TestMessageRouter:
     """Test message routing."""
@@ -408,6 +464,45 @@ class TestProtocolBrokerAgent:
         assert stats["contract_id"] == contract_id
         assert stats["participants"] == ["agent-a", "agent-b"]
 
+    def test_idle_collaboration_expires(self):
+        """Test idle collaborations stop being tracked; active ones are kept."""
+        from datetime import datetime, timedelta
+
+        clock = FakeClock()
+        broker = ProtocolBrokerAgent(expiry_scheduler=ExpiryScheduler(clock=clock))
+        broker.register_agent("agent-a", lambda m: None)
+        broker.register_agent("agent-b", lambda m: None)
+
+        handshake_result = broker.initiate_handshake("agent-a", "agent-b", "test")
+        contract_id = broker.accept_handshake(
+            handshake_result.details["handshake_id"]
+        ).details["contract_id"]
+
+        broker.route_message(ProtocolMessage(
+            source_agent=Agent(agent_id="agent-a", domain="test", version="1.0.0"),
+            target_agent=Agent(agent_id="agent-b", domain="test", version="1.0.0"),
+            message_type="request",
+            intent="test",
+            payload={"contract_id": contract_id},
+            security=Security(auth_token="test-token")
+        ))
+        collaboration = list(broker.collaborations.values())[0]
+
+        # Recent activity: the idle check is rescheduled, not applied
+        clock.now += ProtocolBrokerAgent.COLLABORATION_IDLE_SECONDS + 1
+        broker.expiry_scheduler.run_pending()
+        assert collaboration.collaboration_id in broker.collaborations
+
+        # No activity for the whole idle window
+        collaboration.last_activity = datetime.utcnow() - timedelta(
+            seconds=ProtocolBrokerAgent.COLLABORATION_IDLE_SECONDS + 1
+        )
+        clock.now += ProtocolBrokerAgent.COLLABORATION_IDLE_SECONDS + 1
+        broker.expiry_scheduler.run_pending()
+
+        assert broker.collaborations == {}
+        assert broker.contract_store.get_contract(contract_id).status == "active"
+
     def test_terminate_collaboration(self):
         """Test terminating a collaboration."""
         broker = ProtocolBrokerAgent()
@@ -455,6 +550,328 @@ class TestProtocolBrokerAgent:
         stats = broker.get_collaboration_stats(collaboration_id)
         assert stats is None
 
+    def test_route_many(self):
+        """Test batch routing returns per-message results in input order."""
+        broker = ProtocolBrokerAgent()
+
+        received = []
+
+        class BatchHandler:
+            def __init__(self):
+                self.batches = []
+
+            def __call__(self, message):
+                received.append(message)
+
+            def handle_batch(self, messages):
+                self.batches.append(list(messages))
+
+        batch_handler = BatchHandler()
+        broker.register_agent("agent-b", batch_handler)
+        broker.register_agent("agent-c", lambda message: received.append(message))
+
+        handshake_result = broker.initiate_handshake("agent-a", "agent-b", "test")
+        contract_id = broker.accept_handshake(
+            handshake_result.details["handshake_id"]
+        ).details["contract_id"]
+
+        source = Agent(agent_id="agent-a", domain="test", version="1.0.0")
+        security = Security(auth_token="test-token")
+
+        def make(target_id, payload, message_type="request"):
+            return ProtocolMessage(
+                source_agent=source,
+                target_agent=Agent(agent_id=target_id, domain="test", version="1.0.0"),
+                message_type=message_type,
+                intent="test",
+                payload=payload,
+                security=security
+            )
+
+        messages = [
+            make("agent-b", {"contract_id": contract_id, "index": 0}),
+            make("agent-c", {"index": 1}),
+            make("agent-b", {"contract_id": contract_id, "index": 2}),
+            make("agent-b", {"contract_id": "contract-missing"}),
+            make("agent-x", {"index": 4}),
+            make("agent-c", {"index": 5}, message_type="bogus"),
+            make("agent-c", {"index": 6}),
+        ]
+
+        results = broker.route_many(messages)
+
+        assert [r.valid for r in results] == [True, True, True, False, False, False, True]
+        assert results[3].error_code == ErrorCode.CONTRACT_VIOLATION
+        assert results[4].error_code == ErrorCode.CAPABILITY_NOT_FOUND
+        assert results[5].error_code == "INVALID_MESSAGE_TYPE"
+
+        # Batch-capable handler gets one list per group; others get single messages
+        assert [[m.payload["index"] for m in b] for b in batch_handler.batches] == [[0, 2]]
+        assert [m.payload["index"] for m in received] == [1, 6]
+
+        # Collaboration counted every message in the group
+        stats = broker.get_collaboration_stats(next(iter(broker.collaborations)))
+        assert stats["message_count"] == 2
+
+    def test_rate_limited_agent(self):
+        """Test a noisy agent gets RATE_LIMIT_EXCEEDED while others are served."""
+        broker = ProtocolBrokerAgent(
+            admission=AdmissionController(agent_limit=RateLimit(rate=1, burst=2))
+        )
+        broker.register_agent("agent-b", lambda m: None)
+
+        def make(source_id):
+            return ProtocolMessage(
+                source_agent=Agent(agent_id=source_id, domain="test", version="1.0.0"),
+                target_agent=Agent(agent_id="agent-b", domain="test", version="1.0.0"),
+                message_type="request",
+                intent="test",
+                payload={},
+                security=Security(auth_token="test-token")
+            )
+
+        results = [broker.route_message(make("noisy")) for _ in range(3)]
+        batch = broker.route_many([make("noisy"), make("quiet")])
+
+        assert [r.valid for r in results] == [True, True, False]
+        assert results[2].error_code == ErrorCode.RATE_LIMIT_EXCEEDED
+        assert results[2].to_error_response().retry_after >= 1
+        assert not batch[0].valid
+        assert batch[1].valid
+
+    def test_concurrency_cap_sheds_load(self):
+        """Test deliveries beyond max_in_flight are rejected immediately."""
+        broker = ProtocolBrokerAgent(admission=AdmissionController(max_in_flight=1))
+        nested_results = []
+
+        def make(target_id):
+            return ProtocolMessage(
+                source_agent=Agent(agent_id="agent-a", domain="test", version="1.0.0"),
+                target_agent=Agent(agent_id=target_id, domain="test", version="1.0.0"),
+                message_type="request",
+                intent="test",
+                payload={},
+                security=Security(auth_token="test-token")
+            )
+
+        # While agent-b's handler runs, the only delivery slot is taken
+        broker.register_agent("agent-b", lambda m: nested_results.append(broker.route_message(make("agent-c"))))
+        broker.register_agent("agent-c", lambda m: None)
+
+        result = broker.route_message(make("agent-b"))
+
+        assert result.valid
+        assert nested_results[0].error_code == ErrorCode.RATE_LIMIT_EXCEEDED
+        assert nested_results[0].details["limit"] == "in_flight"
+        assert broker.route_message(make("agent-c")).valid
+
+    def test_shed_batch_is_not_charged(self):
+        """Test a group shed by the concurrency cap spends no rate-limit tokens."""
+        broker = ProtocolBrokerAgent(admission=AdmissionController(
+            agent_limit=RateLimit(rate=0.001, burst=1), max_in_flight=1
+        ))
+        broker.register_agent("agent-a", lambda m: None)
+        broker.register_agent("agent-c", lambda m: None)
+        handshake_id = broker.initiate_handshake("agent-a", "agent-c", "test").details["handshake_id"]
+        contract_id = broker.accept_handshake(handshake_id).details["contract_id"]
+
+        def make(source_id, target_id, payload):
+            return ProtocolMessage(
+                source_agent=Agent(agent_id=source_id, domain="test", version="1.0.0"),
+                target_agent=Agent(agent_id=target_id, domain="test", version="1.0.0"),
+                message_type="request",
+                intent="test",
+                payload=payload,
+                security=Security(auth_token="test-token")
+            )
+
+        # While agent-b's handler runs, the only delivery slot is taken
+        nested_results = []
+        broker.register_agent("agent-b", lambda m: nested_results.extend(
+            broker.route_many([make("agent-a", "agent-c", {"contract_id": contract_id})])
+        ))
+        assert broker.route_message(make("agent-x", "agent-b", {})).valid
+
+        assert nested_results[0].details["limit"] == "in_flight"
+        assert broker.collaborations == {}
+        assert broker.route_many([make("agent-a", "agent-c", {"contract_id": contract_id})])[0].valid
+
+    def test_concurrent_collaboration_updates(self):
+        """Test concurrent routing on one contract creates a single collaboration."""
+        import threading
+
+        broker = ProtocolBrokerAgent()
+        broker.register_agent("agent-a", lambda message: None)
+        broker.register_agent("agent-b", lambda message: None)
+
+        handshake_result = broker.initiate_handshake("agent-a", "agent-b", "test")
+        accept_result = broker.accept_handshake(handshake_result.details["handshake_id"])
+        contract_id = accept_result.details["contract_id"]
+
+        source = Agent(agent_id="agent-a", domain="test", version="1.0.0")
+        target = Agent(agent_id="agent-b", domain="test", version="1.0.0")
+        security = Security(auth_token="test-token")
+
+        def send(count):
+            for i in range(count):
+                broker.route_message(ProtocolMessage(
+                    source_agent=source,
+                    target_agent=target,
+                    message_type="request",
+                    intent="test",
+                    payload={"contract_id": contract_id, "index": i},
+                    security=security
+                ))
+
+        threads = [threading.Thread(target=send, args=(250,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(broker.collaborations) == 1
+        collaboration_id = next(iter(broker.collaborations))
+        stats = broker.get_collaboration_stats(collaboration_id)
+        assert stats["message_count"] == 1000
+
+        # Terminating removes the contract index entry too; new traffic is rejected
+        broker.terminate_collaboration(collaboration_id)
+        assert contract_id not in broker._collaborations_by_contract
+
+
+class TestContractSchemas:
+    """Test payload validation against contract schemas."""
+
+    INPUT_SCHEMA = {
+        "type": "object",
+        "properties": {"dataset": {"type": "string"}, "rows": {"type": "integer", "minimum": 1}},
+        "required": ["dataset", "rows"]
+    }
+
+    def _broker(self, **accept_kwargs):
+        """Broker with agents a and b and an accepted contract a -> b."""
+        from src.a_domain.protocol.discovery import CapabilityDiscoveryAgent
+
+        discovery = CapabilityDiscoveryAgent()
+        discovery.register_capability(
+            agent_id="agent-b",
+            domain="test",
+            version="1.0.0",
+            intents=["provision"],
+            input_schema=self.INPUT_SCHEMA,
+            output_schema={"dataset_id": "string"}
+        )
+
+        broker = ProtocolBrokerAgent(discovery=discovery)
+        received = []
+        broker.register_agent("agent-a", received.append)
+        broker.register_agent("agent-b", received.append)
+
+        handshake_id = broker.initiate_handshake("agent-a", "agent-b", "provision").details["handshake_id"]
+        contract_id = broker.accept_handshake(handshake_id, **accept_kwargs).details["contract_id"]
+        return broker, contract_id, received
+
+    @staticmethod
+    def _message(contract_id, payload, message_type="request", source="agent-a", target="agent-b"):
+        return ProtocolMessage(
+            source_agent=Agent(agent_id=source, domain="test", version="1.0.0"),
+            target_agent=Agent(agent_id=target, domain="test", version="1.0.0"),
+            message_type=message_type,
+            intent="provision",
+            payload={"contract_id": contract_id, **payload},
+            security=Security(auth_token="test-token")
+        )
+
+    def test_schemas_loaded_from_registry(self):
+        """Test contracts take their schemas from the target's capability."""
+        broker, contract_id, _ = self._broker()
+
+        contract = broker.contract_store.get_contract(contract_id)
+        assert contract.input_schema == self.INPUT_SCHEMA
+        assert contract.output_schema == {"dataset_id": "string"}
+
+    def test_request_payload_validated(self):
+        """Test requests must match the contract's input schema."""
+        broker, contract_id, received = self._broker()
+
+        ok = broker.route_message(self._message(contract_id, {"dataset": "users", "rows": 10}))
+        bad = broker.route_message(self._message(contract_id, {"dataset": "users", "rows": 0}))
+
+        assert ok.valid
+        assert not bad.valid
+        assert bad.error_code == ErrorCode.SCHEMA_MISMATCH
+        assert bad.details == {"contract_id": contract_id, "schema": "input", "error": "$.rows: 0 is below minimum 1"}
+        assert len(received) == 1
+
+    def test_response_payload_validated(self):
+        """Test responses must match the output schema; events are not checked."""
+        broker, contract_id, _ = self._broker()
+
+        ok = broker.route_message(self._message(
+            contract_id, {"dataset_id": "ds-1"}, "response", source="agent-b", target="agent-a"
+        ))
+        bad = broker.route_message(self._message(
+            contract_id, {"rows": 1}, "response", source="agent-b", target="agent-a"
+        ))
+        event = broker.route_message(self._message(contract_id, {"anything": True}, "event"))
+
+        assert ok.valid and event.valid
+        assert bad.error_code == ErrorCode.SCHEMA_MISMATCH
+        assert bad.details["schema"] == "output"
+
+    def test_closed_schema_ignores_envelope_keys(self):
+        """Test contract_id and correlation_id do not count as unexpected fields."""
+        closed = {
+            "type": "object",
+            "properties": {"x": {"type": "integer"}},
+            "required": ["x"],
+            "additionalProperties": False
+        }
+        broker, contract_id, received = self._broker(input_schema=closed, output_schema=closed)
+
+        request = self._message(contract_id, {"x": 1})
+        response = request.create_response({"contract_id": contract_id, "x": 2})
+        extra = self._message(contract_id, {"x": 1, "y": 2})
+
+        assert broker.route_message(request).valid
+        assert broker.route_message(response).valid
+        assert broker.route_many([extra])[0].details["error"] == "$: unexpected field 'y'"
+        assert [m.payload["x"] for m in received] == [1, 2]
+
+    def test_explicit_schemas_override_registry(self):
+        """Test schemas passed at accept time replace the registry's."""
+        broker, contract_id, _ = self._broker(input_schema={}, output_schema={})
+
+        assert broker.route_message(self._message(contract_id, {"unrelated": 1})).valid
+
+    def test_malformed_schema_rejects_contract(self):
+        """Test a contract whose schema cannot compile is not created."""
+        broker = ProtocolBrokerAgent()
+        broker.register_agent("agent-b", lambda message: None)
+        handshake_id = broker.initiate_handshake("agent-a", "agent-b", "test").details["handshake_id"]
+
+        result = broker.accept_handshake(handshake_id, input_schema={"type": "object", "properties": {"id": {"type": "text"}}})
+
+        assert not result.valid
+        assert result.error_code == "INVALID_CONTRACT"
+
+    def test_route_many_validates_payloads(self):
+        """Test batch routing rejects only the non-conforming messages."""
+        broker, contract_id, received = self._broker()
+
+        results = broker.route_many([
+            self._message(contract_id, {"dataset": "a", "rows": 1}),
+            self._message(contract_id, {"dataset": "b"}),
+            self._message(contract_id, {"dataset": "c", "rows": 3}),
+        ])
+
+        assert [r.valid for r in results] == [True, False, True]
+        assert results[1].details["error"] == "$: missing required field 'rows'"
+        assert [m.payload["dataset"] for m in received] == ["a", "c"]
+
+        stats = broker.get_collaboration_stats(next(iter(broker.collaborations)))
+        assert stats["message_count"] == 2
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,158 @@
+"""
+Unit tests for protocol message codecs.
+
+Tests JSON and binary wire encodings and per-contract codec negotiation.
+"""
+
+import pytest
+from src.a_domain.protocol.codec import (
+    JSONCodec,
+    BinaryCodec,
+    CodecError,
+    negotiate_codec,
+    create_codec
+)
+from src.a_domain.protocol.broker import ProtocolBrokerAgent
+from src.a_domain.protocol.message import ProtocolMessage, Agent, Security
+
+
+def make_message(**overrides) -> ProtocolMessage:
+    """Create a request message with optional field overrides."""
+    fields = dict(
+        source_agent=Agent(agent_id="agent-a", domain="test", version="1.0.0"),
+        target_agent=Agent(agent_id="agent-b", domain="test", version="2.1.0"),
+        message_type="request",
+        intent="provision_test_dataset",
+        payload={"dataset": "café", "rows": [1, 2.5, None, True], "nested": {"k": "v"}},
+        security=Security(auth_token="test-token")
+    )
+    fields.update(overrides)
+    return ProtocolMessage(**fields)
+
+
+class TestJSONCodec:
+    """Test JSON codec."""
+
+    def test_round_trip(self):
+        """Test JSON encode/decode preserves the message."""
+        codec = JSONCodec()
+        message = make_message()
+
+        decoded = codec.decode(codec.encode(message))
+
+        assert decoded.to_dict() == message.to_dict()
+        assert decoded.wire_size == len(codec.encode(message))
+
+    def test_invalid_data(self):
+        """Test malformed JSON raises CodecError."""
+        with pytest.raises(CodecError):
+            JSONCodec().decode(b"{not json")
+
+
+class TestBinaryCodec:
+    """Test binary codec."""
+
+    def test_round_trip(self):
+        """Test binary encode/decode preserves the message."""
+        codec = BinaryCodec(agent_ids=["agent-a", "agent-b"])
+        message = make_message()
+
+        decoded = codec.decode(codec.encode(message))
+
+        assert decoded.to_dict() == message.to_dict()
+
+    def test_round_trip_uncommon_fields(self):
+        """Test non-UUID ids, custom versions, no intent and aes256 survive."""
+        codec = BinaryCodec()
+        message = make_message(
+            message_id="custom-id",
+            protocol_version="1.1",
+            intent=None,
+            message_type="error",
+            security=Security(auth_token="t", encryption="aes256")
+        )
+
+        decoded = codec.decode(codec.encode(message))
+
+        assert decoded.to_dict() == message.to_dict()
+
+    def test_smaller_than_json(self):
+        """Test binary encoding with interned agents is smaller than JSON."""
+        message = make_message()
+        json_size = len(JSONCodec().encode(message))
+        binary_size = len(BinaryCodec(agent_ids=["agent-a", "agent-b"]).encode(message))
+        literal_size = len(BinaryCodec().encode(message))
+
+        assert binary_size < literal_size < json_size
+        assert binary_size < json_size / 2
+
+    def test_interning_requires_matching_table(self):
+        """Test decoding a reference outside the agent table fails cleanly."""
+        data = BinaryCodec(agent_ids=["agent-a", "agent-b"]).encode(make_message())
+
+        with pytest.raises(CodecError):
+            BinaryCodec().decode(data)
+
+    def test_truncated_data(self):
+        """Test truncated buffers raise CodecError."""
+        data = BinaryCodec().encode(make_message())
+
+        with pytest.raises(CodecError):
+            BinaryCodec().decode(data[:20])
+
+    def test_large_varint_lengths(self):
+        """Test strings longer than one varint byte round-trip."""
+        codec = BinaryCodec()
+        message = make_message(intent="x" * 20000)
+
+        assert codec.decode(codec.encode(message)).intent == "x" * 20000
+
+
+class TestCodecNegotiation:
+    """Test codec negotiation."""
+
+    def test_negotiate_prefers_offered_order(self):
+        """Test the first mutually supported codec is chosen."""
+        assert negotiate_codec(["binary", "json"], ["json", "binary"]) == "binary"
+        assert negotiate_codec(["binary", "json"], ["json"]) == "json"
+        assert negotiate_codec(["msgpack"], ["msgpack"]) == "json"
+        assert negotiate_codec(None, None) == "json"
+
+    def test_create_codec(self):
+        """Test codec creation by name."""
+        assert isinstance(create_codec("json"), JSONCodec)
+        assert create_codec("binary", ["a", "b"]).agent_ids == ("a", "b")
+
+    def test_broker_negotiates_at_handshake(self):
+        """Test the broker records the negotiated codec on the contract."""
+        broker = ProtocolBrokerAgent()
+        broker.register_agent("agent-a", lambda m: None)
+        broker.register_agent("agent-b", lambda m: None)
+
+        handshake = broker.initiate_handshake("agent-a", "agent-b", "test", codecs=["binary", "json"])
+        accepted = broker.accept_handshake(handshake.details["handshake_id"], codecs=["binary"])
+        contract_id = accepted.details["contract_id"]
+
+        assert accepted.details["codec"] == "binary"
+        assert broker.contract_store.get_contract(contract_id).codec == "binary"
+
+        codec = broker.get_codec(contract_id)
+        assert isinstance(codec, BinaryCodec)
+        assert codec.agent_ids == ("agent-a", "agent-b")
+        assert broker.get_codec(contract_id) is codec
+
+    def test_broker_defaults_to_json(self):
+        """Test contracts without codec preferences use JSON."""
+        broker = ProtocolBrokerAgent()
+        broker.register_agent("agent-b", lambda m: None)
+
+        handshake = broker.initiate_handshake("agent-a", "agent-b", "test")
+        accepted = broker.accept_handshake(handshake.details["handshake_id"])
+
+        assert accepted.details["codec"] == "json"
+        assert isinstance(broker.get_codec(accepted.details["contract_id"]), JSONCodec)
+        assert broker.get_codec("missing") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
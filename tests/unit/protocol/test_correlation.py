@@ -0,0 +1,177 @@
+"""
+Unit tests for request/response correlation.
+
+Tests CorrelationTable and the broker request() APIs.
+"""
+
+import asyncio
+import threading
+import pytest
+from src.a_domain.protocol.correlation import CorrelationTable
+from src.a_domain.protocol.broker import ProtocolBrokerAgent
+from src.a_domain.protocol.async_broker import AsyncProtocolBroker
+from src.a_domain.protocol.message import (
+    ProtocolMessage,
+    Agent,
+    Security,
+    ErrorCode
+)
+
+
+def make_request(target_id: str = "agent-b", payload=None) -> ProtocolMessage:
+    """Create a request from agent-a."""
+    return ProtocolMessage(
+        source_agent=Agent(agent_id="agent-a", domain="test", version="1.0.0"),
+        target_agent=Agent(agent_id=target_id, domain="test", version="1.0.0"),
+        message_type="request",
+        intent="test",
+        payload=payload or {},
+        security=Security(auth_token="test-token")
+    )
+
+
+class TestCorrelationTable:
+    """Test pending request tracking."""
+
+    def test_resolve(self):
+        """Test a response resolves its request's future."""
+        table = CorrelationTable()
+        request = make_request()
+        future = table.register(request, timeout=5)
+
+        response = request.create_response(payload={"result": "ok"})
+
+        assert table.resolve(response) is True
+        assert future.result(0) is response
+        assert len(table) == 0
+        assert not table.scheduler.is_scheduled(("request", request.message_id))
+
+    def test_unmatched_messages(self):
+        """Test requests and unknown responses are not consumed."""
+        table = CorrelationTable()
+        request = make_request()
+        table.register(request, timeout=5)
+
+        unrelated = make_request().create_response(payload={})
+
+        assert table.resolve(make_request(payload={"correlation_id": request.message_id})) is False
+        assert table.resolve(unrelated) is False
+        assert len(table) == 1
+
+    def test_duplicate_key(self):
+        """Test a second pending request with the same key is rejected."""
+        table = CorrelationTable()
+        table.register(make_request(payload={"correlation_id": "corr-1"}), timeout=5)
+
+        with pytest.raises(ValueError):
+            table.register(make_request(payload={"correlation_id": "corr-1"}), timeout=5)
+
+    def test_expire(self):
+        """Test expiry resolves the future with a TIMEOUT error message."""
+        table = CorrelationTable()
+        request = make_request()
+        future = table.register(request, timeout=0)
+
+        table.scheduler.run_pending()
+        error = future.result(0)
+
+        assert error.message_type == "error"
+        assert error.payload["error"]["code"] == ErrorCode.TIMEOUT
+        assert error.correlation_id == request.message_id
+        assert table.get_metrics()["timed_out"] == 1
+        assert table.expire(request.message_id) is False
+
+
+class TestBrokerRequest:
+    """Test ProtocolBrokerAgent.request."""
+
+    def test_inline_response(self):
+        """Test a handler that responds synchronously."""
+        broker = ProtocolBrokerAgent()
+        broker.register_agent(
+            "agent-b",
+            lambda m: broker.route_message(m.create_response(payload={"echo": m.payload["value"]}))
+        )
+
+        response = broker.request(make_request(payload={"value": 7}), timeout=1)
+
+        assert response.message_type == "response"
+        assert response.payload["echo"] == 7
+        assert len(broker.correlations) == 0
+
+    def test_response_from_another_thread(self):
+        """Test a response routed later from another thread."""
+        broker = ProtocolBrokerAgent()
+
+        def handler(message):
+            threading.Timer(
+                0.05, broker.route_message, [message.create_response(payload={"ok": True})]
+            ).start()
+
+        broker.register_agent("agent-b", handler)
+        broker.register_agent("agent-a", lambda m: pytest.fail("response delivered to handler"))
+
+        response = broker.request(make_request(), timeout=2)
+
+        assert response.payload["ok"] is True
+
+    def test_timeout(self):
+        """Test a request without a response returns a TIMEOUT error message."""
+        broker = ProtocolBrokerAgent()
+        broker.register_agent("agent-b", lambda m: None)
+        request = make_request()
+
+        response = broker.request(request, timeout=0.05)
+
+        assert response.message_type == "error"
+        assert response.payload["error"]["code"] == ErrorCode.TIMEOUT
+        assert response.correlation_id == request.message_id
+        assert len(broker.correlations) == 0
+
+    def test_routing_failure(self):
+        """Test routing errors resolve immediately as error messages."""
+        broker = ProtocolBrokerAgent()
+
+        response = broker.request(make_request("missing"), timeout=5)
+
+        assert response.message_type == "error"
+        assert response.payload["error"]["code"] == ErrorCode.CAPABILITY_NOT_FOUND
+
+
+class TestAsyncBrokerRequest:
+    """Test AsyncProtocolBroker.request."""
+
+    def test_concurrent_requests(self):
+        """Test many concurrent requests each get their own response."""
+        async def scenario():
+            async with AsyncProtocolBroker() as broker:
+                async def handler(message):
+                    await asyncio.sleep(0.01)
+                    await broker.route_message(
+                        message.create_response(payload={"value": message.payload["value"]})
+                    )
+
+                broker.register_agent("agent-b", handler)
+                return await asyncio.gather(*(
+                    broker.request(make_request(payload={"value": i}), timeout=2)
+                    for i in range(20)
+                ))
+
+        responses = asyncio.run(scenario())
+
+        assert [r.payload["value"] for r in responses] == list(range(20))
+
+    def test_timeout(self):
+        """Test an unanswered async request returns a TIMEOUT error message."""
+        async def scenario():
+            async with AsyncProtocolBroker() as broker:
+                broker.register_agent("agent-b", lambda m: None)
+                return await broker.request(make_request(), timeout=0.05)
+
+        response = asyncio.run(scenario())
+
+        assert response.payload["error"]["code"] == ErrorCode.TIMEOUT
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -11,7 +11,11 @@ from src.a_domain.protocol.discovery import (
     CapabilityRegistry,
     CompatibilityMatrix,
     AgentMatch,
-    CompatibilityResult
+    CapabilityQuery,
+    CompatibilityResult,
+    RegistrySnapshot,
+    DiscoveryCache,
+    tokenize
 )
 
 
@@ -236,6 +240,38 @@ class TestCompatibilityMatrix:
         retrieved = matrix.get_compatibility("agent-1", "agent-2")
         assert retrieved is None
 
+    def test_tuple_key(self):
+        """Test pairs are keyed by an ordered ID tuple."""
+        matrix = CompatibilityMatrix()
+        matrix.set_compatibility(CompatibilityResult(True, "agent-2", "agent-1", "1.0"))
+
+        assert list(matrix.matrix) == [("agent-1", "agent-2")]
+
+    def test_invalidate_agent(self):
+        """Test invalidation drops only the pairs involving the agent."""
+        matrix = CompatibilityMatrix()
+        for a, b in [("a", "b"), ("a", "c"), ("b", "c")]:
+            matrix.set_compatibility(CompatibilityResult(True, a, b, "1.0"))
+
+        dropped = matrix.invalidate_agent("a")
+
+        assert sorted((r.agent_a, r.agent_b) for r in dropped) == [("a", "b"), ("a", "c")]
+        assert list(matrix.matrix) == [("b", "c")]
+        assert matrix.invalidate_agent("a") == []
+
+    def test_stale_result_not_stored(self):
+        """Test results computed before an invalidation are discarded."""
+        matrix = CompatibilityMatrix()
+        generations = (matrix.generation("a"), matrix.generation("b"))
+
+        matrix.invalidate_agent("a")  # Schema changed while the check ran
+
+        assert matrix.set_compatibility(CompatibilityResult(True, "a", "b", "1.0"), generations) is False
+        assert matrix.get_compatibility("a", "b") is None
+
+        generations = (matrix.generation("a"), matrix.generation("b"))
+        assert matrix.set_compatibility(CompatibilityResult(True, "a", "b", "1.0"), generations) is True
+
 
 class TestCapabilityDiscoveryAgent:
     """Test CapabilityDiscoveryAgent functionality."""
@@ -534,5 +570,651 @@ class TestCapabilityDiscoveryAgent:
         assert len(matches) == 3  # agents 0, 5, 10
 
 
+class TestCapabilityQuery:
+    """Test indexed multi-predicate discovery."""
+
+    @pytest.fixture
+    def discovery(self):
+        """Discovery agent with a small mixed catalogue."""
+        discovery = CapabilityDiscoveryAgent()
+        discovery.register_capability(
+            agent_id="validator-v1",
+            domain="data",
+            version="1.4.0",
+            intents=["validate_data"],
+            input_schema={},
+            output_schema={},
+            provides=["data_validation"],
+            description="Validates tabular datasets against a schema"
+        )
+        discovery.register_capability(
+            agent_id="validator-v2",
+            domain="data",
+            version="2.1.0",
+            intents=["validate_data"],
+            input_schema={},
+            output_schema={},
+            provides=["data_validation"],
+            requires=["schema_registry"],
+            description="Fast streaming validation of datasets"
+        )
+        discovery.register_capability(
+            agent_id="generalist",
+            domain="data",
+            version="1.10.0",
+            intents=["validate_data", "provision_dataset", "export_report"],
+            input_schema={},
+            output_schema={},
+            provides=["data_validation", "dataset_provisioning"],
+            description="Does a bit of everything"
+        )
+        discovery.register_capability(
+            agent_id="reporter",
+            domain="reporting",
+            version="1.0.0",
+            intents=["export_report"],
+            input_schema={},
+            output_schema={},
+            description="Renders PDF reports"
+        )
+        return discovery
+
+    def test_tokenize(self):
+        """Test identifiers and text tokenize alike."""
+        assert tokenize("provision_test_dataset") == ["provision", "test", "dataset"]
+        assert tokenize("Provision a Test-Dataset!") == ["provision", "test", "dataset"]
+
+    def test_specialists_rank_above_generalists(self, discovery):
+        """Test intent matches are scored by specificity."""
+        matches = discovery.discover_by_intent("validate_data")
+
+        assert [m.agent_id for m in matches] == ["validator-v1", "validator-v2", "generalist"]
+        assert matches[0].match_score == 1.0
+        assert matches[2].match_score == pytest.approx(1 / 3)
+
+    def test_predicates_are_anded(self, discovery):
+        """Test intent, domain and provides must all match."""
+        matches = discovery.discover(CapabilityQuery(
+            intents=["validate_data", "export_report"],
+            domain="data",
+            provides=["data_validation"]
+        ))
+
+        assert [m.agent_id for m in matches] == ["generalist"]
+
+    def test_requires_predicate(self, discovery):
+        """Test filtering on required capabilities."""
+        matches = discovery.discover(CapabilityQuery(requires=["schema_registry"]))
+
+        assert [m.agent_id for m in matches] == ["validator-v2"]
+
+    def test_version_range(self, discovery):
+        """Test min (inclusive) and max (exclusive) version bounds compare numerically."""
+        matches = discovery.discover(CapabilityQuery(
+            intents=["validate_data"],
+            min_version="1.4.0",
+            max_version="2.0.0"
+        ))
+
+        assert sorted(m.agent_id for m in matches) == ["generalist", "validator-v1"]
+
+    def test_text_query_ranks_by_matched_tokens(self, discovery):
+        """Test free-text queries match descriptions and names."""
+        matches = discovery.discover(CapabilityQuery(text="streaming validation"))
+
+        assert matches[0].agent_id == "validator-v2"
+        assert matches[0].match_score == pytest.approx(1.0)
+        assert all(m.match_score < 1.0 for m in matches[1:])
+
+        assert discovery.discover(CapabilityQuery(text="quantum")) == []
+
+    def test_text_combined_with_predicates(self, discovery):
+        """Test text only ranks within the structured matches."""
+        matches = discovery.discover(CapabilityQuery(domain="data", text="export pdf"))
+
+        assert [m.agent_id for m in matches] == ["generalist"]
+
+    def test_top_k(self, discovery):
+        """Test limit returns only the best k matches."""
+        matches = discovery.discover(CapabilityQuery(intents=["validate_data"], limit=1))
+
+        assert len(matches) == 1
+        assert matches[0].agent_id in ("validator-v1", "validator-v2")
+        assert matches[0].match_score == 1.0
+
+        assert discovery.discover(CapabilityQuery(intents=["validate_data"], limit=0)) == []
+
+    def test_text_top_k_matches_full_ranking(self):
+        """Test early termination returns the same scores as a full ranking."""
+        discovery = CapabilityDiscoveryAgent()
+        for i in range(300):
+            discovery.register_capability(
+                agent_id=f"agent-{i}",
+                domain="test",
+                version="1.0.0",
+                intents=[f"intent_{i % 7}"],
+                input_schema={},
+                output_schema={},
+                description=f"worker {i % 3} shard {i % 11} region {i % 29}"
+            )
+
+        for text in ["worker shard 5", "region 17 shard 3 worker 1", "intent 4 region 2"]:
+            full = discovery.discover(CapabilityQuery(text=text))
+            top = discovery.discover(CapabilityQuery(text=text, limit=10))
+
+            assert [m.match_score for m in top] == pytest.approx([m.match_score for m in full[:10]])
+
+    def test_unregister_removes_index_terms(self, discovery):
+        """Test unregistered agents no longer match any index."""
+        discovery.unregister_capability("validator-v2")
+
+        assert discovery.discover(CapabilityQuery(requires=["schema_registry"])) == []
+        assert discovery.discover(CapabilityQuery(text="streaming")) == []
+        assert "schema_registry" not in discovery.registry.requires_index
+
+    def test_reregister_replaces_index_terms(self, discovery):
+        """Test re-registering an agent drops its old index entries."""
+        discovery.register_capability(
+            agent_id="reporter",
+            domain="reporting",
+            version="1.1.0",
+            intents=["render_chart"],
+            input_schema={},
+            output_schema={}
+        )
+
+        assert discovery.discover_by_intent("export_report")[0].agent_id == "generalist"
+        assert len(discovery.discover_by_intent("export_report")) == 1
+        assert [m.agent_id for m in discovery.discover_by_intent("render_chart")] == ["reporter"]
+
+
+class TestSnapshotReads:
+    """Test copy-on-write snapshot mode of the registry."""
+
+    @staticmethod
+    def make_capability(agent_id: str, intents, domain: str = "test") -> CapabilitySpec:
+        return CapabilitySpec(
+            agent_id=agent_id,
+            domain=domain,
+            version="1.0.0",
+            intents=list(intents),
+            input_schema={},
+            output_schema={}
+        )
+
+    def test_reads_do_not_take_lock(self):
+        """Test every read path works while a writer holds the lock."""
+        registry = CapabilityRegistry(snapshot_reads=True)
+        registry.register(self.make_capability("agent-1", ["intent_a"]))
+
+        with registry._lock:
+            assert registry.get_capability("agent-1").agent_id == "agent-1"
+            assert registry.find_by_intent("intent_a") == ["agent-1"]
+            assert registry.find_by_domain("test") == ["agent-1"]
+            assert registry.get_agent_count() == 1
+            assert len(registry.get_all_capabilities()) == 1
+            assert registry.query(CapabilityQuery(intents=["intent_a"]))[0][1] == 1.0
+
+    def test_snapshot_is_immutable_and_stable(self):
+        """Test a taken snapshot does not see later writes and rejects mutation."""
+        registry = CapabilityRegistry(snapshot_reads=True)
+        registry.register(self.make_capability("agent-1", ["intent_a"]))
+        before = registry.snapshot()
+
+        registry.register(self.make_capability("agent-2", ["intent_a"]))
+        registry.unregister("agent-1")
+
+        assert set(before.capabilities) == {"agent-1"}
+        assert before.intent_index["intent_a"] == frozenset({"agent-1"})
+        assert set(registry.snapshot().intent_index["intent_a"]) == {"agent-2"}
+
+        with pytest.raises(TypeError):
+            before.capabilities["agent-3"] = None
+        with pytest.raises(AttributeError):
+            before.intent_index["intent_a"].add("agent-3")
+
+    def test_untouched_maps_are_shared(self):
+        """Test writes only copy the index maps they change."""
+        registry = CapabilityRegistry(snapshot_reads=True)
+        registry.register(self.make_capability("agent-1", ["intent_a"]))
+        before = registry.snapshot()
+
+        registry.register(self.make_capability("agent-2", ["intent_b"]))
+        after = registry.snapshot()
+
+        assert after.requires_index is before.requires_index
+        assert after.provides_index is before.provides_index
+        assert after.intent_index is not before.intent_index
+        assert after.intent_index["intent_a"] is before.intent_index["intent_a"]
+
+    def test_matches_locked_mode(self):
+        """Test snapshot and locked registries answer queries identically."""
+        locked = CapabilityRegistry()
+        snapshotted = CapabilityRegistry(snapshot_reads=True)
+        capabilities = [
+            self.make_capability(f"agent-{i}", [f"intent_{i % 4}", f"intent_{i % 3}"], f"domain-{i % 2}")
+            for i in range(40)
+        ]
+        for registry in (locked, snapshotted):
+            registry.register_many(capabilities)
+            for i in range(0, 40, 5):
+                registry.unregister(f"agent-{i}")
+            registry.register(self.make_capability("agent-1", ["intent_9"]))
+
+        for query in (
+            CapabilityQuery(intents=["intent_1"]),
+            CapabilityQuery(domain="domain-0", intents=["intent_2"]),
+            CapabilityQuery(text="intent 9"),
+        ):
+            assert [(c.agent_id, s) for c, s in locked.query(query)] == \
+                [(c.agent_id, s) for c, s in snapshotted.query(query)]
+        expected, actual = locked.snapshot(), snapshotted.snapshot()
+        assert set(expected.capabilities) == set(actual.capabilities)
+        assert dict(expected.intent_index) == dict(actual.intent_index)
+        assert dict(expected.token_index) == dict(actual.token_index)
+
+    def test_concurrent_readers_see_consistent_snapshots(self):
+        """Test readers racing a writer never see a half-applied write."""
+        import threading
+
+        registry = CapabilityRegistry(snapshot_reads=True)
+        stop = threading.Event()
+        errors = []
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                registry.register(self.make_capability(f"agent-{i % 50}", [f"intent_{i % 5}"]))
+                i += 1
+
+        def reader():
+            for _ in range(2000):
+                snapshot = registry.snapshot()
+                indexed = set().union(*snapshot.intent_index.values()) if snapshot.intent_index else set()
+                if indexed != set(snapshot.capabilities):
+                    errors.append((indexed, set(snapshot.capabilities)))
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for r in readers:
+            r.start()
+        for r in readers:
+            r.join()
+        stop.set()
+        thread.join()
+
+        assert errors == []
+
+    def test_discovery_agent_snapshot_mode(self):
+        """Test the discovery agent passes snapshot mode to its registry."""
+        discovery = CapabilityDiscoveryAgent(snapshot_reads=True)
+        discovery.register_capability(
+            agent_id="agent-1",
+            domain="test",
+            version="1.0.0",
+            intents=["intent_a"],
+            input_schema={},
+            output_schema={}
+        )
+
+        assert discovery.registry.snapshot_reads is True
+        assert isinstance(discovery.registry.snapshot(), RegistrySnapshot)
+        assert [m.agent_id for m in discovery.discover_by_intent("intent_a")] == ["agent-1"]
+
+
+class TestMultiVersion:
+    """Test side-by-side capability versions and range resolution."""
+
+    @staticmethod
+    def register(discovery, agent_id: str, version: str, intents, domain: str = "data"):
+        discovery.register_capability(
+            agent_id=agent_id,
+            domain=domain,
+            version=version,
+            intents=list(intents),
+            input_schema={"version": version},
+            output_schema={}
+        )
+
+    @pytest.fixture(params=[False, True], ids=["locked", "snapshot"])
+    def discovery(self, request):
+        """Fleet mid-upgrade: validator 1.x and 2.x side by side."""
+        discovery = CapabilityDiscoveryAgent(snapshot_reads=request.param)
+        self.register(discovery, "validator", "1.4.0", ["validate_data", "legacy_check"])
+        self.register(discovery, "validator", "2.1.0", ["validate_data"])
+        self.register(discovery, "validator", "1.10.2", ["validate_data", "legacy_check"])
+        self.register(discovery, "checker", "2.3.0", ["validate_data"])
+        return discovery
+
+    def test_versions_coexist(self, discovery):
+        """Test every version is stored and the highest is current."""
+        assert discovery.list_versions("validator") == ["1.4.0", "1.10.2", "2.1.0"]
+        assert discovery.registry.get_capability("validator").version == "2.1.0"
+        assert discovery.registry.get_agent_count() == 2
+
+    def test_get_capability_schema_exact_and_range(self, discovery):
+        """Test exact versions and ranges resolve to the right schema."""
+        assert discovery.get_capability_schema("validator", "1.4.0").input_schema == {"version": "1.4.0"}
+        assert discovery.get_capability_schema("validator", "^1.2").version == "1.10.2"
+        assert discovery.get_capability_schema("validator", ">=2.0,<3").version == "2.1.0"
+        assert discovery.get_capability_schema("validator", "1.5.0") is None
+        assert discovery.get_capability_schema("unknown", "^1") is None
+
+    def test_best_version_for_intent(self, discovery):
+        """Test best-version resolution across agents and ranges."""
+        assert discovery.discover_best_version("validate_data").agent_id == "checker"
+        assert discovery.discover_best_version("validate_data", "^2.0 <2.2").version == "2.1.0"
+        assert discovery.discover_best_version("validate_data", "^1").version == "1.10.2"
+        assert discovery.discover_best_version("validate_data", "^3") is None
+        assert discovery.discover_best_version("unknown_intent") is None
+
+    def test_intent_resolves_to_older_release(self, discovery):
+        """Test intents dropped by the current version still resolve to the release serving them."""
+        assert discovery.discover_by_intent("legacy_check") == []
+
+        match = discovery.discover_best_version("legacy_check")
+        assert (match.agent_id, match.version) == ("validator", "1.10.2")
+
+    def test_cache_invalidated_on_register_and_unregister(self, discovery):
+        """Test cached resolutions follow registry writes."""
+        assert discovery.discover_best_version("validate_data", "^2").version == "2.3.0"
+
+        self.register(discovery, "validator", "2.5.0", ["validate_data"])
+        assert discovery.discover_best_version("validate_data", "^2").version == "2.5.0"
+
+        discovery.unregister_capability("validator", "2.5.0")
+        assert discovery.discover_best_version("validate_data", "^2").version == "2.3.0"
+        assert discovery.registry.get_capability("validator").version == "2.1.0"
+
+        discovery.unregister_capability("checker")
+        assert discovery.discover_best_version("validate_data", "^2").version == "2.1.0"
+
+    def test_unregister_version_promotes_next_highest(self, discovery):
+        """Test removing the current version re-indexes the next highest."""
+        assert discovery.unregister_capability("validator", "2.1.0") is True
+        assert discovery.unregister_capability("validator", "2.1.0") is False
+
+        current = discovery.registry.get_capability("validator")
+        assert current.version == "1.10.2"
+        assert "validator" in [m.agent_id for m in discovery.discover_by_intent("legacy_check")]
+
+        assert discovery.unregister_capability("validator") is True
+        assert discovery.list_versions("validator") == []
+        assert discovery.discover_best_version("legacy_check") is None
+        assert discovery.registry.intent_versions.get("legacy_check") is None
+
+    def test_reregister_same_version_replaces(self, discovery):
+        """Test re-registering an existing version replaces it in place."""
+        self.register(discovery, "validator", "1.4.0", ["reformat"])
+
+        assert discovery.list_versions("validator") == ["1.4.0", "1.10.2", "2.1.0"]
+        assert discovery.discover_best_version("reformat").version == "1.4.0"
+        assert discovery.discover_best_version("legacy_check").version == "1.10.2"
+
+    def test_query_version_range(self, discovery):
+        """Test CapabilityQuery filters current versions by semver range."""
+        matches = discovery.discover(CapabilityQuery(intents=["validate_data"], version_range="~2.1"))
+
+        assert [m.agent_id for m in matches] == ["validator"]
+
+    def test_invalid_version_rejected(self, discovery):
+        """Test registering a non-semver version fails without side effects."""
+        with pytest.raises(ValueError):
+            self.register(discovery, "broken", "latest", ["validate_data"])
+
+        assert discovery.registry.get_capability("broken") is None
+
+
+class TestCompatibilityInvalidation:
+    """Test dependency-driven compatibility refresh in the discovery agent."""
+
+    @staticmethod
+    def register(discovery, agent_id: str, input_schema, output_schema, version: str = "1.0.0", description: str = ""):
+        discovery.register_capability(
+            agent_id=agent_id,
+            domain="test",
+            version=version,
+            intents=["test"],
+            input_schema=input_schema,
+            output_schema=output_schema,
+            description=description
+        )
+
+    @pytest.fixture
+    def discovery(self):
+        discovery = CapabilityDiscoveryAgent()
+        self.register(discovery, "producer", {}, {"result": "string"})
+        self.register(discovery, "consumer", {"result": "string"}, {})
+        self.register(discovery, "auditor", {}, {})
+        return discovery
+
+    def test_schema_change_recomputes_only_affected_pairs(self, discovery):
+        """Test a new schema refreshes that agent's pairs and leaves others cached."""
+        assert discovery.check_compatibility("producer", "consumer").compatible is True
+        unrelated = discovery.check_compatibility("consumer", "auditor")
+
+        self.register(discovery, "producer", {}, {"renamed": "string"}, version="1.1.0")
+
+        refreshed = discovery.compatibility_matrix.get_compatibility("producer", "consumer")
+        assert refreshed is not None
+        assert refreshed.compatible is False
+        assert discovery.compatibility_matrix.get_compatibility("consumer", "auditor") is unrelated
+
+    def test_same_schema_keeps_cache(self, discovery):
+        """Test re-registering with an unchanged schema keeps cached results."""
+        cached = discovery.check_compatibility("producer", "consumer")
+
+        self.register(discovery, "producer", {}, {"result": "string"}, description="now documented")
+
+        assert discovery.compatibility_matrix.get_compatibility("producer", "consumer") is cached
+
+    def test_older_version_does_not_invalidate(self, discovery):
+        """Test registering a non-current version leaves the current pairs cached."""
+        cached = discovery.check_compatibility("producer", "consumer")
+
+        self.register(discovery, "producer", {}, {}, version="0.9.0")
+
+        assert discovery.compatibility_matrix.get_compatibility("producer", "consumer") is cached
+
+    def test_unregister_drops_pairs(self, discovery):
+        """Test removing an agent drops its pairs without recomputing."""
+        discovery.check_compatibility("producer", "consumer")
+        discovery.check_compatibility("consumer", "auditor")
+
+        discovery.unregister_capability("producer")
+
+        assert discovery.compatibility_matrix.get_compatibility("producer", "consumer") is None
+        assert len(discovery.compatibility_matrix) == 1
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_precompute_all(self, parallel):
+        """Test precompute fills every pair and matches on-demand checks."""
+        discovery = CapabilityDiscoveryAgent()
+        for i in range(12):
+            self.register(discovery, f"agent-{i:02d}", {f"field_{i % 3}": "string"}, {f"field_{(i + 1) % 3}": "string"})
+
+        discovery.check_compatibility("agent-00", "agent-01")
+        stored = discovery.precompute_all(parallel=parallel, max_workers=3)
+
+        assert stored == 12 * 11 // 2 - 1
+        assert len(discovery.compatibility_matrix) == 12 * 11 // 2
+        assert discovery.precompute_all(parallel=parallel) == 0
+
+        for a, b in [("agent-00", "agent-04"), ("agent-02", "agent-09")]:
+            cached = discovery.compatibility_matrix.get_compatibility(a, b)
+            fresh = discovery.check_compatibility(a, b, force_recheck=True)
+            assert (cached.compatible, cached.issues) == (fresh.compatible, fresh.issues)
+
+
+class TestDiscoveryCache:
+    """Test epoch-validated discovery result caching and O(1) stats."""
+
+    @staticmethod
+    def register(discovery, agent_id: str, intents, domain: str = "data", version: str = "1.0.0"):
+        discovery.register_capability(
+            agent_id=agent_id,
+            domain=domain,
+            version=version,
+            intents=list(intents),
+            input_schema={},
+            output_schema={}
+        )
+
+    @pytest.fixture(params=[False, True], ids=["locked", "snapshot"])
+    def discovery(self, request):
+        return CapabilityDiscoveryAgent(snapshot_reads=request.param)
+
+    def test_epoch_bumped_by_writes(self, discovery):
+        """Test every write, including non-current versions, bumps the epoch."""
+        registry = discovery.registry
+        start = registry.epoch
+
+        self.register(discovery, "agent-1", ["a"], version="2.0.0")
+        self.register(discovery, "agent-1", ["a"], version="1.0.0")
+        assert registry.epoch == start + 2
+
+        assert discovery.unregister_capability("agent-1", "1.0.0")
+        assert not discovery.unregister_capability("agent-1", "1.0.0")
+        assert registry.epoch == start + 3
+        assert registry.snapshot().epoch == registry.epoch
+
+    def test_repeated_queries_hit_cache(self, discovery):
+        """Test repeated discovery shares AgentMatch objects until a write."""
+        self.register(discovery, "agent-1", ["a"])
+        self.register(discovery, "agent-2", ["a", "b"])
+
+        first = discovery.discover_by_intent("a")
+        second = discovery.discover_by_intent("a")
+
+        assert [m.agent_id for m in first] == ["agent-1", "agent-2"]
+        assert second == first and second is not first
+        assert all(x is y for x, y in zip(first, second))
+        assert discovery.discovery_cache.get_metrics()["hits"] == 1
+
+    def test_write_invalidates(self, discovery):
+        """Test a registration is visible to the next query."""
+        self.register(discovery, "agent-1", ["a"])
+        assert [m.agent_id for m in discovery.discover_by_intent("a")] == ["agent-1"]
+
+        self.register(discovery, "agent-0", ["a"])
+        assert [m.agent_id for m in discovery.discover_by_intent("a")] == ["agent-0", "agent-1"]
+
+        discovery.unregister_capability("agent-1")
+        assert [m.agent_id for m in discovery.discover_by_intent("a")] == ["agent-0"]
+        assert len(discovery.discovery_cache) == 1  # Older epochs dropped
+
+    def test_query_key_distinguishes_predicates(self, discovery):
+        """Test queries differing in any predicate are cached separately."""
+        self.register(discovery, "agent-1", ["a"], domain="x")
+        self.register(discovery, "agent-2", ["a"], domain="y")
+
+        assert len(discovery.discover(CapabilityQuery(intents=["a"]))) == 2
+        assert len(discovery.discover(CapabilityQuery(intents=["a"], domain="x"))) == 1
+        assert len(discovery.discover(CapabilityQuery(intents=["a"], limit=1))) == 1
+        assert len(discovery.discovery_cache) == 3
+
+    def test_cache_bounded_and_optional(self):
+        """Test the cache evicts LRU entries and can be disabled."""
+        cache = DiscoveryCache(max_entries=2)
+        for i in range(3):
+            cache.put((i,), 0, [])
+        assert len(cache) == 2
+        assert cache.get((0,), 0) is None
+        assert cache.get((2,), 0) == []
+        assert cache.get((2,), 1) is None  # Other epoch
+
+        cache.put((3,), 5, [])
+        cache.put((4,), 4, [])  # Older than stored epoch: ignored
+        assert cache.get((4,), 4) is None and len(cache) == 1
+
+        uncached = CapabilityDiscoveryAgent(cache_size=0)
+        self.register(uncached, "agent-1", ["a"])
+        assert uncached.discovery_cache is None
+        assert len(uncached.discover_by_intent("a")) == 1
+
+    def test_stats_from_indexes(self, discovery):
+        """Test stats track writes and are reused between writes."""
+        self.register(discovery, "agent-1", ["a", "b"], domain="x")
+        self.register(discovery, "agent-2", ["b"], domain="y")
+
+        stats = discovery.registry.get_stats()
+        assert stats == {
+            "total_agents": 2,
+            "domains": 2,
+            "domain_distribution": {"x": 1, "y": 1},
+            "unique_intents": 2,
+            "intents": ["a", "b"]
+        }
+        assert discovery.registry.get_stats() is stats
+
+        discovery.unregister_capability("agent-1")
+        stats = discovery.get_registry_stats()
+        assert stats["domain_distribution"] == {"y": 1}
+        assert stats["intents"] == ["b"]
+
+
+class TestRegistryListeners:
+    """Test current-capability change notifications."""
+
+    def test_notifies_current_changes_only(self):
+        """Test listeners see new, upgraded and removed agents but not older versions."""
+        registry = CapabilityRegistry()
+        events = []
+        listener = lambda agent_id, previous, current: events.append(
+            (agent_id, previous and previous.version, current and current.version)
+        )
+        registry.add_listener(listener)
+
+        def spec(version):
+            return CapabilitySpec("agent-1", "test", version, ["test"], {}, {})
+
+        registry.register(spec("1.0.0"))
+        registry.register(spec("2.0.0"))
+        registry.register(spec("1.5.0"))
+        registry.unregister("agent-1", "2.0.0")
+        registry.unregister("agent-1")
+
+        assert events == [
+            ("agent-1", None, "1.0.0"),
+            ("agent-1", "1.0.0", "2.0.0"),
+            ("agent-1", "2.0.0", "1.5.0"),
+            ("agent-1", "1.5.0", None),
+        ]
+
+        assert registry.remove_listener(listener) is True
+        registry.register(spec("3.0.0"))
+        assert len(events) == 4
+
+    def test_failing_listener_does_not_break_writes(self):
+        """Test a raising listener is logged and later listeners still run."""
+        registry = CapabilityRegistry()
+        seen = []
+        registry.add_listener(lambda *args: 1 / 0)
+        registry.add_listener(lambda agent_id, previous, current: seen.append(agent_id))
+
+        registry.register(CapabilitySpec("agent-1", "test", "1.0.0", ["test"], {}, {}))
+
+        assert seen == ["agent-1"]
+        assert registry.get_capability("agent-1") is not None
+
+    def test_remove_bound_method_listener(self):
+        """Test a bound method can be unsubscribed with a fresh reference to it."""
+        class Subscriber:
+            def __init__(self):
+                self.seen = []
+
+            def on_change(self, agent_id, previous, current):
+                self.seen.append(agent_id)
+
+        registry = CapabilityRegistry()
+        subscriber = Subscriber()
+        registry.add_listener(subscriber.on_change)
+
+        assert registry.remove_listener(subscriber.on_change) is True
+        registry.register(CapabilitySpec("agent-1", "test", "1.0.0", ["test"], {}, {}))
+        assert subscriber.seen == []
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
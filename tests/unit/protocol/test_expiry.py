@@ -0,0 +1,125 @@
+"""
+Unit tests for ExpiryScheduler.
+
+Tests deadline ordering, rescheduling, lazy cancellation and the
+background sweeper.
+"""
+
+import time
+import pytest
+from src.a_domain.protocol.expiry import ExpiryScheduler
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestExpiryScheduler:
+    """Test expiry scheduling."""
+
+    def test_expires_in_deadline_order(self):
+        """Test only due keys expire, earliest first."""
+        clock = FakeClock()
+        scheduler = ExpiryScheduler(clock=clock)
+        fired = []
+
+        for key, delay in [("c", 3), ("a", 1), ("b", 2)]:
+            scheduler.schedule(key, delay, lambda k=key: fired.append(k))
+
+        clock.now += 2
+        expired = scheduler.run_pending()
+
+        assert expired == ["a", "b"]
+        assert fired == ["a", "b"]
+        assert scheduler.is_scheduled("c")
+        assert len(scheduler) == 1
+
+    def test_reschedule_replaces_deadline(self):
+        """Test rescheduling a key moves its deadline and fires once."""
+        clock = FakeClock()
+        scheduler = ExpiryScheduler(clock=clock)
+        fired = []
+
+        scheduler.schedule("a", 1, lambda: fired.append("first"))
+        scheduler.schedule("a", 5, lambda: fired.append("second"))
+
+        clock.now += 2
+        assert scheduler.run_pending() == []
+
+        clock.now += 5
+        assert scheduler.run_pending() == ["a"]
+        assert fired == ["second"]
+
+    def test_cancel(self):
+        """Test cancelled keys never fire."""
+        clock = FakeClock()
+        scheduler = ExpiryScheduler(clock=clock)
+        fired = []
+
+        scheduler.schedule("a", 1, lambda: fired.append("a"))
+
+        assert scheduler.cancel("a") is True
+        assert scheduler.cancel("a") is False
+
+        clock.now += 2
+        assert scheduler.run_pending() == []
+        assert fired == []
+
+    def test_compacts_stale_entries(self):
+        """Test cancelled entries do not accumulate in the heap."""
+        scheduler = ExpiryScheduler(clock=FakeClock())
+
+        for i in range(1000):
+            scheduler.schedule(i, 60, lambda: None)
+        for i in range(1000):
+            scheduler.cancel(i)
+
+        assert scheduler.get_metrics()["heap_size"] < ExpiryScheduler.COMPACT_MIN_STALE
+
+    def test_callback_error_is_counted(self):
+        """Test a failing callback does not stop other expiries."""
+        clock = FakeClock()
+        scheduler = ExpiryScheduler(clock=clock)
+        fired = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        scheduler.schedule("a", 1, fail)
+        scheduler.schedule("b", 1, lambda: fired.append("b"))
+
+        clock.now += 1
+        scheduler.run_pending()
+
+        metrics = scheduler.get_metrics()
+        assert fired == ["b"]
+        assert metrics["expired"] == 2
+        assert metrics["callback_errors"] == 1
+
+    def test_background_sweeper(self):
+        """Test the background thread expires keys without explicit calls."""
+        scheduler = ExpiryScheduler()
+        fired = []
+
+        scheduler.schedule("a", 0.05, lambda: fired.append("a"))
+        scheduler.start(interval=0.01)
+        try:
+            deadline = time.monotonic() + 2.0
+            while not fired and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert scheduler.get_metrics()["running"]
+        finally:
+            scheduler.stop()
+
+        assert fired == ["a"]
+        assert not scheduler.get_metrics()["running"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
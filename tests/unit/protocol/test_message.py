@@ -115,6 +115,78 @@ class TestProtocolMessage:
         assert message.source_agent.agent_id == "test-agent"
         assert message.target_agent.agent_id == "target-agent"
 
+    def test_message_ids_are_unique_uuid4(self):
+        """Test generated message IDs are distinct version 4 UUIDs."""
+        from uuid import UUID
+
+        source = Agent(agent_id="test-agent", domain="a_domain", version="1.0.0")
+        security = Security(auth_token="test-token")
+        ids = {
+            ProtocolMessage(
+                source_agent=source,
+                target_agent=source,
+                message_type="event",
+                payload={},
+                security=security
+            ).message_id
+            for _ in range(1000)
+        }
+
+        assert len(ids) == 1000
+        assert all(UUID(message_id).version == 4 for message_id in ids)
+
+    def test_timestamp_formatting(self):
+        """Test lazily formatted timestamps and explicit timestamps."""
+        from datetime import datetime
+
+        source = Agent(agent_id="test-agent", domain="a_domain", version="1.0.0")
+        security = Security(auth_token="test-token")
+        message = ProtocolMessage(
+            source_agent=source,
+            target_agent=source,
+            message_type="event",
+            payload={},
+            security=security
+        )
+
+        parsed = datetime.fromisoformat(message.timestamp.rstrip("Z"))
+        assert abs((datetime.utcnow() - parsed).total_seconds()) < 5
+        assert message.timestamp_ns // 1000 == int(
+            (parsed - datetime(1970, 1, 1)).total_seconds() * 1_000_000
+        )
+
+        message.timestamp = "2026-01-27T14:30:00Z"
+        assert message.timestamp == "2026-01-27T14:30:00Z"
+        assert message.timestamp_ns == 1769524200 * 1_000_000_000
+
+    def test_validation_keeps_timestamp_lazy(self):
+        """Test validating a message does not format its timestamp."""
+        source = Agent(agent_id="test-agent", domain="a_domain", version="1.0.0")
+        message = ProtocolMessage(
+            source_agent=source,
+            target_agent=source,
+            message_type="event",
+            payload={},
+            security=Security(auth_token="test-token")
+        )
+
+        assert MessageValidator().validate_message(message).valid
+        assert message._timestamp is None
+        assert message.encoded_sizes()[0] == len(message.to_json())
+
+        message.timestamp = None
+        result = MessageValidator().validate_message(message)
+        assert result.error_code == "MISSING_REQUIRED_FIELD"
+
+    def test_agent_interning(self):
+        """Test interned agents are shared and equal to plain agents."""
+        first = Agent.intern("test-agent", "a_domain", "1.0.0")
+        second = Agent.intern("test-agent", "a_domain", "1.0.0")
+
+        assert first is second
+        assert first == Agent(agent_id="test-agent", domain="a_domain", version="1.0.0")
+        assert Agent.intern("test-agent", "a_domain", "2.0.0") is not first
+
     def test_create_response(self):
         """Test creating response message."""
         source = Agent(agent_id="test-agent", domain="a_domain", version="1.0.0")
@@ -138,6 +210,28 @@ class TestProtocolMessage:
         assert response.message_type == "response"
         assert response.intent == "test_intent"
 
+    def test_create_response_correlation(self):
+        """Test responses carry the request's correlation key."""
+        source = Agent(agent_id="test-agent", domain="a_domain", version="1.0.0")
+        target = Agent(agent_id="target-agent", domain="test_domain", version="2.0.0")
+        security = Security(auth_token="test-token")
+
+        request = ProtocolMessage(
+            source_agent=source,
+            target_agent=target,
+            message_type="request",
+            payload={},
+            security=security
+        )
+        response = request.create_response(payload={"result": "success"})
+
+        assert response.correlation_id == request.message_id
+        assert "correlation_id" not in request.payload
+
+        # An explicit correlation_id on the request is echoed instead
+        request.payload["correlation_id"] = "workflow-42"
+        assert request.create_response(payload={}).correlation_id == "workflow-42"
+
     def test_create_error_response(self):
         """Test creating error response message."""
         source = Agent(agent_id="test-agent", domain="a_domain", version="1.0.0")
@@ -254,6 +348,78 @@ class TestMessageValidator:
         assert result.valid is False
         assert result.error_code == "INVALID_MESSAGE_TYPE"
 
+    def _make_message(self, payload):
+        return ProtocolMessage(
+            source_agent=Agent(agent_id="test-agent", domain="a_domain", version="1.0.0"),
+            target_agent=Agent(agent_id="target-agent", domain="test_domain", version="2.0.0"),
+            message_type="request",
+            intent="test_intent",
+            payload=payload,
+            security=Security(auth_token="test-token")
+        )
+
+    def test_encoded_sizes_match_to_json(self):
+        """Test encoded sizes equal the canonical JSON encoding exactly."""
+        payload = {"text": "caf\u00e9 \u2603", "nested": {"values": [1, 2.5, None, True]}}
+        message = self._make_message(payload)
+
+        message_size, payload_size = message.encoded_sizes()
+
+        assert message_size == len(message.to_json().encode("utf-8"))
+        assert payload_size == len(json.dumps(payload).encode("utf-8"))
+
+    def test_validate_message_matches_dict_path(self):
+        """Test typed validation agrees with dictionary validation."""
+        validator = MessageValidator()
+
+        valid = self._make_message({"key": "value"})
+        assert validator.validate_message(valid).valid is True
+
+        invalid = self._make_message({})
+        invalid.message_type = "invalid_type"
+        result = validator.validate_message(invalid)
+        assert result.error_code == validator.validate(invalid.to_dict()).error_code
+
+        invalid = self._make_message({})
+        invalid.security = Security(auth_token="test-token", encryption="rot13")
+        assert validator.validate_message(invalid).error_code == "INVALID_SECURITY_STRUCTURE"
+
+    def test_validate_message_payload_limit_is_exact(self):
+        """Test the payload size limit is enforced at the exact byte boundary."""
+        validator = MessageValidator()
+        overhead = len(json.dumps({"data": ""}))
+
+        at_limit = self._make_message({"data": "x" * (validator.MAX_PAYLOAD_SIZE_BYTES - overhead)})
+        over_limit = self._make_message({"data": "x" * (validator.MAX_PAYLOAD_SIZE_BYTES - overhead + 1)})
+
+        assert validator.validate_message(at_limit).valid is True
+        result = validator.validate_message(over_limit)
+        assert result.error_code == "PAYLOAD_TOO_LARGE"
+        assert result.error_code == validator.validate(over_limit.to_dict()).error_code
+
+    def test_validate_message_reuses_wire_size(self, monkeypatch):
+        """Test messages decoded from JSON are size-checked without re-serializing."""
+        validator = MessageValidator()
+        message = ProtocolMessage.from_json(self._make_message({"key": "value"}).to_json())
+
+        def fail(self):
+            raise AssertionError("message was re-serialized")
+
+        monkeypatch.setattr(ProtocolMessage, "encoded_sizes", fail)
+        assert message.wire_size is not None
+        assert validator.validate_message(message).valid is True
+
+    def test_validate_message_large_wire_message_checked_exactly(self):
+        """Test large decoded messages fall back to exact size computation."""
+        validator = MessageValidator()
+        wire = self._make_message({"data": "x" * validator.MAX_PAYLOAD_SIZE_BYTES}).to_json()
+
+        message = ProtocolMessage.from_json(wire)
+        result = validator.validate_message(message)
+
+        assert result.valid is False
+        assert result.error_code == "PAYLOAD_TOO_LARGE"
+
 
 class TestErrorResponse:
     """Test error response format."""
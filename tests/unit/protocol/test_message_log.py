@@ -0,0 +1,163 @@
+"""
+Unit tests for MessageLog.
+
+Tests append/replay, segment rotation, crash recovery and broker
+integration.
+"""
+
+import os
+import pytest
+from src.a_domain.protocol.message_log import MessageLog, MessageLogError
+from src.a_domain.protocol.broker import ProtocolBrokerAgent
+from src.a_domain.protocol.admission import AdmissionController
+from src.a_domain.protocol.message import ProtocolMessage, Agent, Security
+
+
+def make_message(index: int, contract_id: str = None, target_id: str = "agent-b") -> ProtocolMessage:
+    """Create a request message, optionally bound to a contract."""
+    payload = {"index": index}
+    if contract_id:
+        payload["contract_id"] = contract_id
+    return ProtocolMessage(
+        source_agent=Agent(agent_id="agent-a", domain="test", version="1.0.0"),
+        target_agent=Agent(agent_id=target_id, domain="test", version="1.0.0"),
+        message_type="request",
+        intent="test",
+        payload=payload,
+        security=Security(auth_token="test-token")
+    )
+
+
+class TestMessageLog:
+    """Test log writes and reads."""
+
+    def test_append_and_replay(self, tmp_path):
+        """Test messages replay in order and unchanged."""
+        messages = [make_message(i) for i in range(5)]
+
+        with MessageLog(str(tmp_path), fsync=False) as log:
+            offsets = [log.append(m) for m in messages]
+            replayed = list(log.replay())
+
+        assert offsets == [0, 1, 2, 3, 4]
+        assert replayed == list(zip(offsets, messages))
+
+    def test_replay_from_offset_and_contract(self, tmp_path):
+        """Test replay filters by offset and contract."""
+        with MessageLog(str(tmp_path), fsync=False) as log:
+            log.append_many([make_message(i, contract_id=f"contract-{i % 2}") for i in range(10)])
+
+            offsets = [offset for offset, _ in log.replay(from_offset=3, contract_id="contract-1")]
+
+        assert offsets == [3, 5, 7, 9]
+
+    def test_segment_rotation(self, tmp_path):
+        """Test the log rolls segments and replays across them."""
+        with MessageLog(str(tmp_path), segment_bytes=1024, fsync=False) as log:
+            log.append_many([make_message(i) for i in range(50)])
+            segments = log.get_metrics()["segments"]
+            replayed = [m.payload["index"] for _, m in log.replay(from_offset=17)]
+
+        assert segments > 1
+        assert len(os.listdir(tmp_path)) == segments
+        assert replayed == list(range(17, 50))
+
+    def test_wait_makes_durable(self, tmp_path):
+        """Test append(wait=True) returns only once the record is fsynced."""
+        with MessageLog(str(tmp_path), sync_interval=10) as log:
+            offset = log.append(make_message(0), wait=True)
+
+            assert log.durable_offset > offset
+            assert log.get_metrics()["fsyncs"] >= 1
+
+    def test_reopen_continues_offsets(self, tmp_path):
+        """Test a reopened log keeps its records and offsets."""
+        with MessageLog(str(tmp_path), segment_bytes=1024, fsync=False) as log:
+            log.append_many([make_message(i) for i in range(30)])
+
+        with MessageLog(str(tmp_path), segment_bytes=1024, fsync=False) as log:
+            assert log.next_offset == 30
+            assert log.append(make_message(30)) == 30
+            assert [m.payload["index"] for _, m in log.replay(from_offset=28)] == [28, 29, 30]
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        """Test a partially written final record is dropped on open."""
+        with MessageLog(str(tmp_path), fsync=False) as log:
+            log.append_many([make_message(i) for i in range(3)])
+
+        segment = tmp_path / sorted(os.listdir(tmp_path))[-1]
+        with open(segment, "ab") as f:
+            f.write(b"\x40\x00\x00\x00\xde\xad")  # Header of a record that never finished
+
+        with MessageLog(str(tmp_path), fsync=False) as log:
+            assert log.next_offset == 3
+            assert log.get_metrics()["truncated_bytes"] == 6
+            assert log.append(make_message(3)) == 3
+            assert len(list(log.replay())) == 4
+
+    def test_closed_log(self, tmp_path):
+        """Test appends after close fail."""
+        log = MessageLog(str(tmp_path), fsync=False)
+        log.close()
+
+        with pytest.raises(MessageLogError):
+            log.append(make_message(0))
+
+
+class TestBrokerMessageLog:
+    """Test broker write-ahead logging and recovery."""
+
+    def test_logs_admitted_messages_and_redelivers(self, tmp_path):
+        """Test routed messages are logged and can be re-delivered after restart."""
+        with MessageLog(str(tmp_path), fsync=False) as log:
+            broker = ProtocolBrokerAgent(message_log=log)
+            broker.register_agent("agent-a", lambda m: None)
+            broker.register_agent("agent-b", lambda m: None)
+            handshake = broker.initiate_handshake("agent-a", "agent-b", "test")
+            contract_id = broker.accept_handshake(handshake.details["handshake_id"]).details["contract_id"]
+
+            broker.route_message(make_message(0, contract_id))
+            broker.route_many([make_message(1, contract_id), make_message(2), make_message(3, "contract-unknown")])
+
+            invalid = make_message(4, contract_id)
+            invalid.message_type = "invalid"
+            broker.route_message(invalid)
+
+        # Restart: new broker, same log
+        received = []
+        with MessageLog(str(tmp_path), fsync=False) as log:
+            assert log.next_offset == 3  # Rejected messages were never logged
+
+            broker = ProtocolBrokerAgent(message_log=log)
+            broker.register_agent("agent-b", received.append)
+            delivered = broker.redeliver(contract_id=contract_id)
+
+        assert delivered == 2
+        assert [m.payload["index"] for m in received] == [0, 1]
+
+    def test_rejected_messages_not_logged(self, tmp_path):
+        """Test messages to unregistered targets or shed for overload are not redelivered."""
+        with MessageLog(str(tmp_path), fsync=False) as log:
+            broker = ProtocolBrokerAgent(message_log=log, admission=AdmissionController(max_in_flight=1))
+            shed = []
+            broker.register_agent("agent-b", lambda m: shed.extend(
+                broker.route_many([make_message(9, target_id="agent-c")])
+            ))
+            broker.register_agent("agent-c", lambda m: None)
+
+            assert broker.route_message(make_message(0)).valid
+            assert not broker.route_message(make_message(1, target_id="missing")).valid
+            assert not broker.route_many([make_message(2, target_id="missing")])[0].valid
+            assert shed[0].details["limit"] == "in_flight"
+
+            received = []
+            broker.register_agent("agent-b", received.append)
+            broker.register_agent("agent-c", received.append)
+            broker.register_agent("missing", received.append)
+
+            assert broker.redeliver() == 1
+            assert [m.payload["index"] for m in received] == [0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,173 @@
+"""
+Unit tests for the persistent capability registry store.
+
+Tests write-behind persistence, snapshot warm starts and lazy index
+rebuilds after loading.
+"""
+
+import os
+import pytest
+from src.a_domain.protocol.discovery import CapabilityDiscoveryAgent, CapabilityQuery
+from src.a_domain.protocol.registry_store import SQLiteRegistryStore, RegistryStoreError
+
+
+def register(discovery, agent_id, version="1.0.0", domain="test", intents=("check",), provides=()):
+    discovery.register_capability(
+        agent_id=agent_id,
+        domain=domain,
+        version=version,
+        intents=list(intents),
+        input_schema={"query": "string"},
+        output_schema={"result": "string"},
+        provides=list(provides),
+        description=f"{agent_id} agent"
+    )
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "registry.db")
+
+
+def open_store(path, **kwargs):
+    return SQLiteRegistryStore(path, synchronous=False, **kwargs)
+
+
+class TestRegistryStore:
+    """Test persisting registry writes."""
+
+    def test_restart_restores_registry(self, path):
+        """Test a new discovery agent sees every stored version."""
+        store = open_store(path)
+        discovery = CapabilityDiscoveryAgent(store=store)
+        register(discovery, "agent-a", "1.0.0")
+        register(discovery, "agent-a", "2.0.0", intents=["check", "report"])
+        register(discovery, "agent-b", domain="billing", provides=["invoice"])
+        store.close()
+
+        store = open_store(path)
+        restored = CapabilityDiscoveryAgent(store=store)
+
+        assert restored.list_versions("agent-a") == ["1.0.0", "2.0.0"]
+        assert restored.registry.get_capability("agent-a").intents == ["check", "report"]
+        assert restored.registry.get_capability("agent-b").input_schema == {"query": "string"}
+        assert store.get_metrics()["snapshot_loads"] == 1
+        store.close()
+
+    def test_unregister_persisted(self, path):
+        """Test removed versions and agents stay removed after a restart."""
+        with open_store(path) as store:
+            discovery = CapabilityDiscoveryAgent(store=store)
+            register(discovery, "agent-a", "1.0.0")
+            register(discovery, "agent-a", "1.1.0")
+            register(discovery, "agent-b")
+            discovery.unregister_capability("agent-a", "1.1.0")
+            discovery.unregister_capability("agent-b")
+
+        with open_store(path) as store:
+            restored = CapabilityDiscoveryAgent(store=store)
+
+            assert restored.list_versions("agent-a") == ["1.0.0"]
+            assert restored.registry.get_capability("agent-b") is None
+
+    def test_write_behind_batches(self, path):
+        """Test writes are queued, coalesced and committed together."""
+        with open_store(path, flush_interval=60) as store:
+            discovery = CapabilityDiscoveryAgent(store=store)
+            for i in range(10):
+                register(discovery, "agent-a", "1.0", intents=[f"intent_{i}"])
+            register(discovery, "agent-b")
+
+            assert store.get_metrics()["pending"] == 2
+            store.flush()
+            metrics = store.get_metrics()
+
+        assert metrics["pending"] == 0
+        assert metrics["batches"] == 1
+        assert metrics["written"] == 2
+
+    def test_stale_snapshot_falls_back_to_database(self, path):
+        """Test a snapshot older than the database is ignored and rewritten."""
+        with open_store(path) as store:
+            register(CapabilityDiscoveryAgent(store=store), "agent-a")
+        with open(path + ".snapshot", "rb") as f:
+            stale = f.read()
+
+        with open_store(path) as store:
+            register(CapabilityDiscoveryAgent(store=store), "agent-b")
+        # As after a crash: the last snapshot predates the latest writes
+        with open(path + ".snapshot", "wb") as f:
+            f.write(stale)
+
+        with open_store(path) as store:
+            restored = CapabilityDiscoveryAgent(store=store)
+            assert store.get_metrics()["database_loads"] == 1
+            assert restored.registry.get_agent_count() == 2
+
+        with open_store(path) as store:
+            CapabilityDiscoveryAgent(store=store)
+            assert store.get_metrics()["snapshot_loads"] == 1
+
+    def test_corrupt_snapshot_ignored(self, path):
+        """Test an unreadable snapshot falls back to the database."""
+        with open_store(path) as store:
+            register(CapabilityDiscoveryAgent(store=store), "agent-a")
+        with open(path + ".snapshot", "wb") as f:
+            f.write(b"not a snapshot")
+
+        with open_store(path) as store:
+            restored = CapabilityDiscoveryAgent(store=store)
+            assert restored.registry.get_agent_count() == 1
+            assert store.get_metrics()["database_loads"] == 1
+        assert os.path.getsize(path + ".snapshot") > len(b"not a snapshot")
+
+    def test_closed_store_rejects_writes(self, path):
+        """Test writes fail without touching the registry once the store is closed."""
+        store = open_store(path)
+        discovery = CapabilityDiscoveryAgent(store=store)
+        store.close()
+
+        with pytest.raises(RegistryStoreError):
+            register(discovery, "agent-a")
+        assert discovery.registry.get_agent_count() == 0
+
+
+class TestLazyIndexes:
+    """Test indexes of loaded capabilities are built on first use."""
+
+    @pytest.fixture
+    def stored(self, path):
+        with open_store(path) as store:
+            discovery = CapabilityDiscoveryAgent(store=store)
+            register(discovery, "agent-a", domain="billing", intents=["invoice"], provides=["invoices"])
+            register(discovery, "agent-b", "1.0.0", intents=["legacy"])
+            register(discovery, "agent-b", "2.0.0", intents=["report"])
+        return path
+
+    @pytest.mark.parametrize("snapshot_reads", [False, True])
+    def test_queries_after_load(self, stored, snapshot_reads):
+        """Test every index-backed read works straight after loading."""
+        with open_store(stored) as store:
+            discovery = CapabilityDiscoveryAgent(snapshot_reads=snapshot_reads, store=store)
+            registry = discovery.registry
+
+            assert not registry._indexed
+            assert registry.get_capability("agent-a").domain == "billing"
+            assert not registry._indexed  # Point lookups need no index
+
+            assert [m.agent_id for m in discovery.discover_by_intent("invoice")] == ["agent-a"]
+            assert registry._indexed
+            assert registry.find_by_provides("invoices") == ["agent-a"]
+            assert registry.best_for_intent("legacy").version == "1.0.0"
+            assert registry.get_stats()["domain_distribution"] == {"billing": 1, "test": 1}
+            assert registry.snapshot().capabilities.keys() == {"agent-a", "agent-b"}
+
+    def test_writes_before_first_read(self, stored):
+        """Test writes made before the indexes are built are indexed with the rest."""
+        with open_store(stored) as store:
+            discovery = CapabilityDiscoveryAgent(snapshot_reads=True, store=store)
+            register(discovery, "agent-c", intents=["invoice"])
+            discovery.unregister_capability("agent-a")
+
+            assert [m.agent_id for m in discovery.discover(CapabilityQuery(intents=["invoice"]))] == ["agent-c"]
+            assert discovery.registry.find_by_intent("report") == ["agent-b"]
@@ -0,0 +1,276 @@
+"""
+Unit tests for compiled payload schemas and schema compatibility.
+"""
+
+import pytest
+from src.a_domain.protocol.schema import (
+    SchemaCache,
+    SchemaError,
+    compile_schema,
+    compatibility_issues,
+    is_json_schema,
+    normalize_schema,
+    schema_hash
+)
+from src.a_domain.protocol.validator import ContractValidator
+
+
+ORDER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "order_id": {"type": "string", "minLength": 1},
+        "quantity": {"type": "integer", "minimum": 1},
+        "status": {"enum": ["open", "closed"]},
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"sku": {"type": "string"}, "price": {"type": "number"}},
+                "required": ["sku"]
+            }
+        }
+    },
+    "required": ["order_id", "quantity"],
+    "additionalProperties": False
+}
+
+
+class TestSchemaDetection:
+    """Test telling JSON Schemas from field maps."""
+
+    def test_json_schema(self):
+        """Test schemas built from keywords are read as JSON Schema."""
+        assert is_json_schema(ORDER_SCHEMA)
+        assert is_json_schema({"type": "string", "title": "Name"})
+        assert normalize_schema(ORDER_SCHEMA) is ORDER_SCHEMA
+
+    def test_field_map(self):
+        """Test field maps become objects with every field required."""
+        assert not is_json_schema({"result": "string", "status": "string"})
+
+        normalized = normalize_schema({"count": "integer", "when": "datetime", "meta": {"tag": "str"}})
+
+        assert normalized["required"] == ["count", "when", "meta"]
+        assert normalized["properties"]["count"] == {"type": "integer"}
+        assert normalized["properties"]["when"]["type"] == "string"
+        assert normalized["properties"]["meta"]["properties"]["tag"] == {"type": "string"}
+
+    def test_field_named_like_keyword(self):
+        """Test a field map with a 'type' field is not mistaken for JSON Schema."""
+        assert not is_json_schema({"type": "category", "name": "string"})
+        assert not is_json_schema({"title": "string"})
+        assert not is_json_schema({"required": "boolean"})
+
+    def test_hash_ignores_key_order(self):
+        """Test equal schemas hash equally regardless of key order."""
+        reordered = {"required": ["b", "a"], "type": "object"}
+
+        assert schema_hash({"type": "object", "required": ["b", "a"]}) == schema_hash(reordered)
+        assert schema_hash({"type": "object", "required": ["a", "b"]}) != schema_hash(reordered)
+
+
+class TestCompiledSchema:
+    """Test payload validation with compiled schemas."""
+
+    def test_valid_payload(self):
+        """Test a conforming payload passes."""
+        compiled = compile_schema(ORDER_SCHEMA)
+
+        payload = {"order_id": "o-1", "quantity": 2, "status": "open", "items": [{"sku": "x", "price": 1.5}]}
+        assert compiled.validate(payload) is None
+        assert compiled.is_valid(payload)
+
+    @pytest.mark.parametrize("payload,error", [
+        ({"quantity": 1}, "$: missing required field 'order_id'"),
+        ({"order_id": "", "quantity": 1}, "$.order_id: shorter than 1 characters"),
+        ({"order_id": "o", "quantity": 0}, "$.quantity: 0 is below minimum 1"),
+        ({"order_id": "o", "quantity": True}, "$.quantity: expected integer, got boolean"),
+        ({"order_id": "o", "quantity": 1, "status": "lost"}, "$.status: 'lost' is not one of ['open', 'closed']"),
+        ({"order_id": "o", "quantity": 1, "items": [{"price": 1}]}, "$.items[]: missing required field 'sku'"),
+        ({"order_id": "o", "quantity": 1, "items": [{"sku": 3}]}, "$.items[].sku: expected string, got integer"),
+        ({"order_id": "o", "quantity": 1, "note": "x"}, "$: unexpected field 'note'"),
+        (["o", 1], "$: expected object, got array"),
+    ])
+    def test_invalid_payload(self, payload, error):
+        """Test violations report the path of the first failing field."""
+        assert compile_schema(ORDER_SCHEMA).validate(payload) == error
+
+    def test_type_unions_and_any_of(self):
+        """Test type lists and anyOf accept any matching alternative."""
+        nullable = compile_schema({"type": ["string", "null"]})
+        either = compile_schema({"anyOf": [{"type": "integer"}, {"type": "string", "pattern": "^[0-9]+$"}]})
+
+        assert nullable.is_valid(None) and nullable.is_valid("x")
+        assert not nullable.is_valid(1)
+        assert either.is_valid(5) and either.is_valid("42")
+        assert "matches no alternative" in either.validate("forty-two")
+
+    def test_integer_accepts_integral_float(self):
+        """Test integral floats count as integers, as in JSON Schema."""
+        compiled = compile_schema({"type": "integer"})
+
+        assert compiled.is_valid(3.0)
+        assert not compiled.is_valid(3.5)
+
+    def test_field_map_payload(self):
+        """Test field-map schemas require every field with its type."""
+        compiled = compile_schema({"result": "string", "count": "integer", "extra": "anything"})
+
+        assert compiled.is_valid({"result": "ok", "count": 1, "extra": [1]})
+        assert compiled.validate({"result": "ok", "count": "1", "extra": None}) == "$.count: expected integer, got string"
+
+    def test_empty_schema_accepts_all(self):
+        """Test an empty schema compiles to no checks at all."""
+        compiled = compile_schema({})
+
+        assert compiled.accepts_all
+        assert compiled.validate(object()) is None
+
+    @pytest.mark.parametrize("schema", [
+        {"type": ["string", "text"]},
+        {"type": "object", "properties": {"a": 5}},
+        {"type": "string", "pattern": "("},
+    ])
+    def test_malformed_schema(self, schema):
+        """Test malformed schemas fail at compile time."""
+        with pytest.raises(SchemaError):
+            SchemaCache().compile(schema)
+
+
+class TestSchemaCache:
+    """Test compilation and compatibility caching."""
+
+    def test_compiled_once_per_schema(self):
+        """Test equal schemas share one compiled validator."""
+        cache = SchemaCache()
+
+        first = cache.compile({"type": "object", "required": ["a"]})
+        second = cache.compile({"required": ["a"], "type": "object"})
+
+        assert first is second
+        assert cache.get_metrics()["compiled"] == 1
+        assert cache.get_metrics()["hits"] == 1
+
+    def test_compatibility_cached(self):
+        """Test compatibility results are reused for the same schema pair."""
+        cache = SchemaCache()
+
+        first = cache.compatibility({"a": "string"}, {"b": "string"})
+        second = cache.compatibility({"a": "string"}, {"b": "string"})
+
+        assert first == second == ("$: missing required field 'b'",)
+        assert cache.get_metrics()["compatibility_hits"] == 1
+
+    def test_bounded(self):
+        """Test the cache evicts least recently used schemas."""
+        cache = SchemaCache(max_schemas=2, max_pairs=1)
+
+        kept = cache.compile({"type": "string"})
+        cache.compile({"type": "integer"})
+        cache.compile({"type": "string"})  # Refresh: integer is now oldest
+        cache.compile({"type": "boolean"})
+        cache.compatibility({"type": "string"}, {"type": "string"})
+
+        metrics = cache.get_metrics()
+        assert metrics["schemas"] == 2 and metrics["pairs"] == 1
+        assert cache.compile({"type": "string"}) is kept
+
+
+class TestCompatibility:
+    """Test structural schema compatibility."""
+
+    def test_same_schema_compatible(self):
+        """Test a schema is compatible with itself."""
+        assert compatibility_issues(ORDER_SCHEMA, ORDER_SCHEMA) == ()
+
+    def test_field_maps(self):
+        """Test field maps compare by required fields and types."""
+        assert compatibility_issues({"result": "string", "status": "string"}, {"result": "string"}) == ()
+        assert compatibility_issues({"a": "string"}, {"b": "string"}) == ("$: missing required field 'b'",)
+        assert compatibility_issues({"a": "number"}, {"a": "string"}) == (
+            "$.a: type number not accepted, expected string",
+        )
+
+    def test_nested_properties(self):
+        """Test nested objects are compared field by field."""
+        provided = {"type": "object", "properties": {"user": {"type": "object", "properties": {
+            "id": {"type": "integer"}}, "required": ["id"]}}, "required": ["user"]}
+        expected = {"type": "object", "properties": {"user": {"type": "object", "properties": {
+            "id": {"type": "number"}, "email": {"type": "string"}}, "required": ["id", "email"]}},
+            "required": ["user"]}
+
+        assert compatibility_issues(provided, expected) == ("$.user: missing required field 'email'",)
+
+    def test_optional_field_not_guaranteed(self):
+        """Test a field the consumer requires must be required by the producer."""
+        provided = {"type": "object", "properties": {"id": {"type": "string"}}}
+        expected = {"type": "object", "properties": {"id": {"type": "string"}}, "required": ["id"]}
+
+        assert compatibility_issues(provided, expected) == (
+            "$: field 'id' is required but optional in provided schema",
+        )
+
+    def test_enums_and_bounds(self):
+        """Test enums must be subsets and bounds at least as tight."""
+        assert compatibility_issues({"enum": ["a"]}, {"enum": ["a", "b"]}) == ()
+        assert compatibility_issues({"enum": ["a", "c"]}, {"enum": ["a", "b"]}) == (
+            "$: values ['c'] not in ['a', 'b']",
+        )
+        assert compatibility_issues({"type": "string"}, {"enum": ["a"]}) == ("$: values not restricted to ['a']",)
+        assert compatibility_issues({"type": "integer", "minimum": 5}, {"type": "number", "minimum": 1}) == ()
+        assert compatibility_issues({"type": "integer"}, {"type": "integer", "maximum": 9}) == (
+            "$: maximum 9 not guaranteed",
+        )
+
+    def test_closed_objects_and_arrays(self):
+        """Test additionalProperties false and array items are enforced."""
+        closed = {"type": "object", "properties": {"a": {}}, "additionalProperties": False}
+        wider = {"type": "object", "properties": {"a": {}, "b": {}}}
+
+        assert compatibility_issues(wider, closed) == ("$: field 'b' is not allowed",)
+        assert compatibility_issues(
+            {"type": "array", "items": {"type": "string"}},
+            {"type": "array", "items": {"type": "integer"}}
+        ) == ("$[]: type string not accepted, expected integer",)
+
+    def test_any_of(self):
+        """Test every provided alternative must fit some expected alternative."""
+        assert compatibility_issues(
+            {"anyOf": [{"type": "string"}, {"type": "integer"}]},
+            {"anyOf": [{"type": "string"}, {"type": "number"}]}
+        ) == ()
+        assert compatibility_issues(
+            {"anyOf": [{"type": "string"}, {"type": "null"}]},
+            {"type": "string"}
+        ) == ("$: type null not accepted, expected string",)
+
+
+class TestContractValidatorSchemas:
+    """Test ContractValidator schema checks."""
+
+    def test_check_schema_compatibility(self):
+        """Test mismatches report issues and missing top-level fields."""
+        validator = ContractValidator()
+
+        assert validator.check_schema_compatibility({"a": "string"}, {"a": "string"}).valid
+
+        result = validator.check_schema_compatibility(
+            {"a": "string", "n": "string"}, {"a": "string", "b": "string", "n": "integer"}
+        )
+        assert not result.valid
+        assert result.error_code == "SCHEMA_MISMATCH"
+        assert result.details["missing_fields"] == ["b"]
+        assert "$.n: type string not accepted, expected integer" in result.details["issues"]
+
+    def test_validate_contract_rejects_malformed_schema(self):
+        """Test contracts with uncompilable schemas are invalid."""
+        result = ContractValidator().validate_contract({
+            "contract_id": "c-1",
+            "participants": ["a", "b"],
+            "input_schema": {"type": "object", "properties": {"id": {"type": "text"}}},
+            "output_schema": {}
+        })
+
+        assert not result.valid
+        assert result.error_code == "INVALID_CONTRACT"
+        assert "input_schema" in result.error_message
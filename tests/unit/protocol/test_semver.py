@@ -0,0 +1,115 @@
+"""
+Unit tests for semantic version parsing, ranges and version tables.
+"""
+
+import pytest
+from src.a_domain.protocol.semver import Version, VersionRange, VersionTable
+
+
+V = Version.parse
+
+
+class TestVersion:
+    """Test version parsing and precedence."""
+
+    def test_parse(self):
+        """Test full, partial, prefixed and build-tagged versions."""
+        assert V("1.2.3") == Version(1, 2, 3)
+        assert V("v2.1") == Version(2, 1, 0)
+        assert V("3") == Version(3, 0, 0)
+        assert V("1.2.3+build.7") == V("1.2.3")
+        assert str(V("1.0.0-rc.1")) == "1.0.0-rc.1"
+
+    def test_invalid(self):
+        """Test non-versions are rejected."""
+        for text in ["latest", "", "1.2.3.4", "1..2"]:
+            with pytest.raises(ValueError):
+                V(text)
+
+    def test_precedence(self):
+        """Test semver precedence, including numeric and pre-release ordering."""
+        ordered = [
+            "1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-beta", "1.0.0-beta.2",
+            "1.0.0-beta.11", "1.0.0-rc.1", "1.0.0", "1.2.0", "1.10.0", "2.0.0"
+        ]
+        assert sorted(ordered, key=V) == ordered
+
+
+class TestVersionRange:
+    """Test range expressions."""
+
+    @pytest.mark.parametrize("expression,inside,outside", [
+        ("^1.2", ["1.2.0", "1.9.9"], ["1.1.9", "2.0.0", "2.0.0-beta"]),
+        ("^0.2", ["0.2.0", "0.2.9"], ["0.3.0"]),
+        ("^0.0.3", ["0.0.3"], ["0.0.4"]),
+        ("~1.2.3", ["1.2.3", "1.2.9"], ["1.2.2", "1.3.0"]),
+        (">=2.0,<3", ["2.0.0", "2.9.9"], ["1.9.9", "3.0.0"]),
+        (">= 2.0 < 3", ["2.5.0"], ["3.0.0"]),
+        ("1.x", ["1.0.0", "1.9.0"], ["2.0.0"]),
+        ("1.2", ["1.2.0", "1.2.7"], ["1.3.0"]),
+        ("1.2.3", ["1.2.3"], ["1.2.4"]),
+        (">1.2", ["1.3.0"], ["1.2.9"]),
+        ("<=1.2", ["1.2.9"], ["1.3.0"]),
+        ("^1 || ^3", ["1.5.0", "3.0.0"], ["2.0.0", "4.0.0"]),
+        ("*", ["0.0.1", "9.9.9"], []),
+    ])
+    def test_contains(self, expression, inside, outside):
+        """Test membership for each supported operator."""
+        version_range = VersionRange.parse(expression)
+
+        for version in inside:
+            assert V(version) in version_range, version
+        for version in outside:
+            assert V(version) not in version_range, version
+
+    def test_invalid(self):
+        """Test malformed ranges are rejected."""
+        for expression in ["^latest", ">=1.0 ||", "~"]:
+            with pytest.raises(ValueError):
+                VersionRange.parse(expression)
+
+
+class TestVersionTable:
+    """Test sorted version tables."""
+
+    @pytest.fixture
+    def table(self):
+        table = VersionTable()
+        for version in ["2.0.0", "1.0.0", "1.10.0", "3.1.0", "1.2.0"]:
+            table.put(V(version), version)
+        return table
+
+    def test_sorted(self, table):
+        """Test values iterate in version order."""
+        assert table.select() == ["1.0.0", "1.2.0", "1.10.0", "2.0.0", "3.1.0"]
+        assert table.latest() == "3.1.0"
+
+    @pytest.mark.parametrize("expression,expected", [
+        ("^1", "1.10.0"),
+        (">=2.0,<3", "2.0.0"),
+        ("^1 || ^3", "3.1.0"),
+        ("<=1.2.0", "1.2.0"),
+        ("1.2.0", "1.2.0"),
+        (">3.1.0", None),
+        ("^4", None),
+    ])
+    def test_best(self, table, expression, expected):
+        """Test best() returns the highest version in range."""
+        assert table.best(VersionRange.parse(expression)) == expected
+
+    def test_replace_and_remove(self, table):
+        """Test put() replaces an existing version and remove() deletes it."""
+        assert table.put(V("2.0.0"), "2.0.0-rebuilt") == "2.0.0"
+        assert table.get(V("2.0.0")) == "2.0.0-rebuilt"
+        assert table.remove(V("2.0.0")) == "2.0.0-rebuilt"
+        assert table.remove(V("2.0.0")) is None
+        assert len(table) == 4
+
+    def test_tiebreak(self):
+        """Test equal versions of different owners coexist, ordered by tiebreak."""
+        table = VersionTable()
+        table.put(V("1.0.0"), "a", "agent-a")
+        table.put(V("1.0.0"), "b", "agent-b")
+
+        assert table.select() == ["a", "b"]
+        assert table.best(VersionRange.parse("^1")) == "b"
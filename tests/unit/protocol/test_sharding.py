@@ -0,0 +1,210 @@
+"""
+Unit tests for ShardedProtocolBroker.
+
+Tests consistent-hash placement, cross-shard contract routing and shard
+error handling.
+"""
+
+import pytest
+from src.a_domain.protocol.sharding import (
+    ConsistentHashRing,
+    ShardedProtocolBroker,
+    ShardError
+)
+from src.a_domain.protocol.expiry import ExpiryScheduler
+from src.a_domain.protocol.message import (
+    ProtocolMessage,
+    Agent,
+    Security,
+    ErrorCode
+)
+
+
+class NullHandler:
+    """Picklable handler; delivery is observed through shard stats."""
+
+    def __call__(self, message):
+        pass
+
+
+class FailingHandler:
+    """Picklable handler that always raises."""
+
+    def __call__(self, message):
+        raise RuntimeError("boom")
+
+
+def make_message(source_id: str, target_id: str, payload=None) -> ProtocolMessage:
+    """Create a simple request message."""
+    return ProtocolMessage(
+        source_agent=Agent(agent_id=source_id, domain="test", version="1.0.0"),
+        target_agent=Agent(agent_id=target_id, domain="test", version="1.0.0"),
+        message_type="request",
+        intent="test",
+        payload=payload or {},
+        security=Security(auth_token="test-token")
+    )
+
+
+def agents_on_different_shards(broker: ShardedProtocolBroker):
+    """Find two agent IDs the ring places on different shards."""
+    first = "agent-0"
+    for i in range(1, 100):
+        candidate = f"agent-{i}"
+        if broker.shard_for(candidate) != broker.shard_for(first):
+            return first, candidate
+    raise AssertionError("No agents on different shards")
+
+
+class TestConsistentHashRing:
+    """Test agent placement."""
+
+    def test_placement_is_stable(self):
+        """Test the same key always maps to the same node."""
+        ring = ConsistentHashRing([0, 1, 2, 3])
+        other = ConsistentHashRing([0, 1, 2, 3])
+
+        assert all(ring.get_node(f"agent-{i}") == other.get_node(f"agent-{i}") for i in range(100))
+
+    def test_placement_is_balanced(self):
+        """Test keys spread across all nodes."""
+        ring = ConsistentHashRing([0, 1, 2, 3])
+        counts = [0, 0, 0, 0]
+        for i in range(4000):
+            counts[ring.get_node(f"agent-{i}")] += 1
+
+        assert min(counts) > 600
+
+    def test_adding_node_moves_few_keys(self):
+        """Test adding a node only moves keys onto the new node."""
+        ring = ConsistentHashRing([0, 1, 2, 3])
+        keys = [f"agent-{i}" for i in range(4000)]
+        before = {key: ring.get_node(key) for key in keys}
+
+        ring.add_node(4)
+        moved = [key for key in keys if ring.get_node(key) != before[key]]
+
+        assert all(ring.get_node(key) == 4 for key in moved)
+        assert len(moved) < len(keys) / 3
+
+    def test_empty_ring(self):
+        """Test lookups on an empty ring fail clearly."""
+        with pytest.raises(ShardError):
+            ConsistentHashRing().get_node("agent-a")
+
+
+class TestShardedProtocolBroker:
+    """Test multi-process routing."""
+
+    def test_not_started(self):
+        """Test calls before start() raise ShardError."""
+        broker = ShardedProtocolBroker(num_shards=2)
+
+        with pytest.raises(ShardError):
+            broker.register_agent("agent-a", NullHandler())
+
+    def test_cross_shard_contract_routing(self):
+        """Test contract messages in both directions across shards."""
+        with ShardedProtocolBroker(num_shards=2) as broker:
+            agent_a, agent_b = agents_on_different_shards(broker)
+            broker.register_agent(agent_a, NullHandler())
+            broker.register_agent(agent_b, NullHandler())
+
+            handshake = broker.initiate_handshake(agent_a, agent_b, "test")
+            accepted = broker.accept_handshake(handshake.details["handshake_id"])
+            contract_id = accepted.details["contract_id"]
+
+            messages = [
+                make_message(agent_a, agent_b, {"contract_id": contract_id}),
+                make_message(agent_b, agent_a, {"contract_id": contract_id}),
+                make_message(agent_b, agent_a, {"contract_id": contract_id}),
+            ]
+            results = broker.route_many(messages)
+            stats = broker.get_shard_stats()
+
+        assert all(r.valid for r in results)
+
+        owner = stats[broker.shard_for(agent_b)]
+        assert owner["contracts"] == 1
+        assert owner["collaborations"] == 1
+        assert owner["delivered"] == {agent_b: 1}
+        assert stats[broker.shard_for(agent_a)]["delivered"] == {agent_a: 2}
+
+    def test_rejections_are_per_message(self):
+        """Test invalid and unroutable messages fail without affecting others."""
+        with ShardedProtocolBroker(num_shards=2) as broker:
+            broker.register_agent("agent-b", NullHandler())
+
+            invalid = make_message("agent-a", "agent-b")
+            invalid.message_type = "invalid"
+            results = broker.route_many([
+                make_message("agent-a", "agent-b"),
+                invalid,
+                make_message("agent-a", "missing"),
+                make_message("agent-a", "agent-b", {"contract_id": "contract-unknown"}),
+            ])
+
+        assert results[0].valid
+        assert results[1].error_code == "INVALID_MESSAGE_TYPE"
+        assert results[2].error_code == ErrorCode.CAPABILITY_NOT_FOUND
+        assert results[3].error_code == ErrorCode.CONTRACT_VIOLATION
+
+    def test_accept_unknown_handshake(self):
+        """Test accepting a handshake the router never saw."""
+        with ShardedProtocolBroker(num_shards=2) as broker:
+            result = broker.accept_handshake("handshake-unknown")
+
+        assert not result.valid
+        assert result.error_code == ErrorCode.TIMEOUT
+
+    def test_router_forgets_expired_handshakes(self):
+        """Test handshakes that expire unaccepted are dropped by the front router."""
+        now = [0.0]
+        scheduler = ExpiryScheduler(clock=lambda: now[0])
+        with ShardedProtocolBroker(num_shards=2, expiry_scheduler=scheduler) as broker:
+            broker.register_agent("agent-b", NullHandler())
+            handshake_id = broker.initiate_handshake("agent-a", "agent-b", "test").details["handshake_id"]
+
+            now[0] += 60.0
+            result = broker.accept_handshake(handshake_id)
+
+        assert result.error_code == ErrorCode.TIMEOUT
+        assert broker._handshake_shards == {}
+
+    def test_terminate_contract(self):
+        """Test terminating a contract drops it from the router and its shard."""
+        with ShardedProtocolBroker(num_shards=2) as broker:
+            agent_a, agent_b = agents_on_different_shards(broker)
+            broker.register_agent(agent_a, NullHandler())
+            broker.register_agent(agent_b, NullHandler())
+
+            handshake = broker.initiate_handshake(agent_a, agent_b, "test")
+            contract_id = broker.accept_handshake(handshake.details["handshake_id"]).details["contract_id"]
+            assert broker.route_message(make_message(agent_a, agent_b, {"contract_id": contract_id})).valid
+
+            terminated = broker.terminate_contract(contract_id)
+            result = broker.route_message(make_message(agent_a, agent_b, {"contract_id": contract_id}))
+            stats = broker.get_shard_stats()
+
+        assert terminated.valid
+        assert result.error_code == ErrorCode.CONTRACT_VIOLATION
+        assert broker._contract_shards == {}
+        assert stats[broker.shard_for(agent_b)]["collaborations"] == 0
+        assert not broker.terminate_contract(contract_id).valid
+
+    def test_handler_error_raises_shard_error(self):
+        """Test a failing handler surfaces as ShardError and the shard keeps serving."""
+        with ShardedProtocolBroker(num_shards=2) as broker:
+            broker.register_agent("agent-b", FailingHandler())
+            broker.register_agent("agent-c", NullHandler())
+
+            with pytest.raises(ShardError):
+                broker.route_message(make_message("agent-a", "agent-b"))
+
+            result = broker.route_message(make_message("agent-a", "agent-c"))
+
+        assert result.valid
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])